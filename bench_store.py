@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Armazenamento dos resultados de benchmark e comparação com uma execução de referência.
+
+Cada execução vira um JSON em <dir>/<commit>/<servidor>-<cenário>-jvm<hash>-ds<tamanho>-<data>.json,
+com os metadados (commit, servidor, flags da JVM, tamanho do conjunto de dados) e o resultado
+completo do loadgen (incluindo os histogramas). `compare_runs` confronta p95/p99, vazão (só
+requisições bem-sucedidas) e taxa de erros de duas execuções e aponta regressões acima dos limites.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Limite padrão de regressão (percentual) para latência e vazão
+DEFAULT_THRESHOLD_PCT = 10.0
+# Aumento absoluto da taxa de erros (fração de requisições) tratado como regressão
+DEFAULT_ERROR_RATE_THRESHOLD = 0.01
+# Tolerância relativa do tamanho do conjunto de dados ao escolher a referência
+DATASET_TOLERANCE_PCT = 5.0
+
+LATENCY_PERCENTILES = ("p95", "p99")
+
+
+def git_revision(repo_dir: str) -> Tuple[str, bool]:
+    """(commit abreviado, árvore com alterações) do repositório; ("sem-git", False) se indisponível."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short=12", "HEAD"], cwd=repo_dir,
+                             capture_output=True, text=True, timeout=10)
+        if sha.returncode != 0 or not sha.stdout.strip():
+            return "sem-git", False
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir,
+                                capture_output=True, text=True, timeout=20)
+        return sha.stdout.strip(), bool(status.stdout.strip())
+    except Exception:
+        return "sem-git", False
+
+
+def jvm_flags_hash(flags: str) -> str:
+    normalized = " ".join(sorted((flags or "").split()))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:8]
+
+
+def build_meta(repo_dir: str, server: str, scenario: str, jvm_flags: str, dataset_size: Optional[int],
+               **extra) -> Dict[str, Any]:
+    commit, dirty = git_revision(repo_dir)
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "server": server,
+        "scenario": scenario,
+        "jvm_flags": (jvm_flags or "").strip(),
+        "jvm_flags_hash": jvm_flags_hash(jvm_flags),
+        "dataset_size": dataset_size,
+    }
+    meta.update({k: v for k, v in extra.items() if v is not None})
+    return meta
+
+
+def save_run(results_dir: str, meta: Dict[str, Any], result: Dict[str, Any]) -> str:
+    """Grava a execução e retorna o caminho do arquivo."""
+    stamp = datetime.fromisoformat(meta["timestamp"]).strftime("%Y%m%d%H%M%S")
+    commit = meta.get("commit") or "sem-git"
+    if meta.get("dirty"):
+        commit += "-dirty"
+    dataset = meta.get("dataset_size")
+    name = (f"{meta.get('server', 'servidor')}-{meta.get('scenario', 'mix')}-jvm{meta.get('jvm_flags_hash', '0')}"
+            f"-ds{dataset if dataset is not None else 'nd'}-{stamp}.json")
+    directory = os.path.join(results_dir, commit)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"meta": meta, "result": result}, fh, ensure_ascii=False, indent=1)
+    return path
+
+
+def load_run(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    data["path"] = path
+    return data
+
+
+def list_runs(results_dir: str) -> List[Dict[str, Any]]:
+    """Todas as execuções gravadas, da mais antiga para a mais recente (somente metadados + caminho)."""
+    runs = []
+    if not os.path.isdir(results_dir):
+        return runs
+    for root, _dirs, files in os.walk(results_dir):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    meta = json.load(fh).get("meta") or {}
+            except (OSError, ValueError):
+                continue
+            runs.append({"path": path, "meta": meta})
+    runs.sort(key=lambda r: (r["meta"].get("timestamp", ""), r["path"]))
+    return runs
+
+
+def _matches(meta: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    return all(v is None or meta.get(k) == v for k, v in filters.items())
+
+
+def select_run(results_dir: str, selector: Optional[str] = "latest", exclude: Optional[str] = None,
+               **filters) -> Optional[Dict[str, Any]]:
+    """
+    Resolve uma execução: caminho de arquivo, "latest" (a mais recente) ou prefixo de commit
+    (a mais recente daquele commit). `filters` restringe por metadados (server, scenario, ...).
+    """
+    if selector and os.path.isfile(selector):
+        return load_run(selector)
+    candidates = [r for r in list_runs(results_dir)
+                  if _matches(r["meta"], filters)
+                  and (exclude is None or os.path.abspath(r["path"]) != os.path.abspath(exclude))]
+    if selector and selector != "latest":
+        candidates = [r for r in candidates if str(r["meta"].get("commit", "")).startswith(selector)]
+    return load_run(candidates[-1]["path"]) if candidates else None
+
+
+def similar_dataset(a: Optional[int], b: Optional[int], tolerance_pct: float = DATASET_TOLERANCE_PCT) -> bool:
+    """Tamanhos equivalentes para comparação: diferença relativa até `tolerance_pct` (ou ambos ausentes)."""
+    if a is None or b is None:
+        return a is None and b is None
+    return abs(a - b) <= max(a, b) * tolerance_pct / 100.0
+
+
+def find_baseline(results_dir: str, candidate: Dict[str, Any], match_dataset: bool = True,
+                  dataset_tolerance_pct: float = DATASET_TOLERANCE_PCT) -> Optional[Dict[str, Any]]:
+    """
+    Referência padrão: a execução mais recente com mesmo servidor, cenário e flags da JVM, e conjunto
+    de dados de tamanho semelhante (±`dataset_tolerance_pct`; ignorado com match_dataset=False),
+    feita em outro commit (ou, se não houver, qualquer execução anterior).
+    """
+    meta = candidate["meta"]
+    same = {k: meta.get(k) for k in ("server", "scenario", "jvm_flags_hash")}
+    runs = [r for r in list_runs(results_dir)
+            if _matches(r["meta"], same) and os.path.abspath(r["path"]) != os.path.abspath(candidate["path"])
+            and r["meta"].get("timestamp", "") <= meta.get("timestamp", "")
+            and (not match_dataset or similar_dataset(r["meta"].get("dataset_size"), meta.get("dataset_size"),
+                                                      dataset_tolerance_pct))]
+    other_commit = [r for r in runs if r["meta"].get("commit") != meta.get("commit")]
+    chosen = (other_commit or runs)
+    return load_run(chosen[-1]["path"]) if chosen else None
+
+
+def extract_metrics(result: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Métricas comparáveis de um resultado do loadgen: {"total": {...}, "<operação>": {...}} com
+    throughput (requisições bem-sucedidas/s ou ciclos completos/s), error_rate (fração) e p95/p99 em ms.
+    Respostas de erro rápidas não contam como vazão.
+    """
+    metrics: Dict[str, Dict[str, Optional[float]]] = {}
+    duration = result.get("duration_s") or 0
+    if result.get("scenario") == "lifecycle":
+        parts = result.get("steps") or {}
+        completed, failed = result.get("completed") or 0, result.get("failed") or 0
+        metrics["total"] = {"throughput": result.get("throughput_rps"),
+                            "error_rate": round(failed / (completed + failed), 5) if completed + failed else None}
+    else:
+        parts = result.get("operations") or {}
+        total_latency = result.get("latency_ms") or {}
+        ok = sum(stats.get("ok") or 0 for stats in parts.values())
+        errors = sum(stats.get("errors") or 0 for stats in parts.values())
+        metrics["total"] = {"throughput": round(ok / duration, 2) if duration else None,
+                            "error_rate": round(errors / (ok + errors), 5) if ok + errors else None,
+                            **{p: total_latency.get(p) for p in LATENCY_PERCENTILES}}
+    for name, stats in parts.items():
+        latency = stats.get("latency_ms") or {}
+        ok, errors = stats.get("ok") or 0, stats.get("errors") or 0
+        metrics[name] = {"throughput": round(ok / duration, 2) if duration else None,
+                         "error_rate": round(errors / (ok + errors), 5) if ok + errors else None,
+                         **{p: latency.get(p) for p in LATENCY_PERCENTILES}}
+    return metrics
+
+
+class Comparison:
+    def __init__(self, baseline: Dict[str, Any], candidate: Dict[str, Any],
+                 latency_threshold_pct: float, throughput_threshold_pct: float,
+                 error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD):
+        self.baseline = baseline
+        self.candidate = candidate
+        self.latency_threshold_pct = latency_threshold_pct
+        self.throughput_threshold_pct = throughput_threshold_pct
+        self.error_rate_threshold = error_rate_threshold
+        self.rows: List[Dict[str, Any]] = []
+
+    @property
+    def regressions(self) -> List[Dict[str, Any]]:
+        return [r for r in self.rows if r["regressed"]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "baseline": self.baseline.get("path"), "candidate": self.candidate.get("path"),
+            "latency_threshold_pct": self.latency_threshold_pct,
+            "throughput_threshold_pct": self.throughput_threshold_pct,
+            "error_rate_threshold": self.error_rate_threshold,
+            "rows": self.rows, "regressions": len(self.regressions),
+        }
+
+
+def compare_runs(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                 latency_threshold_pct: float = DEFAULT_THRESHOLD_PCT,
+                 throughput_threshold_pct: float = DEFAULT_THRESHOLD_PCT,
+                 error_rate_threshold: float = DEFAULT_ERROR_RATE_THRESHOLD) -> Comparison:
+    """
+    Regressão: p95/p99 acima de (1 + limite) × referência, vazão bem-sucedida abaixo de
+    (1 - limite) × referência, ou taxa de erros acima da referência em mais de `error_rate_threshold`
+    (diferença absoluta: de 0% para 100% de erros reprova mesmo com latência e vazão boas).
+    A vazão só é avaliada no total (por operação ela depende da mistura sorteada).
+    """
+    comparison = Comparison(baseline, candidate, latency_threshold_pct, throughput_threshold_pct, error_rate_threshold)
+    base_metrics = extract_metrics(baseline.get("result") or {})
+    cand_metrics = extract_metrics(candidate.get("result") or {})
+    for scope in [k for k in base_metrics if k in cand_metrics]:
+        for metric, cand_value in cand_metrics[scope].items():
+            base_value = base_metrics[scope].get(metric)
+            if metric == "throughput" and scope != "total":
+                continue
+            if metric == "error_rate":
+                if base_value is None or cand_value is None:
+                    continue
+                delta = cand_value - base_value
+                comparison.rows.append({"scope": scope, "metric": metric, "baseline": base_value,
+                                        "candidate": cand_value, "delta_abs": round(delta, 5),
+                                        "regressed": delta > error_rate_threshold})
+                continue
+            if base_value in (None, 0) or cand_value is None:
+                continue
+            delta_pct = (cand_value - base_value) / base_value * 100.0
+            if metric == "throughput":
+                regressed = delta_pct < -throughput_threshold_pct
+            else:
+                regressed = delta_pct > latency_threshold_pct
+            comparison.rows.append({"scope": scope, "metric": metric, "baseline": base_value,
+                                    "candidate": cand_value, "delta_pct": round(delta_pct, 2),
+                                    "regressed": regressed})
+    return comparison
+
+
+def _describe(run: Dict[str, Any]) -> str:
+    meta = run.get("meta") or {}
+    dirty = "+alterações" if meta.get("dirty") else ""
+    return (f"{meta.get('commit', '?')}{dirty} {meta.get('server', '?')}/{meta.get('scenario', '?')} "
+            f"ds={meta['dataset_size'] if meta.get('dataset_size') is not None else 'n/d'} jvm=[{meta.get('jvm_flags') or 'padrão'}] em {meta.get('timestamp', '?')}")
+
+
+def format_comparison(comparison: Comparison) -> List[str]:
+    lines = [
+        f"Referência: {_describe(comparison.baseline)}",
+        f"Candidata:  {_describe(comparison.candidate)}",
+        f"Limites: latência +{comparison.latency_threshold_pct:g}%, vazão -{comparison.throughput_threshold_pct:g}%, "
+        f"erros +{comparison.error_rate_threshold * 100:g} p.p.",
+        f"{'escopo':<18} {'métrica':<10} {'referência':>11} {'candidata':>11} {'Δ':>9}",
+    ]
+    for row in comparison.rows:
+        flag = "  << REGRESSÃO" if row["regressed"] else ""
+        if row["metric"] == "error_rate":
+            lines.append(f"{row['scope']:<18} {'erros %':<10} {row['baseline'] * 100:>11.2f} "
+                         f"{row['candidate'] * 100:>11.2f} {row['delta_abs'] * 100:>+6.2f}p.p.{flag}")
+            continue
+        unit = "req/s" if row["metric"] == "throughput" else "ms"
+        lines.append(f"{row['scope']:<18} {row['metric'] + ' ' + unit:<10} {row['baseline']:>11.2f} "
+                     f"{row['candidate']:>11.2f} {row['delta_pct']:>+8.1f}%{flag}")
+    bmeta, cmeta = comparison.baseline.get("meta") or {}, comparison.candidate.get("meta") or {}
+    for key in ("server", "scenario", "jvm_flags_hash", "dataset_size"):
+        if bmeta.get(key) != cmeta.get(key) and not (key == "dataset_size" and similar_dataset(bmeta.get(key), cmeta.get(key))):
+            lines.append(f"Aviso: execuções com {key} diferente ({bmeta.get(key)} × {cmeta.get(key)})")
+    regressions = comparison.regressions
+    lines.append(f"{len(regressions)} regressão(ões) acima do limite" if regressions else "Sem regressões acima do limite")
+    return lines
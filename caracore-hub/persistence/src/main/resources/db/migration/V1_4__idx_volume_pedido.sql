@@ -0,0 +1,3 @@
+-- FK sem indice: o ON DELETE CASCADE de pedido (e o LEFT JOIN FETCH dos volumes) varria a tabela
+-- volume inteira para cada pedido removido, deixando as limpezas em massa O(N^2)
+CREATE INDEX IF NOT EXISTS idx_volume_pedido ON volume(pedido_id);
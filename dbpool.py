@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Acesso compartilhado ao PostgreSQL para as ferramentas do projeto (main.py, seeds, snapshots, testes).
+
+    db = dbpool.get_database(load_db_config_from_compose())
+    with db.cursor() as cur:            # transação: commit ao sair, rollback em exceção
+        cur.execute("SELECT ...")
+    total = db.scalar("SELECT count(*) FROM pedido")
+    deleted = db.run(lambda cur: cur.execute(sql, params) or cur.rowcount)   # várias operações no cursor
+    for row in db.stream("SELECT ... FROM evento"):   # cursor no servidor, memória constante
+        ...
+
+Um pool por banco (host, porta, banco, usuário) e opções do pool, criado na primeira utilização e reaproveitado por
+todo o processo: uma única conexão atende seeds, verificações e limpezas em sequência, em vez de
+um handshake por função (e sem esgotar max_connections com as próprias ferramentas). Conexões
+novas recebem statement_timeout e application_name; falhas de conexão são repetidas com backoff
+exponencial e conexões derrubadas (reinício do contêiner, restauração de snapshot) são descartadas.
+
+Variáveis: APP_DB_POOL_MAX (padrão 4), APP_DB_STATEMENT_TIMEOUT_MS (padrão 30000; 0 = sem limite),
+APP_DB_CONNECT_RETRIES (padrão 3).
+"""
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import psycopg2  # type: ignore
+    import psycopg2.pool  # type: ignore
+except Exception:  # pragma: no cover - dependência opcional
+    psycopg2 = None
+
+POOL_MAX = max(1, int(os.environ.get("APP_DB_POOL_MAX", "4")))
+STATEMENT_TIMEOUT_MS = max(0, int(os.environ.get("APP_DB_STATEMENT_TIMEOUT_MS", "30000")))
+CONNECT_RETRIES = max(0, int(os.environ.get("APP_DB_CONNECT_RETRIES", "3")))
+CONNECT_TIMEOUT_S = 5
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 8.0
+APPLICATION_NAME = "app_jakarta-tools"
+# Falhas de conexão que não se resolvem esperando (credenciais, banco inexistente)
+_PERMANENT_ERRORS = ("password authentication failed", "does not exist", "no pg_hba.conf entry")
+# SQLSTATE de sessão encerrada pelo servidor (pg_terminate_backend, desligamento, reinício)
+_DISCONNECT_SQLSTATES = ("57P01", "57P02", "57P03")
+
+
+class DatabaseUnavailable(RuntimeError):
+    """Driver ausente ou banco inacessível após as tentativas de conexão."""
+
+
+def available() -> bool:
+    return psycopg2 is not None
+
+
+def _is_disconnect(exc: BaseException, conn) -> bool:
+    """
+    Conexão perdida (descartar e, antes de qualquer efeito, repetir): a conexão ficou fechada, o
+    SQLSTATE é da classe 08 (connection exception) ou de sessão encerrada pelo servidor. Demais
+    OperationalError (disco cheio, deadlock, falta de memória) não são desconexões.
+    """
+    if psycopg2 is None:
+        return False
+    if conn is not None and getattr(conn, "closed", 0):
+        return True
+    if isinstance(exc, psycopg2.InterfaceError):
+        return True
+    code = getattr(exc, "pgcode", None) or ""
+    return code.startswith("08") or code in _DISCONNECT_SQLSTATES
+
+
+class Database:
+    """Pool de conexões de um banco (criado sob demanda) com operações de conveniência."""
+
+    def __init__(self, config: Dict[str, Any], maxconn: int = POOL_MAX,
+                 statement_timeout_ms: int = STATEMENT_TIMEOUT_MS, retries: int = CONNECT_RETRIES,
+                 application_name: str = APPLICATION_NAME):
+        self.config = dict(config)
+        self.maxconn = max(1, maxconn)
+        self.statement_timeout_ms = statement_timeout_ms
+        self.retries = retries
+        self.application_name = application_name
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        c = self.config
+        return f"{c.get('host')}:{c.get('port')}/{c.get('name')}"
+
+    def _get_pool(self):
+        if psycopg2 is None:
+            raise DatabaseUnavailable("psycopg2 não instalado")
+        with self._lock:
+            if self._pool is None:
+                c = self.config
+                # O pool só é criado no primeiro uso. minconn=1: o psycopg2 fecha na devolução toda conexão
+                # além de minconn, então é ela que fica aberta entre as chamadas (as ferramentas são sequenciais)
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    1, self.maxconn, host=c["host"], port=str(c["port"]), dbname=c["name"], user=c["user"],
+                    password=c["password"], connect_timeout=CONNECT_TIMEOUT_S, application_name=self.application_name,
+                    options=f"-c statement_timeout={int(self.statement_timeout_ms)}",
+                )
+            return self._pool
+
+    def _acquire(self, retries: Optional[int] = None):
+        """Conexão do pool; falhas de conexão são repetidas com backoff exponencial."""
+        attempts = (self.retries if retries is None else retries) + 1
+        delay = BACKOFF_BASE_S
+        last_error: Optional[BaseException] = None
+        for attempt in range(attempts):
+            try:
+                pool = self._get_pool()
+                conn = pool.getconn()
+            except psycopg2.pool.PoolError as e:
+                # Pool esgotado (mais usuários simultâneos que APP_DB_POOL_MAX): aguardar uma devolução
+                last_error = e
+            except psycopg2.OperationalError as e:
+                last_error = e
+                if any(marker in str(e).lower() for marker in _PERMANENT_ERRORS):
+                    break
+            else:
+                if not conn.closed:
+                    return conn
+                pool.putconn(conn, close=True)
+                continue
+            if attempt < attempts - 1:
+                time.sleep(delay)
+                delay = min(delay * 2, BACKOFF_MAX_S)
+        raise DatabaseUnavailable(f"Sem conexão com {self.label}: {last_error}")
+
+    def _release(self, conn, discard: bool = False) -> None:
+        if self._pool is None:
+            return
+        try:
+            self._pool.putconn(conn, close=discard or bool(conn.closed))
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self, autocommit: bool = False, statement_timeout_ms: Optional[int] = None,
+                   retries: Optional[int] = None) -> Iterator[Any]:
+        """
+        Conexão emprestada do pool. Sem autocommit, a transação é confirmada ao sair e desfeita em
+        exceção. `statement_timeout_ms` substitui o limite padrão só durante o empréstimo (0 = sem limite).
+        """
+        conn = self._acquire(retries)
+        discard = False
+        try:
+            conn.autocommit = autocommit
+            if statement_timeout_ms is not None:
+                with conn.cursor() as cur:
+                    cur.execute("SET statement_timeout = %s", (int(statement_timeout_ms),))
+                if not autocommit:
+                    conn.commit()
+            yield conn
+            if not autocommit and not conn.closed:
+                conn.commit()
+        except BaseException as exc:
+            discard = _is_disconnect(exc, conn)
+            if not discard and not conn.closed:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            raise
+        finally:
+            if not discard and not conn.closed:
+                try:
+                    if statement_timeout_ms is not None:
+                        conn.autocommit = True
+                        with conn.cursor() as cur:
+                            cur.execute("SET statement_timeout = %s", (int(self.statement_timeout_ms),))
+                    conn.autocommit = False
+                except Exception:
+                    discard = True
+            self._release(conn, discard)
+
+    @contextmanager
+    def cursor(self, autocommit: bool = False, statement_timeout_ms: Optional[int] = None) -> Iterator[Any]:
+        with self.connection(autocommit=autocommit, statement_timeout_ms=statement_timeout_ms) as conn:
+            with conn.cursor() as cur:
+                yield cur
+
+    def run(self, fn, autocommit: bool = False, statement_timeout_ms: Optional[int] = None):
+        """
+        Executa fn(cursor) numa transação (ou em autocommit) e devolve o resultado; repete uma vez se
+        a conexão do pool estava morta (sessão encerrada no servidor).
+        """
+        for attempt in (1, 2):
+            conn = None
+            try:
+                with self.connection(autocommit=autocommit, statement_timeout_ms=statement_timeout_ms) as conn:
+                    with conn.cursor() as cur:
+                        return fn(cur)
+            except DatabaseUnavailable:
+                raise
+            except Exception as exc:
+                if attempt == 2 or not _is_disconnect(exc, conn):
+                    raise
+
+    def execute(self, sql: str, params: Sequence[Any] = (), **kw) -> int:
+        """Comando sem retorno de linhas; devolve o rowcount."""
+        def fn(cur):
+            cur.execute(sql, params or None)
+            return cur.rowcount
+        return self.run(fn, **kw)
+
+    def fetchone(self, sql: str, params: Sequence[Any] = (), **kw) -> Optional[Tuple[Any, ...]]:
+        def fn(cur):
+            cur.execute(sql, params or None)
+            return cur.fetchone()
+        return self.run(fn, **kw)
+
+    def fetchall(self, sql: str, params: Sequence[Any] = (), **kw) -> List[Tuple[Any, ...]]:
+        def fn(cur):
+            cur.execute(sql, params or None)
+            return cur.fetchall() if cur.description is not None else []
+        return self.run(fn, **kw)
+
+    def scalar(self, sql: str, params: Sequence[Any] = (), **kw) -> Any:
+        row = self.fetchone(sql, params, **kw)
+        return row[0] if row else None
+
+    def stream(self, sql: str, params: Sequence[Any] = (), itersize: int = 2000,
+               statement_timeout_ms: Optional[int] = 0) -> Iterator[Tuple[Any, ...]]:
+        """
+        Leitura grande por cursor no servidor (DECLARE/FETCH em lotes de `itersize`): memória constante.
+        Sem limite de tempo por padrão, já que o cursor fica aberto enquanto o chamador consome.
+        """
+        with self.connection(statement_timeout_ms=statement_timeout_ms) as conn:
+            with conn.cursor(name=f"dbpool_stream_{id(conn):x}_{time.monotonic_ns():x}") as cur:
+                cur.itersize = itersize
+                cur.execute(sql, params or None)
+                for row in cur:
+                    yield row
+
+    def ping(self, retries: Optional[int] = None) -> str:
+        """Versão do servidor (SELECT version()); DatabaseUnavailable/erro do driver em falha."""
+        with self.connection(autocommit=True, retries=retries) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT version()")
+                return cur.fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                try:
+                    self._pool.closeall()
+                except Exception:
+                    pass
+                self._pool = None
+
+
+_DATABASES: Dict[Tuple[Any, ...], Database] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_database(config: Dict[str, Any], **options) -> Database:
+    """
+    Pool compartilhado para (host, porta, banco, usuário, options): pedidos com opções diferentes
+    (ex.: statement_timeout_ms=0 das sessões administrativas) recebem pools próprios.
+    """
+    key = (str(config.get("host")), str(config.get("port")), str(config.get("name")), str(config.get("user")),
+           tuple(sorted(options.items())))
+    with _REGISTRY_LOCK:
+        db = _DATABASES.get(key)
+        if db is None or db.config.get("password") != config.get("password"):
+            if db is not None:
+                db.close()
+            db = _DATABASES[key] = Database(config, **options)
+        return db
+
+
+def close_all() -> None:
+    with _REGISTRY_LOCK:
+        for db in _DATABASES.values():
+            db.close()
+        _DATABASES.clear()
+
+
+atexit.register(close_all)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Snapshots do banco da aplicação como bancos-modelo do PostgreSQL (CREATE DATABASE ... TEMPLATE).
+
+    save    <banco>__snap_<nome> = cópia do banco da aplicação (marcada IS_TEMPLATE, sem conexões)
+    restore o banco da aplicação é substituído por uma cópia do snapshot (cópia, troca por RENAME)
+    clone   um banco novo (ex.: por sessão de testes/benchmark) a partir do snapshot
+
+A cópia é feita pelo servidor, arquivo a arquivo, sem reexecutar docker/postgres/init nem seeds:
+leva segundos mesmo com milhões de linhas. Os comandos rodam no banco de manutenção `postgres`
+(CREATE/DROP DATABASE não podem estar conectados ao banco alvo) pelo pool do dbpool ou, sem
+psycopg2, via psql dentro do contêiner.
+"""
+
+import json
+import re
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+import dbpool
+
+SNAPSHOT_INFIX = "__snap_"
+# Nome provisório da cópia durante o restore (o banco atual só é removido depois da cópia pronta)
+RESTORE_SUFFIX = "__restoring"
+DEFAULT_CONTAINER = "meu-app-postgres"
+MAINTENANCE_DB = "postgres"
+# Limite de identificadores do PostgreSQL (NAMEDATALEN - 1)
+MAX_IDENTIFIER = 63
+# Tentativas de CREATE DATABASE ... TEMPLATE enquanto sessões reconectam ao banco de origem
+COPY_ATTEMPTS = 5
+
+_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9_]*$")
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def snapshot_db_name(database: str, name: str) -> str:
+    """Nome do banco-modelo do snapshot `name` (minúsculas, dígitos e '_')."""
+    if not _NAME_RE.match(name or ""):
+        raise SnapshotError(f"Nome de snapshot inválido: {name!r} (use minúsculas, dígitos e '_')")
+    full = f"{database}{SNAPSHOT_INFIX}{name}"
+    if len(full.encode("utf-8")) > MAX_IDENTIFIER:
+        raise SnapshotError(f"Nome de snapshot longo demais: {full} (máximo {MAX_IDENTIFIER} bytes)")
+    return full
+
+
+class AdminSession:
+    """
+    Sessão no banco de manutenção: pool compartilhado (dbpool, autocommit, sem statement_timeout)
+    quando o psycopg2 conecta, senão `docker exec <contêiner> psql`. `db` segue
+    load_db_config_from_compose (host, port, name, user, password).
+    """
+
+    def __init__(self, db: Dict[str, Any], container: str = DEFAULT_CONTAINER, use_driver: bool = True):
+        self.db = db
+        self.container = container
+        self._database = None
+        if use_driver and dbpool.available():
+            # CREATE DATABASE ... TEMPLATE de bancos grandes passa do statement_timeout padrão
+            database = dbpool.get_database(dict(db, name=MAINTENANCE_DB), statement_timeout_ms=0)
+            try:
+                database.ping(retries=0)
+                self._database = database
+            except Exception:
+                self._database = None
+
+    @property
+    def via(self) -> str:
+        return "psycopg2" if self._database is not None else f"psql ({self.container})"
+
+    def query(self, sql: str) -> List[Tuple[str, ...]]:
+        """Executa um comando (SQL já com identificadores/literais citados) e retorna as linhas."""
+        if self._database is not None:
+            try:
+                return [tuple(row) for row in self._database.fetchall(sql, autocommit=True)]
+            except Exception as e:
+                raise SnapshotError(str(e).strip()) from e
+        try:
+            proc = subprocess.run(
+                ["docker", "exec", self.container, "psql", "-U", self.db["user"], "-d", MAINTENANCE_DB,
+                 "-v", "ON_ERROR_STOP=1", "-X", "-q", "-tA", "-F", "\t", "-c", sql],
+                capture_output=True, text=True, timeout=600,
+            )
+        except Exception as e:
+            raise SnapshotError(f"psql indisponível: {e}") from e
+        if proc.returncode != 0:
+            raise SnapshotError((proc.stderr or proc.stdout).strip() or f"psql retornou {proc.returncode}")
+        return [tuple(line.split("\t")) for line in proc.stdout.splitlines() if line.strip()]
+
+    def close(self) -> None:
+        # As conexões ficam no pool compartilhado (fechado ao fim do processo)
+        self._database = None
+
+    def __enter__(self) -> "AdminSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def database_exists(admin: AdminSession, name: str) -> bool:
+    return bool(admin.query(f"SELECT 1 FROM pg_database WHERE datname = {quote_literal(name)}"))
+
+
+def terminate_connections(admin: AdminSession, name: str) -> int:
+    """Encerra as demais sessões conectadas ao banco (pools dos servidores, psql abertos)."""
+    rows = admin.query(
+        f"SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+        f"WHERE datname = {quote_literal(name)} AND pid <> pg_backend_pid()"
+    )
+    return len(rows)
+
+
+def drop_database(admin: AdminSession, name: str) -> None:
+    if not database_exists(admin, name):
+        return
+    # IS_TEMPLATE impede o DROP; WITH (FORCE) (PostgreSQL 13+) derruba sessões remanescentes
+    admin.query(f"ALTER DATABASE {quote_ident(name)} WITH IS_TEMPLATE false")
+    admin.query(f"DROP DATABASE {quote_ident(name)} WITH (FORCE)")
+
+
+def _copy_database(admin: AdminSession, source: str, target: str, owner: str) -> float:
+    started = datetime.now()
+    admin.query(f"CREATE DATABASE {quote_ident(target)} TEMPLATE {quote_ident(source)} OWNER {quote_ident(owner)}")
+    return (datetime.now() - started).total_seconds()
+
+
+def save_snapshot(admin: AdminSession, database: str, name: str, note: str = "",
+                  replace: bool = False) -> Dict[str, Any]:
+    """
+    Copia o banco da aplicação para o banco-modelo do snapshot. O PostgreSQL exige que o banco de
+    origem não tenha outras sessões durante a cópia: as conexões dos pools são encerradas (os
+    servidores reconectam na próxima requisição).
+    """
+    target = snapshot_db_name(database, name)
+    if database_exists(admin, target):
+        if not replace:
+            raise SnapshotError(f"Snapshot '{name}' já existe (use substituição explícita)")
+        drop_database(admin, target)
+    # Os pools podem reconectar entre o encerramento e a cópia ("being accessed by other users"): repetir
+    terminated = 0
+    for attempt in range(1, COPY_ATTEMPTS + 1):
+        terminated += terminate_connections(admin, database)
+        try:
+            seconds = _copy_database(admin, database, target, admin.db["user"])
+            break
+        except SnapshotError as e:
+            if "other users" not in str(e) or attempt == COPY_ATTEMPTS:
+                raise
+            time.sleep(0.2 * attempt)
+    meta = {"created_at": datetime.now().isoformat(timespec="seconds"), "source": database, "note": note}
+    admin.query(f"COMMENT ON DATABASE {quote_ident(target)} IS {quote_literal(json.dumps(meta, ensure_ascii=False))}")
+    # Modelo somente leitura: ninguém conecta (a cópia seguinte não espera sessões) e nada o altera
+    admin.query(f"ALTER DATABASE {quote_ident(target)} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false")
+    return {"snapshot": target, "seconds": seconds, "terminated": terminated}
+
+
+def restore_snapshot(admin: AdminSession, database: str, name: str) -> Dict[str, Any]:
+    """
+    Substitui o banco da aplicação pelo snapshot: a cópia é criada com nome provisório, o banco
+    atual é removido (DROP ... WITH (FORCE)) e a cópia renomeada. Se a cópia falhar (disco cheio,
+    snapshot corrompido), o banco da aplicação continua intacto.
+    """
+    source = snapshot_db_name(database, name)
+    if not database_exists(admin, source):
+        raise SnapshotError(f"Snapshot '{name}' não encontrado ({source})")
+    staging = database + RESTORE_SUFFIX
+    if len(staging.encode("utf-8")) > MAX_IDENTIFIER:
+        raise SnapshotError(f"Nome do banco longo demais para o restore: {staging} (máximo {MAX_IDENTIFIER} bytes)")
+    drop_database(admin, staging)
+    try:
+        seconds = _copy_database(admin, source, staging, admin.db["user"])
+    except SnapshotError:
+        drop_database(admin, staging)
+        raise
+    drop_database(admin, database)
+    admin.query(f"ALTER DATABASE {quote_ident(staging)} RENAME TO {quote_ident(database)}")
+    return {"snapshot": source, "database": database, "seconds": seconds}
+
+
+def clone_snapshot(admin: AdminSession, database: str, name: str, target: str) -> Dict[str, Any]:
+    """Cria `target` a partir do snapshot (substituindo-o se existir), sem tocar no banco da aplicação."""
+    source = snapshot_db_name(database, name)
+    if not database_exists(admin, source):
+        raise SnapshotError(f"Snapshot '{name}' não encontrado ({source})")
+    if target == database or SNAPSHOT_INFIX in target:
+        raise SnapshotError(f"Destino inválido para clone: {target}")
+    drop_database(admin, target)
+    seconds = _copy_database(admin, source, target, admin.db["user"])
+    return {"snapshot": source, "database": target, "seconds": seconds}
+
+
+def drop_snapshot(admin: AdminSession, database: str, name: str) -> bool:
+    target = snapshot_db_name(database, name)
+    if not database_exists(admin, target):
+        return False
+    drop_database(admin, target)
+    return True
+
+
+def list_snapshots(admin: AdminSession, database: str) -> List[Dict[str, Any]]:
+    """Snapshots do banco: nome, tamanho em bytes e metadados gravados no COMMENT."""
+    prefix = database + SNAPSHOT_INFIX
+    rows = admin.query(
+        "SELECT datname, pg_database_size(oid), coalesce(shobj_description(oid, 'pg_database'), '') "
+        f"FROM pg_database WHERE left(datname, {len(prefix)}) = {quote_literal(prefix)} ORDER BY datname"
+    )
+    snapshots = []
+    for datname, size, comment in rows:
+        try:
+            meta = json.loads(comment) if comment else {}
+        except ValueError:
+            meta = {"note": comment}
+        snapshots.append({"name": datname[len(prefix):], "database": datname, "size": int(size), **meta})
+    return snapshots
+
+
+def format_snapshots(snapshots: Sequence[Dict[str, Any]]) -> List[str]:
+    if not snapshots:
+        return ["Nenhum snapshot encontrado"]
+    lines = [f"{'snapshot':<24} {'tamanho':>10} {'criado em':<20} nota"]
+    for snap in snapshots:
+        lines.append(f"{snap['name']:<24} {snap['size'] / (1024 * 1024):>8.1f}MB {snap.get('created_at', '?'):<20} "
+                     f"{snap.get('note', '')}")
+    return lines
+
+
+def restore_from_config(db: Dict[str, Any], name: str, container: str = DEFAULT_CONTAINER) -> Dict[str, Any]:
+    """Atalho para fixtures/scripts: abre a sessão administrativa, restaura e fecha."""
+    with AdminSession(db, container) as admin:
+        return restore_snapshot(admin, db["name"], name)
+
+
+def clone_from_config(db: Dict[str, Any], name: str, target: str, container: str = DEFAULT_CONTAINER) -> Dict[str, Any]:
+    """Atalho para fixtures/scripts: clona o snapshot em `target` sem tocar no banco `db["name"]`."""
+    with AdminSession(db, container) as admin:
+        return clone_snapshot(admin, db["name"], name, target)
+
+
+def drop_from_config(db: Dict[str, Any], target: str, container: str = DEFAULT_CONTAINER) -> None:
+    """Remove um banco criado por `clone_from_config` (nunca o banco da aplicação nem um snapshot)."""
+    if target == db["name"] or SNAPSHOT_INFIX in target:
+        raise SnapshotError(f"Banco protegido: {target}")
+    with AdminSession(db, container) as admin:
+        drop_database(admin, target)
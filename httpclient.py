@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Cliente HTTP/1.1 keep-alive mínimo (asyncio), compartilhado pelo gerador de carga (loadgen.py) e
+pelas sondas de prontidão (readiness.py).
+
+Uma conexão atende requisições em sequência e lê cada corpo por completo para poder ser reutilizada.
+Respostas interinas 1xx são descartadas; HEAD, 1xx, 204 e 304 não têm corpo (RFC 9112, 6.3).
+"""
+
+import asyncio
+import json
+import ssl
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_USER_AGENT = "app-jakarta/1.0"
+
+# Métodos que podem ser repetidos sem duplicar efeitos no servidor (RFC 9110, 9.2.2)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+def split_url(url: str) -> Tuple[bool, str, int, str, str]:
+    """(https?, host, porta, cabeçalho Host, caminho com query) de uma URL."""
+    parts = urlsplit(url)
+    secure = parts.scheme.lower() == "https"
+    host = parts.hostname or "localhost"
+    default_port = 443 if secure else 80
+    port = parts.port or default_port
+    host_header = host if port == default_port else f"{host}:{port}"
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    return secure, host, port, host_header, path
+
+
+def has_no_body(method: str, status: int) -> bool:
+    """
+    Resposta sem corpo por definição, mesmo com Content-Length/Transfer-Encoding no cabeçalho: ler
+    aqui bloquearia a conexão keep-alive até o timeout esperando bytes que nunca chegam.
+    """
+    return method.upper() == "HEAD" or 100 <= status < 200 or status in (204, 304)
+
+
+class HttpResponse:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+class HttpConnection:
+    """Conexão HTTP/1.1 keep-alive (requisições em sequência, corpo lido por completo)."""
+
+    def __init__(self, host: str, port: int, secure: bool, host_header: str,
+                 user_agent: str = DEFAULT_USER_AGENT, accept: str = "application/json"):
+        self.host = host
+        self.port = port
+        self.secure = secure
+        self.host_header = host_header
+        self.user_agent = user_agent
+        self.accept = accept
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.requests = 0
+        self.sent = False
+
+    async def _connect(self) -> None:
+        ctx = None
+        if self.secure:
+            ctx = ssl.create_default_context()
+            # Ambiente local de desenvolvimento: certificados autoassinados são comuns
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+        self.requests = 0
+
+    async def close(self) -> None:
+        writer, self.reader, self.writer = self.writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        reused = self.writer is not None and self.requests > 0
+        try:
+            return await self._request_once(method, path, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            await self.close()
+            # POST/PATCH já enviados podem ter sido processados: repetir duplicaria o efeito
+            if not reused or (self.sent and method.upper() not in IDEMPOTENT_METHODS):
+                raise
+        # Conexão keep-alive encerrada pelo servidor entre requisições: repetir numa conexão nova
+        return await self._request_once(method, path, body, headers)
+
+    async def _request_once(self, method: str, path: str, body: Optional[bytes],
+                            headers: Optional[Dict[str, str]]) -> HttpResponse:
+        self.sent = False
+        if self.writer is None:
+            await self._connect()
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host_header}",
+            f"User-Agent: {self.user_agent}",
+            f"Accept: {self.accept}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body) if body else 0}",
+        ]
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self.writer.drain()
+        self.sent = True
+        while True:
+            status_line = await self.reader.readuntil(b"\r\n")
+            pieces = status_line.decode("latin-1").split(" ", 2)
+            if len(pieces) < 2 or not pieces[0].startswith("HTTP/"):
+                raise ConnectionError(f"resposta HTTP inválida: {status_line[:60]!r}")
+            status = int(pieces[1])
+            response_headers: Dict[str, str] = {}
+            while True:
+                line = await self.reader.readuntil(b"\r\n")
+                if line == b"\r\n":
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                response_headers[key.strip().lower()] = value.strip()
+            # 1xx (100 Continue, 103 Early Hints) é interino: a resposta final vem em seguida
+            if not 100 <= status < 200 or status == 101:
+                break
+        data = b"" if has_no_body(method, status) else await self._read_body(response_headers)
+        self.requests += 1
+        if response_headers.get("connection", "").lower() == "close" or pieces[0] == "HTTP/1.0":
+            await self.close()
+        return HttpResponse(status, response_headers, data)
+
+    async def _read_body(self, headers: Dict[str, str]) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size_line = await self.reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # trailers até a linha vazia
+                    while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    return b"".join(chunks)
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+        length = headers.get("content-length")
+        if length is not None:
+            return await self.reader.readexactly(int(length))
+        # Sem tamanho conhecido: ler até o fim e descartar a conexão
+        data = await self.reader.read()
+        await self.close()
+        return data
@@ -0,0 +1,669 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Gerador de carga HTTP (asyncio) para a API de pedidos (/api/pedidos).
+
+Dois modos:
+  - closed: N usuários virtuais, cada um envia a próxima requisição quando a anterior termina
+    (mede a capacidade do servidor com concorrência fixa);
+  - open: chegadas a taxa fixa (req/s), independentes das respostas. A latência é medida a partir
+    do instante *agendado* de cada requisição, então filas no cliente ou no servidor aparecem nos
+    percentis (sem "coordinated omission").
+
+As conexões HTTP/1.1 keep-alive ficam num pool compartilhado; as latências vão para histogramas
+log-lineares no estilo HDR (erro relativo limitado, memória constante).
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from httpclient import HttpConnection, HttpResponse, split_url
+
+USER_AGENT = "app-jakarta-loadgen/1.0"
+
+# Proporção padrão das operações (pesos relativos)
+DEFAULT_MIX = {"create": 4, "list": 3, "ready": 2, "pickup": 1}
+
+# Combinações de filtros usadas no GET /api/pedidos (rotacionadas)
+LIST_FILTERS = (
+    {"status": "RECEBIDO"},
+    {"status": "PRONTO", "canal": "MANUAL"},
+    {"destinatario": "Cliente Carga"},
+    {"dataInicio": "{today}", "dataFim": "{today}"},
+    {"status": "RETIRADO", "destinatario": "Cliente Carga", "canal": "MANUAL"},
+)
+
+
+class LatencyHistogram:
+    """
+    Histograma log-linear (estilo HDR Histogram) de latências em microssegundos.
+
+    Valores abaixo de 2**sub_bucket_bits ficam em baldes exatos; acima disso cada potência de dois
+    é dividida em 2**(sub_bucket_bits-1) baldes, o que limita o erro relativo a ~1/2**(bits-1)
+    (0,8% com o padrão de 8 bits). Os baldes são esparsos (dict), então o custo de memória
+    depende só da quantidade de valores distintos em escala logarítmica.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 8):
+        self.bits = sub_bucket_bits
+        self.sub_count = 1 << sub_bucket_bits
+        self.half = self.sub_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.bits
+        return self.sub_count + (shift - 1) * self.half + ((value >> shift) - self.half)
+
+    def _upper(self, index: int) -> int:
+        """Maior valor equivalente ao balde (como o highestEquivalentValue do HDR)."""
+        if index < self.sub_count:
+            return index
+        shift, offset = divmod(index - self.sub_count, self.half)
+        shift += 1
+        return ((self.half + offset + 1) << shift) - 1
+
+    def record(self, value_us: float, count: int = 1) -> None:
+        value = max(0, int(value_us))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_seconds(self, seconds: float) -> None:
+        self.record(seconds * 1e6)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.bits != self.bits:
+            raise ValueError("Histogramas com precisões diferentes não podem ser combinados")
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Valor (µs) no percentil p (0-100); None se vazio."""
+        if not self.count:
+            return None
+        target = max(1, int(round(p / 100.0 * self.count + 0.4999)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def summary(self, percentiles=(50, 90, 95, 99, 99.9)) -> Dict[str, Any]:
+        """Resumo em milissegundos (chaves p50, p90, ..., min, max, mean, count)."""
+        def ms(v):
+            return round(v / 1000.0, 3) if v is not None else None
+        data = {"count": self.count, "min": ms(self.min), "mean": ms(self.mean), "max": ms(self.max)}
+        for p in percentiles:
+            data[f"p{p:g}".replace(".", "_")] = ms(self.percentile(p))
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sub_bucket_bits": self.bits, "count": self.count, "total": self.total,
+            "min": self.min, "max": self.max,
+            "counts": {str(k): v for k, v in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(int(data.get("sub_bucket_bits", 8)))
+        hist.counts = {int(k): int(v) for k, v in (data.get("counts") or {}).items()}
+        hist.count = int(data.get("count", sum(hist.counts.values())))
+        hist.total = int(data.get("total", 0))
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
+
+
+class ConnectionPool:
+    """Pool de conexões keep-alive para um host (criadas sob demanda até `size`)."""
+
+    def __init__(self, base_url: str, size: int = 32):
+        self.secure, self.host, self.port, self.host_header, _ = split_url(base_url)
+        self.size = max(1, int(size))
+        self._idle: Optional[asyncio.Queue] = None
+        self._all: List[HttpConnection] = []
+
+    @asynccontextmanager
+    async def connection(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and len(self._all) < self.size:
+            conn = HttpConnection(self.host, self.port, self.secure, self.host_header, user_agent=USER_AGENT)
+            self._all.append(conn)
+        else:
+            conn = await self._idle.get()
+        try:
+            yield conn
+        except BaseException:
+            await conn.close()
+            raise
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        async with self.connection() as conn:
+            return await conn.request(method, path, body, headers)
+
+    async def close(self) -> None:
+        for conn in self._all:
+            await conn.close()
+        self._all.clear()
+
+
+class OperationStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.ok = 0
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+        self.error_samples: List[str] = []
+        # p95 do primeiro e do último décimo (cenário de ciclo de vida)
+        self.first_p95: Optional[int] = None
+        self.last_p95: Optional[int] = None
+
+    def add(self, seconds: float, status: Optional[int], ok: bool, detail: Optional[str] = None) -> None:
+        self.histogram.record_seconds(seconds)
+        key = str(status) if status is not None else "erro"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if ok:
+            self.ok += 1
+        else:
+            self.errors += 1
+            if detail and len(self.error_samples) < 5:
+                self.error_samples.append(detail)
+
+    def merge(self, other: "OperationStats") -> None:
+        self.histogram.merge(other.histogram)
+        self.ok += other.ok
+        self.errors += other.errors
+        for key, n in other.statuses.items():
+            self.statuses[key] = self.statuses.get(key, 0) + n
+        self.error_samples.extend(other.error_samples[: max(0, 5 - len(self.error_samples))])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok, "errors": self.errors, "statuses": dict(self.statuses),
+            "latency_ms": self.histogram.summary(), "histogram": self.histogram.to_dict(),
+            "error_samples": list(self.error_samples),
+        }
+
+
+class LoadResult:
+    def __init__(self, mode: str, duration: float, params: Dict[str, Any]):
+        self.mode = mode
+        self.duration = duration
+        self.params = params
+        self.operations: Dict[str, OperationStats] = {}
+
+    def stats(self, operation: str) -> OperationStats:
+        if operation not in self.operations:
+            self.operations[operation] = OperationStats()
+        return self.operations[operation]
+
+    @property
+    def total(self) -> OperationStats:
+        total = OperationStats()
+        for stats in self.operations.values():
+            total.merge(stats)
+        return total
+
+    @property
+    def throughput(self) -> float:
+        total = self.total
+        return (total.ok + total.errors) / self.duration if self.duration > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.total
+        requests = total.ok + total.errors
+        return {
+            "mode": self.mode, "duration_s": round(self.duration, 3), "params": self.params,
+            "requests": requests, "throughput_rps": round(self.throughput, 2),
+            "error_rate": round(total.errors / requests, 5) if requests else 0.0,
+            "latency_ms": total.histogram.summary(),
+            "operations": {name: stats.to_dict() for name, stats in sorted(self.operations.items())},
+        }
+
+    def summary_lines(self) -> List[str]:
+        total = self.total
+        requests = total.ok + total.errors
+        error_rate = (total.errors / requests * 100) if requests else 0.0
+        lines = [
+            f"Modo {self.mode}: {requests} requisições em {self.duration:.1f}s — "
+            f"{self.throughput:.1f} req/s, erros {total.errors} ({error_rate:.2f}%)",
+            f"{'operação':<10} {'req':>7} {'req/s':>8} {'erros':>6} {'p50(ms)':>9} {'p90(ms)':>9} "
+            f"{'p95(ms)':>9} {'p99(ms)':>9} {'p99.9(ms)':>10} {'máx(ms)':>9}",
+        ]
+        rows = sorted(self.operations.items()) + [("total", total)]
+        for name, stats in rows:
+            s = stats.histogram.summary()
+            n = stats.ok + stats.errors
+            rate = n / self.duration if self.duration > 0 else 0.0
+
+            def fmt(v, width=9):
+                return f"{v:>{width}.2f}" if v is not None else f"{'-':>{width}}"
+            lines.append(
+                f"{name:<10} {n:>7} {rate:>8.1f} {stats.errors:>6} {fmt(s['p50'])} {fmt(s['p90'])} "
+                f"{fmt(s['p95'])} {fmt(s['p99'])} {fmt(s['p99_9'], 10)} {fmt(s['max'])}"
+            )
+        for name, stats in sorted(self.operations.items()):
+            for sample in stats.error_samples[:2]:
+                lines.append(f"  erro em {name}: {sample}")
+        return lines
+
+
+def pedido_payload(codigo: str, actor: str = "loadgen", destinatario: str = "Cliente Carga") -> Dict[str, Any]:
+    """Corpo de POST /api/pedidos no mesmo formato do teste de fluxo (tests/fase_01)."""
+    return {
+        "codigo": codigo,
+        "destinatarioNome": destinatario,
+        "destinatarioDocumento": "11122233344",
+        "destinatarioTelefone": "11988887777",
+        "canal": "MANUAL",
+        "volumes": [{"etiqueta": f"{codigo}-VOL-01", "peso": 2.5, "dimensoes": "30x20x15"}],
+        "actor": actor,
+    }
+
+
+def list_query(filters: Dict[str, str]) -> str:
+    today = date.today().isoformat()
+    return "&".join(f"{k}={quote(v.replace('{today}', today))}" for k, v in filters.items())
+
+
+class PedidoWorkload:
+    """
+    Mistura de operações sobre /api/pedidos. Pedidos criados alimentam as filas de `ready` e
+    `pickup`; quando a fila da operação sorteada está vazia, um pedido é criado no lugar.
+    """
+
+    def __init__(self, api_path: str, run_id: str, mix: Optional[Dict[str, float]] = None,
+                 seed: Optional[int] = None):
+        self.api_path = api_path.rstrip("/") + "/"
+        self.run_id = run_id
+        self.mix = {k: float(v) for k, v in (mix or DEFAULT_MIX).items() if float(v) > 0}
+        unknown = set(self.mix) - set(DEFAULT_MIX)
+        if unknown or not self.mix:
+            raise ValueError(f"Operações inválidas na mistura: {', '.join(sorted(unknown)) or '(vazia)'}")
+        self.rng = random.Random(seed)
+        self.received: Deque[int] = deque()
+        self.ready: Deque[int] = deque()
+        self.created_codes: List[str] = []
+        self._seq = 0
+        self._list_index = 0
+
+    @property
+    def code_prefix(self) -> str:
+        return f"LOAD-{self.run_id}-"
+
+    def _next_code(self) -> str:
+        self._seq += 1
+        return f"{self.code_prefix}{self._seq:07d}"
+
+    def next_request(self) -> Tuple[str, str, str, Optional[bytes], Any]:
+        """Retorna (operação, método, caminho, corpo, contexto) da próxima requisição."""
+        operation = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if operation == "ready" and self.received:
+            pedido_id = self.received.popleft()
+            return "ready", "POST", f"{self.api_path}pedidos/{pedido_id}/ready", None, pedido_id
+        if operation == "pickup" and self.ready:
+            pedido_id = self.ready.popleft()
+            return "pickup", "POST", f"{self.api_path}pedidos/{pedido_id}/pickup", None, pedido_id
+        if operation == "list":
+            filters = LIST_FILTERS[self._list_index % len(LIST_FILTERS)]
+            self._list_index += 1
+            return "list", "GET", f"{self.api_path}pedidos?{list_query(filters)}", None, None
+        codigo = self._next_code()
+        self.created_codes.append(codigo)
+        body = json.dumps(pedido_payload(codigo)).encode("utf-8")
+        return "create", "POST", f"{self.api_path}pedidos", body, codigo
+
+    def on_response(self, operation: str, response: HttpResponse, context: Any) -> bool:
+        """Atualiza as filas com a resposta e informa se ela é um sucesso para a operação."""
+        if operation == "create":
+            if response.status != 201:
+                return False
+            try:
+                self.received.append(int(response.json()["id"]))
+            except Exception:
+                return False
+            return True
+        if operation == "ready":
+            if response.status == 200:
+                self.ready.append(context)
+                return True
+            return False
+        return response.status == 200
+
+
+async def _timed_request(pool: ConnectionPool, workload: PedidoWorkload, result: LoadResult,
+                         timeout: float, scheduled: Optional[float] = None) -> None:
+    operation, method, path, body, context = workload.next_request()
+    headers = {"Content-Type": "application/json"} if body is not None else None
+    start = scheduled if scheduled is not None else time.perf_counter()
+    status = None
+    try:
+        response = await asyncio.wait_for(pool.request(method, path, body, headers), timeout)
+        status = response.status
+        ok = workload.on_response(operation, response, context)
+        detail = None if ok else f"HTTP {status}: {response.body[:160].decode('utf-8', 'ignore')}"
+    except asyncio.TimeoutError:
+        ok, detail = False, f"timeout após {timeout:.0f}s"
+    except Exception as exc:
+        ok, detail = False, f"{exc.__class__.__name__}: {exc}"
+    result.stats(operation).add(time.perf_counter() - start, status, ok, detail)
+
+
+async def run_closed_loop(pool: ConnectionPool, workload: PedidoWorkload, users: int, duration: float,
+                          timeout: float = 10.0, think_time: float = 0.0) -> LoadResult:
+    result = LoadResult("closed", duration, {"users": users, "think_time_s": think_time})
+    deadline = time.perf_counter() + duration
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            await _timed_request(pool, workload, result, timeout)
+            if think_time > 0:
+                await asyncio.sleep(think_time)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(max(1, users))))
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def run_open_loop(pool: ConnectionPool, workload: PedidoWorkload, rate: float, duration: float,
+                        timeout: float = 10.0, max_in_flight: int = 2000) -> LoadResult:
+    """
+    Chegadas a taxa fixa. Requisições que excederiam `max_in_flight` são contadas como erro
+    ("descartada") em vez de acumular memória sem limite quando o servidor não acompanha.
+    """
+    result = LoadResult("open", duration, {"rate_rps": rate, "max_in_flight": max_in_flight})
+    interval = 1.0 / max(rate, 0.001)
+    started = time.perf_counter()
+    in_flight = set()
+    n = 0
+    while True:
+        scheduled = started + n * interval
+        if scheduled - started >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        n += 1
+        if len(in_flight) >= max_in_flight:
+            result.stats("descartada").add(0.0, None, False, f"mais de {max_in_flight} requisições pendentes")
+            continue
+        task = asyncio.ensure_future(_timed_request(pool, workload, result, timeout, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def _run(api_base_url: str, mode: str, duration: float, warmup: float, users: int, rate: float,
+               connections: int, timeout: float, mix: Optional[Dict[str, float]], run_id: str,
+               think_time: float, seed: Optional[int],
+               on_phase: Optional[Callable[[str], None]]) -> Tuple[LoadResult, PedidoWorkload]:
+    api_path = urlsplit(api_base_url).path or "/"
+    pool = ConnectionPool(api_base_url, connections)
+    workload = PedidoWorkload(api_path, run_id, mix, seed)
+    try:
+        async def phase(seconds: float) -> LoadResult:
+            if mode == "open":
+                return await run_open_loop(pool, workload, rate, seconds, timeout)
+            return await run_closed_loop(pool, workload, users, seconds, timeout, think_time)
+
+        if warmup > 0:
+            if on_phase:
+                on_phase(f"aquecimento ({warmup:.0f}s)")
+            await phase(warmup)
+        if on_phase:
+            on_phase(f"medição ({duration:.0f}s)")
+        result = await phase(duration)
+        result.params.update({"connections": pool.size, "warmup_s": warmup, "mix": workload.mix,
+                              "code_prefix": workload.code_prefix})
+        return result, workload
+    finally:
+        await pool.close()
+
+
+def run_load(api_base_url: str, mode: str = "closed", duration: float = 30.0, warmup: float = 5.0,
+             users: int = 16, rate: float = 50.0, connections: int = 32, timeout: float = 10.0,
+             mix: Optional[Dict[str, float]] = None, run_id: Optional[str] = None,
+             think_time: float = 0.0, seed: Optional[int] = None,
+             on_phase: Optional[Callable[[str], None]] = None) -> Tuple[LoadResult, PedidoWorkload]:
+    """
+    Executa a carga contra `api_base_url` (ex.: http://localhost:9090/caracore-hub/api/).
+    Retorna o resultado da fase medida e o workload (códigos criados, para limpeza).
+    """
+    if mode not in ("open", "closed"):
+        raise ValueError(f"Modo de carga inválido: {mode}")
+    run_id = run_id or time.strftime("%Y%m%d%H%M%S")
+    return asyncio.run(_run(api_base_url, mode, duration, warmup, users, rate, connections, timeout,
+                            mix, run_id, think_time, seed, on_phase))
+
+
+# Etapas medidas no cenário de ciclo de vida (mesma sequência de tests/fase_01/test_fluxo_pedidos.py)
+LIFECYCLE_STEPS = ("criar", "RECEBIDO→PRONTO", "PRONTO→RETIRADO", "listar")
+
+
+class LifecycleResult:
+    """Latência por transição de estado e da consulta filtrada por faixa de tamanho da tabela."""
+
+    def __init__(self, pedidos: int, concurrency: int, table_baseline: int = 0):
+        self.pedidos = pedidos
+        self.concurrency = concurrency
+        self.table_baseline = table_baseline
+        self.bucket_size = max(1, pedidos // 10)
+        self.duration = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.steps: Dict[str, OperationStats] = {step: OperationStats() for step in LIFECYCLE_STEPS}
+        self.list_by_size: Dict[int, OperationStats] = {}
+
+    def add_list(self, seconds: float, status: Optional[int], ok: bool, created: int, detail: Optional[str]) -> None:
+        self.steps["listar"].add(seconds, status, ok, detail)
+        bucket = (created // self.bucket_size) * self.bucket_size
+        self.list_by_size.setdefault(bucket, OperationStats()).add(seconds, status, ok, detail)
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.duration if self.duration > 0 else 0.0
+
+    def degradation(self) -> List[Tuple[str, Optional[float]]]:
+        """Razão p95 (último décimo / primeiro décimo dos pedidos) por etapa, da maior para a menor."""
+        ratios = []
+        for step, stats in self.steps.items():
+            first, last = stats.first_p95, stats.last_p95
+            ratios.append((step, (last / first) if first and last else None))
+        return sorted(ratios, key=lambda r: r[1] or 0.0, reverse=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scenario": "lifecycle", "pedidos": self.pedidos, "concurrency": self.concurrency,
+            "completed": self.completed, "failed": self.failed, "duration_s": round(self.duration, 3),
+            "throughput_rps": round(self.throughput, 2), "table_baseline": self.table_baseline,
+            "steps": {step: stats.to_dict() for step, stats in self.steps.items()},
+            "list_by_table_size": {str(self.table_baseline + k): v.to_dict() for k, v in sorted(self.list_by_size.items())},
+            "degradation_p95": {step: ratio for step, ratio in self.degradation()},
+        }
+
+    def summary_lines(self) -> List[str]:
+        def fmt(v, width=9):
+            return f"{v:>{width}.2f}" if v is not None else f"{'-':>{width}}"
+        lines = [
+            f"Ciclo de vida: {self.completed}/{self.pedidos} pedidos completos em {self.duration:.1f}s "
+            f"({self.throughput:.1f} ciclos/s, concorrência {self.concurrency}, falhas {self.failed})",
+            f"{'etapa':<18} {'req':>7} {'erros':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'máx(ms)':>9}",
+        ]
+        for step, stats in self.steps.items():
+            s = stats.histogram.summary()
+            lines.append(f"{step:<18} {stats.ok + stats.errors:>7} {stats.errors:>6} {fmt(s['p50'])} "
+                         f"{fmt(s['p95'])} {fmt(s['p99'])} {fmt(s['max'])}")
+        lines.append("Consulta filtrada por tamanho da tabela (pedidos):")
+        for bucket, stats in sorted(self.list_by_size.items()):
+            s = stats.histogram.summary()
+            size = self.table_baseline + bucket
+            lines.append(f"  ~{size:>8} {stats.ok + stats.errors:>7} consultas  p50 {fmt(s['p50'])}  p95 {fmt(s['p95'])}  p99 {fmt(s['p99'])}")
+        ranked = [(step, ratio) for step, ratio in self.degradation() if ratio is not None]
+        if ranked:
+            lines.append("Degradação do p95 (último décimo ÷ primeiro décimo): "
+                         + ", ".join(f"{step} ×{ratio:.2f}" for step, ratio in ranked))
+        for step, stats in self.steps.items():
+            for sample in stats.error_samples[:2]:
+                lines.append(f"  erro em {step}: {sample}")
+        return lines
+
+
+async def _run_lifecycle(api_base_url: str, pedidos: int, concurrency: int, connections: int,
+                         timeout: float, run_id: str, table_baseline: int,
+                         on_progress: Optional[Callable[[int, int], None]]) -> Tuple[LifecycleResult, PedidoWorkload]:
+    api_path = urlsplit(api_base_url).path or "/"
+    pool = ConnectionPool(api_base_url, connections)
+    workload = PedidoWorkload(api_path, run_id)
+    result = LifecycleResult(pedidos, concurrency, table_baseline)
+    tenth = max(1, pedidos // 10)
+    early = {step: LatencyHistogram() for step in LIFECYCLE_STEPS}
+    late = {step: LatencyHistogram() for step in LIFECYCLE_STEPS}
+    json_headers = {"Content-Type": "application/json"}
+    next_index = 0
+    created = 0
+
+    async def step(name: str, method: str, path: str, body: Optional[bytes], expect: int,
+                   expect_status: Optional[str], index: int) -> Optional[Any]:
+        nonlocal created
+        start = time.perf_counter()
+        status, payload, ok, detail = None, None, False, None
+        try:
+            response = await asyncio.wait_for(pool.request(method, path, body, json_headers if body else None), timeout)
+            status = response.status
+            if status == expect:
+                payload = response.json()
+                ok = expect_status is None or (isinstance(payload, dict) and payload.get("status") == expect_status)
+            if not ok:
+                detail = f"HTTP {status}: {response.body[:160].decode('utf-8', 'ignore')}"
+        except asyncio.TimeoutError:
+            detail = f"timeout após {timeout:.0f}s"
+        except Exception as exc:
+            detail = f"{exc.__class__.__name__}: {exc}"
+        elapsed = time.perf_counter() - start
+        if name == "listar":
+            result.add_list(elapsed, status, ok, created, detail)
+        else:
+            result.steps[name].add(elapsed, status, ok, detail)
+            if name == "criar" and ok:
+                created += 1
+        if index < tenth:
+            early[name].record_seconds(elapsed)
+        elif index >= pedidos - tenth:
+            late[name].record_seconds(elapsed)
+        return payload if ok else None
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < pedidos:
+            index = next_index
+            next_index += 1
+            codigo = workload._next_code()
+            workload.created_codes.append(codigo)
+            # Destinatário exclusivo do ciclo: a consulta final devolve só este pedido. Com um nome comum a
+            # resposta cresceria com cada pedido retirado e a carga inteira ficaria O(N²)
+            destinatario = f"Cliente Carga {codigo}"
+            body = json.dumps(pedido_payload(codigo, actor="bench", destinatario=destinatario)).encode("utf-8")
+            pedido = await step("criar", "POST", f"{workload.api_path}pedidos", body, 201, "RECEBIDO", index)
+            ok = pedido is not None and await step(
+                "RECEBIDO→PRONTO", "POST", f"{workload.api_path}pedidos/{pedido['id']}/ready", None, 200, "PRONTO", index) is not None
+            ok = ok and await step(
+                "PRONTO→RETIRADO", "POST", f"{workload.api_path}pedidos/{pedido['id']}/pickup", None, 200, "RETIRADO", index) is not None
+            list_path = f"{workload.api_path}pedidos?{list_query({'status': 'RETIRADO', 'destinatario': destinatario})}"
+            ok = ok and await step("listar", "GET", list_path, None, 200, None, index) is not None
+            if ok:
+                result.completed += 1
+            else:
+                result.failed += 1
+            if on_progress and (result.completed + result.failed) % tenth == 0:
+                on_progress(result.completed + result.failed, pedidos)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, pedidos)))))
+    finally:
+        await pool.close()
+    result.duration = time.perf_counter() - started
+    for name, stats in result.steps.items():
+        stats.first_p95 = early[name].percentile(95)
+        stats.last_p95 = late[name].percentile(95)
+    return result, workload
+
+
+def run_lifecycle(api_base_url: str, pedidos: int = 2000, concurrency: int = 32, connections: int = 32,
+                  timeout: float = 10.0, run_id: Optional[str] = None, table_baseline: int = 0,
+                  on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[LifecycleResult, PedidoWorkload]:
+    """
+    Leva `pedidos` pedidos pelo ciclo completo (criar → pronto → retirado → consulta filtrada), com
+    `concurrency` ciclos simultâneos. `table_baseline` é a quantidade de pedidos já existente, usada
+    apenas para rotular as faixas de tamanho da tabela no relatório.
+    """
+    run_id = run_id or time.strftime("%Y%m%d%H%M%S")
+    return asyncio.run(_run_lifecycle(api_base_url, max(1, int(pedidos)), int(concurrency), connections,
+                                      timeout, run_id, table_baseline, on_progress))
+
+
+def parse_mix(text: Optional[str]) -> Optional[Dict[str, float]]:
+    """'create=4,list=3,ready=2,pickup=1' -> dict (None se vazio)."""
+    if not text:
+        return None
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            mix[name] = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Peso inválido para '{name}': {weight}")
+    return mix
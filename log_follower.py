@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Leitura incremental de logs dos servidores (catalina*.log / catalina.out e server.log),
+compartilhada por main.py e main_tom.py.
+
+Cada arquivo é acompanhado por um LogFollower que guarda o offset em bytes e o inode já lidos:
+chamadas repetidas processam apenas os bytes acrescentados desde a última leitura (rotação e
+truncamento reiniciam a leitura). Os sinais são reconhecidos por um único regex pré-compilado
+com todos os padrões, e o horário da linha só é convertido (strptime) quando ela contém um sinal.
+"""
+
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Tamanho lido do final do arquivo na primeira vez que ele é acompanhado
+DEFAULT_BOOTSTRAP_BYTES = 96_000
+DEFAULT_MAX_EVENTS = 2_000
+DEFAULT_TAIL_LINES = 400
+
+
+@dataclass(frozen=True)
+class TimestampFormat:
+    """Formato do horário no início das linhas de um log."""
+    pattern: "re.Pattern[str]"
+    formats: Tuple[str, ...]
+
+
+# 17-Oct-2025 18:17:31.877 INFO [main] ...
+CATALINA_TIMESTAMP = TimestampFormat(
+    re.compile(r"^\s*(\d{1,2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2}(?:\.\d{1,3})?)"),
+    ("%d-%b-%Y %H:%M:%S.%f", "%d-%b-%Y %H:%M:%S"),
+)
+# 2025-10-17 18:17:31,877 INFO  [org.jboss.as] ...
+WILDFLY_TIMESTAMP = TimestampFormat(
+    re.compile(r"^\s*(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:,\d{1,3})?)"),
+    ("%Y-%m-%d %H:%M:%S,%f", "%Y-%m-%d %H:%M:%S"),
+)
+
+# Sinais de datasource/JNDI no catalina (Tomcat)
+TOMCAT_JNDI_SIGNALS: Dict[str, Sequence[str]] = {
+    "error": (
+        'cannot create jdbc driver',
+        'cannot create poolableconnectionfactory',
+        'resource is not available',
+        'failed to register in jndi',
+        'nontransientconnectionexception',
+        'org.postgresql.util',
+        'name [jdbc/postgresds] is not bound',
+        'name [java:comp/env/jdbc/postgresds] is not bound',
+        'no suitable driver',
+        'org.postgresql.driver not found',
+        'fetal: password authentication failed',
+        'connection refused',
+    ),
+    "ok": (
+        'registering jndi resource',
+        'registered jndi resource',
+        'initialized datasource',
+        'pgjdbc',
+        'bound to naming context',
+        'name [java:comp/env/jdbc/postgresds] is bound',
+        'name [jdbc/postgresds] is bound',
+        'org.apache.commons.dbcp2',
+    ),
+}
+
+# Sinais de datasource/JNDI no server.log (WildFly)
+WILDFLY_JNDI_SIGNALS: Dict[str, Sequence[str]] = {
+    "error": (
+        'wflyjca0046',  # failed to load driver
+        'wflyjca0040',
+        'wflyjca0056',
+        'wflyjca0091',  # connection error
+        'failed to register',
+        'jboss.naming',
+        'could not create connection',
+    ),
+    "ok": (
+        'wflyjca0005',  # Bound data source
+        'bound data source',
+        'java:/jdbc/postgresds" =>',
+    ),
+    "jndi_name": ('java:/jdbc/postgresds',),
+    "bound": ('bound',),
+}
+
+
+class SignalMatcher:
+    """Reconhece, com um único regex pré-compilado, todos os padrões de todas as categorias."""
+
+    def __init__(self, signals: Dict[str, Sequence[str]]):
+        self.signals = {category: tuple(t.lower() for t in tokens) for category, tokens in signals.items()}
+        self._category_of: Dict[str, str] = {}
+        for category, tokens in self.signals.items():
+            for token in tokens:
+                self._category_of.setdefault(token, category)
+        # Padrões mais longos primeiro: o regex consome o mais específico, e as categorias dos
+        # padrões contidos nele (ex.: 'bound' em 'bound data source') são deduzidas abaixo
+        ordered = sorted(self._category_of, key=len, reverse=True)
+        self._implied: Dict[str, Dict[str, str]] = {}
+        for token in ordered:
+            implied = {}
+            for other, category in self._category_of.items():
+                if other != token and other in token and category != self._category_of[token]:
+                    implied.setdefault(category, other)
+            self._implied[token] = implied
+        self.pattern = re.compile("|".join(re.escape(t) for t in ordered), re.IGNORECASE) if ordered else None
+
+    def match(self, line: str) -> List[Tuple[str, str]]:
+        """Retorna [(categoria, padrão)] encontrados na linha (cada categoria uma vez)."""
+        if self.pattern is None:
+            return []
+        found: Dict[str, str] = {}
+        for m in self.pattern.finditer(line):
+            token = m.group(0).lower()
+            found.setdefault(self._category_of[token], token)
+            for category, other in self._implied[token].items():
+                found.setdefault(category, other)
+        return list(found.items())
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    category: str
+    token: str
+    line: str
+    timestamp: Optional[datetime]
+    offset: int
+
+
+class LogFollower:
+    """Acompanha um arquivo de log lendo apenas os bytes novos a cada poll()."""
+
+    def __init__(self, path: str, signals: Dict[str, Sequence[str]],
+                 timestamp: Optional[TimestampFormat] = None,
+                 bootstrap_bytes: int = DEFAULT_BOOTSTRAP_BYTES,
+                 max_events: int = DEFAULT_MAX_EVENTS,
+                 tail_lines: int = DEFAULT_TAIL_LINES):
+        self.path = path
+        self.matcher = SignalMatcher(signals)
+        self.timestamp = timestamp
+        self.bootstrap_bytes = bootstrap_bytes
+        # Um deque limitado por categoria: sinais frequentes (ex.: 'bound' no WildFly) não
+        # expulsam os erros, que são raros e justamente os que interessam
+        self.max_events = max_events
+        self.events: Dict[str, Deque[LogEvent]] = {}
+        self.lines: Deque[str] = deque(maxlen=tail_lines)
+        self.offset = 0
+        self.inode: Optional[Tuple[int, int]] = None
+        self.bytes_read = 0
+        self._partial = b""
+        self._skipping = False
+        self._last_ts_text: Optional[str] = None
+        self._ts_cache: Dict[str, Optional[datetime]] = {}
+        self._lock = threading.Lock()
+
+    def _parse_ts(self, text: str) -> Optional[datetime]:
+        if text in self._ts_cache:
+            return self._ts_cache[text]
+        parsed = None
+        for fmt in self.timestamp.formats if self.timestamp else ():
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        if len(self._ts_cache) > 512:
+            self._ts_cache.clear()
+        self._ts_cache[text] = parsed
+        return parsed
+
+    def _reset(self, inode: Optional[Tuple[int, int]]) -> None:
+        self.offset = 0
+        self.inode = inode
+        self._partial = b""
+        self._skipping = False
+        self._last_ts_text = None
+        self.events.clear()
+        self.lines.clear()
+
+    def poll(self) -> List[LogEvent]:
+        """Lê os bytes acrescentados desde a última chamada e retorna os novos eventos."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return []
+            inode = (st.st_dev, st.st_ino)
+            first_read = self.inode is None
+            if first_read or inode != self.inode or st.st_size < self.offset:
+                # Arquivo novo, rotacionado ou truncado: recomeçar (a partir do final recente)
+                self._reset(inode)
+                self.offset = max(0, st.st_size - self.bootstrap_bytes)
+                self._skipping = self.offset > 0
+            if st.st_size == self.offset:
+                return []
+            try:
+                with open(self.path, "rb") as fh:
+                    fh.seek(self.offset)
+                    data = fh.read(st.st_size - self.offset)
+            except OSError:
+                return []
+            start_offset = self.offset - len(self._partial)
+            self.offset += len(data)
+            self.bytes_read += len(data)
+            data = self._partial + data
+            if self._skipping:
+                # Começando no meio do arquivo: descartar a primeira linha incompleta, mesmo que
+                # ela só termine numa leitura seguinte
+                newline = data.find(b"\n")
+                if newline < 0:
+                    return []
+                data = data[newline + 1:]
+                start_offset += newline + 1
+                self._skipping = False
+            lines = data.split(b"\n")
+            self._partial = lines.pop()
+            new_events: List[LogEvent] = []
+            line_offset = start_offset
+            for raw in lines:
+                line = raw.decode("utf-8", errors="ignore").rstrip("\r")
+                current = line_offset
+                line_offset += len(raw) + 1
+                self.lines.append(line)
+                if self.timestamp is not None:
+                    ts_match = self.timestamp.pattern.match(line)
+                    if ts_match:
+                        self._last_ts_text = ts_match.group(1)
+                matches = self.matcher.match(line)
+                if not matches:
+                    continue
+                # Linhas sem horário (stack traces) herdam o da última linha com horário
+                ts = self._parse_ts(self._last_ts_text) if self._last_ts_text else None
+                for category, token in matches:
+                    event = LogEvent(category, token, line, ts, current)
+                    bucket = self.events.get(category)
+                    if bucket is None:
+                        bucket = self.events[category] = deque(maxlen=self.max_events)
+                    bucket.append(event)
+                    new_events.append(event)
+            return new_events
+
+    def events_since(self, since: Optional[datetime] = None,
+                     categories: Optional[Iterable[str]] = None,
+                     window_bytes: Optional[int] = None) -> List[LogEvent]:
+        """
+        Eventos registrados a partir de `since` (todos se None). Eventos sem horário conhecido
+        são sempre incluídos. `window_bytes` restringe aos eventos dos últimos N bytes do arquivo.
+        """
+        with self._lock:
+            min_offset = self.offset - window_bytes if window_bytes is not None else None
+            buckets = self.events.values() if categories is None else [
+                self.events[c] for c in set(categories) if c in self.events
+            ]
+            found = [
+                e for bucket in buckets for e in bucket
+                if (since is None or e.timestamp is None or e.timestamp >= since)
+                and (min_offset is None or e.offset >= min_offset)
+            ]
+        found.sort(key=lambda e: e.offset)
+        return found
+
+    def has(self, category: str, since: Optional[datetime] = None,
+            window_bytes: Optional[int] = None) -> bool:
+        return bool(self.events_since(since, (category,), window_bytes))
+
+    def tail_lines(self, count: int) -> List[str]:
+        with self._lock:
+            return list(self.lines)[-count:] if count > 0 else []
+
+    def tail_text(self) -> str:
+        with self._lock:
+            return "\n".join(self.lines)
+
+
+_FOLLOWERS: Dict[Tuple[str, int], LogFollower] = {}
+_FOLLOWERS_LOCK = threading.Lock()
+
+
+def follow(path: str, signals: Dict[str, Sequence[str]],
+           timestamp: Optional[TimestampFormat] = None, **kwargs) -> LogFollower:
+    """Retorna (criando se preciso) o follower do arquivo para o conjunto de sinais informado."""
+    key = (os.path.abspath(path), id(signals))
+    with _FOLLOWERS_LOCK:
+        follower = _FOLLOWERS.get(key)
+        if follower is None:
+            follower = LogFollower(path, signals, timestamp, **kwargs)
+            _FOLLOWERS[key] = follower
+    return follower
+
+
+def latest_log(directory: str, prefix: str) -> Optional[str]:
+    """Arquivo mais recente do diretório cujo nome começa com `prefix` (ex.: catalina)."""
+    try:
+        candidates = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().startswith(prefix.lower())
+        ]
+    except OSError:
+        return None
+    candidates = [p for p in candidates if os.path.isfile(p)]
+    return max(candidates, key=os.path.getmtime, default=None)
@@ -33,17 +33,70 @@ import shutil
 import time
 import logging
 import builtins
-# Se não estiver em venv, reexecuta com o Python da venv (se existir)
-try:
-    base = getattr(sys, "base_prefix", None) or getattr(sys, "real_prefix", None)
-    in_venv = base and sys.prefix != base
-    if not in_venv:
-        _venv_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".venv", "Scripts", "python.exe")
-        if os.path.exists(_venv_py) and os.path.abspath(sys.executable) != os.path.abspath(_venv_py):
-            print("Reexecutando com o Python da venv...")
-            os.execv(_venv_py, [_venv_py, __file__, *sys.argv[1:]])
-except Exception:
-    pass
+import importlib
+
+# Perfil de inicialização (--startup-profile / APP_STARTUP_PROFILE=1): marcos desde o carregamento do script
+_STARTUP_T0 = time.perf_counter()
+STARTUP_PROFILE = "--startup-profile" in sys.argv[1:] or str(os.environ.get("APP_STARTUP_PROFILE", "")).strip().lower() in {"1", "true", "yes", "on"}
+_STARTUP_MARKS = []    # [(rótulo, instante)]
+_STARTUP_IMPORTS = []  # [(módulo, segundos)] importados sob demanda
+
+def startup_mark(label):
+    if STARTUP_PROFILE:
+        _STARTUP_MARKS.append((label, time.perf_counter()))
+
+class _LazyModule:
+    """Importa o módulo apenas no primeiro acesso a um atributo (inicialização rápida)."""
+
+    def __init__(self, name, on_missing=None):
+        self._name = name
+        self._module = None
+        self._on_missing = on_missing
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            try:
+                module = importlib.import_module(self._name)
+            except ModuleNotFoundError:
+                if self._on_missing is not None:
+                    self._on_missing()
+                raise
+            _STARTUP_IMPORTS.append((self._name, time.perf_counter() - start))
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+def report_startup_profile(option=None):
+    """Exibe os custos de inicialização: marcos do script e imports feitos sob demanda."""
+    if not STARTUP_PROFILE:
+        return
+    print("\nPerfil de inicialização" + (f" (opção {option})" if option else "") + ":")
+    previous = _STARTUP_T0
+    for label, instant in _STARTUP_MARKS:
+        print(f"  {label:<46} +{(instant - previous) * 1000:8.1f} ms  (acumulado {(instant - _STARTUP_T0) * 1000:8.1f} ms)")
+        previous = instant
+    for name, seconds in _STARTUP_IMPORTS:
+        print(f"  import sob demanda: {name:<26} {seconds * 1000:9.1f} ms")
+    loaded = sorted(m for m in ("requests", "asyncio", "concurrent.futures", "psycopg2", "yaml", "bcrypt", "playwright") if m in sys.modules)
+    print(f"  módulos pesados carregados: {', '.join(loaded) or 'nenhum'}")
+    print("  (detalhe por módulo: python -X importtime main.py ...)")
+
+def _reexec_in_venv():
+    """Se não estiver em venv, reexecuta com o Python da venv (se existir). Só é chamada por main()."""
+    try:
+        base = getattr(sys, "base_prefix", None) or getattr(sys, "real_prefix", None)
+        in_venv = base and sys.prefix != base
+        if not in_venv:
+            venv_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".venv", "Scripts", "python.exe")
+            if os.path.exists(venv_py) and os.path.abspath(sys.executable) != os.path.abspath(venv_py):
+                print("Reexecutando com o Python da venv...")
+                os.execv(venv_py, [venv_py, os.path.abspath(__file__), *sys.argv[1:]])
+    except Exception:
+        pass
+
 import tempfile
 import glob
 
@@ -66,9 +119,6 @@ def _infer_preselected_option_from_argv():
         except Exception:
             pass
 
-# Inferir antes de validar ambiente (para evitar prompts)
-_infer_preselected_option_from_argv()
-
 def validate_python_environment():
     """
     Valida se o script está sendo executado com o Python da venv, não o global.
@@ -125,12 +175,7 @@ def validate_python_environment():
             print("=" * 80)
             sys.exit(1)
 
-# Validar ambiente Python antes de prosseguir
-validate_python_environment()
-
-try:
-    import requests
-except ModuleNotFoundError:
+def _requests_missing():
     # Mensagem amigável quando o script é executado com o Python global sem a venv
     print("Erro: módulo 'requests' não encontrado.\n"
           "Provavelmente você executou com o Python global (fora da venv).\n"
@@ -140,17 +185,36 @@ except ModuleNotFoundError:
           "2) Rodar direto com o Python da venv (sem ativar):\n"
           ".\\.venv\\Scripts\\python.exe .\\main.py\n\n"
           "Se a venv não existir, crie/atualize com: ./setup-python.ps1")
-    import sys
     sys.exit(1)
+
+# Módulos pesados importados apenas pelas opções que os usam
+requests = _LazyModule("requests", on_missing=_requests_missing)
 import zipfile
 import re
 import json
+import hashlib
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 import socket
+import threading
 from urllib.parse import urljoin
 
+import maven_reactor
+import tracing
+
+log_follower = _LazyModule("log_follower")
+readiness = _LazyModule("readiness")
+pipeline = _LazyModule("pipeline")
+loadgen = _LazyModule("loadgen")
+bench_store = _LazyModule("bench_store")
+procstats = _LazyModule("procstats")
+seeder = _LazyModule("seeder")
+dbsnapshot = _LazyModule("dbsnapshot")
+dbpool = _LazyModule("dbpool")
+queryplan = _LazyModule("queryplan")
+startup_mark("imports do script")
+
 # Variáveis globais
 WORKSPACE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.join(WORKSPACE_DIR, "caracore-hub")
@@ -192,6 +256,11 @@ def build_arg_parser():
     parser.add_argument("--tomcat-foreground", action="store_true", help="Atalho para forçar o Tomcat a iniciar em foreground (equivalente a --tomcat-run-mode foreground)")
     parser.add_argument("--wildfly-run-mode", choices=["foreground", "background"], help="Controla se o WildFly inicia em foreground (logs no console) ou background. Padrão: background")
     parser.add_argument("--wildfly-foreground", action="store_true", help="Atalho para forçar o WildFly a iniciar em foreground (equivalente a --wildfly-run-mode foreground)")
+    parser.add_argument("--incremental", action="store_true", help="Build incremental: recompila apenas módulos alterados e seus dependentes, sem clean (equivalente a APP_BUILD_INCREMENTAL=1)")
+    parser.add_argument("--tomcat-deploy-mode", dest="tomcat_deploy_mode", choices=["cold", "delta", "manager"], help="Deploy no Tomcat: cold (WAR novo e reinício, padrão), delta (sincroniza apenas arquivos alterados no diretório explodido) ou manager (deploy a quente via Tomcat Manager, com cold como fallback). Equivalente a APP_TOMCAT_DEPLOY_MODE")
+    parser.add_argument("--parallel-build", dest="parallel_build", nargs="?", const="auto", metavar="THREADS", help="Build Maven paralelo (-T). Sem valor usa o número de núcleos; aceita N ou NC (ex.: 1C). Equivalente a APP_BUILD_PARALLEL=1 / APP_MAVEN_THREADS")
+    parser.add_argument("--no-build-cache", dest="no_build_cache", action="store_true", help="Desativa o cache de WAR por fingerprint (equivalente a APP_BUILD_CACHE=0)")
+    parser.add_argument("--startup-profile", dest="startup_profile", action="store_true", help="Exibe ao final os custos de inicialização (marcos do script e imports sob demanda). Equivalente a APP_STARTUP_PROFILE=1")
     # Aceitar uma opção posicional (número ou nome), ex.: 2, deploy-tomcat, wildfly, iniciar-tomcat, test-login
     parser.add_argument("option", nargs="?", help="Opção do menu (0-12) ou nome: check, deploy-tomcat, start-tomcat, deploy-wildfly, start-wildfly, undeploy, diag-tomcat, diag-wildfly, set-tomcat-port, cfg-wildfly-ds, cfg-tomcat-ds, test-login")
     return parser
@@ -204,8 +273,6 @@ WILDFLY_MANAGEMENT_PORT = 9990  # Porta de administração padrão (9990)
 
 # Configuração de logging (arquivo por dia)
 LOG_DIR = os.path.join(WORKSPACE_DIR, "log")
-# Criar o diretório de log se não existir
-os.makedirs(LOG_DIR, exist_ok=True)
 
 # Nome base configurável do arquivo de log (APP_LOG_BASENAME), padrão 'maven_deploy'
 LOG_BASENAME = os.environ.get("APP_LOG_BASENAME", "maven_deploy")
@@ -214,15 +281,26 @@ LOG_BASENAME = os.environ.get("APP_LOG_BASENAME", "maven_deploy")
 _today_str = datetime.now().strftime("%Y_%m_%d")
 _log_file = os.path.join(LOG_DIR, f"{_today_str}_{LOG_BASENAME}.log")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(_log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
+_LOGGING_CONFIGURED = False
+
+def configure_logging():
+    """Cria log/ e configura o arquivo de log do dia (adiado até a primeira mensagem)."""
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    _LOGGING_CONFIGURED = True
+    # Criar o diretório de log se não existir
+    os.makedirs(LOG_DIR, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(_log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+    startup_mark("logging configurado")
 
 # Cores para terminal (Windows e Linux)
 class Colors:
@@ -239,6 +317,9 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Captura por thread: checagens paralelas acumulam suas mensagens e as emitem juntas ao final
+_LOG_CAPTURE = threading.local()
+
 def log(message, level="INFO"):
     """
     Função para registrar mensagens no log com formatação colorida.
@@ -247,6 +328,12 @@ def log(message, level="INFO"):
         message (str): Mensagem a ser registrada
         level (str): Nível de log (INFO, SUCCESS, WARNING, ERROR)
     """
+    captured = getattr(_LOG_CAPTURE, "lines", None)
+    if captured is not None:
+        captured.append((message, level))
+        return
+    if not _LOGGING_CONFIGURED:
+        configure_logging()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     if level == "INFO":
@@ -310,6 +397,7 @@ def is_server_up(host: str, port: int, timeout: float = 2.0) -> bool:
     except Exception:
         return False
 
+@tracing.traced("postgres_up", cat="readiness")
 def ensure_docker_db_up(timeout: int = 60) -> bool:
     """Garante que o Postgres do docker-compose esteja em execução."""
     try:
@@ -357,15 +445,11 @@ def ensure_docker_db_up(timeout: int = 60) -> bool:
     except Exception as e:
         log(f"Falha ao executar docker compose up -d: {e}", "WARNING")
 
-    # Aguardar porta do Postgres
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            with socket.create_connection((host, port), timeout=1.5):
-                log(f"PostgreSQL disponível em {host}:{port}", "SUCCESS")
-                return True
-        except Exception:
-            time.sleep(2)
+    # Aguardar o Postgres aceitar conexões (handshake do protocolo, não só a porta do docker-proxy)
+    report = readiness.wait_ready([readiness.postgres_target("postgres", port, host)], timeout)
+    if report.all_ready:
+        log(f"PostgreSQL disponível em {host}:{port} ({report['postgres'].elapsed:.1f}s)", "SUCCESS")
+        return True
     log("Timeout aguardando PostgreSQL do docker-compose.", "WARNING")
     return False
 
@@ -450,18 +534,34 @@ def ensure_wildfly_running_and_deployed() -> bool:
             return False
     return is_server_up("localhost", WILDFLY_PORT)
 
-def find_built_war() -> str | None:
-    """Procura um arquivo WAR gerado em target/ do projeto."""
-    try:
-        target = os.path.join(PROJECT_DIR, "target")
-        if os.path.exists(target):
-            wars = [f for f in os.listdir(target) if f.lower().endswith(".war")]
-            if wars:
-                return os.path.join(target, wars[0])
-    except Exception:
-        pass
+# Nome do WAR gerado pelo build (finalName do módulo web)
+EXPECTED_WAR_NAME = os.environ.get("APP_WAR_NAME", "caracore-hub.war")
+
+def select_war(names) -> str | None:
+    """
+    Escolhe o WAR do build entre os arquivos informados: o de nome EXPECTED_WAR_NAME ou, na falta
+    dele, o único .war presente. Com vários candidatos a escolha seria arbitrária: retorna None.
+    """
+    wars = sorted(n for n in names if n.lower().endswith(".war"))
+    if EXPECTED_WAR_NAME in wars:
+        return EXPECTED_WAR_NAME
+    if len(wars) == 1:
+        return wars[0]
+    if wars:
+        log(f"Vários WARs e nenhum chamado {EXPECTED_WAR_NAME}: {', '.join(wars)}. Defina APP_WAR_NAME.", "WARNING")
     return None
 
+def _war_in(directory) -> str | None:
+    try:
+        name = select_war(os.listdir(directory))
+    except OSError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+def find_built_war() -> str | None:
+    """Procura o WAR gerado em target/ do projeto."""
+    return _war_in(os.path.join(PROJECT_DIR, "target"))
+
 def _wildfly_cli_credentials() -> tuple[str, str] | None:
     """Obtém credenciais para o jboss-cli, se configuradas via variáveis de ambiente."""
     user = os.environ.get("APP_WILDFLY_CLI_USER") or os.environ.get("WILDFLY_CLI_USER")
@@ -470,26 +570,41 @@ def _wildfly_cli_credentials() -> tuple[str, str] | None:
         return user, password
     return None
 
+@tracing.traced("wait_for_port", cat="readiness")
 def wait_for_port(port: int, timeout: int = 30) -> bool:
-    start = time.time()
-    while time.time() - start < timeout:
-        if is_server_up("localhost", port):
-            return True
-        time.sleep(1.5)
-    return False
+    return readiness.wait_for_port(port, timeout=timeout)
 
+@tracing.traced("wait_for_url", cat="readiness")
 def wait_for_url(url: str, timeout: int = 30) -> bool:
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            r = requests.get(url, timeout=3)
-            # Considerar pronto apenas respostas 2xx ou 3xx (não 404/401)
-            if 200 <= r.status_code < 400:
-                return True
-        except Exception:
-            pass
-        time.sleep(1.5)
-    return False
+    # Considerar pronto apenas respostas 2xx ou 3xx (não 404/401)
+    return readiness.wait_for_url(url, timeout=timeout, accept=readiness.accept_2xx_3xx)
+
+@tracing.traced("wait_for_environment", cat="readiness")
+def wait_for_environment(timeout: int = 60, db: bool = True, tomcat_ctx: str | None = None,
+                         wildfly_ctx: str | None = None, health: bool = True) -> "readiness.ReadinessReport":
+    """Aguarda, em paralelo e com prazo único, os componentes informados do ambiente.
+
+    tomcat_ctx/wildfly_ctx: contexto da aplicação (ex.: '/caracore-hub'); quando informados, a
+    página de login e (se health) /api/health/ready entram na sonda além da porta do servidor.
+    """
+    targets: list[readiness.ProbeTarget] = []
+    if db:
+        db_cfg = load_db_config_from_compose()
+        port_cfg = db_cfg.get("port", 5432)
+        db_port = int(str(port_cfg).split(":")[-1]) if isinstance(port_cfg, str) else int(port_cfg)
+        targets.append(readiness.postgres_target("postgres", db_port, db_cfg.get("host", "localhost")))
+    for label, port, ctx in (("tomcat", TOMCAT_PORT, tomcat_ctx), ("wildfly", WILDFLY_PORT, wildfly_ctx)):
+        if ctx is None:
+            continue
+        base = f"http://localhost:{port}{'' if ctx == '/' else ctx}/"
+        targets.append(readiness.tcp_target(label, port))
+        targets.append(readiness.http_target(f"{label}:login", urljoin(base, "login")))
+        if health:
+            targets.append(readiness.http_target(f"{label}:health", urljoin(base, "api/health/ready")))
+    report = readiness.wait_ready(targets, timeout)
+    for line in readiness.format_report(report).splitlines():
+        log(f"Prontidão - {line}", "INFO" if not report.pending() else "WARNING")
+    return report
 
 def _mask_cookie_value(val: str) -> str:
     try:
@@ -570,6 +685,12 @@ def _parse_login_form(html: str, base_url: str, fallback_post_url: str) -> tuple
 
 def deploy_tomcat_root_quick(war_path: str) -> bool:
     """Faz cold deploy no Tomcat (sem deploy a quente): para servidor, copia ROOT.war e inicia."""
+    if TOMCAT_DEPLOY_MODE == "delta":
+        return deploy_tomcat_delta(war_path, "ROOT")
+    if TOMCAT_DEPLOY_MODE == "manager":
+        if deploy_tomcat_hot(war_path, "ROOT"):
+            return True
+        log("Seguindo com cold deploy (fallback do Tomcat Manager)...", "INFO")
     if not os.path.exists(TOMCAT_DIR):
         log(f"Tomcat não encontrado em: {TOMCAT_DIR}", "ERROR")
         return False
@@ -611,7 +732,8 @@ def deploy_tomcat_root_quick(war_path: str) -> bool:
         except Exception:
             pass
     try:
-        shutil.copy2(war_path, os.path.join(webapps, "ROOT.war"))
+        with tracing.span("copia_war", cat="copy"):
+            shutil.copy2(war_path, os.path.join(webapps, "ROOT.war"))
         log("WAR copiado para Tomcat como ROOT.war", "SUCCESS")
     except Exception as e:
         log(f"Falha ao copiar WAR para Tomcat: {e}", "ERROR")
@@ -688,8 +810,626 @@ def derive_context_from_war(war_path: str) -> str:
         return '/'
     return '/' + base
 
+# Modo de deploy no Tomcat: "cold" (padrão, WAR novo e reinício), "delta" (sincroniza o diretório explodido)
+# ou "manager" (deploy a quente via Tomcat Manager, com cold deploy como fallback)
+TOMCAT_DEPLOY_MODE = (os.environ.get("APP_TOMCAT_DEPLOY_MODE") or "cold").strip().lower()
+# Alterações nestes caminhos exigem reload do contexto; estáticos e JSPs são recarregados pelo próprio Tomcat
+_TOMCAT_RELOAD_PREFIXES = ("WEB-INF/classes/", "WEB-INF/lib/", "WEB-INF/web.xml", "META-INF/context.xml")
+
+def _file_crc32(path: str) -> int:
+    import zlib
+    crc = 0
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc & 0xFFFFFFFF
+
+def sync_exploded_war(war_path: str, target_dir: str, manifest_name: str | None = None) -> dict:
+    """
+    Sincroniza o conteúdo do WAR com um diretório explodido, gravando apenas o que mudou.
+
+    Cada entrada é comparada por tamanho e CRC-32 (o CRC do lado do WAR vem do diretório
+    central do zip, sem descompactar). O CRC dos arquivos em disco fica num manifesto
+    (mtime/tamanho) para que arquivos inalterados não sejam relidos. Arquivos que não existem
+    mais no WAR são removidos.
+
+    Returns:
+        dict: {"written": [...], "deleted": [...], "unchanged": int, "bytes_written": int}
+    """
+    manifest_name = manifest_name or f"delta-{os.path.basename(os.path.normpath(target_dir))}.json"
+    manifest = _load_build_cache_json(manifest_name, {})
+    new_manifest = {}
+    written, deleted = [], []
+    unchanged = 0
+    bytes_written = 0
+    target_root = os.path.abspath(target_dir)
+    os.makedirs(target_root, exist_ok=True)
+
+    with zipfile.ZipFile(war_path, "r") as zf:
+        entries = {}
+        for info in zf.infolist():
+            name = info.filename.replace("\\", "/")
+            if name.endswith("/"):
+                continue
+            dest = os.path.abspath(os.path.join(target_root, *name.split("/")))
+            # Proteção contra entradas com caminho fora do diretório de destino
+            if not dest.startswith(target_root + os.sep):
+                log(f"Entrada ignorada no WAR (caminho inválido): {name}", "WARNING")
+                continue
+            entries[name] = (info, dest)
+
+        for name, (info, dest) in entries.items():
+            same = False
+            try:
+                st = os.stat(dest)
+                if st.st_size == info.file_size:
+                    cached = manifest.get(name)
+                    if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+                        disk_crc = cached["crc"]
+                    else:
+                        disk_crc = _file_crc32(dest)
+                    same = disk_crc == info.CRC
+            except FileNotFoundError:
+                st = None
+            if not same:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                tmp = dest + ".delta-tmp"
+                with zf.open(info) as src, open(tmp, "wb") as out:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+                os.replace(tmp, dest)
+                st = os.stat(dest)
+                written.append(name)
+                bytes_written += info.file_size
+            else:
+                unchanged += 1
+            new_manifest[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "crc": info.CRC}
+
+    # Remover arquivos que não fazem mais parte do WAR (e diretórios que ficaram vazios)
+    for dirpath, dirnames, filenames in os.walk(target_root, topdown=False):
+        for filename in filenames:
+            full = os.path.join(dirpath, filename)
+            rel = os.path.relpath(full, target_root).replace(os.sep, "/")
+            if rel not in entries:
+                try:
+                    os.remove(full)
+                    deleted.append(rel)
+                except OSError as e:
+                    log(f"Não foi possível remover {rel}: {e}", "WARNING")
+        if dirpath != target_root and not os.listdir(dirpath):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+    _save_build_cache_json(manifest_name, new_manifest)
+    return {"written": written, "deleted": deleted, "unchanged": unchanged, "bytes_written": bytes_written}
+
+@tracing.traced("tomcat_startup", cat="server")
+def _launch_tomcat_startup() -> bool:
+    """Inicia o Tomcat via startup.sh/startup.bat e aguarda a porta HTTP."""
+    env = setup_tomcat_environment(TOMCAT_DIR)
+    bin_dir = os.path.join(TOMCAT_DIR, "bin")
+    if platform.system() == "Windows":
+        subprocess.Popen([os.path.join(bin_dir, "startup.bat")], shell=True, env=env)
+    else:
+        subprocess.Popen([os.path.join(bin_dir, "startup.sh")], env=env)
+    if not wait_for_port(TOMCAT_PORT, timeout=40):
+        log("Tomcat não respondeu na porta esperada após iniciar.", "WARNING")
+    return True
+
+def reload_tomcat_context(ctx_dir: str) -> bool:
+    """
+    Solicita o reload do contexto: via Tomcat Manager quando disponível, senão tocando
+    WEB-INF/web.xml (WatchedResource padrão do Tomcat, verificado pelo autoDeploy do Host).
+    """
+    # Só usa o Manager se o usuário de deploy já existir (criado pelo modo manager); não o provisiona aqui
+    if (os.path.isdir(os.path.join(TOMCAT_DIR, "webapps", "manager"))
+            and ensure_tomcat_manager_user(provision=False)):
+        ok, message = tomcat_manager_reload(os.path.basename(os.path.normpath(ctx_dir)))
+        if ok:
+            log(f"Contexto recarregado via Tomcat Manager: {message.splitlines()[0]}", "SUCCESS")
+            return True
+        log(f"Reload via Tomcat Manager indisponível ({message.splitlines()[0] if message else ''}); usando WatchedResource", "WARNING")
+    web_xml = os.path.join(ctx_dir, "WEB-INF", "web.xml")
+    if not os.path.isfile(web_xml):
+        log(f"WEB-INF/web.xml não encontrado em {ctx_dir}; reload automático não disparado", "WARNING")
+        return False
+    os.utime(web_xml, None)
+    log(f"Reload do contexto solicitado (WEB-INF/web.xml atualizado em {ctx_dir})", "INFO")
+    return True
+
+# Credenciais do usuário manager-script usado no deploy a quente via Tomcat Manager. Sem
+# APP_TOMCAT_MANAGER_PASSWORD, uma senha aleatória é gerada uma vez e guardada (permissão 0600)
+TOMCAT_MANAGER_USER = os.environ.get("APP_TOMCAT_MANAGER_USER", "caracore-deployer")
+TOMCAT_MANAGER_CREDENTIALS_FILE = os.path.join(WORKSPACE_DIR, ".tomcat-manager-password")
+_TOMCAT_MANAGER_PASSWORD = None
+
+def tomcat_manager_password() -> str:
+    """Senha do usuário de deploy: APP_TOMCAT_MANAGER_PASSWORD ou a gerada em .tomcat-manager-password."""
+    global _TOMCAT_MANAGER_PASSWORD
+    if _TOMCAT_MANAGER_PASSWORD:
+        return _TOMCAT_MANAGER_PASSWORD
+    explicit = os.environ.get("APP_TOMCAT_MANAGER_PASSWORD")
+    if explicit:
+        _TOMCAT_MANAGER_PASSWORD = explicit
+        return explicit
+    try:
+        with open(TOMCAT_MANAGER_CREDENTIALS_FILE, "r", encoding="utf-8") as fh:
+            stored = fh.read().strip()
+        if stored:
+            _TOMCAT_MANAGER_PASSWORD = stored
+            return stored
+    except OSError:
+        pass
+    import secrets
+    generated = secrets.token_urlsafe(24)
+    # Criado já com 0600: a senha nunca fica legível por outros usuários, nem por um instante
+    fd = os.open(TOMCAT_MANAGER_CREDENTIALS_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(generated + "\n")
+    log(f"Senha do usuário '{TOMCAT_MANAGER_USER}' gerada em {TOMCAT_MANAGER_CREDENTIALS_FILE}", "INFO")
+    _TOMCAT_MANAGER_PASSWORD = generated
+    return generated
+
+def _xml_attributes(tag: str) -> dict:
+    """Atributos de uma tag XML simples, com entidades decodificadas."""
+    from xml.sax.saxutils import unescape
+    return {name: unescape(value[1:-1], {"&quot;": '"', "&apos;": "'"})
+            for name, value in re.findall(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\')', tag)}
+
+def ensure_tomcat_manager_user(tomcat_dir: str | None = None, provision: bool = True) -> bool:
+    """
+    Garante em conf/tomcat-users.xml o papel manager-script e o usuário de deploy
+    (APP_TOMCAT_MANAGER_USER / senha de tomcat_manager_password()).
+
+    A edição é textual para preservar os comentários do arquivo. O UserDatabase do Tomcat
+    recarrega o arquivo ao detectar a alteração (watchSource), sem reinício. Com
+    provision=False apenas verifica: o usuário só é criado pelo deploy via Manager
+    (APP_TOMCAT_DEPLOY_MODE=manager), nunca como efeito colateral de outro fluxo.
+
+    Returns:
+        bool: True se o usuário está provisionado
+    """
+    from xml.sax.saxutils import quoteattr
+    tomcat_dir = tomcat_dir or TOMCAT_DIR
+    users_xml = os.path.join(tomcat_dir, "conf", "tomcat-users.xml")
+    if not os.path.isfile(users_xml):
+        if provision:
+            log(f"Arquivo tomcat-users.xml não encontrado em: {users_xml}", "ERROR")
+        return False
+    try:
+        password = tomcat_manager_password() if provision else (
+            os.environ.get("APP_TOMCAT_MANAGER_PASSWORD") or _TOMCAT_MANAGER_PASSWORD)
+        with open(users_xml, "r", encoding="utf-8") as fh:
+            content = fh.read()
+        # Ignorar exemplos comentados ao procurar o usuário
+        active = re.sub(r"<!--.*?-->", "", content, flags=re.S)
+        existing = None
+        for match in re.finditer(r"<user\s[^>]*/>", active):
+            if _xml_attributes(match.group(0)).get("username") == TOMCAT_MANAGER_USER:
+                existing = match.group(0)
+                break
+        if existing:
+            attrs = _xml_attributes(existing)
+            roles = [r.strip() for r in attrs.get("roles", "").split(",")]
+            if not provision:
+                # Sem senha conhecida (nem env nem arquivo) não há como autenticar
+                if not password and os.path.isfile(TOMCAT_MANAGER_CREDENTIALS_FILE):
+                    password = tomcat_manager_password()
+                return bool(password) and "manager-script" in roles and attrs.get("password") == password
+            if "manager-script" in roles and attrs.get("password") == password:
+                return True
+        elif not provision:
+            return False
+        desired_user = (f"<user username={quoteattr(TOMCAT_MANAGER_USER)} password={quoteattr(password)} "
+                        f'roles="manager-script"/>')
+        if existing:
+            content = content.replace(existing, desired_user, 1)
+        else:
+            if "</tomcat-users>" not in content:
+                log("tomcat-users.xml sem a tag </tomcat-users>; não foi possível provisionar o usuário", "ERROR")
+                return False
+            insert = ""
+            if not re.search(r'<role\s+rolename="manager-script"', active):
+                insert += '  <role rolename="manager-script"/>\n'
+            insert += f"  {desired_user}\n"
+            content = content.replace("</tomcat-users>", insert + "</tomcat-users>", 1)
+        backup_path = users_xml + ".bak"
+        if not os.path.exists(backup_path):
+            shutil.copy2(users_xml, backup_path)
+            log(f"Backup do tomcat-users.xml criado em: {backup_path}", "INFO")
+        with open(users_xml, "w", encoding="utf-8") as fh:
+            fh.write(content)
+        log(f"Usuário '{TOMCAT_MANAGER_USER}' (manager-script) provisionado em tomcat-users.xml", "SUCCESS")
+        return True
+    except Exception as e:
+        log(f"Falha ao provisionar usuário do Tomcat Manager: {e}", "ERROR")
+        return False
+
+def tomcat_manager_request(command: str, params: dict | None = None, war_path: str | None = None,
+                           timeout: int = 120) -> tuple[bool, str]:
+    """
+    Executa um comando na interface texto do Tomcat Manager (/manager/text/<command>).
+
+    Returns:
+        tuple: (ok, mensagem) — ok quando a resposta começa com "OK"
+    """
+    url = f"http://localhost:{TOMCAT_PORT}/manager/text/{command}"
+    auth = (TOMCAT_MANAGER_USER, tomcat_manager_password())
+    try:
+        if war_path:
+            with open(war_path, "rb") as fh:
+                r = requests.put(url, params=params, data=fh, auth=auth, timeout=timeout,
+                                 headers={"Content-Type": "application/octet-stream"})
+        else:
+            r = requests.get(url, params=params, auth=auth, timeout=timeout)
+    except Exception as e:
+        return False, f"erro de conexão com o Tomcat Manager: {e}"
+    if r.status_code in (401, 403):
+        return False, f"HTTP {r.status_code}: acesso negado ao Tomcat Manager (usuário/papel manager-script)"
+    if r.status_code == 404:
+        return False, "HTTP 404: aplicação manager não implantada no Tomcat"
+    text = (r.text or "").strip()
+    first_line = text.splitlines()[0] if text else f"HTTP {r.status_code}"
+    return first_line.startswith("OK"), text or first_line
+
+def _manager_context_path(ctx: str) -> str:
+    return "/" if ctx in ("", "/", "ROOT") else "/" + ctx.strip("/")
+
+def tomcat_manager_undeploy(ctx: str) -> tuple[bool, str]:
+    return tomcat_manager_request("undeploy", {"path": _manager_context_path(ctx)})
+
+def tomcat_manager_deploy(war_path: str, ctx: str, update: bool = True) -> tuple[bool, str]:
+    params = {"path": _manager_context_path(ctx)}
+    if update:
+        params["update"] = "true"
+    return tomcat_manager_request("deploy", params, war_path=war_path)
+
+def tomcat_manager_reload(ctx: str) -> tuple[bool, str]:
+    return tomcat_manager_request("reload", {"path": _manager_context_path(ctx)}, timeout=60)
+
+def tomcat_manager_list() -> dict:
+    """Lista os contextos implantados: {path: {"state": ..., "sessions": ..., "name": ...}}."""
+    ok, text = tomcat_manager_request("list", timeout=15)
+    contexts = {}
+    if not ok:
+        return contexts
+    for line in text.splitlines()[1:]:
+        parts = line.split(":", 3)
+        if len(parts) == 4:
+            contexts[parts[0]] = {"state": parts[1], "sessions": parts[2], "name": parts[3]}
+    return contexts
+
+@tracing.traced("deploy_tomcat_hot", cat="deploy")
+def deploy_tomcat_hot(war_path: str, ctx: str | None = None) -> bool:
+    """
+    Deploy a quente via Tomcat Manager (PUT /manager/text/deploy com update=true: o Tomcat
+    substitui o contexto existente) mantendo a JVM do Tomcat em execução. Retorna False quando não é possível (Tomcat parado, manager
+    ausente ou credenciais recusadas) para que o chamador use o cold deploy.
+    """
+    ctx = ctx or (derive_context_from_war(war_path).lstrip('/') or 'ROOT')
+    if not is_server_up("localhost", TOMCAT_PORT):
+        log("Tomcat não está em execução; deploy via Manager indisponível", "INFO")
+        return False
+    if not os.path.isdir(os.path.join(TOMCAT_DIR, "webapps", "manager")):
+        log("Aplicação manager ausente em webapps/; deploy via Manager indisponível", "WARNING")
+        return False
+    if not ensure_tomcat_manager_user():
+        return False
+    started = time.time()
+    ok, message = tomcat_manager_deploy(war_path, ctx)
+    if not ok and "acesso negado" in message:
+        # O UserDatabase recarrega tomcat-users.xml em segundo plano; aguardar uma verificação
+        time.sleep(3)
+        ok, message = tomcat_manager_deploy(war_path, ctx)
+    if not ok:
+        log(f"Deploy via Tomcat Manager falhou: {message.splitlines()[0] if message else message}", "WARNING")
+        return False
+    log(f"Deploy a quente de {_manager_context_path(ctx)} via Tomcat Manager em {time.time() - started:.1f}s", "SUCCESS")
+    return True
+
+@tracing.traced("deploy_tomcat_delta", cat="deploy")
+def deploy_tomcat_delta(war_path: str, ctx: str | None = None) -> bool:
+    """
+    Deploy incremental no Tomcat: sincroniza webapps/<ctx> com o WAR (apenas arquivos alterados)
+    e recarrega o contexto se classes, bibliotecas ou descritores mudaram.
+
+    O contexto passa a ser servido a partir do diretório explodido. Se existir um <ctx>.war em
+    webapps, ele é removido com o Tomcat parado (remover o WAR com o servidor no ar faria o
+    Tomcat desimplantar o contexto inteiro).
+    """
+    if not os.path.exists(TOMCAT_DIR):
+        log(f"Tomcat não encontrado em: {TOMCAT_DIR}", "ERROR")
+        return False
+    webapps = os.path.join(TOMCAT_DIR, "webapps")
+    os.makedirs(webapps, exist_ok=True)
+    ctx = ctx or (derive_context_from_war(war_path).lstrip('/') or 'ROOT')
+    ctx_dir = os.path.join(webapps, ctx)
+    packed_war = os.path.join(webapps, f"{ctx}.war")
+    running = is_server_up("localhost", TOMCAT_PORT)
+
+    if os.path.isfile(packed_war):
+        if running:
+            log(f"Delta deploy: {ctx}.war presente em webapps; parando Tomcat para migrar o contexto para diretório explodido...", "INFO")
+            stop_tomcat_server()
+            running = False
+        try:
+            os.remove(packed_war)
+        except OSError as e:
+            log(f"Falha ao remover {packed_war}: {e}", "ERROR")
+            return False
+
+    started = time.time()
+    try:
+        result = sync_exploded_war(war_path, ctx_dir, manifest_name=f"tomcat-delta-{ctx}.json")
+    except Exception as e:
+        log(f"Falha na sincronização incremental de {ctx}: {e}", "ERROR")
+        return False
+    changed = result["written"] + result["deleted"]
+    log(f"Delta deploy de /{'' if ctx == 'ROOT' else ctx}: {len(result['written'])} gravado(s) "
+        f"({result['bytes_written'] / 1024:.1f} KB), {len(result['deleted'])} removido(s), "
+        f"{result['unchanged']} inalterado(s) em {time.time() - started:.2f}s", "SUCCESS")
+
+    if not running:
+        try:
+            configure_tomcat_port(TOMCAT_DIR, TOMCAT_PORT)
+        except Exception:
+            pass
+        try:
+            return _launch_tomcat_startup()
+        except Exception as e:
+            log(f"Falha ao iniciar Tomcat: {e}", "ERROR")
+            return False
+
+    if not changed:
+        log("Nenhuma alteração no WAR; contexto mantido sem reload", "INFO")
+        return True
+    if any(name.startswith(_TOMCAT_RELOAD_PREFIXES) for name in changed):
+        return reload_tomcat_context(ctx_dir)
+    log("Apenas recursos estáticos/JSP alterados; reload do contexto não é necessário", "INFO")
+    return True
+
+def wait_for_port_closed(port: int, timeout: float = 10, interval: float = 0.25) -> bool:
+    """Aguarda a porta deixar de aceitar conexões (servidor parado), sem espera fixa."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not is_server_up("localhost", port, timeout=interval):
+            return True
+        time.sleep(interval)
+    return not is_server_up("localhost", port, timeout=interval)
+
+def _locate_tomcat_build_war():
+    """WAR gerado pelo build: target/ do projeto, com o diretório do projeto como alternativa."""
+    war_file = find_built_war()
+    if war_file:
+        return war_file
+    log("Nenhum arquivo WAR encontrado em target/. Procurando em outros diretórios...", "WARNING")
+    # Verificar em diretórios alternativos (por exemplo, diretório atual ou diretório raiz do projeto)
+    war_file = _war_in(PROJECT_DIR)
+    if war_file:
+        log(f"Arquivo WAR encontrado no diretório do projeto: {war_file}", "INFO")
+    return war_file
+
+def run_tomcat_deploy_pipeline(tomcat_run_mode: str = "background") -> "pipeline.PipelineResult":
+    """
+    Deploy no Tomcat (opção 2) como grafo de etapas: requisitos, PostgreSQL, build Maven e a
+    configuração do Tomcat (porta, datasource, ambiente) rodam em paralelo quando independentes;
+    parada, limpeza, cópia e início seguem o build. Em foreground o início fica a cargo do chamador.
+
+    Returns:
+        pipeline.PipelineResult: valores por etapa (build = caminho do WAR, ambiente = env do
+        Tomcat, deploy_quente = {"mode", "ok"} quando manager/delta concluiu o deploy).
+    """
+    def requisitos(ctx):
+        log("Verificando requisitos mínimos...", "INFO")
+        java_installed, _ = check_java_installed()
+        maven_installed, _, _ = check_maven_installed()
+        if not java_installed or not maven_installed:
+            log("Requisitos mínimos não atendidos. Verifique o ambiente primeiro (opção 1).", "ERROR")
+            return False
+        if check_server_running(TOMCAT_PORT):
+            log(f"Servidor Tomcat está em execução na porta {TOMCAT_PORT}", "WARNING")
+            log("O Tomcat não permite deploy a quente. O servidor será parado, feito undeploy e reiniciado.", "WARNING")
+            log("Continuando automaticamente com o deploy...", "INFO")
+        else:
+            log(f"Servidor Tomcat não está em execução na porta {TOMCAT_PORT}", "INFO")
+            log("O servidor será iniciado após o deploy.", "INFO")
+        return True
+
+    def postgres(ctx):
+        return ensure_docker_db_up()
+
+    def build(ctx):
+        log("Compilando e empacotando o projeto para Tomcat...", "INFO")
+        mvn_result = execute_maven_command("clean package", "tomcat", "-DskipTests")
+        if not mvn_result["success"]:
+            log("Falha na compilação do projeto. Verifique os erros acima.", "ERROR")
+            return False
+        war_file = _locate_tomcat_build_war()
+        if not war_file:
+            log("Nenhum arquivo WAR encontrado. Falha no processo de deploy para Tomcat.", "ERROR")
+            return False
+        log(f"Arquivo WAR encontrado: {war_file}", "SUCCESS")
+        return war_file
+
+    def porta(ctx):
+        # Configurar a porta do Tomcat antes de iniciar
+        log(f"Configurando Tomcat para usar a porta {TOMCAT_PORT}...", "INFO")
+        return configure_tomcat_port(TOMCAT_DIR, TOMCAT_PORT)
+
+    def datasource(ctx):
+        # Garantir datasource PostgreSQL no Tomcat
+        log("Verificando/Configurando datasource PostgreSQL no Tomcat...", "INFO")
+        if configure_tomcat_postgres_datasource():
+            log("Datasource PostgreSQL pronto no Tomcat.", "SUCCESS")
+            return True
+        log("Não foi possível garantir o datasource PostgreSQL no Tomcat.", "WARNING")
+        return False
+
+    def ambiente(ctx):
+        tomcat_env = setup_tomcat_environment(TOMCAT_DIR)
+        os.makedirs(os.path.join(TOMCAT_DIR, "webapps"), exist_ok=True)
+        return tomcat_env
+
+    def deploy_quente(ctx):
+        war_file = ctx["build"]
+        # Deploy a quente via Tomcat Manager (JVM permanece aquecida); cold deploy como fallback
+        if TOMCAT_DEPLOY_MODE == "manager" and tomcat_run_mode != "foreground":
+            if deploy_tomcat_hot(war_file, "caracore-hub"):
+                return {"mode": "manager", "ok": True}
+            log("Deploy via Tomcat Manager indisponível; seguindo com cold deploy (parada e reinício)...", "WARNING")
+        # Deploy incremental: sincroniza apenas o que mudou, sem parar o Tomcat
+        if TOMCAT_DEPLOY_MODE == "delta" and tomcat_run_mode != "foreground":
+            return {"mode": "delta", "ok": deploy_tomcat_delta(war_file, "caracore-hub")}
+        return pipeline.SKIP
+
+    def parar(ctx):
+        if ctx.get("deploy_quente"):
+            return pipeline.SKIP
+        tomcat_env = ctx["ambiente"]
+        # Verificar se o Tomcat está em execução para fazer undeploy
+        if not check_server_running(TOMCAT_PORT):
+            log("Tomcat não está em execução. Prosseguindo com a limpeza do diretório webapps...", "INFO")
+            return True
+        log("Tomcat está em execução. Realizando undeploy...", "INFO")
+        print(f"\n{Colors.YELLOW}Parando o servidor Tomcat para undeploy, aguarde...{Colors.END}")
+        script = "shutdown.bat" if platform.system() == "Windows" else "shutdown.sh"
+        try:
+            subprocess.run([os.path.join(TOMCAT_DIR, "bin", script)], shell=True, env=tomcat_env)
+            log("Comando de parada do Tomcat executado com sucesso", "SUCCESS")
+        except Exception as e:
+            log(f"Erro ao parar o Tomcat: {str(e)}", "ERROR")
+            return True
+        # Aguarda a porta fechar (até 10 s) em vez de uma espera fixa
+        print(f"{Colors.YELLOW}Aguardando o servidor parar (até 10 segundos)...{Colors.END}")
+        if not wait_for_port_closed(TOMCAT_PORT, timeout=10):
+            log("Tomcat ainda responde na porta após 10 s; prosseguindo com a limpeza mesmo assim.", "WARNING")
+        return True
+
+    def limpeza(ctx):
+        if ctx.get("deploy_quente"):
+            return pipeline.SKIP
+        # Limpar deployments anteriores (mesmo se o servidor não estiver rodando)
+        log("Limpando deployments anteriores...", "INFO")
+        tomcat_webapps = os.path.join(TOMCAT_DIR, "webapps")
+        for item in ["caracore-hub", "caracore-hub.war", "ROOT", "ROOT.war"]:
+            item_path = os.path.join(tomcat_webapps, item)
+            if os.path.exists(item_path):
+                if os.path.isdir(item_path):
+                    shutil.rmtree(item_path, ignore_errors=True)
+                    log(f"Diretório {item} removido do Tomcat", "INFO")
+                else:
+                    os.remove(item_path)
+                    log(f"Arquivo {item} removido do Tomcat", "INFO")
+        return True
+
+    def copia(ctx):
+        if ctx.get("deploy_quente"):
+            return pipeline.SKIP
+        # Copiar o WAR para o Tomcat
+        war_dest = os.path.join(TOMCAT_DIR, "webapps", "caracore-hub.war")
+        with tracing.span("copia_war", cat="copy"):
+            shutil.copy2(ctx["build"], war_dest)
+        log(f"Arquivo WAR copiado para Tomcat: {war_dest}", "SUCCESS")
+        return war_dest
+
+    def inicio(ctx):
+        if ctx.get("deploy_quente"):
+            return pipeline.SKIP
+        # Iniciar o Tomcat usando o script padrão (background)
+        log("Iniciando o Tomcat (startup script)...", "INFO")
+        bin_dir = os.path.join(TOMCAT_DIR, "bin")
+        try:
+            if platform.system() == "Windows":
+                subprocess.run([os.path.join(bin_dir, "startup.bat")], shell=True, cwd=bin_dir, env=ctx["ambiente"], check=True)
+            else:
+                subprocess.run([os.path.join(bin_dir, "startup.sh")], cwd=bin_dir, env=ctx["ambiente"], check=True)
+            log("Comando de inicialização do Tomcat executado com sucesso", "SUCCESS")
+        except subprocess.CalledProcessError as e:
+            log(f"Erro ao iniciar o Tomcat (exit {e.returncode}): {e}", "ERROR")
+            return False
+        except Exception as e:
+            log(f"Erro ao iniciar o Tomcat: {str(e)}", "ERROR")
+            return False
+        if wait_for_port(TOMCAT_PORT, timeout=40):
+            log("Tomcat iniciou e está respondendo na porta configurada", "SUCCESS")
+            return True
+        log("Tomcat não respondeu na porta configurada dentro do tempo limite", "WARNING")
+        return False
+
+    stages = [
+        pipeline.Stage("requisitos", requisitos),
+        pipeline.Stage("postgres", postgres, required=False),
+        pipeline.Stage("build", build, deps=["requisitos"]),
+    ]
+    if os.path.exists(TOMCAT_DIR):
+        stages += [
+            pipeline.Stage("porta", porta, required=False),
+            pipeline.Stage("datasource", datasource, required=False),
+            pipeline.Stage("ambiente", ambiente),
+            pipeline.Stage("deploy_quente", deploy_quente, deps=["build", "porta", "datasource", "ambiente"]),
+            pipeline.Stage("parar_tomcat", parar, deps=["deploy_quente"]),
+            pipeline.Stage("limpeza", limpeza, deps=["parar_tomcat"]),
+            pipeline.Stage("copia_war", copia, deps=["limpeza"]),
+        ]
+        if tomcat_run_mode != "foreground":
+            # O PostgreSQL precisa estar no ar quando o pool JNDI do contexto inicializar
+            stages.append(pipeline.Stage("inicio", inicio, deps=["copia_war", "postgres"], required=False))
+
+    result = pipeline.Pipeline(stages, max_workers=PIPELINE_WORKERS).run()
+    log("Relatório do pipeline de deploy (Tomcat):", "INFO")
+    for line in pipeline.format_report(result):
+        log(f"  {line}", "INFO")
+    return result
+
+def run_tomcat_foreground(tomcat_env) -> None:
+    """Inicia o Tomcat em foreground (catalina run) e aguarda o término ou Ctrl+C."""
+    bin_dir = os.path.join(TOMCAT_DIR, "bin")
+    log("Iniciando o Tomcat em foreground (logs no terminal atual)...", "INFO")
+    tomcat_process = None
+    try:
+        if platform.system() == "Windows":
+            catalina = os.path.join(bin_dir, "catalina.bat")
+            if not os.path.exists(catalina):
+                log("catalina.bat não encontrado no Tomcat.", "ERROR")
+            else:
+                cmd = f'"{catalina}" run'
+                tomcat_process = subprocess.Popen(cmd, shell=True, cwd=bin_dir, env=tomcat_env)
+        else:
+            catalina = os.path.join(bin_dir, "catalina.sh")
+            if not os.path.exists(catalina):
+                log("catalina.sh não encontrado no Tomcat.", "ERROR")
+            else:
+                tomcat_process = subprocess.Popen([catalina, "run"], cwd=bin_dir, env=tomcat_env)
+
+        if tomcat_process:
+            print(f"{Colors.CYAN}Tomcat em execução no foreground. Pressione Ctrl+C para parar.{Colors.END}")
+            print(f"{Colors.GREEN}Aplicação: http://localhost:{TOMCAT_PORT}/caracore-hub/{Colors.END}")
+            log("Tomcat iniciado em foreground; logs sendo exibidos neste terminal.", "SUCCESS")
+            log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/ (foreground)", "SUCCESS")
+            tomcat_process.wait()
+            log("Tomcat finalizado (foreground).", "INFO")
+    except KeyboardInterrupt:
+        log("Interrompido pelo usuário. Enviando shutdown ao Tomcat...", "INFO")
+        try:
+            if platform.system() == "Windows":
+                subprocess.run([os.path.join(bin_dir, "shutdown.bat")], shell=True, cwd=bin_dir, env=tomcat_env)
+            else:
+                subprocess.run([os.path.join(bin_dir, "shutdown.sh")], cwd=bin_dir, env=tomcat_env)
+        except Exception:
+            pass
+    except Exception as e:
+        log(f"Erro ao iniciar o Tomcat em foreground: {str(e)}", "ERROR")
+
+@tracing.traced("deploy_tomcat_quick", cat="deploy")
 def deploy_tomcat_war_quick(war_path: str) -> bool:
     """Cold deploy no Tomcat mantendo o nome do WAR (contexto pelo nome/descriptor)."""
+    if TOMCAT_DEPLOY_MODE == "delta":
+        return deploy_tomcat_delta(war_path)
+    if TOMCAT_DEPLOY_MODE == "manager":
+        if deploy_tomcat_hot(war_path):
+            return True
+        log("Seguindo com cold deploy (fallback do Tomcat Manager)...", "INFO")
     if not os.path.exists(TOMCAT_DIR):
         log(f"Tomcat não encontrado em: {TOMCAT_DIR}", "ERROR")
         return False
@@ -718,7 +1458,8 @@ def deploy_tomcat_war_quick(war_path: str) -> bool:
         except Exception:
             pass
     try:
-        shutil.copy2(war_path, os.path.join(webapps, war_name))
+        with tracing.span("copia_war", cat="copy"):
+            shutil.copy2(war_path, os.path.join(webapps, war_name))
         log(f"WAR copiado para Tomcat como {war_name}", "SUCCESS")
     except Exception as e:
         log(f"Falha ao copiar WAR para Tomcat: {e}", "ERROR")
@@ -769,7 +1510,8 @@ def deploy_wildfly_root_quick(war_path: str) -> bool:
             pass
     try:
         dest = os.path.join(deployments, "ROOT.war")
-        shutil.copy2(war_path, dest)
+        with tracing.span("copia_war", cat="copy"):
+            shutil.copy2(war_path, dest)
         log("WAR copiado para WildFly como ROOT.war (hot deploy)", "SUCCESS")
         # Criar .dodeploy para forçar scanner, caso necessário
         try:
@@ -780,6 +1522,133 @@ def deploy_wildfly_root_quick(war_path: str) -> bool:
         log(f"Falha ao copiar WAR para WildFly: {e}", "ERROR")
         return False
 
+# API HTTP de gerenciamento do WildFly (JSON DMR em :9990/management); 0 força sempre o jboss-cli
+WILDFLY_MGMT_HTTP_ENABLED = str(os.environ.get("APP_WILDFLY_MGMT_HTTP", "1")).strip().lower() not in {"0", "false", "no", "off"}
+
+class WildFlyManagementClient:
+    """
+    Cliente da API HTTP de gerenciamento do WildFly (JSON DMR em /management).
+
+    Substitui chamadas ao jboss-cli (uma JVM por operação) por requisições HTTP reaproveitando
+    a mesma conexão. A interface HTTP exige um usuário do ManagementRealm (add-user.sh), lido de
+    APP_WILDFLY_CLI_USER / APP_WILDFLY_CLI_PASSWORD. Falhas de conexão ou autenticação retornam
+    {"outcome": "failed", "unavailable": True, ...} para que o chamador use o jboss-cli.
+    """
+
+    def __init__(self, host: str = "localhost", port: int | None = None, timeout: int = 30):
+        from requests.auth import HTTPDigestAuth
+        self.base_url = f"http://{host}:{port or WILDFLY_MANAGEMENT_PORT}/management"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        creds = _wildfly_cli_credentials()
+        self.has_credentials = creds is not None
+        if creds:
+            self.session.auth = HTTPDigestAuth(*creds)
+
+    @staticmethod
+    def _unavailable(reason: str) -> dict:
+        return {"outcome": "failed", "failure-description": reason, "unavailable": True}
+
+    def _post(self, url: str, timeout: int | None = None, **kwargs) -> dict:
+        try:
+            r = self.session.post(url, timeout=timeout or self.timeout, **kwargs)
+        except Exception as e:
+            return self._unavailable(f"API de gerenciamento inacessível: {e}")
+        if r.status_code in (401, 403):
+            return self._unavailable(f"HTTP {r.status_code}: credenciais do ManagementRealm ausentes ou recusadas")
+        try:
+            return r.json()
+        except ValueError:
+            return self._unavailable(f"HTTP {r.status_code}: resposta não JSON da API de gerenciamento")
+
+    def execute(self, operation: str, address: list | None = None, timeout: int | None = None, **params) -> dict:
+        """Executa uma operação DMR. Parâmetros com '_' são enviados com '-' (ex.: include_runtime)."""
+        body = {"operation": operation, "address": address or []}
+        body.update({k.replace("_", "-"): v for k, v in params.items()})
+        return self._post(self.base_url, json=body, timeout=timeout)
+
+    @staticmethod
+    def succeeded(result: dict) -> bool:
+        return result.get("outcome") == "success"
+
+    @staticmethod
+    def failure(result: dict) -> str:
+        return str(result.get("failure-description") or result.get("outcome") or "sem resposta")
+
+    def server_state(self) -> str | None:
+        result = self.execute("read-attribute", name="server-state", timeout=5)
+        return result.get("result") if self.succeeded(result) else None
+
+    def upload_content(self, war_path: str) -> dict:
+        """Envia o WAR para o repositório de conteúdo do servidor (/management/add-content)."""
+        with open(war_path, "rb") as fh:
+            return self._post(self.base_url + "/add-content", files={"file": (os.path.basename(war_path), fh)},
+                              timeout=max(self.timeout, 120))
+
+    def deployment_status(self, name: str) -> str | None:
+        """Status do deployment (OK, FAILED, STOPPED) ou None se não existir/indisponível."""
+        result = self.execute("read-attribute", [{"deployment": name}], name="status")
+        return result.get("result") if self.succeeded(result) else None
+
+    def deploy(self, war_path: str, name: str | None = None, enabled: bool = True) -> dict:
+        """Deploy (ou redeploy, se já existir) do WAR com o nome informado."""
+        name = name or os.path.basename(war_path)
+        uploaded = self.upload_content(war_path)
+        if not self.succeeded(uploaded):
+            return uploaded
+        content = [{"hash": uploaded["result"]}]
+        exists = self.succeeded(self.execute("read-resource", [{"deployment": name}]))
+        if exists:
+            return self.execute("full-replace-deployment", name=name, content=content, enabled=enabled,
+                                timeout=max(self.timeout, 180))
+        return self.execute("add", [{"deployment": name}], content=content, enabled=enabled,
+                            timeout=max(self.timeout, 180))
+
+    def undeploy(self, name: str) -> dict:
+        return self.execute("remove", [{"deployment": name}])
+
+    def reload(self) -> dict:
+        return self.execute("reload")
+
+    def shutdown(self) -> dict:
+        return self.execute("shutdown")
+
+    def test_connection_in_pool(self, datasource: str = "PostgresDS") -> dict:
+        return self.execute("test-connection-in-pool", [{"subsystem": "datasources"}, {"data-source": datasource}])
+
+    def flush_pool(self, datasource: str = "PostgresDS") -> dict:
+        """Descarta todas as conexões do pool (ex.: após recriar o banco a partir de um snapshot)."""
+        return self.execute("flush-all-connection-in-pool", [{"subsystem": "datasources"}, {"data-source": datasource}])
+
+def wildfly_http_deploy(war_path: str) -> bool | None:
+    """
+    Deploy a quente via API HTTP de gerenciamento, confirmando o status do deployment.
+
+    Returns:
+        True/False conforme o resultado, ou None se a API não estiver disponível (usar jboss-cli)
+    """
+    if not WILDFLY_MGMT_HTTP_ENABLED:
+        return None
+    client = WildFlyManagementClient()
+    if not client.has_credentials:
+        return None
+    war_name = os.path.basename(war_path)
+    started = time.time()
+    result = client.deploy(war_path, war_name)
+    if result.get("unavailable"):
+        log(f"API HTTP de gerenciamento do WildFly indisponível: {client.failure(result)}", "WARNING")
+        return None
+    if not client.succeeded(result):
+        log(f"Deploy via API de gerenciamento falhou: {client.failure(result)}", "ERROR")
+        return False
+    status = client.deployment_status(war_name)
+    if status != "OK":
+        log(f"Deployment {war_name} com status {status or 'desconhecido'} após deploy via API", "ERROR")
+        return False
+    log(f"Deploy via API HTTP de gerenciamento concluído em {time.time() - started:.1f}s (status {status})", "SUCCESS")
+    return True
+
 def wildfly_cli_deploy(war_path: str, *, env: dict | None = None, force: bool = True, timeout: int | None = None) -> bool:
     """Tenta aplicar hot deploy via jboss-cli, permitindo que o WildFly gerencie o processo."""
     bin_dir = os.path.join(WILDFLY_DIR, "bin")
@@ -820,29 +1689,111 @@ def wildfly_cli_deploy(war_path: str, *, env: dict | None = None, force: bool =
     return False
 
 
+# Eventos do inotify usados para detectar a criação de arquivos marker
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_INOTIFY_EVENT_HEADER = 16  # struct inotify_event: int wd; uint32 mask, cookie, len
+
+def _first_existing(directory: str, filenames) -> str | None:
+    for name in filenames:
+        if os.path.exists(os.path.join(directory, name)):
+            return name
+    return None
+
+def _inotify_wait_for_files(directory: str, filenames, timeout: float) -> str | None:
+    """Aguarda via inotify (Linux) a criação de um dos arquivos. Lança OSError se indisponível."""
+    import ctypes
+    import ctypes.util
+    import select
+    import struct
+
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+    try:
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou para {directory}")
+        # Verificar depois de registrar o watch para não perder um marker criado nesse intervalo
+        found = _first_existing(directory, filenames)
+        if found:
+            return found
+        wanted = set(filenames)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                return None
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset + _INOTIFY_EVENT_HEADER <= len(data):
+                _wd, _mask, _cookie, name_len = struct.unpack_from("iIII", data, offset)
+                raw_name = data[offset + _INOTIFY_EVENT_HEADER:offset + _INOTIFY_EVENT_HEADER + name_len]
+                offset += _INOTIFY_EVENT_HEADER + name_len
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                if name in wanted:
+                    return name
+    finally:
+        os.close(fd)
+
+@tracing.traced("wait_for_files", cat="readiness")
+def wait_for_files(directory: str, filenames, timeout: float = 45, poll_interval: float = 0.5) -> str | None:
+    """
+    Aguarda até que um dos arquivos apareça no diretório e retorna o nome do primeiro encontrado.
+
+    No Linux usa eventos do sistema de arquivos (inotify) e retorna assim que o arquivo é criado;
+    nos demais sistemas, ou se o inotify falhar, recorre a polling.
+
+    Returns:
+        str | None: nome do arquivo encontrado, ou None se o tempo esgotar
+    """
+    filenames = list(filenames)
+    found = _first_existing(directory, filenames)
+    if found or timeout <= 0:
+        return found
+    if platform.system() == "Linux" and os.path.isdir(directory):
+        try:
+            return _inotify_wait_for_files(directory, filenames, timeout)
+        except (OSError, AttributeError) as e:
+            log(f"inotify indisponível ({e}); usando polling em {directory}", "WARNING")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        found = _first_existing(directory, filenames)
+        if found:
+            return found
+        time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+    return _first_existing(directory, filenames)
+
 def _wait_for_wildfly_deploy_marker(war_name: str, timeout: int = 45) -> bool:
     deployments = os.path.join(WILDFLY_DIR, "standalone", "deployments")
-    deployed_marker = os.path.join(deployments, f"{war_name}.deployed")
     failed_marker = os.path.join(deployments, f"{war_name}.failed")
-    start = time.time()
+    os.makedirs(deployments, exist_ok=True)
 
-    while time.time() - start < timeout:
-        if os.path.exists(failed_marker):
-            try:
-                with open(failed_marker, "r", encoding="utf-8", errors="ignore") as fh:
-                    snippet = fh.read(400)
-                log(f"Deploy do WildFly falhou (conteúdo de {war_name}.failed): {snippet}", "ERROR")
-            except Exception:
-                log(f"Deploy do WildFly falhou. Verifique {war_name}.failed", "ERROR")
-            return False
-        if os.path.exists(deployed_marker):
-            return True
-        time.sleep(1.5)
+    found = wait_for_files(deployments, (f"{war_name}.failed", f"{war_name}.deployed"), timeout=timeout)
+    if found == f"{war_name}.failed":
+        try:
+            with open(failed_marker, "r", encoding="utf-8", errors="ignore") as fh:
+                snippet = fh.read(400)
+            log(f"Deploy do WildFly falhou (conteúdo de {war_name}.failed): {snippet}", "ERROR")
+        except Exception:
+            log(f"Deploy do WildFly falhou. Verifique {war_name}.failed", "ERROR")
+        return False
+    if found:
+        return True
 
     log(f"WildFly: não confirmou deployment de {war_name} dentro do tempo.", "WARNING")
     return False
 
 
+@tracing.traced("deploy_wildfly_quick", cat="deploy")
 def deploy_wildfly_war_quick(war_path: str) -> bool:
     """Hot deploy no WildFly mantendo o nome do WAR (contexto pelo nome/descriptor)."""
     if not os.path.exists(WILDFLY_DIR):
@@ -854,6 +1805,11 @@ def deploy_wildfly_war_quick(war_path: str) -> bool:
     server_http_up = is_server_up("localhost", WILDFLY_PORT)
     server_mgmt_up = is_server_up("localhost", WILDFLY_MANAGEMENT_PORT)
 
+    if server_mgmt_up:
+        http_result = wildfly_http_deploy(war_path)
+        if http_result is not None:
+            return http_result
+
     if server_http_up or server_mgmt_up:
         log("Servidor WildFly detectado em execução; tentando deploy via jboss-cli...", "INFO")
         if wildfly_cli_deploy(war_path, env=env):
@@ -889,7 +1845,8 @@ def deploy_wildfly_war_quick(war_path: str) -> bool:
 
     try:
         dest = os.path.join(deployments, war_name)
-        shutil.copy2(war_path, dest)
+        with tracing.span("copia_war", cat="copy"):
+            shutil.copy2(war_path, dest)
         log(f"WAR copiado para WildFly como {war_name} (fallback de hot deploy)", "SUCCESS")
         try:
             open(dest + ".dodeploy", "w").close()
@@ -929,12 +1886,35 @@ def detect_wildfly_context_paths() -> list[str]:
     except Exception:
         return contexts
 
+def resolve_app_base_url(server: str = "tomcat") -> str:
+    """URL base da aplicação publicada no servidor (com contexto e '/' final).
+
+    Tomcat: contexto derivado do WAR (target/ ou webapps/); WildFly: primeiro contexto detectado
+    em standalone/deployments (com o WAR de target/ como alternativa).
+    """
+    ctx = None
+    if server == "wildfly":
+        contexts = detect_wildfly_context_paths()
+        if contexts:
+            ctx = contexts[0]
+        port = WILDFLY_PORT
+    else:
+        port = TOMCAT_PORT
+    if ctx is None:
+        war_path = find_built_war()
+        if not war_path and server != "wildfly":
+            webapps = os.path.join(TOMCAT_DIR, "webapps")
+            war_path = _war_in(webapps)
+        ctx = derive_context_from_war(war_path) if war_path else "/caracore-hub"
+    return f"http://localhost:{port}{'' if ctx == '/' else ctx}/"
+
 def _candidate_login_urls(base_url: str) -> list[str]:
     # Base URL já deve conter o contexto da aplicação (se houver)
     # Portanto, basta testar apenas "login" relativo a essa base
     return [urljoin(base_url, "login")]
 
 
+@tracing.traced("login", cat="login")
 def test_login(base_url: str, email: str = "admin@meuapp.com", senha: str = "Admin@123", timeout: int = 20, max_wait: int = 60) -> bool:
     """
     Realiza um POST em /login com as credenciais fornecidas e valida o resultado.
@@ -1043,6 +2023,7 @@ def test_login(base_url: str, email: str = "admin@meuapp.com", senha: str = "Adm
         log(f"Erro ao testar login: {e}", "ERROR")
         return False
 
+@tracing.traced("login_browser", cat="login")
 def test_login_browser(base_url: str, email: str = "admin@meuapp.com", senha: str = "Admin@123", max_wait: int = 60, headless: bool = True) -> bool:
     """
     Realiza o fluxo de login em um navegador headless usando Playwright.
@@ -1202,21 +2183,12 @@ def http_download(url, dest_path, timeout=30, max_retries=3, backoff_seconds=2,
 def ensure_admin_seed(email: str = "admin@meuapp.com", senha: str = "Admin@123") -> bool:
     """
     Garante que exista ao menos um usuário ADMIN no banco (idempotente).
-    - Usa credenciais do docker-compose (ou APP_DB_* via env).
+    - Usa credenciais do docker-compose (ou APP_DB_* via env) e o pool compartilhado (dbpool).
     - Se não houver ADMIN, insere um com email/senha informados (hash BCrypt custo 10).
     """
     try:
-        db = load_db_config_from_compose()
-        host = db.get("host", "localhost")
-        port = str(db.get("port", "5432"))
-        name = db.get("name", "meu_app_db")
-        user = db.get("user", "meu_app_user")
-        pwd = db.get("password", "meu_app_password")
-
-        try:
-            import psycopg2  # type: ignore
-        except Exception as e:
-            log(f"psycopg2 não disponível para semear ADMIN: {e}", "WARNING")
+        if not dbpool.available():
+            log("psycopg2 não disponível para semear ADMIN.", "WARNING")
             return False
 
         # Tentar gerar hash com bcrypt; caso indisponível, usar hash conhecido de Admin@123 ($2a$)
@@ -1232,89 +2204,391 @@ def ensure_admin_seed(email: str = "admin@meuapp.com", senha: str = "Admin@123")
             # manter hash padrão $2a$
             pass
 
-        conn = None
         try:
-            conn = psycopg2.connect(host=host, port=port, database=name, user=user, password=pwd)
-            conn.autocommit = False
-            cur = conn.cursor()
-            # Criar tabela se não existir (compatível com entidade)
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS usuarios (
-                    id SERIAL PRIMARY KEY,
-                    nome VARCHAR(100) NOT NULL,
-                    email VARCHAR(150) UNIQUE NOT NULL,
-                    senha VARCHAR(255) NOT NULL,
-                    ativo BOOLEAN DEFAULT true,
-                    perfil VARCHAR(20) DEFAULT 'OPERADOR' CHECK (perfil IN ('ADMIN','SUPERVISOR','OPERADOR')),
-                    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            # Uma transação: commit ao sair do bloco, rollback em exceção
+            with app_database().cursor() as cur:
+                # Criar tabela se não existir (compatível com entidade)
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS usuarios (
+                        id SERIAL PRIMARY KEY,
+                        nome VARCHAR(100) NOT NULL,
+                        email VARCHAR(150) UNIQUE NOT NULL,
+                        senha VARCHAR(255) NOT NULL,
+                        ativo BOOLEAN DEFAULT true,
+                        perfil VARCHAR(20) DEFAULT 'OPERADOR' CHECK (perfil IN ('ADMIN','SUPERVISOR','OPERADOR')),
+                        data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
                 )
-                """
-            )
-            # Verificar existência de ADMIN
-            # Verificar se já existe ADMIN e validar senha; se não combinar, atualizar para o hash gerado
-            cur.execute("SELECT id, email, senha FROM usuarios WHERE perfil = 'ADMIN' ORDER BY id ASC LIMIT 1")
-            row = cur.fetchone()
-            if row:
-                admin_id, admin_email, admin_hash = row[0], row[1], row[2] or ""
-                # Se o email padrão não existir mas há outro admin, manter; apenas garantir que ao menos um admin tem a senha esperada
-                needs_update = False
-                new_hash = None
-                # Forçar compatibilidade para jBCrypt: normalizar prefixo para $2a$ se necessário
-                if admin_hash.startswith("$2b$") or admin_hash.startswith("$2y$"):
-                    new_hash = "$2a$" + admin_hash[4:]
-                    needs_update = True
-                else:
-                    try:
-                        import bcrypt  # type: ignore
+                # Verificar se já existe ADMIN e validar senha; se não combinar, atualizar para o hash gerado
+                cur.execute("SELECT id, email, senha FROM usuarios WHERE perfil = 'ADMIN' ORDER BY id ASC LIMIT 1")
+                row = cur.fetchone()
+                if row:
+                    admin_id, admin_email, admin_hash = row[0], row[1], row[2] or ""
+                    # Se o email padrão não existir mas há outro admin, manter; apenas garantir que ao menos um admin tem a senha esperada
+                    needs_update = False
+                    new_hash = None
+                    # Forçar compatibilidade para jBCrypt: normalizar prefixo para $2a$ se necessário
+                    if admin_hash.startswith("$2b$") or admin_hash.startswith("$2y$"):
+                        new_hash = "$2a$" + admin_hash[4:]
+                        needs_update = True
+                    else:
                         try:
-                            # Se a senha confere, não precisamos alterar o hash (mesmo que o salt seja diferente)
-                            needs_update = not bcrypt.checkpw(senha.encode("utf-8"), admin_hash.encode("utf-8"))
+                            import bcrypt  # type: ignore
+                            try:
+                                # Se a senha confere, não precisamos alterar o hash (mesmo que o salt seja diferente)
+                                needs_update = not bcrypt.checkpw(senha.encode("utf-8"), admin_hash.encode("utf-8"))
+                            except Exception:
+                                needs_update = (admin_hash != hash_bcrypt)
                         except Exception:
                             needs_update = (admin_hash != hash_bcrypt)
-                    except Exception:
-                        needs_update = (admin_hash != hash_bcrypt)
 
-                if needs_update:
-                    if new_hash is None:
-                        new_hash = hash_bcrypt
-                    cur.execute("UPDATE usuarios SET senha = %s WHERE id = %s", (new_hash, admin_id))
-                    log(f"Senha do ADMIN (id={admin_id}) atualizada (normalizada para $2a$ ou ajustada para testes).", "INFO")
-                else:
-                    log("Senha do ADMIN já corresponde ao esperado para testes.", "INFO")
-                conn.commit()
-                return True
-            # Inserir ADMIN padrão
-            cur.execute(
-                """
-                INSERT INTO usuarios (nome, email, senha, perfil, ativo)
-                VALUES (%s, %s, %s, 'ADMIN', true)
-                ON CONFLICT (email) DO NOTHING
-                """,
-                ("Administrador", email, hash_bcrypt)
-            )
-            conn.commit()
+                    if needs_update:
+                        if new_hash is None:
+                            new_hash = hash_bcrypt
+                        cur.execute("UPDATE usuarios SET senha = %s WHERE id = %s", (new_hash, admin_id))
+                        log(f"Senha do ADMIN (id={admin_id}) atualizada (normalizada para $2a$ ou ajustada para testes).", "INFO")
+                    else:
+                        log("Senha do ADMIN já corresponde ao esperado para testes.", "INFO")
+                    return True
+                # Inserir ADMIN padrão
+                cur.execute(
+                    """
+                    INSERT INTO usuarios (nome, email, senha, perfil, ativo)
+                    VALUES (%s, %s, %s, 'ADMIN', true)
+                    ON CONFLICT (email) DO NOTHING
+                    """,
+                    ("Administrador", email, hash_bcrypt)
+                )
             log("Usuário ADMIN padrão criado para testes (altere a senha depois).", "SUCCESS")
             return True
         except Exception as e:
-            try:
-                if conn:
-                    conn.rollback()
-            except Exception:
-                pass
             log(f"Falha ao semear usuário ADMIN: {e}", "WARNING")
             return False
-        finally:
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
     except Exception as e:
         log(f"Erro inesperado no seed de ADMIN: {e}", "WARNING")
         return False
 
+def _seed_tag(value: str) -> str:
+    try:
+        return seeder.validate_tag(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_seed_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py seed",
+        description="Carga em massa de dados sintéticos (posicao, pedido, volume, evento) via COPY FROM STDIN, em memória constante")
+    parser.add_argument("--pedidos", type=int, default=100_000, help="Pedidos a gerar (padrão: 100000); volumes e eventos são derivados de cada pedido")
+    parser.add_argument("--max-volumes", dest="max_volumes", type=int, default=3, help="Volumes por pedido, sorteados entre 1 e este valor (padrão: 3)")
+    parser.add_argument("--posicoes", type=int, default=2_000, help="Posições do mapa físico a garantir (padrão: 2000; existentes são mantidas)")
+    parser.add_argument("--status-mix", dest="status_mix", help="Distribuição dos status, ex.: RECEBIDO=0.2,PRONTO=0.3,RETIRADO=0.5 (padrão)")
+    parser.add_argument("--days", type=float, default=365.0, help="Intervalo de created_at em dias até agora (padrão: 365)")
+    parser.add_argument("--recency-skew", dest="recency_skew", type=float, default=1.0, help="Viés para datas recentes: 1 = uniforme, >1 concentra nos últimos dias (padrão: 1)")
+    parser.add_argument("--names", type=int, default=5_000, help="Cardinalidade de destinatario_nome (nomes distintos; padrão: 5000)")
+    parser.add_argument("--tag", type=_seed_tag, help="Identificador da carga nos códigos SEED-<tag>-* (padrão: data/hora)")
+    parser.add_argument("--seed", type=int, default=1, help="Semente da geração (mesma semente e tag = mesmos dados; padrão: 1)")
+    parser.add_argument("--purge", metavar="TAG", type=_seed_tag, help="Remove os pedidos SEED-<TAG>-* (volumes e eventos em cascata) e encerra")
+    parser.add_argument("--snapshot", metavar="NOME", help="Após a carga, grava o banco como snapshot NOME (substitui se existir; ver main.py snapshot)")
+    return parser
+
+
+@tracing.traced("seed_bulk", cat="db")
+def seed_bulk_data(config) -> dict | None:
+    """
+    Carrega os dados sintéticos descritos por `config` (seeder.SeedConfig) numa única transação.
+    Exige psycopg2 (COPY FROM STDIN); retorna {tabela: {rows, seconds}} ou None em falha.
+    """
+    if not dbpool.available():
+        log("psycopg2 não disponível para a carga em massa.", "ERROR")
+        return None
+    last_report = [time.perf_counter()]
+
+    def progress(table: str, rows: int) -> None:
+        now = time.perf_counter()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            log(f"  {table}: {rows:,} linhas enviadas", "INFO")
+
+    try:
+        # COPY de milhões de linhas: sem statement_timeout nesta conexão
+        with app_database().connection(statement_timeout_ms=0) as conn:
+            return seeder.seed(conn, config, progress)
+    except Exception as e:
+        log(f"Falha na carga em massa (transação desfeita): {e}", "ERROR")
+        return None
+
+
+def run_seed_command(argv: list[str]) -> int:
+    """Subcomando `main.py seed`: 0 em sucesso, 1 em falha."""
+    args = build_seed_parser().parse_args(argv)
+    if args.purge:
+        try:
+            removed = delete_pedidos_by_prefix(f"SEED-{args.purge}-")
+        except ValueError as e:
+            log(str(e), "ERROR")
+            return 1
+        if removed is None:
+            return 1
+        log(f"{removed} pedido(s) SEED-{args.purge}-* removido(s)", "SUCCESS")
+        return 0
+    try:
+        status_mix = seeder.parse_distribution(args.status_mix, seeder.DEFAULT_STATUS_MIX)
+        config = seeder.SeedConfig(
+            pedidos=args.pedidos, posicoes=args.posicoes, max_volumes=args.max_volumes, status_mix=status_mix,
+            days=args.days, recency_skew=args.recency_skew, names=args.names, tag=args.tag, seed=args.seed,
+        )
+    except ValueError as e:
+        log(str(e), "ERROR")
+        return 1
+    log(f"Carga sintética: {config.describe()}", "INFO")
+    started = time.perf_counter()
+    stats = seed_bulk_data(config)
+    if stats is None:
+        return 1
+    for table, info in stats.items():
+        rate = info["rows"] / info["seconds"] if info["seconds"] > 0 and info["rows"] else 0
+        detail = f"{int(info['rows']):,} linhas em {info['seconds']:.1f}s ({rate:,.0f} linhas/s)" if table != "analyze" else f"{info['seconds']:.1f}s"
+        log(f"  {table:<8} {detail}", "INFO")
+    log(f"Carga concluída em {time.perf_counter() - started:.1f}s (remover com: main.py seed --purge {config.tag})", "SUCCESS")
+    if args.snapshot:
+        return 0 if save_db_snapshot(args.snapshot, note=config.describe(), replace=True) else 1
+    return 0
+
+
+def _db_admin_session():
+    return dbsnapshot.AdminSession(app_database().config)
+
+
+@tracing.traced("snapshot_save", cat="db")
+def save_db_snapshot(name: str, note: str = "", replace: bool = False) -> bool:
+    """Grava o banco da aplicação como banco-modelo `<banco>__snap_<name>`."""
+    try:
+        with _db_admin_session() as admin:
+            info = dbsnapshot.save_snapshot(admin, admin.db["name"], name, note=note, replace=replace)
+    except Exception as e:
+        log(f"Falha ao gravar o snapshot '{name}': {e}", "ERROR")
+        return False
+    log(f"Snapshot '{name}' gravado em {info['seconds']:.1f}s ({info['snapshot']}; {info['terminated']} sessão(ões) encerrada(s))", "SUCCESS")
+    return True
+
+
+@tracing.traced("snapshot_restore", cat="db")
+def restore_db_snapshot(name: str) -> bool:
+    """
+    Recria o banco da aplicação a partir do snapshot. As conexões dos servidores são derrubadas:
+    o Tomcat revalida no empréstimo (testOnBorrow); no WildFly o pool é esvaziado pela API de gerenciamento.
+    """
+    try:
+        with _db_admin_session() as admin:
+            info = dbsnapshot.restore_snapshot(admin, admin.db["name"], name)
+    except Exception as e:
+        log(f"Falha ao restaurar o snapshot '{name}': {e}", "ERROR")
+        return False
+    log(f"Banco {info['database']} restaurado do snapshot '{name}' em {info['seconds']:.1f}s", "SUCCESS")
+    if WILDFLY_MGMT_HTTP_ENABLED and is_server_up("localhost", WILDFLY_MANAGEMENT_PORT):
+        client = WildFlyManagementClient()
+        if client.has_credentials and not client.succeeded(client.flush_pool()):
+            log("Não foi possível esvaziar o pool PostgresDS do WildFly; a primeira requisição pode falhar.", "WARNING")
+    return True
+
+
+# Banco descartável das medições com --from-snapshot: <banco>__bench, recriado do snapshot a cada execução
+BENCH_DB_SUFFIX = "__bench"
+
+
+def bench_database_name() -> str:
+    return app_database().config["name"] + BENCH_DB_SUFFIX
+
+
+@tracing.traced("snapshot_clone", cat="db")
+def clone_db_snapshot(name: str, target: str) -> bool:
+    """Cria `target` a partir do snapshot; o banco da aplicação não é tocado."""
+    try:
+        with _db_admin_session() as admin:
+            info = dbsnapshot.clone_snapshot(admin, admin.db["name"], name, target)
+    except Exception as e:
+        log(f"Falha ao clonar o snapshot '{name}' em {target}: {e}", "ERROR")
+        return False
+    log(f"Banco {info['database']} criado do snapshot '{name}' em {info['seconds']:.1f}s", "SUCCESS")
+    return True
+
+
+def drop_scratch_database(target: str) -> None:
+    try:
+        with _db_admin_session() as admin:
+            if target == admin.db["name"] or dbsnapshot.SNAPSHOT_INFIX in target:
+                raise dbsnapshot.SnapshotError(f"Banco protegido: {target}")
+            dbsnapshot.drop_database(admin, target)
+    except Exception as e:
+        log(f"Não foi possível remover o banco {target}: {e}", "WARNING")
+
+
+def point_datasource(server: str, db_name: str | None = None) -> bool:
+    """Aponta o datasource do servidor para `db_name` (None: banco da aplicação). Vale no próximo início."""
+    if server == "tomcat":
+        return configure_tomcat_postgres_datasource(db_name)
+    return configure_wildfly_postgres_datasource(db_name)
+
+
+def release_bench_database(servers: list[str], bench_db: str, stop: bool = True) -> None:
+    """
+    Devolve os datasources ao banco da aplicação e remove o clone. Com stop=False os servidores
+    seguem rodando sobre o clone (mantido) até o próximo início.
+    """
+    for server in servers:
+        if stop:
+            _stop_server(server)
+        point_datasource(server)
+    if stop:
+        drop_scratch_database(bench_db)
+    else:
+        log(f"Servidores mantidos sobre {bench_db}; no próximo início voltam ao banco da aplicação.", "WARNING")
+
+
+def build_snapshot_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py snapshot",
+        description="Snapshots do banco como bancos-modelo do PostgreSQL (CREATE DATABASE ... TEMPLATE): restauração em segundos")
+    sub = parser.add_subparsers(dest="action", required=True)
+    save = sub.add_parser("save", help="Grava o banco da aplicação como snapshot")
+    save.add_argument("name", help="Nome do snapshot (minúsculas, dígitos e '_')")
+    save.add_argument("--note", default="", help="Descrição gravada com o snapshot")
+    save.add_argument("--replace", action="store_true", help="Substitui um snapshot existente com o mesmo nome")
+    restore = sub.add_parser("restore", help="Recria o banco da aplicação a partir do snapshot")
+    restore.add_argument("name")
+    clone = sub.add_parser("clone", help="Cria outro banco a partir do snapshot (o banco da aplicação não é alterado)")
+    clone.add_argument("name")
+    clone.add_argument("target", help="Nome do banco a criar (substituído se existir)")
+    drop = sub.add_parser("drop", help="Remove o snapshot")
+    drop.add_argument("name")
+    sub.add_parser("list", help="Lista os snapshots com tamanho e data")
+    return parser
+
+
+def run_snapshot_command(argv: list[str]) -> int:
+    """Subcomando `main.py snapshot`: 0 em sucesso, 1 em falha."""
+    args = build_snapshot_parser().parse_args(argv)
+    if args.action == "save":
+        return 0 if save_db_snapshot(args.name, note=args.note, replace=args.replace) else 1
+    if args.action == "restore":
+        return 0 if restore_db_snapshot(args.name) else 1
+    try:
+        with _db_admin_session() as admin:
+            database = admin.db["name"]
+            if args.action == "clone":
+                info = dbsnapshot.clone_snapshot(admin, database, args.name, args.target)
+                log(f"Banco {info['database']} criado do snapshot '{args.name}' em {info['seconds']:.1f}s", "SUCCESS")
+            elif args.action == "drop":
+                if not dbsnapshot.drop_snapshot(admin, database, args.name):
+                    log(f"Snapshot '{args.name}' não encontrado", "WARNING")
+                    return 1
+                log(f"Snapshot '{args.name}' removido", "SUCCESS")
+            else:
+                for line in dbsnapshot.format_snapshots(dbsnapshot.list_snapshots(admin, database)):
+                    log(line, "INFO")
+    except Exception as e:
+        log(f"Falha na operação de snapshot ({args.action}): {e}", "ERROR")
+        return 1
+    return 0
+
+
+def build_queryplan_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py queryplan",
+        description="EXPLAIN (ANALYZE, BUFFERS) das 32 combinações de filtros da listagem de pedidos "
+                    "(PedidoDAO.buscarComFiltros): seq scans, sorts em disco e projeção para bases maiores")
+    parser.add_argument("--snapshots", help="Snapshots (vírgula) de tamanhos diferentes a medir, cada um num clone temporário; "
+                                            "sem esta opção mede o banco da aplicação")
+    parser.add_argument("--status", default=queryplan.DEFAULT_VALUES["status"], help="Valor do filtro status (padrão: RECEBIDO)")
+    parser.add_argument("--canal", default=queryplan.DEFAULT_VALUES["canal"], help="Valor do filtro canal (padrão: MANUAL)")
+    parser.add_argument("--destinatario", default=queryplan.DEFAULT_VALUES["destinatario"], help="Trecho do nome do destinatário (padrão: silva)")
+    parser.add_argument("--days", type=int, default=queryplan.DEFAULT_VALUES["days"], help="dataInicio = hoje menos N dias; dataFim = hoje (padrão: 7)")
+    parser.add_argument("--target", type=int, default=queryplan.DEFAULT_TARGET_PEDIDOS, help="Tamanho da base para a projeção (padrão: 10000000 pedidos)")
+    parser.add_argument("--budget-ms", dest="budget_ms", type=float, default=queryplan.DEFAULT_BUDGET_MS, help="Tempo aceitável por listagem na projeção (padrão: 1000 ms)")
+    parser.add_argument("--timeout-ms", dest="timeout_ms", type=int, default=60_000, help="statement_timeout de cada EXPLAIN ANALYZE (padrão: 60000; 0 = sem limite)")
+    parser.add_argument("--repeat", type=int, default=1, help="Execuções por combinação; fica a mais rápida (padrão: 1)")
+    parser.add_argument("--show-plans", dest="show_plans", action="store_true", help="Exibe a árvore do plano das combinações em risco")
+    parser.add_argument("--output", help="Relatório JSON (padrão: log/<data>_<base>_queryplan.json)")
+    return parser
+
+
+@tracing.traced("queryplan_dataset", cat="db")
+def _explain_dataset(db, name: str, values: dict, args) -> dict:
+    log(f"Conjunto {name}: EXPLAIN ANALYZE de {len(queryplan.combinations())} combinações...", "INFO")
+    dataset = queryplan.run_dataset(db, values, timeout_ms=args.timeout_ms, repeat=args.repeat)
+    for line in queryplan.format_dataset(name, dataset):
+        log(line, "INFO")
+    return dataset
+
+
+def run_queryplan_command(argv: list[str]) -> int:
+    """Subcomando `main.py queryplan`: 0 sem combinações em risco, 1 com alguma em risco, 2 em falha."""
+    args = build_queryplan_parser().parse_args(argv)
+    if not dbpool.available():
+        log("psycopg2 não disponível para o EXPLAIN ANALYZE.", "ERROR")
+        return 2
+    values = queryplan.filter_values(args.status, args.canal, args.destinatario, args.days)
+    base = app_database()
+    datasets: dict = {}
+    try:
+        if not args.snapshots:
+            datasets["atual"] = _explain_dataset(base, "atual", values, args)
+        else:
+            # Cada snapshot num clone descartável: o banco da aplicação e os servidores não são afetados
+            scratch = f"{base.config['name']}__queryplan"
+            try:
+                for name in [n.strip() for n in args.snapshots.split(",") if n.strip()]:
+                    with _db_admin_session() as admin:
+                        dbsnapshot.clone_snapshot(admin, admin.db["name"], name, scratch)
+                    db = dbpool.get_database(dict(base.config, name=scratch))
+                    try:
+                        datasets[name] = _explain_dataset(db, name, values, args)
+                    finally:
+                        db.close()
+            finally:
+                with _db_admin_session() as admin:
+                    dbsnapshot.drop_database(admin, scratch)
+    except Exception as e:
+        log(f"Falha na análise dos planos: {e}", "ERROR")
+        return 2
+    if not datasets:
+        log("Nenhum snapshot informado em --snapshots.", "ERROR")
+        return 2
+    measured = list(datasets.values())
+    empty = [name for name, dataset in datasets.items() if not dataset["pedidos"]]
+    if empty:
+        log(f"Conjunto(s) sem pedidos ignorado(s) na projeção: {', '.join(empty)}", "WARNING")
+    try:
+        projection = queryplan.project(measured, args.target, args.budget_ms)
+    except ValueError as e:
+        log(f"Projeção impossível: {e} (use um snapshot com pedidos)", "ERROR")
+        return 2
+    for line in queryplan.format_projection(projection, args.target, args.budget_ms):
+        log(line, "INFO")
+    largest = max(measured, key=lambda d: d["pedidos"])
+    at_risk = [row for row in projection if row["at_risk"]]
+    if args.show_plans:
+        for row in at_risk:
+            log(f"Plano de {row['combo']}:", "INFO")
+            for line in largest["combos"][row["combo"]].get("plan", []):
+                log(f"  {line}", "INFO")
+    tips = queryplan.recommendations(measured)
+    for tip in tips:
+        log(f"Sugestão: {tip}", "WARNING")
+    output = args.output or os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y_%m_%d_%H%M%S')}_{LOG_BASENAME}_queryplan.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump({"values": values, "target": args.target, "budget_ms": args.budget_ms, "datasets": datasets,
+                   "projection": projection, "recommendations": tips}, fh, ensure_ascii=False, indent=1, default=str)
+    summary = (f"{len(at_risk)} de {len(projection)} combinação(ões) acima de {args.budget_ms:g} ms em {args.target:,} pedidos"
+               if at_risk else f"Nenhuma combinação acima de {args.budget_ms:g} ms em {args.target:,} pedidos")
+    log(f"{summary} (relatório: {output})", "WARNING" if at_risk else "SUCCESS")
+    return 1 if at_risk else 0
+
 def load_db_config_from_compose():
     """
     Lê credenciais do PostgreSQL a partir do `docker-compose.yml`.
@@ -1407,7 +2681,105 @@ def load_db_config_from_compose():
         log(f"Falha ao ler docker-compose.yml para DB: {e}", "WARNING")
         return cfg
 
+_APP_DB_CONFIG = None
+
+def app_database():
+    """Pool compartilhado (dbpool) do banco da aplicação; a configuração é lida uma vez por processo."""
+    global _APP_DB_CONFIG
+    if _APP_DB_CONFIG is None:
+        _APP_DB_CONFIG = load_db_config_from_compose()
+    return dbpool.get_database(_APP_DB_CONFIG)
+
+# Cache em disco das sondagens de ferramentas (java/mvn/docker -version, JAVA_HOME)
+TOOL_PROBE_CACHE_ENABLED = str(os.environ.get("APP_TOOL_PROBE_CACHE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+_TOOL_PROBE_CACHE_NAME = "tool-probes.json"
+_TOOL_PROBE_ENV_VARS = ("PATH", "JAVA_HOME", "MAVEN_HOME", "M2_HOME")
+_TOOL_PROBE_LOCK = threading.Lock()
+_TOOL_PROBE_MEMO = {}
+
+def _tool_binary_state(binary):
+    """Resolve o binário (PATH ou caminho absoluto) e retorna [caminho_real, mtime, tamanho]."""
+    resolved = binary if os.path.isabs(binary) else shutil.which(binary)
+    if not resolved:
+        return [binary, None, None]
+    real = os.path.realpath(resolved)
+    try:
+        st = os.stat(real)
+        return [real, st.st_mtime_ns, st.st_size]
+    except OSError:
+        return [real, None, None]
+
+def _tool_probe_key(name, binaries):
+    material = {
+        "tool": name,
+        "platform": platform.system(),
+        "env": {var: os.environ.get(var, "") for var in _TOOL_PROBE_ENV_VARS},
+        "binaries": [_tool_binary_state(b) for b in binaries if b],
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+def cached_tool_probe(name, binaries, probe, is_valid=None):
+    """
+    Executa `probe()` apenas se a chave (PATH, JAVA_HOME, MAVEN_HOME/M2_HOME e mtime dos binários
+    resolvidos) mudou desde a última sondagem; caso contrário devolve o resultado gravado em disco.
+
+    Args:
+        name (str): Identificador da sondagem (ex.: "java", "maven").
+        binaries (list): Binários que influenciam o resultado (nome no PATH ou caminho absoluto).
+        probe (callable): Sondagem real; o resultado deve ser serializável em JSON.
+        is_valid (callable, optional): Decide se o resultado pode ser gravado/reutilizado.
+            Padrão: tuplas cujo primeiro item é True (sondagem bem-sucedida).
+
+    Returns:
+        O resultado da sondagem (listas gravadas voltam como tuplas).
+    """
+    if is_valid is None:
+        is_valid = lambda result: isinstance(result, (tuple, list)) and bool(result) and result[0] is True
+    if not TOOL_PROBE_CACHE_ENABLED:
+        return probe()
+    key = _tool_probe_key(name, binaries)
+    with _TOOL_PROBE_LOCK:
+        entry = _TOOL_PROBE_MEMO.get(name)
+        if entry is None:
+            entry = _load_build_cache_json(_TOOL_PROBE_CACHE_NAME, {}).get(name)
+        if entry and entry.get("key") == key:
+            result = entry.get("result")
+            result = tuple(result) if isinstance(result, list) else result
+            if is_valid(result):
+                _TOOL_PROBE_MEMO[name] = entry
+                return result
+    result = probe()
+    if is_valid(result):
+        entry = {"key": key, "result": list(result) if isinstance(result, tuple) else result, "probed_at": time.time()}
+        with _TOOL_PROBE_LOCK:
+            _TOOL_PROBE_MEMO[name] = entry
+            data = _load_build_cache_json(_TOOL_PROBE_CACHE_NAME, {})
+            data[name] = entry
+            _save_build_cache_json(_TOOL_PROBE_CACHE_NAME, data)
+    return result
+
+def _maven_candidate_binaries():
+    """Binários Maven que influenciam a detecção (os mesmos caminhos testados no Windows)."""
+    if platform.system() != "Windows":
+        return ["mvn"]
+    return [
+        "mvn",
+        "C:\\Program Files\\Apache\\apache-maven-3.9.11\\bin\\mvn.cmd",
+        "C:\\Program Files\\Apache\\Maven\\bin\\mvn.cmd",
+        os.path.join(os.environ.get('MAVEN_HOME', ''), 'bin', 'mvn.cmd'),
+        os.path.join(os.environ.get('M2_HOME', ''), 'bin', 'mvn.cmd'),
+    ]
+
 def check_maven_installed():
+    """
+    Verifica se o Maven está instalado e disponível no PATH (resultado em cache até o ambiente mudar).
+    
+    Returns:
+        tuple: (bool, str, str) - instalado, versão ou mensagem de erro, comando Maven
+    """
+    return cached_tool_probe("maven", _maven_candidate_binaries(), _probe_maven_installed)
+
+def _probe_maven_installed():
     """
     Verifica se o Maven está instalado e disponível no PATH.
     
@@ -1503,12 +2875,14 @@ def check_java_version(java_home=None):
             log(f"Arquivo java não encontrado em {java_path}", "WARNING")
             java_path = None
     
-    try:
-        # Verificar a versão do Java
+    def _java_version_output():
         if platform.system() == "Windows":
-            version_output = subprocess.check_output(f'{java_cmd} -version', stderr=subprocess.STDOUT, shell=True, universal_newlines=True)
-        else:
-            version_output = subprocess.check_output([java_cmd, "-version"], stderr=subprocess.STDOUT, universal_newlines=True)
+            return True, subprocess.check_output(f'{java_cmd} -version', stderr=subprocess.STDOUT, shell=True, universal_newlines=True)
+        return True, subprocess.check_output([java_cmd, "-version"], stderr=subprocess.STDOUT, universal_newlines=True)
+
+    try:
+        # Verificar a versão do Java (saída de `java -version` em cache até o binário/ambiente mudar)
+        _, version_output = cached_tool_probe(f"java-version:{java_path or 'PATH'}", [java_path or "java"], _java_version_output)
         
         # Extrair informações úteis
         version_info = {}
@@ -1539,6 +2913,15 @@ def check_java_version(java_home=None):
         return False, str(e), None
 
 def check_java_installed():
+    """
+    Verifica se o Java está instalado e disponível no PATH (resultado em cache até o ambiente mudar).
+    
+    Returns:
+        tuple: (bool, str) - True se o Java estiver instalado + versão, False caso contrário + mensagem de erro
+    """
+    return cached_tool_probe("java", ["java"], _probe_java_installed)
+
+def _probe_java_installed():
     """
     Verifica se o Java está instalado e disponível no PATH.
     
@@ -1574,6 +2957,15 @@ def check_java_installed():
         return False, "Java não está instalado ou não está no PATH do sistema"
 
 def check_docker_installed():
+    """
+    Verifica se o Docker está instalado e disponível no PATH (resultado em cache até o ambiente mudar).
+    
+    Returns:
+        tuple: (bool, str) - True se o Docker estiver instalado + versão, False caso contrário + mensagem de erro
+    """
+    return cached_tool_probe("docker", ["docker"], _probe_docker_installed)
+
+def _probe_docker_installed():
     """
     Verifica se o Docker está instalado e disponível no PATH.
     
@@ -1602,9 +2994,13 @@ def check_docker_installed():
     except (subprocess.SubprocessError, FileNotFoundError):
         return False, "Docker não está instalado ou não está no PATH do sistema"
 
-def check_database_connection():
+def check_database_connection(restart_on_saturation=True):
     """
     Verifica se é possível conectar ao banco de dados PostgreSQL.
+
+    Args:
+        restart_on_saturation (bool): reinicia o contêiner e tenta de novo quando o Postgres
+            responde 'too many clients'. Desligado nas checagens paralelas, que só sondam.
     
     Returns:
         tuple: (bool, str) - True se a conexão foi bem-sucedida, False caso contrário + mensagem de erro
@@ -1624,68 +3020,35 @@ def check_database_connection():
         if not output:
             return False, "Contêiner PostgreSQL não está em execução"
             
-        # Carregar dados do docker-compose.yml (ou env) para obter informações do banco
-        db_cfg = load_db_config_from_compose()
-        db_host = db_cfg["host"]
-        db_port = str(db_cfg["port"]) if isinstance(db_cfg["port"], int) else db_cfg["port"]
-        db_name = db_cfg["name"]
-        db_user = db_cfg["user"]
-        db_password = db_cfg["password"]
-        
-        # Aqui você poderia tentar conectar ao banco usando psycopg2 ou outro driver
-        # Se o módulo psycopg2 estiver instalado
+        if not dbpool.available():
+            return True, "Módulo psycopg2 não instalado, mas contêiner PostgreSQL está em execução"
+
+        # Pool compartilhado: a conexão validada aqui é reaproveitada pelo seed de ADMIN e demais etapas.
+        # Falhas de conexão (Postgres ainda inicializando, recusa, timeout) são repetidas com backoff.
+        db = app_database()
         try:
-            import psycopg2
-            def _try_connect():
-                conn = psycopg2.connect(
-                    host=db_host,
-                    port=db_port,
-                    database=db_name,
-                    user=db_user,
-                    password=db_password
+            db.ping()
+            return True, f"Conectado ao banco de dados PostgreSQL: {db.label}"
+        except Exception as e:
+            msg = str(e)
+            normalized = msg.lower()
+            if "too many clients" in normalized and restart_on_saturation:
+                log("PostgreSQL retornou 'too many clients' — reiniciando contêiner e tentando novamente...", "WARNING")
+                db.close()
+                restart_postgres_container()
+                try:
+                    db.ping()
+                    return True, f"Conexão restabelecida após reinício do Postgres: {db.label}"
+                except Exception as e2:
+                    return False, f"Erro ao conectar ao banco de dados após reinício: {str(e2)}"
+            if "password authentication failed" in normalized:
+                hint = (
+                    "Falha de autenticação para o usuário configurado no Postgres. "
+                    "Verifique as credenciais em docker-compose.yml/variáveis ou considere reiniciar o volume (docker compose down -v)."
                 )
-                conn.close()
-            try:
-                _try_connect()
-                return True, f"Conectado ao banco de dados PostgreSQL: {db_host}:{db_port}/{db_name}"
-            except Exception as e:
-                msg = str(e)
-                normalized = msg.lower()
-                if "too many clients" in msg.lower():
-                    log("PostgreSQL retornou 'too many clients' — reiniciando contêiner e tentando novamente...", "WARNING")
-                    restart_postgres_container()
-                    try:
-                        _try_connect()
-                        return True, f"Conexão restabelecida após reinício do Postgres: {db_host}:{db_port}/{db_name}"
-                    except Exception as e2:
-                        return False, f"Erro ao conectar ao banco de dados após reinício: {str(e2)}"
-                if "server closed the connection unexpectedly" in normalized or "terminating connection due to administrator command" in normalized:
-                    log("PostgreSQL ainda está inicializando; aguardando 5s e tentando novamente...", "WARNING")
-                    time.sleep(5)
-                    try:
-                        _try_connect()
-                        return True, f"Conectado ao banco de dados PostgreSQL após nova tentativa: {db_host}:{db_port}/{db_name}"
-                    except Exception as e2:
-                        return False, f"Erro ao conectar ao banco de dados após nova tentativa: {str(e2)}"
-                if "password authentication failed" in normalized:
-                    hint = (
-                        "Falha de autenticação para o usuário configurado no Postgres. "
-                        "Verifique as credenciais em docker-compose.yml/variáveis ou considere reiniciar o volume (docker compose down -v)."
-                    )
-                    log(hint, "ERROR")
-                    return False, f"Erro ao conectar ao banco de dados: {msg}"
-                if "connection refused" in normalized or "timeout expired" in normalized:
-                    log("PostgreSQL não respondeu à conexão; aguardando 3s e tentando novamente...", "WARNING")
-                    time.sleep(3)
-                    try:
-                        _try_connect()
-                        return True, f"Conectado ao banco de dados PostgreSQL após nova tentativa: {db_host}:{db_port}/{db_name}"
-                    except Exception as e2:
-                        return False, f"Erro ao conectar ao banco de dados após nova tentativa: {str(e2)}"
-                return False, f"Erro ao conectar ao banco de dados: {msg}"
-        except ImportError:
-            return True, "Módulo psycopg2 não instalado, mas contêiner PostgreSQL está em execução"
-            
+                log(hint, "ERROR")
+            return False, f"Erro ao conectar ao banco de dados: {msg}"
+
     except (subprocess.SubprocessError, FileNotFoundError):
         return False, "Não foi possível verificar o status do PostgreSQL. Docker não está disponível."
 
@@ -1844,11 +3207,26 @@ def setup_tomcat_environment(tomcat_dir):
 
 def detect_java_home():
     """
-    Detecta o diretório do Java instalado no sistema.
+    Detecta o diretório do Java instalado no sistema (resultado em cache até o ambiente mudar).
     
     Returns:
         str: Caminho para o JAVA_HOME ou None se não for encontrado
     """
+    probed = []
+
+    def _probe():
+        probed.append(True)
+        return _detect_java_home_uncached()
+
+    result = cached_tool_probe(
+        "java-home", ["javac", "java", "/etc/alternatives/java"], _probe,
+        is_valid=lambda r: isinstance(r, str) and os.path.isdir(r),
+    )
+    if result and not probed:
+        log(f"JAVA_HOME (cache de sondagem): {result}", "SUCCESS")
+    return result
+
+def _detect_java_home_uncached():
     log("Tentando detectar JAVA_HOME automaticamente...", "INFO")
     
     # Verificar a variável de ambiente JAVA_HOME primeiro
@@ -2107,11 +3485,12 @@ def setup_wildfly_environment():
     
     return env
 
-def configure_wildfly_postgres_datasource():
+def configure_wildfly_postgres_datasource(db_name: str | None = None):
     """
     Configura um datasource PostgreSQL no WildFly editando o arquivo standalone.xml
     e garante a presença do driver em modules/org/postgresql.
     Usa defaults e variáveis de ambiente: APP_DB_HOST, APP_DB_PORT, APP_DB_NAME, APP_DB_USER, APP_DB_PASSWORD.
+    `db_name` aponta o datasource para outro banco (ex.: clone de snapshot dos benchmarks).
 
     Returns:
         bool: True se configurado com sucesso, False caso contrário
@@ -2126,7 +3505,7 @@ def configure_wildfly_postgres_datasource():
         db_cfg = load_db_config_from_compose()
         db_host = db_cfg["host"]
         db_port = str(db_cfg["port"]) if isinstance(db_cfg["port"], int) else db_cfg["port"]
-        db_name = db_cfg["name"]
+        db_name = db_name or db_cfg["name"]
         db_user = db_cfg["user"]
         db_pass = db_cfg["password"]
         jndi_name = "java:/jdbc/PostgresDS"
@@ -2354,16 +3733,26 @@ def configure_wildfly_postgres_datasource():
         # Salvar alterações
         tree.write(standalone_xml, encoding='utf-8', xml_declaration=True)
         log("standalone.xml atualizado com datasource PostgreSQL", "SUCCESS")
+        # Servidor em execução: :reload relê o standalone.xml sem reiniciar o processo
+        if WILDFLY_MGMT_HTTP_ENABLED and is_server_up("localhost", WILDFLY_MANAGEMENT_PORT):
+            client = WildFlyManagementClient()
+            if client.has_credentials:
+                result = client.reload()
+                if client.succeeded(result):
+                    log("WildFly recarregado (:reload) para aplicar o datasource", "SUCCESS")
+                else:
+                    log(f"Não foi possível recarregar o WildFly via API: {client.failure(result)}", "WARNING")
         return True
     except Exception as e:
         log(f"Erro ao configurar datasource do WildFly: {e}", "ERROR")
         return False
 
-def configure_tomcat_postgres_datasource():
+def configure_tomcat_postgres_datasource(db_name: str | None = None):
     """
     Configura um datasource PostgreSQL no Tomcat editando o arquivo conf/context.xml
     e garante a presença do driver em TOMCAT_DIR/lib.
     Usa env vars: APP_DB_HOST, APP_DB_PORT, APP_DB_NAME, APP_DB_USER, APP_DB_PASSWORD.
+    `db_name` aponta o datasource para outro banco (ex.: clone de snapshot dos benchmarks).
 
     Returns:
         bool: True se configurado com sucesso, False caso contrário
@@ -2378,7 +3767,7 @@ def configure_tomcat_postgres_datasource():
         db_cfg = load_db_config_from_compose()
         db_host = db_cfg["host"]
         db_port = str(db_cfg["port"]) if isinstance(db_cfg["port"], int) else db_cfg["port"]
-        db_name = db_cfg["name"]
+        db_name = db_name or db_cfg["name"]
         db_user = db_cfg["user"]
         db_pass = db_cfg["password"]
 
@@ -2457,20 +3846,7 @@ def configure_tomcat_postgres_datasource():
         log(f"Erro ao configurar datasource do Tomcat: {e}", "ERROR")
         return False
 
-def _tail_file(path: str, max_bytes: int = 64_000) -> str:
-    """Lê as últimas bytes de um arquivo para inspeção rápida."""
-    try:
-        with open(path, 'rb') as f:
-            f.seek(0, os.SEEK_END)
-            size = f.tell()
-            if size <= max_bytes:
-                f.seek(0)
-                return f.read().decode('utf-8', errors='ignore')
-            f.seek(-max_bytes, os.SEEK_END)
-            return f.read().decode('utf-8', errors='ignore')
-    except Exception:
-        return ""
-
+@tracing.traced("jndi_tomcat", cat="jndi")
 def validate_tomcat_jndi(runtime_check: bool = True) -> tuple[bool, str]:
     """Valida configuração JNDI no Tomcat.
     - Checa conf/context.xml por Resource jdbc/PostgresDS
@@ -2516,70 +3892,16 @@ def validate_tomcat_jndi(runtime_check: bool = True) -> tuple[bool, str]:
         if runtime_check and is_server_up('localhost', TOMCAT_PORT):
             logs_dir = os.path.join(TOMCAT_DIR, 'logs')
             if os.path.isdir(logs_dir):
-                # pegar o arquivo catalina mais recente
-                cand = [p for p in os.listdir(logs_dir) if p.lower().startswith('catalina')]
-                cand_paths = [os.path.join(logs_dir, p) for p in cand]
-                latest = max(cand_paths, key=lambda p: os.path.getmtime(p), default=None)
+                # acompanhar o arquivo catalina mais recente (leitura incremental)
+                latest = log_follower.latest_log(logs_dir, 'catalina')
                 if latest:
-                    tail = _tail_file(latest)
-                    # Heurísticas de sucesso/erro
-                    err_signals = [
-                        'cannot create jdbc driver',
-                        'cannot create poolableconnectionfactory',
-                        'resource is not available',
-                        'failed to register in jndi',
-                        'nontransientconnectionexception',
-                        'org.postgresql.util',
-                        'name [jdbc/postgresds] is not bound',
-                        'name [java:comp/env/jdbc/postgresds] is not bound',
-                        'no suitable driver',
-                        'org.postgresql.driver not found',
-                        'fetal: password authentication failed',
-                        'connection refused',
-                    ]
-                    ok_signals = [
-                        'registering jndi resource',
-                        'registered jndi resource',
-                        'initialized datasource',
-                        'pgjdbc',
-                        'bound to naming context',
-                        'name [java:comp/env/jdbc/postgresds] is bound',
-                        'name [jdbc/postgresds] is bound',
-                        'org.apache.commons.dbcp2',
-                    ]
-                    # Consider only recent log lines to avoid false-positives from old entries.
-                    import re, datetime
-                    tail_lines = tail.splitlines()
-                    now = datetime.datetime.now()
+                    follower = tomcat_log_follower(latest)
+                    follower.poll()
+                    # Considerar apenas eventos recentes para evitar falsos positivos de entradas antigas
                     window_minutes = 10
-                    recent_err = False
-                    recent_ok = False
-
-                    # Match Catalina timestamp like: 17-Oct-2025 18:17:31.877
-                    ts_re = re.compile(r'^(\d{1,2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}:\d{2}(?:\.\d{1,3})?)')
-                    for line in tail_lines:
-                        low = line.lower()
-                        m = ts_re.match(line.strip())
-                        ts_dt = None
-                        if m:
-                            ts_str = m.group(1)
-                            try:
-                                ts_dt = datetime.datetime.strptime(ts_str, '%d-%b-%Y %H:%M:%S.%f')
-                            except Exception:
-                                try:
-                                    ts_dt = datetime.datetime.strptime(ts_str, '%d-%b-%Y %H:%M:%S')
-                                except Exception:
-                                    ts_dt = None
-
-                        is_recent = True if ts_dt is None else ((now - ts_dt).total_seconds() <= window_minutes * 60)
-
-                        if is_recent and any(tok in low for tok in err_signals):
-                            recent_err = True
-                        if is_recent and any(tok in low for tok in ok_signals):
-                            recent_ok = True
-
-                    has_err = recent_err
-                    has_ok = recent_ok
+                    since = datetime.now() - timedelta(minutes=window_minutes)
+                    has_err = follower.has('error', since)
+                    has_ok = follower.has('ok', since)
                     if has_err:
                         ok = False
                         msg.append("Erros detectados em catalina.log referentes ao datasource/JNDI (em janela recente)")
@@ -2589,10 +3911,30 @@ def validate_tomcat_jndi(runtime_check: bool = True) -> tuple[bool, str]:
     except Exception as e:
         return False, f"Falha na validação JNDI do Tomcat: {e}"
 
+def tomcat_log_follower(path: str | None = None) -> "log_follower.LogFollower":
+    """Follower incremental do log do Tomcat (catalina.out ou catalina mais recente)."""
+    if path is None:
+        logs_dir = os.path.join(TOMCAT_DIR, 'logs')
+        path = os.path.join(logs_dir, 'catalina.out')
+        if not os.path.exists(path):
+            path = log_follower.latest_log(logs_dir, 'catalina') or path
+    return log_follower.follow(path, log_follower.TOMCAT_JNDI_SIGNALS, log_follower.CATALINA_TIMESTAMP)
+
+def wildfly_log_follower(max_bytes: int = 96_000) -> "log_follower.LogFollower":
+    """Follower incremental do standalone/log/server.log do WildFly."""
+    path = os.path.join(WILDFLY_DIR, 'standalone', 'log', 'server.log')
+    return log_follower.follow(path, log_follower.WILDFLY_JNDI_SIGNALS, log_follower.WILDFLY_TIMESTAMP,
+                               bootstrap_bytes=max_bytes)
+
 def _wildfly_read_server_log_tail(max_bytes: int = 96_000) -> str:
     path = os.path.join(WILDFLY_DIR, 'standalone', 'log', 'server.log')
-    return _tail_file(path, max_bytes) if os.path.exists(path) else ""
+    if not os.path.exists(path):
+        return ""
+    follower = wildfly_log_follower(max_bytes)
+    follower.poll()
+    return follower.tail_text()
 
+@tracing.traced("jndi_wildfly", cat="jndi")
 def validate_wildfly_jndi(runtime_check: bool = True) -> tuple[bool, str]:
     """Valida configuração JNDI no WildFly.
     - Checa standalone.xml por datasource com jndi-name java:/jdbc/PostgresDS
@@ -2644,65 +3986,67 @@ def validate_wildfly_jndi(runtime_check: bool = True) -> tuple[bool, str]:
             cli_ok = False
             cli_msg = None
             creds = _wildfly_cli_credentials()
-            if not creds:
-                cli_msg = "CLI não executado (credenciais ManagementRealm ausentes)"
-            elif os.path.exists(cli_path):
-                try:
-                    user, password = creds
-                    if platform.system() == "Windows":
-                        cmd = [
-                            "cmd.exe",
-                            "/c",
-                            cli_path,
-                            "--connect",
-                            f"--user={user}",
-                            f"--password={password}",
-                            "--commands=/subsystem=datasources/data-source=PostgresDS:test-connection-in-pool",
-                        ]
-                    else:
-                        cmd = [
-                            cli_path,
-                            "--connect",
-                            f"--user={user}",
-                            f"--password={password}",
-                            "--commands=/subsystem=datasources/data-source=PostgresDS:test-connection-in-pool",
-                        ]
-                    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=45)
-                    out = (proc.stdout or '') + '\n' + (proc.stderr or '')
-                    out_low = out.lower()
-                    if 'outcome' in out_low and 'success' in out_low:
+            http_checked = False
+            if creds and WILDFLY_MGMT_HTTP_ENABLED:
+                client = WildFlyManagementClient(timeout=45)
+                result = client.test_connection_in_pool("PostgresDS")
+                if not result.get("unavailable"):
+                    http_checked = True
+                    if client.succeeded(result):
                         cli_ok = True
-                        cli_msg = 'CLI test-connection-in-pool OK'
+                        cli_msg = 'API test-connection-in-pool OK'
                     else:
-                        cli_msg = f'CLI não confirmou sucesso: {out.strip()[:200]}'
-                except Exception as e:
-                    cli_msg = f'CLI indisponível/erro: {e}'
-            else:
-                cli_msg = f'CLI não encontrado em {cli_path}'
+                        cli_msg = f'API não confirmou sucesso: {client.failure(result)[:200]}'
+            # Sem resposta da API de gestão: recorrer ao jboss-cli
+            if not http_checked:
+                if not creds:
+                    cli_msg = "CLI não executado (credenciais ManagementRealm ausentes)"
+                elif os.path.exists(cli_path):
+                    try:
+                        user, password = creds
+                        if platform.system() == "Windows":
+                            cmd = [
+                                "cmd.exe",
+                                "/c",
+                                cli_path,
+                                "--connect",
+                                f"--user={user}",
+                                f"--password={password}",
+                                "--commands=/subsystem=datasources/data-source=PostgresDS:test-connection-in-pool",
+                            ]
+                        else:
+                            cmd = [
+                                cli_path,
+                                "--connect",
+                                f"--user={user}",
+                                f"--password={password}",
+                                "--commands=/subsystem=datasources/data-source=PostgresDS:test-connection-in-pool",
+                            ]
+                        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=45)
+                        out = (proc.stdout or '') + '\n' + (proc.stderr or '')
+                        out_low = out.lower()
+                        if 'outcome' in out_low and 'success' in out_low:
+                            cli_ok = True
+                            cli_msg = 'CLI test-connection-in-pool OK'
+                        else:
+                            cli_msg = f'CLI não confirmou sucesso: {out.strip()[:200]}'
+                    except Exception as e:
+                        cli_msg = f'CLI indisponível/erro: {e}'
+                else:
+                    cli_msg = f'CLI não encontrado em {cli_path}'
             if cli_msg:
                 msg_parts.append(cli_msg)
             ok = ok and cli_ok if cli_ok else ok
-            # 2) inspecionar server.log
-            tail = _wildfly_read_server_log_tail()
-            if tail:
-                low = tail.lower()
-                # Sucesso típicos
-                success_tokens = [
-                    'wflyjca0005',  # Bound data source
-                    'bound data source',
-                    'java:/jdbc/postgresds" =>',
-                ]
-                error_tokens = [
-                    'wflyjca0046',  # failed to load driver
-                    'wflyjca0040',
-                    'wflyjca0056',
-                    'wflyjca0091',  # connection error
-                    'failed to register',
-                    'jboss.naming',
-                    'could not create connection',
-                ]
-                has_ok = any(tok in low for tok in success_tokens) or ('java:/jdbc/postgresds' in low and 'bound' in low)
-                has_err = any(tok in low for tok in error_tokens)
+            # 2) inspecionar server.log (somente bytes novos desde a última leitura)
+            server_log = os.path.join(WILDFLY_DIR, 'standalone', 'log', 'server.log')
+            if os.path.exists(server_log):
+                follower = wildfly_log_follower()
+                follower.poll()
+                # Mesma janela do antigo tail: apenas os últimos ~96 KB do server.log
+                window = follower.bootstrap_bytes
+                has_ok = follower.has('ok', window_bytes=window) or (
+                    follower.has('jndi_name', window_bytes=window) and follower.has('bound', window_bytes=window))
+                has_err = follower.has('error', window_bytes=window)
                 if has_ok:
                     msg_parts.append('Logs indicam JNDI bound (datasource registrado)')
                 if has_err:
@@ -2712,6 +4056,7 @@ def validate_wildfly_jndi(runtime_check: bool = True) -> tuple[bool, str]:
     except Exception as e:
         return False, f"Falha na validação JNDI do WildFly: {e}"
 
+@tracing.traced("jndi_http", cat="jndi")
 def validate_jndi_http(base_url: str, timeout: int = 8) -> tuple[bool, str]:
     """Valida JNDI via uma URL HTTP de status da aplicação, se disponível.
     - Se a env APP_JNDI_STATUS_URL estiver definida (absoluta ou relativa), usa como principal.
@@ -2887,19 +4232,19 @@ def diagnose_tomcat_issues(tomcat_env):
         catalina_log = os.path.join(TOMCAT_DIR, "logs", f"catalina.{time.strftime('%Y-%m-%d')}.log")
     
     if os.path.exists(catalina_log):
-        # Ler as últimas 20 linhas do log
+        # Ler as últimas 20 linhas do log (follower lê apenas os bytes novos)
         try:
-            with open(catalina_log, 'r', encoding='utf-8', errors='ignore') as f:
-                log_lines = f.readlines()
-                last_lines = log_lines[-20:] if len(log_lines) >= 20 else log_lines
-                
-                print(f"{Colors.YELLOW}Últimas linhas do log do Tomcat:{Colors.END}")
-                for line in last_lines:
-                    # Destacar linhas de erro
-                    if "ERROR" in line or "SEVERE" in line:
-                        print(f"{Colors.RED}{line.strip()}{Colors.END}")
-                    else:
-                        print(f"{Colors.GRAY}{line.strip()}{Colors.END}")
+            follower = tomcat_log_follower(catalina_log)
+            follower.poll()
+            last_lines = follower.tail_lines(20)
+
+            print(f"{Colors.YELLOW}Últimas linhas do log do Tomcat:{Colors.END}")
+            for line in last_lines:
+                # Destacar linhas de erro
+                if "ERROR" in line or "SEVERE" in line:
+                    print(f"{Colors.RED}{line.strip()}{Colors.END}")
+                else:
+                    print(f"{Colors.GRAY}{line.strip()}{Colors.END}")
         except Exception as e:
             print(f"{Colors.RED}Erro ao ler logs do Tomcat: {str(e)}{Colors.END}")
     else:
@@ -3055,11 +4400,95 @@ def check_tomcat_environment():
     print(f"\n{Colors.GREEN}Ambiente do Tomcat verificado e está pronto para uso!{Colors.END}")
     return True
 
+# Número de threads das checagens independentes da opção 1 / --only-check
+ENV_CHECK_WORKERS = int(os.environ.get("APP_CHECK_WORKERS", "8") or 8)
+# Número de etapas simultâneas nos pipelines de deploy (opção 2)
+PIPELINE_WORKERS = int(os.environ.get("APP_PIPELINE_WORKERS", "6") or 6)
+# Resultados de benchmark (main.py loadtest) e limite de regressão do main.py compare (%)
+BENCH_RESULTS_DIR = os.environ.get("APP_BENCH_RESULTS_DIR") or os.path.join(WORKSPACE_DIR, "bench-results")
+BENCH_REGRESSION_THRESHOLD = float(os.environ.get("APP_BENCH_THRESHOLD", "10") or 10)
+# Taxa de erros máxima (fração) aceita pelo loadtest antes de sair com código 1
+BENCH_MAX_ERROR_RATE = float(os.environ.get("APP_BENCH_MAX_ERROR_RATE", "0.01") or 0.01)
+
+def _read_pom_profiles(pom_path):
+    """Retorna (tem_tomcat, tem_wildfly, tem_run) ou None se o pom.xml não existir."""
+    if not os.path.exists(pom_path):
+        return None
+    with open(pom_path, 'r', encoding='utf-8') as pom_file:
+        pom_content = pom_file.read()
+    return ("<id>tomcat</id>" in pom_content, "<id>wildfly</id>" in pom_content, "<id>run</id>" in pom_content)
+
+def run_environment_probes(probes):
+    """
+    Executa as checagens independentes em paralelo (thread pool).
+
+    Args:
+        probes (dict): {nome: função sem argumentos}
+
+    Returns:
+        dict: {nome: (resultado, duração_em_segundos)} na mesma ordem de `probes`.
+              Exceções de uma checagem são devolvidas como resultado; o log de cada
+              checagem é emitido em bloco, na ordem de `probes`.
+    """
+    def timed(fn):
+        start = time.perf_counter()
+        _LOG_CAPTURE.lines = lines = []
+        try:
+            value = fn()
+        except Exception as e:
+            value = e
+        finally:
+            _LOG_CAPTURE.lines = None
+        return value, time.perf_counter() - start, lines
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    results = {}
+    workers = max(1, min(ENV_CHECK_WORKERS, len(probes)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="env-check") as pool:
+        futures = {name: pool.submit(timed, fn) for name, fn in probes.items()}
+        for name, future in futures.items():
+            value, duration, lines = future.result()
+            # Mensagens de cada checagem saem agrupadas, sem intercalar com as das outras threads
+            for message, level in lines:
+                log(f"[{name}] {message}", level)
+            results[name] = (value, duration)
+    return results
+
+def _probe_value(results, name, default):
+    value = results[name][0]
+    if isinstance(value, Exception):
+        log(f"Checagem '{name}' falhou: {value}", "WARNING")
+        return default
+    return value
+
 def check_environment():
     global MAVEN_CMD
-    
+
+    # Checagens independentes rodam em paralelo; os resultados são reportados na ordem de sempre
+    started = time.perf_counter()
+    probes = run_environment_probes({
+        "java": check_java_installed,
+        "maven": check_maven_installed,
+        "docker": check_docker_installed,
+        "database": lambda: check_database_connection(restart_on_saturation=False),
+        "pom": lambda: _read_pom_profiles(os.path.join(PROJECT_DIR, "pom.xml")),
+        "tomcat_port": lambda: check_server_running(TOMCAT_PORT),
+        "wildfly_port": lambda: check_server_running(WILDFLY_PORT),
+    })
+    wall = time.perf_counter() - started
+    slowest = max(probes, key=lambda name: probes[name][1])
+    durations = ", ".join(f"{name} {duration:.2f}s" for name, (_, duration) in probes.items())
+    log(f"Checagens de ambiente concluídas em {wall:.2f}s (mais lenta: {slowest}) — {durations}", "INFO")
+
+    # Reinício do Postgres saturado acontece aqui, em série, depois que as sondagens terminaram
+    db_probe = probes["database"][0]
+    if isinstance(db_probe, tuple) and not db_probe[0] and "too many clients" in db_probe[1].lower():
+        started = time.perf_counter()
+        probes["database"] = (check_database_connection(), time.perf_counter() - started)
+
     # Verificar Java
-    java_installed, java_version = check_java_installed()
+    java_installed, java_version = _probe_value(probes, "java", (False, "falha inesperada na verificação"))
     if not java_installed:
         log("Java não encontrado! Erro: " + java_version, "ERROR")
         log("Por favor, instale o Java (JDK) e adicione-o ao PATH.", "ERROR")
@@ -3069,7 +4498,7 @@ def check_environment():
         log(f"Java encontrado: versão {java_version}", "SUCCESS")
     
     # Verificar Maven
-    maven_installed, maven_version, maven_cmd = check_maven_installed()
+    maven_installed, maven_version, maven_cmd = _probe_value(probes, "maven", (False, "falha inesperada na verificação", None))
     if not maven_installed:
         log("Maven não encontrado! Erro: " + maven_version, "ERROR")
         log("Por favor, instale o Maven e adicione-o ao PATH.", "ERROR")
@@ -3081,7 +4510,7 @@ def check_environment():
         MAVEN_CMD = maven_cmd
     
     # Verificar Docker
-    docker_installed, docker_version = check_docker_installed()
+    docker_installed, docker_version = _probe_value(probes, "docker", (False, "falha inesperada na verificação"))
     if not docker_installed:
         log("Docker não encontrado! Erro: " + docker_version, "WARNING")
         log("Para funcionalidade completa, instale o Docker Desktop.", "WARNING")
@@ -3090,7 +4519,7 @@ def check_environment():
         log(f"Docker encontrado: {docker_version}", "SUCCESS")
         
         # Verificar banco de dados PostgreSQL
-        db_connected, db_message = check_database_connection()
+        db_connected, db_message = _probe_value(probes, "database", (False, "falha inesperada na verificação"))
         if not db_connected:
             log(f"Banco de dados PostgreSQL não disponível: {db_message}", "WARNING")
             log("Certifique-se de que o contêiner PostgreSQL está em execução.", "WARNING")
@@ -3108,7 +4537,8 @@ def check_environment():
     
     # Verificar pom.xml
     pom_path = os.path.join(PROJECT_DIR, "pom.xml")
-    if not os.path.exists(pom_path):
+    pom_profiles = _probe_value(probes, "pom", None)
+    if pom_profiles is None:
         log(f"Arquivo pom.xml não encontrado em: {pom_path}", "ERROR")
         log("Verifique se o projeto Maven está configurado corretamente.", "ERROR")
         return False
@@ -3116,12 +4546,7 @@ def check_environment():
         log(f"Arquivo pom.xml encontrado: {pom_path}", "SUCCESS")
         
         # Verificar perfis no pom.xml
-        with open(pom_path, 'r', encoding='utf-8') as pom_file:
-            pom_content = pom_file.read()
-            
-        has_tomcat_profile = "<id>tomcat</id>" in pom_content
-        has_wildfly_profile = "<id>wildfly</id>" in pom_content
-        has_run_profile = "<id>run</id>" in pom_content
+        has_tomcat_profile, has_wildfly_profile, has_run_profile = pom_profiles
         
         if has_tomcat_profile:
             log("Perfil 'tomcat' encontrado no pom.xml", "SUCCESS")
@@ -3150,7 +4575,7 @@ def check_environment():
             log(f"Diretório webapps do Tomcat criado: {tomcat_webapps}", "WARNING")
         
         # Verificar se o Tomcat está em execução
-        tomcat_running = check_server_running(TOMCAT_PORT)
+        tomcat_running = _probe_value(probes, "tomcat_port", False)
         if tomcat_running:
             log(f"Servidor Tomcat está em execução na porta {TOMCAT_PORT}", "SUCCESS")
             log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/", "SUCCESS")
@@ -3171,20 +4596,506 @@ def check_environment():
             log(f"Diretório deployments do WildFly criado: {wildfly_deployments}", "WARNING")
         
         # Verificar se o WildFly está em execução
-        wildfly_running = check_server_running(WILDFLY_PORT)
+        wildfly_running = _probe_value(probes, "wildfly_port", False)
         if wildfly_running:
             log(f"Servidor WildFly está em execução na porta {WILDFLY_PORT}", "SUCCESS")
             log(f"Aplicação disponível em: http://localhost:{WILDFLY_PORT}/caracore-hub/", "SUCCESS")
         else:
-            log(f"Servidor WildFly não está em execução na porta {WILDFLY_PORT}. Precisa esta online para deploy.", "INFO")
-            # Não iniciamos o WildFly automaticamente aqui, apenas na operação de deploy
-            # Se o usuário precisar, ele pode iniciar manualmente o servidor ou usar a opção de deploy que iniciará automaticamente
-    else:
-        log(f"WildFly não encontrado em: {WILDFLY_DIR}", "WARNING")
-        log("Você precisará instalar o WildFly manualmente para usar essa opção.", "INFO")
-    
-    return True
+            log(f"Servidor WildFly não está em execução na porta {WILDFLY_PORT}. Precisa esta online para deploy.", "INFO")
+            # Não iniciamos o WildFly automaticamente aqui, apenas na operação de deploy
+            # Se o usuário precisar, ele pode iniciar manualmente o servidor ou usar a opção de deploy que iniciará automaticamente
+    else:
+        log(f"WildFly não encontrado em: {WILDFLY_DIR}", "WARNING")
+        log("Você precisará instalar o WildFly manualmente para usar essa opção.", "INFO")
+    
+    return True
+
+# Cache de build (WAR endereçado por conteúdo)
+BUILD_CACHE_DIR = os.environ.get("APP_BUILD_CACHE_DIR") or os.path.join(WORKSPACE_DIR, ".build-cache")
+BUILD_CACHE_ENABLED = str(os.environ.get("APP_BUILD_CACHE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+BUILD_CACHE_MAX_ENTRIES = int(os.environ.get("APP_BUILD_CACHE_MAX", "5") or 5)
+# Flags que não alteram o artefato gerado (apenas verbosidade/diagnóstico)
+_BUILD_CACHE_NEUTRAL_FLAGS = {"-X", "--debug", "-e", "--errors", "-q", "--quiet", "-B", "--batch-mode"}
+
+def _build_cache_file(name):
+    return os.path.join(BUILD_CACHE_DIR, name)
+
+def _load_build_cache_json(name, default):
+    try:
+        with open(_build_cache_file(name), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except Exception:
+        return default
+
+def _save_build_cache_json(name, data):
+    try:
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        tmp = _build_cache_file(name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+        os.replace(tmp, _build_cache_file(name))
+    except Exception as e:
+        log(f"Não foi possível gravar {name} no cache de build: {e}", "WARNING")
+
+def _iter_build_inputs():
+    """Lista (ordenada) os arquivos que influenciam o WAR: poms e tudo em <módulo>/src."""
+    files = []
+    root_pom = os.path.join(PROJECT_DIR, "pom.xml")
+    if os.path.isfile(root_pom):
+        files.append(root_pom)
+    try:
+        modules = sorted(os.listdir(PROJECT_DIR))
+    except OSError:
+        modules = []
+    for module in modules:
+        module_dir = os.path.join(PROJECT_DIR, module)
+        if not os.path.isdir(module_dir) or module in {"target", ".git"}:
+            continue
+        module_pom = os.path.join(module_dir, "pom.xml")
+        if os.path.isfile(module_pom):
+            files.append(module_pom)
+        src_dir = os.path.join(module_dir, "src")
+        for dirpath, dirnames, filenames in os.walk(src_dir):
+            dirnames.sort()
+            for name in sorted(filenames):
+                files.append(os.path.join(dirpath, name))
+    return files
+
+def _file_sha256(path):
+    fh_hash = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            fh_hash.update(chunk)
+    return fh_hash.hexdigest()
+
+def snapshot_build_inputs():
+    """
+    Calcula o digest SHA-256 de cada entrada do build (caminho relativo a PROJECT_DIR).
+
+    O digest de cada arquivo é reaproveitado de um índice (mtime/tamanho) para evitar
+    reler arquivos inalterados a cada chamada.
+
+    Returns:
+        dict: {caminho_relativo: sha256}
+    """
+    index = _load_build_cache_json("file-index.json", {})
+    new_index = {}
+    snapshot = {}
+    for path in _iter_build_inputs():
+        rel = os.path.relpath(path, PROJECT_DIR).replace(os.sep, "/")
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        cached = index.get(rel)
+        if cached and cached.get("mtime_ns") == st.st_mtime_ns and cached.get("size") == st.st_size:
+            digest = cached["sha256"]
+        else:
+            digest = _file_sha256(path)
+        new_index[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        snapshot[rel] = digest
+    _save_build_cache_json("file-index.json", new_index)
+    return snapshot
+
+def compute_build_fingerprint(command, profile=None, additional_params=None, snapshot=None):
+    """
+    Calcula o fingerprint SHA-256 das entradas do build (fontes, poms, perfil e parâmetros).
+
+    Returns:
+        str: fingerprint hexadecimal
+    """
+    if snapshot is None:
+        snapshot = snapshot_build_inputs()
+    h = hashlib.sha256()
+    goals = sorted(g for g in command.split() if g != "clean")
+    params = sorted(p for p in (additional_params or "").split() if p not in _BUILD_CACHE_NEUTRAL_FLAGS)
+    h.update(f"goals={' '.join(goals)}\nprofile={profile or ''}\nparams={' '.join(params)}\n".encode("utf-8"))
+    for rel in sorted(snapshot):
+        h.update(f"{rel}\0{snapshot[rel]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def _is_cacheable_maven_command(command, additional_params=None):
+    """Somente builds de empacotamento puros (clean/package) geram um WAR reaproveitável."""
+    goals = set(command.split())
+    if "package" not in goals or not goals <= {"clean", "package"}:
+        return False
+    # -DskipTests e similares fazem parte da chave; goals extras nos parâmetros não
+    return not any(p and not p.startswith("-") for p in (additional_params or "").split())
+
+def build_cache_stats():
+    """Retorna os contadores acumulados de hit/miss do cache de build."""
+    stats = _load_build_cache_json("stats.json", {})
+    return {"hits": int(stats.get("hits", 0)), "misses": int(stats.get("misses", 0))}
+
+def _record_build_cache_result(hit):
+    stats = build_cache_stats()
+    stats["hits" if hit else "misses"] += 1
+    stats["last"] = "hit" if hit else "miss"
+    stats["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    _save_build_cache_json("stats.json", stats)
+    total = stats["hits"] + stats["misses"]
+    ratio = (stats["hits"] / total * 100) if total else 0.0
+    log(f"Cache de build: {'HIT' if hit else 'MISS'} (hits={stats['hits']}, misses={stats['misses']}, taxa={ratio:.0f}%)", "INFO")
+
+def restore_war_from_cache(fingerprint):
+    """
+    Restaura o WAR correspondente ao fingerprint em PROJECT_DIR/target.
+
+    Returns:
+        str | None: caminho do WAR restaurado ou None se não houver entrada
+    """
+    entry_dir = _build_cache_file(fingerprint)
+    if not os.path.isdir(entry_dir):
+        return None
+    war_name = select_war(os.listdir(entry_dir))
+    if not war_name:
+        return None
+    target_dir = os.path.join(PROJECT_DIR, "target")
+    os.makedirs(target_dir, exist_ok=True)
+    dest = os.path.join(target_dir, war_name)
+    shutil.copy2(os.path.join(entry_dir, war_name), dest)
+    # Atualiza o mtime da entrada para a política LRU
+    os.utime(entry_dir, None)
+    return dest
+
+def store_war_in_cache(fingerprint):
+    """Guarda o WAR recém-gerado em PROJECT_DIR/target sob o fingerprint informado."""
+    target_dir = os.path.join(PROJECT_DIR, "target")
+    if not os.path.isdir(target_dir):
+        return None
+    war_name = select_war(os.listdir(target_dir))
+    if not war_name:
+        return None
+    entry_dir = _build_cache_file(fingerprint)
+    tmp_dir = entry_dir + ".tmp"
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir, exist_ok=True)
+        shutil.copy2(os.path.join(target_dir, war_name), os.path.join(tmp_dir, war_name))
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+    except Exception as e:
+        log(f"Falha ao armazenar WAR no cache de build: {e}", "WARNING")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return None
+    _prune_build_cache()
+    return os.path.join(entry_dir, war_name)
+
+def _prune_build_cache():
+    """Mantém apenas as BUILD_CACHE_MAX_ENTRIES entradas usadas mais recentemente."""
+    try:
+        entries = [
+            os.path.join(BUILD_CACHE_DIR, d) for d in os.listdir(BUILD_CACHE_DIR)
+            if os.path.isdir(os.path.join(BUILD_CACHE_DIR, d)) and not d.endswith(".tmp")
+        ]
+    except OSError:
+        return
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for old in entries[max(BUILD_CACHE_MAX_ENTRIES, 1):]:
+        shutil.rmtree(old, ignore_errors=True)
+
+# Saída do Maven em streaming: eco no console e tamanho do buffer de linhas recentes
+MAVEN_ECHO_OUTPUT = str(os.environ.get("APP_MAVEN_ECHO", "1")).strip().lower() not in {"0", "false", "no", "off"}
+MAVEN_TAIL_LINES = int(os.environ.get("APP_MAVEN_TAIL_LINES", "200") or 200)
+
+def _log_maven_event(event):
+    """Registra no log os eventos estruturados relevantes extraídos da saída do Maven."""
+    kind = event.get("type")
+    if kind == "module_started":
+        position = f" [{event['index']}/{event['total']}]" if event.get("index") else ""
+        log(f"Maven: módulo {event['module']} iniciado{position}", "INFO")
+    elif kind == "module_finished" and event.get("status") == "FAILURE":
+        log(f"Maven: módulo {event['module']} falhou", "ERROR")
+    elif kind == "tests":
+        level = "WARNING" if event["failures"] or event["errors"] else "INFO"
+        log(f"Maven: testes em {event.get('module') or 'reactor'}: {event['run']} executados, "
+            f"{event['failures']} falhas, {event['errors']} erros, {event['skipped']} ignorados", level)
+
+def run_maven_streaming(cmd, cwd=None, echo=None, tail_lines=None):
+    """
+    Executa o Maven processando a saída linha a linha com memória limitada.
+
+    As linhas são encaminhadas ao console à medida que chegam (APP_MAVEN_ECHO), apenas as
+    últimas `tail_lines` são mantidas para relatório de erro e os eventos estruturados
+    (módulos, testes, erros) são registrados no log em tempo real.
+
+    Returns:
+        tuple: (exit_code, MavenOutputProcessor)
+    """
+    echo = MAVEN_ECHO_OUTPUT if echo is None else echo
+    processor = maven_reactor.MavenOutputProcessor(
+        forward=(lambda line: print(f"{Colors.GRAY}{line}{Colors.END}", flush=True)) if echo else None,
+        on_event=_log_maven_event,
+        tail_lines=tail_lines or MAVEN_TAIL_LINES,
+    )
+    process = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1
+    )
+    try:
+        processor.consume(process.stdout)
+    finally:
+        process.stdout.close()
+        exit_code = process.wait()
+    return exit_code, processor
+
+# Build paralelo do reactor (-T). None = sequencial; "auto" = núcleos disponíveis
+PARALLEL_BUILD_THREADS = None
+if str(os.environ.get("APP_BUILD_PARALLEL", "0")).strip().lower() in {"1", "true", "yes", "on"}:
+    PARALLEL_BUILD_THREADS = "auto"
+
+def export_trace():
+    """
+    Grava os spans desta execução em log/: JSON Chrome trace-event (chrome://tracing ou
+    ui.perfetto.dev) e tabela-resumo por etapa. APP_TRACE=0 desativa.
+    """
+    try:
+        paths = tracing.export(LOG_DIR, LOG_BASENAME)
+    except Exception as e:
+        log(f"Não foi possível exportar o trace de etapas: {e}", "WARNING")
+        return None
+    if paths:
+        log(f"Trace das etapas: {paths['trace']} (resumo: {paths['summary']})", "INFO")
+    return paths
+
+def report_build_timings(timings, cmd, threads=None):
+    """
+    Registra um resumo do detalhamento de tempos (módulos e plugins) de um build Maven
+    e grava o registro completo ao lado do log diário.
+    """
+    try:
+        if not timings or not timings["modules"]:
+            return None
+        path = maven_reactor.save_build_timings(
+            LOG_DIR, LOG_BASENAME, timings,
+            command=" ".join(cmd), threads=threads
+        )
+        total = timings["total_seconds"]
+        total_txt = f"{total:.1f}s" if total is not None else "n/d"
+        log(f"Tempo total do build: {total_txt}{' (wall clock, paralelo)' if timings['wall_clock'] else ''}", "INFO")
+        for module in sorted(timings["modules"], key=lambda m: m["seconds"] or 0, reverse=True):
+            if module["seconds"] is not None:
+                log(f"  {module['module']:<32} {module['status']:<8} {module['seconds']:>8.2f}s", "INFO")
+        top_plugins = maven_reactor.aggregate_plugin_seconds(timings)[:5]
+        if top_plugins:
+            log("Plugins mais lentos: " + ", ".join(f"{name} {secs:.1f}s" for name, secs in top_plugins), "INFO")
+        log(f"Detalhamento de tempos salvo em: {path}", "INFO")
+        return timings
+    except Exception as e:
+        log(f"Não foi possível extrair os tempos do build: {e}", "WARNING")
+        return None
+
+# Build incremental por módulo do reactor (sem clean, apenas módulos afetados)
+INCREMENTAL_BUILD_ENABLED = str(os.environ.get("APP_BUILD_INCREMENTAL", "0")).strip().lower() in {"1", "true", "yes", "on"}
+# Incluir módulos upstream (-am) para que o reactor resolva dependências sem `mvn install` prévio
+INCREMENTAL_ALSO_MAKE = str(os.environ.get("APP_BUILD_INCREMENTAL_AM", "1")).strip().lower() not in {"0", "false", "no", "off"}
+
+def read_reactor_modules():
+    """
+    Lê os módulos do reactor caracore-hub e as dependências entre eles a partir dos poms.
+
+    Returns:
+        dict: {diretório_do_módulo: {"artifactId": str, "depends_on": [diretórios]}}
+    """
+    import xml.etree.ElementTree as ET
+
+    def _strip(tag):
+        return tag.split("}", 1)[-1]
+
+    def _child_text(elem, name):
+        for child in elem:
+            if _strip(child.tag) == name:
+                return (child.text or "").strip()
+        return None
+
+    root = ET.parse(os.path.join(PROJECT_DIR, "pom.xml")).getroot()
+    module_dirs = [
+        (el.text or "").strip()
+        for el in root.iter()
+        if _strip(el.tag) == "module" and (el.text or "").strip()
+    ]
+    modules = {}
+    deps_by_module = {}
+    for module in module_dirs:
+        pom = os.path.join(PROJECT_DIR, module, "pom.xml")
+        if not os.path.isfile(pom):
+            continue
+        mroot = ET.parse(pom).getroot()
+        artifact = _child_text(mroot, "artifactId") or module
+        deps = []
+        for el in mroot.iter():
+            if _strip(el.tag) == "dependency":
+                dep_artifact = _child_text(el, "artifactId")
+                if dep_artifact:
+                    deps.append(dep_artifact)
+        modules[module] = {"artifactId": artifact, "depends_on": []}
+        deps_by_module[module] = deps
+    by_artifact = {info["artifactId"]: module for module, info in modules.items()}
+    for module, deps in deps_by_module.items():
+        modules[module]["depends_on"] = sorted({by_artifact[d] for d in deps if d in by_artifact and by_artifact[d] != module})
+    return modules
+
+def _reactor_dependents(modules, changed):
+    """Fecho transitivo dos módulos que dependem (direta ou indiretamente) de `changed`."""
+    affected = set(changed)
+    grew = True
+    while grew:
+        grew = False
+        for module, info in modules.items():
+            if module not in affected and affected.intersection(info["depends_on"]):
+                affected.add(module)
+                grew = True
+    # Manter a ordem declarada no reactor
+    return [m for m in modules if m in affected]
+
+def _incremental_state_key(profile, additional_params):
+    params = sorted(p for p in (additional_params or "").split() if p not in _BUILD_CACHE_NEUTRAL_FLAGS)
+    return f"profile={profile or ''};params={' '.join(params)}"
+
+def plan_incremental_build(profile=None, additional_params=None, snapshot=None):
+    """
+    Compara as entradas do build com o último build bem-sucedido e decide o que recompilar.
+
+    O "skip" só vale se o WAR em target/ for o mesmo (SHA-256) gravado pelo último build registrado:
+    builds completos, restaurações do cache ou deploys que recriam target/ por outro caminho não o reaproveitam.
+
+    Returns:
+        dict: {"mode": "full" | "modules" | "skip", "modules": [...], "changed": [...], "deleted": [...], "reason": str}
+    """
+    if snapshot is None:
+        snapshot = snapshot_build_inputs()
+    state = _load_build_cache_json("last-build.json", {})
+    if not state or state.get("key") != _incremental_state_key(profile, additional_params):
+        return {"mode": "full", "modules": [], "changed": [], "deleted": [], "reason": "sem build anterior compatível (perfil/parâmetros)"}
+
+    previous = state.get("files", {})
+    changed = sorted(
+        rel for rel in set(previous) | set(snapshot)
+        if previous.get(rel) != snapshot.get(rel)
+    )
+    deleted = [rel for rel in changed if rel not in snapshot]
+    if not changed:
+        war = find_built_war()
+        if not war:
+            return {"mode": "full", "modules": [], "changed": [], "deleted": [], "reason": "WAR ausente em target/"}
+        if not state.get("war_sha256") or _file_sha256(war) != state["war_sha256"]:
+            return {"mode": "full", "modules": [], "changed": [], "deleted": [], "reason": "WAR em target/ não é o do último build registrado"}
+        return {"mode": "skip", "modules": [], "changed": [], "deleted": [], "reason": "nenhuma alteração desde o último build"}
+
+    try:
+        modules = read_reactor_modules()
+    except Exception as e:
+        return {"mode": "full", "modules": [], "changed": changed, "deleted": deleted, "reason": f"falha ao ler poms do reactor: {e}"}
+
+    touched = set()
+    for rel in changed:
+        head = rel.split("/", 1)[0]
+        if "/" not in rel or head not in modules:
+            # pom raiz ou arquivo fora de um módulo conhecido: reconstruir tudo
+            return {"mode": "full", "modules": [], "changed": changed, "deleted": deleted, "reason": f"alteração global em {rel}"}
+        touched.add(head)
+
+    affected = _reactor_dependents(modules, touched)
+    return {
+        "mode": "modules",
+        "modules": affected,
+        "changed": changed,
+        "deleted": deleted,
+        "reason": f"módulos alterados: {', '.join(sorted(touched))}",
+    }
+
+def remove_stale_build_outputs(deleted):
+    """
+    Sem `clean`, o Maven não remove de target/ o que saiu de src/: recursos e páginas apagados
+    iriam para o WAR. Remove as saídas correspondentes aos arquivos apagados:
+    src/main/resources/X -> target/classes/X, src/main/java/X.java -> target/classes/X.class (e X$*.class),
+    src/main/webapp/X -> X em cada diretório do WAR expandido em target/.
+
+    Returns:
+        list: caminhos removidos
+    """
+    removed = []
+
+    def _remove(path):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            os.remove(path)
+        else:
+            return
+        removed.append(path)
+
+    for rel in deleted:
+        parts = rel.split("/")
+        if len(parts) < 5 or parts[1:3] != ["src", "main"]:
+            continue
+        module_target = os.path.join(PROJECT_DIR, parts[0], "target")
+        inner = os.path.join(*parts[4:])
+        if parts[3] == "resources":
+            _remove(os.path.join(module_target, "classes", inner))
+        elif parts[3] == "java" and inner.endswith(".java"):
+            base = os.path.join(module_target, "classes", inner[:-len(".java")])
+            for path in [base + ".class", *glob.glob(glob.escape(base) + "$*.class")]:
+                _remove(path)
+        elif parts[3] == "webapp" and os.path.isdir(module_target):
+            for name in os.listdir(module_target):
+                exploded = os.path.join(module_target, name)
+                if os.path.isdir(os.path.join(exploded, "WEB-INF")):
+                    _remove(os.path.join(exploded, inner))
+    return removed
+
+def save_incremental_build_state(profile=None, additional_params=None, snapshot=None, war_path=None):
+    """Registra o snapshot das entradas e o SHA-256 do WAR do último build bem-sucedido."""
+    if snapshot is None:
+        snapshot = snapshot_build_inputs()
+    war_path = war_path or find_built_war()
+    _save_build_cache_json("last-build.json", {
+        "key": _incremental_state_key(profile, additional_params),
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "files": snapshot,
+        "war": os.path.basename(war_path) if war_path else None,
+        "war_sha256": _file_sha256(war_path) if war_path else None,
+    })
+
+def invalidate_incremental_build_state():
+    """
+    Descarta o registro do último build: target/ deixou de corresponder a ele (build completo fora do
+    modo incremental, WAR restaurado do cache sem as classes dos módulos, build com falha).
+    """
+    try:
+        os.remove(_build_cache_file("last-build.json"))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log(f"Não foi possível invalidar o estado do build incremental: {e}", "WARNING")
 
+_BUILD_SETUP_REPORTED = False
+
+def report_build_setup_once():
+    """Registra (uma vez por execução) o estado do worker mvnd e do cache de build."""
+    global _BUILD_SETUP_REPORTED
+    if _BUILD_SETUP_REPORTED:
+        return
+    _BUILD_SETUP_REPORTED = True
+    if maven_reactor.build_worker_mode() != "off":
+        worker = maven_reactor.find_build_worker()
+        if worker:
+            status = maven_reactor.build_worker_status(worker)
+            warm = bool(status) and any(state in status.lower() for state in ("idle", "busy"))
+            log(f"Worker de build residente (mvnd): {worker} ({'daemon aquecido disponível' if warm else 'daemon será iniciado no primeiro build'})", "INFO")
+        elif maven_reactor.build_worker_mode() == "on":
+            log("APP_BUILD_WORKER=on, mas o mvnd não foi encontrado (PATH, APP_MVND_CMD ou MVND_HOME)", "WARNING")
+    if BUILD_CACHE_ENABLED:
+        stats = build_cache_stats()
+        log(f"Cache de build ativo em {BUILD_CACHE_DIR} (hits={stats['hits']}, misses={stats['misses']})", "INFO")
+
+@tracing.traced("maven_build", cat="build")
 def execute_maven_command(command, profile=None, additional_params=None):
     """
     Executa um comando Maven com os perfis e parâmetros especificados.
@@ -3198,6 +5109,60 @@ def execute_maven_command(command, profile=None, additional_params=None):
         dict: Resultado da execução com success, output e exit_code
     """
     global MAVEN_CMD
+
+    report_build_setup_once()
+    fingerprint = None
+    snapshot = None
+    cacheable = _is_cacheable_maven_command(command, additional_params)
+    if BUILD_CACHE_ENABLED and cacheable:
+        try:
+            snapshot = snapshot_build_inputs()
+            fingerprint = compute_build_fingerprint(command, profile, additional_params, snapshot=snapshot)
+            cached_war = restore_war_from_cache(fingerprint)
+        except Exception as e:
+            log(f"Cache de build indisponível, seguindo com build completo: {e}", "WARNING")
+            fingerprint, cached_war = None, None
+        if cached_war:
+            _record_build_cache_result(True)
+            invalidate_incremental_build_state()
+            log(f"Fontes inalteradas (fingerprint {fingerprint[:12]}); WAR restaurado do cache: {cached_war}", "SUCCESS")
+            return {
+                "success": True,
+                "output": f"WAR restaurado do cache de build ({fingerprint})",
+                "exit_code": 0,
+                "cached": True
+            }
+        if fingerprint:
+            _record_build_cache_result(False)
+
+    module_args = []
+    incremental = INCREMENTAL_BUILD_ENABLED and cacheable
+    if incremental:
+        try:
+            if snapshot is None:
+                snapshot = snapshot_build_inputs()
+            plan = plan_incremental_build(profile, additional_params, snapshot)
+        except Exception as e:
+            log(f"Não foi possível planejar build incremental: {e}", "WARNING")
+            plan = {"mode": "full", "modules": [], "changed": [], "reason": str(e)}
+        if plan["mode"] == "skip":
+            log(f"Build incremental: {plan['reason']}; reaproveitando artefatos de target/", "SUCCESS")
+            return {"success": True, "output": plan["reason"], "exit_code": 0, "incremental": plan}
+        if plan["mode"] == "modules":
+            # Preserva target/ (sem clean) e limita o reactor aos módulos afetados
+            command = " ".join(g for g in command.split() if g != "clean")
+            module_args = ["-pl", ",".join(plan["modules"])]
+            if INCREMENTAL_ALSO_MAKE:
+                module_args.append("-am")
+            log(f"Build incremental ({plan['reason']}; {len(plan['changed'])} arquivo(s)): {', '.join(plan['modules'])}", "INFO")
+            if plan["deleted"]:
+                stale = remove_stale_build_outputs(plan["deleted"])
+                log(f"Build incremental: {len(plan['deleted'])} arquivo(s) apagado(s); {len(stale)} saída(s) obsoleta(s) removida(s) de target/", "INFO")
+        else:
+            log(f"Build incremental: reactor completo ({plan['reason']})", "INFO")
+    else:
+        # Este build altera target/ sem registrar o estado: o próximo incremental não pode confiar nele
+        invalidate_incremental_build_state()
     
     try:
         # Verificar se o Maven está instalado
@@ -3212,10 +5177,11 @@ def execute_maven_command(command, profile=None, additional_params=None):
         
         # Atualizar o comando Maven global
         MAVEN_CMD = maven_cmd
-            
-        os.chdir(PROJECT_DIR)
-        
-        cmd = [MAVEN_CMD]
+
+        # cwd por subprocesso (e não os.chdir): o build roda em paralelo com outras etapas do pipeline
+        cmd, using_worker = maven_reactor.resolve_build_command(MAVEN_CMD)
+        if maven_reactor.build_worker_mode() == "on" and not using_worker:
+            log("APP_BUILD_WORKER=on, mas o mvnd não foi encontrado; usando Maven de execução única", "WARNING")
         cmd.extend(command.split())
         
         if profile:
@@ -3223,46 +5189,62 @@ def execute_maven_command(command, profile=None, additional_params=None):
             
         if additional_params:
             cmd.extend(additional_params.split())
+
+        cmd.extend(module_args)
+
+        threads = None
+        if PARALLEL_BUILD_THREADS:
+            threads = maven_reactor.parallel_thread_count(None if PARALLEL_BUILD_THREADS == "auto" else PARALLEL_BUILD_THREADS)
+            cmd.extend(["-T", str(threads)])
+        # Horário em cada linha para medir o tempo de cada plugin
+        cmd.extend(maven_reactor.TIMESTAMP_PARAMS)
         
         log(f"Executando comando Maven: {' '.join(cmd)}", "INFO")
         
-        # Executar o comando Maven e capturar a saída
-        process = subprocess.run(
-            cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding='utf-8'
-        )
-        
-        output = process.stdout
-        exit_code = process.returncode
+        # Executar o comando Maven processando a saída em streaming
+        exit_code, processor = run_maven_streaming(cmd, cwd=PROJECT_DIR)
+        if using_worker and maven_reactor.is_worker_failure(exit_code, processor):
+            log(f"Worker de build (mvnd) falhou sem executar o build (código {exit_code}); repetindo com Maven de execução única", "WARNING")
+            cmd = [MAVEN_CMD, *cmd[1 + len(maven_reactor.BUILD_WORKER_ARGS):]]
+            log(f"Executando comando Maven: {' '.join(cmd)}", "INFO")
+            exit_code, processor = run_maven_streaming(cmd, cwd=PROJECT_DIR)
+        output = processor.tail_text()
+        build_summary = processor.summary()
+
+        report_build_timings(build_summary["timings"], cmd, threads)
         
         if exit_code == 0:
             log(f"Comando Maven executado com sucesso: {' '.join(cmd)}", "SUCCESS")
             # Verificar se o WAR foi gerado (para comandos package)
             if "package" in cmd:
-                war_files = []
-                target_dir = os.path.join(PROJECT_DIR, "target")
-                if os.path.exists(target_dir):
-                    war_files = [f for f in os.listdir(target_dir) if f.endswith(".war")]
-                if war_files:
-                    log(f"Arquivo WAR gerado: {os.path.join(target_dir, war_files[0])}", "SUCCESS")
+                war_file = find_built_war()
+                if war_file:
+                    log(f"Arquivo WAR gerado: {war_file}", "SUCCESS")
+                    if fingerprint and store_war_in_cache(fingerprint):
+                        log(f"WAR armazenado no cache de build (fingerprint {fingerprint[:12]})", "INFO")
+                    if incremental:
+                        save_incremental_build_state(profile, additional_params, snapshot, war_path=war_file)
                 else:
                     log("Nenhum arquivo WAR encontrado após a compilação", "WARNING")
+                    if incremental:
+                        invalidate_incremental_build_state()
         else:
             log(f"Falha ao executar comando Maven: {' '.join(cmd)}. Código de saída: {exit_code}", "ERROR")
-            # Mostrar os últimos 10 linhas de saída em caso de erro
+            if incremental:
+                invalidate_incremental_build_state()
+            # Mostrar os erros reportados e as últimas 10 linhas de saída
+            for event in processor.errors()[:10]:
+                log(f"  [{event.get('module') or 'reactor'}] {event['message']}", "ERROR")
             if output:
                 log("Últimas linhas de saída do Maven:", "ERROR")
-                output_lines = output.split('\n')
-                for line in output_lines[-10:]:
+                for line in processor.tail_text(10).split('\n'):
                     log(f"  {line}", "ERROR")
             
         return {
             "success": exit_code == 0,
             "output": output,
-            "exit_code": exit_code
+            "exit_code": exit_code,
+            "summary": build_summary
         }
         
     except Exception as e:
@@ -3272,9 +5254,8 @@ def execute_maven_command(command, profile=None, additional_params=None):
             "output": str(e),
             "exit_code": -1
         }
-    finally:
-        os.chdir(WORKSPACE_DIR)
 
+@tracing.traced("start_tomcat", cat="server")
 def start_tomcat_server():
     """
     Inicia o servidor Tomcat 10 usando o perfil Maven 'tomcat'.
@@ -3429,8 +5410,8 @@ def start_tomcat_server():
                     log("Falha na compilação com perfil embedded-tomcat. Tentando abordagem alternativa...", "WARNING")
         
         # Verificar se o WAR foi gerado
-        war_files = [f for f in os.listdir(os.path.join(PROJECT_DIR, "target")) if f.endswith(".war")]
-        if not war_files:
+        war_file = find_built_war()
+        if not war_file:
             log("Arquivo WAR não foi gerado. Tentando empacotar com opções alternativas...", "WARNING")
             
             # Tentar compilar com o plugin tomcat10 e o perfil tomcat
@@ -3488,7 +5469,6 @@ def start_tomcat_server():
                     "type": "tomcat"
                 }
         
-        war_file = os.path.join(PROJECT_DIR, "target", war_files[0])
         log(f"Arquivo WAR gerado: {os.path.basename(war_file)}", "SUCCESS")
         
         # Perguntar ao usuário qual método de inicialização do Tomcat deseja usar
@@ -3559,7 +5539,8 @@ def start_tomcat_server():
             
             # Copiar o WAR para o diretório webapps com o nome ROOT.war
             war_dest = os.path.join(tomcat_webapps, "ROOT.war")
-            shutil.copy2(war_file, war_dest)
+            with tracing.span("copia_war", cat="copy"):
+                shutil.copy2(war_file, war_dest)
             log(f"Arquivo WAR copiado para Tomcat: {war_dest}", "SUCCESS")
             
             # Iniciar Tomcat em foreground (console aqui)
@@ -3660,6 +5641,7 @@ def start_tomcat_server():
     finally:
         os.chdir(WORKSPACE_DIR)
 
+@tracing.traced("start_wildfly", cat="server")
 def start_wildfly_server():
     """
     Inicia o servidor WildFly usando o perfil Maven 'wildfly'.
@@ -3750,8 +5732,8 @@ def start_wildfly_server():
             log("Compilação bem-sucedida sem executar testes.", "SUCCESS")
         
         # Verificar se o WAR foi gerado
-        war_files = [f for f in os.listdir(os.path.join(PROJECT_DIR, "target")) if f.endswith(".war")]
-        if not war_files:
+        war_file = find_built_war()
+        if not war_file:
             log("Arquivo WAR não foi gerado. Tentando empacotar com opções alternativas...", "WARNING")
             return {
                 "success": False,
@@ -3759,7 +5741,6 @@ def start_wildfly_server():
                 "type": "wildfly"
             }
         
-        war_file = os.path.join(PROJECT_DIR, "target", war_files[0])
         log(f"Arquivo WAR gerado: {os.path.basename(war_file)}", "SUCCESS")
         
         # Perguntar ao usuário qual método de inicialização do WildFly deseja usar
@@ -3823,7 +5804,8 @@ def start_wildfly_server():
             
             # Copiar o WAR para o diretório deployments com o nome ROOT.war
             war_dest = os.path.join(deployments_dir, "ROOT.war")
-            shutil.copy2(war_file, war_dest)
+            with tracing.span("copia_war", cat="copy"):
+                shutil.copy2(war_file, war_dest)
             log(f"Arquivo WAR copiado para WildFly: {war_dest}", "SUCCESS")
             
             # Criar o arquivo de marcador .dodeploy para indicar que deve ser implantado
@@ -4094,6 +6076,7 @@ def clean_all_deployments():
         log(f"Erro ao limpar deployments: {str(e)}", "ERROR")
         return False
 
+@tracing.traced("maven_tests", cat="test")
 def run_maven_tests():
     """
     Executa os testes do Maven com JaCoCo.
@@ -4137,6 +6120,7 @@ def run_maven_tests():
     finally:
         os.chdir(WORKSPACE_DIR)
 
+@tracing.traced("maven_tests_module", cat="test")
 def run_maven_tests_module():
     """
     Executa os testes do Maven com JaCoCo no módulo específico.
@@ -4149,9 +6133,14 @@ def run_maven_tests_module():
     try:
         os.chdir(WORKSPACE_DIR)
         
-        # Executar testes com JaCoCo no módulo específico
-        cmd = [MAVEN_CMD, "-q", "-f", f"{PROJECT_DIR}/pom.xml", "clean", "test", "verify"]
+        # Executar testes com JaCoCo no módulo específico (worker residente se disponível)
+        cmd, using_worker = maven_reactor.resolve_build_command(MAVEN_CMD)
+        cmd.extend(["-q", "-f", f"{PROJECT_DIR}/pom.xml", "clean", "test", "verify"])
         process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if using_worker and process.returncode != 0 and "BUILD FAILURE" not in (process.stdout or "") and "[ERROR]" not in (process.stdout or ""):
+            log("Worker de build (mvnd) indisponível; repetindo com Maven de execução única", "WARNING")
+            cmd = [MAVEN_CMD, *cmd[1 + len(maven_reactor.BUILD_WORKER_ARGS):]]
+            process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
         
         if process.returncode == 0:
             log("Testes Maven executados com sucesso no módulo.", "SUCCESS")
@@ -4207,6 +6196,7 @@ def run_embedded_tomcat():
         log(f"Erro ao iniciar Tomcat incorporado: {str(e)}", "ERROR")
         return False
 
+@tracing.traced("pytest", cat="test")
 def run_pytest(base_url: str) -> bool:
     """
     Executa os testes Python (pytest) em um subprocesso, configurando a URL base.
@@ -4296,6 +6286,7 @@ def stop_tomcat_server():
         log(f"Erro ao parar o servidor Tomcat: {str(e)}", "ERROR")
         return False
 
+@tracing.traced("restart_tomcat", cat="server")
 def restart_tomcat_server():
     """
     Reinicia o Tomcat Standalone usando os scripts do diretório `TOMCAT_DIR`.
@@ -4345,6 +6336,19 @@ def stop_wildfly_server():
         bool: True se o servidor foi parado com sucesso, False caso contrário
     """
     log("Parando servidor WildFly...", "INFO")
+
+    if WILDFLY_MGMT_HTTP_ENABLED and is_server_up("localhost", WILDFLY_MANAGEMENT_PORT):
+        client = WildFlyManagementClient(timeout=15)
+        if client.has_credentials:
+            result = client.shutdown()
+            if client.succeeded(result):
+                # Aguardar a liberação da porta HTTP em vez de um intervalo fixo
+                if wait_for_port_closed(WILDFLY_PORT, timeout=20):
+                    log("Servidor WildFly parado com sucesso (API de gerenciamento)", "SUCCESS")
+                    return True
+                log(f"Shutdown aceito pela API de gerenciamento, mas a porta {WILDFLY_PORT} segue aberta após 20s; usando jboss-cli", "WARNING")
+            else:
+                log(f"Shutdown via API de gerenciamento não concluído: {client.failure(result)}; usando jboss-cli", "WARNING")
     
     try:
         if platform.system() == "Windows":
@@ -4355,8 +6359,10 @@ def stop_wildfly_server():
             cmd = [os.path.join(WILDFLY_DIR, "bin", "jboss-cli.sh"), "--connect", "--command=:shutdown"]
             subprocess.run(cmd, shell=True, check=False)
         
-        # Aguardar o servidor parar
-        time.sleep(5)
+        # Aguardar o servidor parar: quem chama inicia o próximo servidor logo em seguida
+        if not wait_for_port_closed(WILDFLY_PORT, timeout=20):
+            log(f"WildFly não parou: a porta {WILDFLY_PORT} continua aberta", "ERROR")
+            return False
         log("Servidor WildFly parado com sucesso", "SUCCESS")
         return True
     except Exception as e:
@@ -4382,13 +6388,554 @@ def stop_all_servers():
     
     return tomcat_stopped and wildfly_stopped
 
+def _run_pedido_sql(sql: str, params: tuple = (), database: str | None = None) -> tuple[bool, object]:
+    """Executa um comando SQL no banco da aplicação, ou em `database` (pool dbpool; sem psycopg2, psql no contêiner).
+
+    Retorna (ok, valor): a primeira coluna da primeira linha em SELECT, ou o rowcount.
+    """
+    if dbpool.available():
+        def run(cur):
+            cur.execute(sql, params)
+            if cur.description is not None:
+                row = cur.fetchone()
+                return row[0] if row else None
+            return cur.rowcount
+        try:
+            # Limpezas em massa (DELETE em cascata) podem passar do statement_timeout padrão
+            target = dbpool.get_database(dict(app_database().config, name=database)) if database else app_database()
+            return True, target.run(run, statement_timeout_ms=0)
+        except Exception as e:
+            return False, str(e)
+    db = load_db_config_from_compose()
+    # Fallback: psql dentro do contêiner (parâmetros literais escapados)
+    literal = sql
+    for value in params:
+        literal = literal.replace("%s", "'" + str(value).replace("'", "''") + "'", 1)
+    try:
+        proc = subprocess.run(
+            ["docker", "exec", "meu-app-postgres", "psql", "-U", db["user"], "-d", database or db["name"], "-tAc", literal],
+            capture_output=True, text=True, timeout=120,
+        )
+    except Exception as e:
+        return False, str(e)
+    if proc.returncode != 0:
+        return False, (proc.stderr or proc.stdout).strip()
+    out = proc.stdout.strip()
+    if out.startswith("DELETE "):
+        return True, int(out.split()[-1])
+    return True, out.splitlines()[0] if out else None
+
+
+def count_pedidos(database: str | None = None) -> int | None:
+    ok, value = _run_pedido_sql("SELECT count(*) FROM pedido", database=database)
+    try:
+        return int(value) if ok else None
+    except (TypeError, ValueError):
+        return None
+
+
+_VOLUME_PEDIDO_INDEX_CHECKED = False
+
+def ensure_volume_pedido_index() -> None:
+    """
+    Garante idx_volume_pedido (migração V1_4) em bancos criados antes dela: sem o índice, o ON DELETE
+    CASCADE varre a tabela volume para cada pedido removido. Verificado uma vez por processo.
+    """
+    global _VOLUME_PEDIDO_INDEX_CHECKED
+    if _VOLUME_PEDIDO_INDEX_CHECKED:
+        return
+    _VOLUME_PEDIDO_INDEX_CHECKED = True
+    ok, exists = _run_pedido_sql("SELECT to_regclass('idx_volume_pedido') IS NOT NULL")
+    if not ok or exists in (True, "t"):
+        return
+    log("Criando idx_volume_pedido (volume.pedido_id) para a remoção em cascata...", "INFO")
+    ok, value = _run_pedido_sql("CREATE INDEX IF NOT EXISTS idx_volume_pedido ON volume(pedido_id)")
+    if not ok:
+        log(f"Não foi possível criar idx_volume_pedido: {value}", "WARNING")
+
+
+def delete_pedidos_by_prefix(prefix: str) -> int | None:
+    """Remove, num único DELETE, os pedidos cujo código começa com `prefix` (volumes e eventos em cascata)."""
+    # '%' e '_' são curingas no LIKE: um prefixo com eles apagaria mais do que a execução
+    if not prefix or any(c in prefix for c in "%_\\"):
+        raise ValueError(f"Prefixo de limpeza inválido: {prefix!r}")
+    ensure_volume_pedido_index()
+    ok, value = _run_pedido_sql("DELETE FROM pedido WHERE codigo LIKE %s", (prefix + "%",))
+    if not ok:
+        log(f"Falha na limpeza dos pedidos {prefix}*: {value}", "WARNING")
+        return None
+    return int(value)
+
+
+def build_loadtest_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py loadtest",
+        description="Carga HTTP (asyncio) sobre /api/pedidos: criar, listar com filtros, ready e pickup")
+    parser.add_argument("--scenario", choices=["mix", "lifecycle"], default="mix", help="mix: operações sorteadas por peso (padrão); lifecycle: ciclo completo criar → pronto → retirado → consulta por pedido, com latência por transição")
+    parser.add_argument("--server", choices=["tomcat", "wildfly"], default="tomcat", help="Servidor alvo (define porta e contexto). Padrão: tomcat")
+    parser.add_argument("--base-url", dest="base_url", help="URL base da aplicação (ex.: http://localhost:9090/caracore-hub/); sobrepõe a detecção pelo WAR")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed", help="closed: N usuários virtuais; open: taxa fixa de chegadas. Padrão: closed")
+    parser.add_argument("--users", type=int, default=16, help="Usuários virtuais no modo closed (padrão: 16)")
+    parser.add_argument("--rate", type=float, default=50.0, help="Requisições por segundo no modo open (padrão: 50)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração da medição em segundos (padrão: 30)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Aquecimento em segundos, descartado do resultado (padrão: 5)")
+    parser.add_argument("--connections", type=int, default=32, help="Tamanho do pool de conexões keep-alive (padrão: 32)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout por requisição em segundos (padrão: 10)")
+    parser.add_argument("--think-time", dest="think_time", type=float, default=0.0, help="Pausa entre requisições de cada usuário no modo closed (s)")
+    parser.add_argument("--mix", help="Pesos das operações, ex.: create=4,list=3,ready=2,pickup=1")
+    parser.add_argument("--seed", type=int, help="Semente do sorteio das operações (reprodutibilidade)")
+    parser.add_argument("--pedidos", type=int, default=2000, help="Pedidos levados pelo ciclo completo no cenário lifecycle (padrão: 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Ciclos simultâneos no cenário lifecycle (padrão: 32)")
+    parser.add_argument("--keep-data", dest="keep_data", action="store_true", help="Não remover os pedidos LOAD-* criados pela carga")
+    parser.add_argument("--jvm-flags", dest="jvm_flags", help="Flags da JVM do servidor, registradas com o resultado (padrão: APP_BENCH_JVM_FLAGS ou as flags -X/-XX da linha de comando do processo em execução; sem o processo, CATALINA_OPTS/JAVA_OPTS)")
+    parser.add_argument("--dataset-size", dest="dataset_size", type=int, help="Tamanho do conjunto de dados registrado (padrão: pedidos na tabela antes da carga)")
+    parser.add_argument("--results-dir", dest="results_dir", default=BENCH_RESULTS_DIR, help="Diretório dos resultados (padrão: bench-results/ ou APP_BENCH_RESULTS_DIR)")
+    parser.add_argument("--no-save", dest="no_save", action="store_true", help="Não gravar o resultado")
+    parser.add_argument("--max-error-rate", dest="max_error_rate", type=float, default=BENCH_MAX_ERROR_RATE, help="Taxa de erros máxima (fração) para a carga ser considerada bem-sucedida (padrão: 0.01 ou APP_BENCH_MAX_ERROR_RATE)")
+    parser.add_argument("--from-snapshot", dest="from_snapshot", metavar="NOME", help="Mede num clone do snapshot NOME (<banco>__bench), com o servidor reiniciado sobre ele; o banco da aplicação não é alterado")
+    return parser
+
+
+def _default_jvm_flags(server: str, pid: int | None = None) -> str:
+    explicit = os.environ.get("APP_BENCH_JVM_FLAGS")
+    if explicit is not None:
+        return explicit
+    # As flags efetivas estão na linha de comando da JVM; o ambiente deste processo pode não ser
+    # o mesmo com que o servidor foi iniciado
+    cmdline = procstats.process_cmdline(pid) if pid else None
+    if cmdline:
+        return " ".join(procstats.jvm_options(cmdline))
+    if server == "tomcat":
+        return " ".join(filter(None, [os.environ.get("JAVA_OPTS", ""), os.environ.get("CATALINA_OPTS", "")]))
+    return os.environ.get("JAVA_OPTS", "")
+
+
+def _local_server_pid(args) -> int | None:
+    """PID do servidor local medido (None quando a carga vai para uma --base-url)."""
+    if args.base_url:
+        return None
+    return procstats.find_listening_pid(TOMCAT_PORT if args.server == "tomcat" else WILDFLY_PORT)
+
+
+def run_loadtest_command(argv: list[str]) -> int:
+    """Subcomando `main.py loadtest`: executa a carga e exibe vazão, erros e percentis."""
+    args = build_loadtest_parser().parse_args(argv)
+    base_url = args.base_url or resolve_app_base_url(args.server)
+    if not base_url.endswith("/"):
+        base_url += "/"
+    if not args.from_snapshot:
+        return _measure_load(args, base_url)
+    # Com snapshot a carga roda num clone (<banco>__bench): o servidor reinicia apontando para ele
+    # e, ao final, volta ao banco da aplicação, que não é alterado pela medição
+    if args.base_url:
+        log("--from-snapshot reinicia o servidor local e não pode ser combinado com --base-url.", "ERROR")
+        return 2
+    war_path = find_built_war()
+    if not war_path:
+        log("Nenhum WAR encontrado para reiniciar o servidor sobre o clone. Gere o build antes.", "ERROR")
+        return 2
+    bench_db = bench_database_name()
+    was_running = is_server_up("localhost", TOMCAT_PORT if args.server == "tomcat" else WILDFLY_PORT)
+    _stop_server(args.server)
+    try:
+        if not clone_db_snapshot(args.from_snapshot, bench_db) or not point_datasource(args.server, bench_db):
+            return 2
+        log(f"[{args.server}] reiniciando sobre o banco {bench_db}...", "INFO")
+        ready, elapsed, _ = _deploy_and_wait(args.server, war_path)
+        if not ready:
+            log(f"[{args.server}] aplicação não ficou pronta em {elapsed:.0f}s sobre {bench_db}.", "ERROR")
+            return 2
+        return _measure_load(args, base_url, database=bench_db)
+    finally:
+        release_bench_database([args.server], bench_db)
+        if was_running:
+            log(f"[{args.server}] reiniciando sobre o banco da aplicação...", "INFO")
+            _deploy_and_wait(args.server, war_path)
+
+
+def _measure_load(args, base_url: str, database: str | None = None) -> int:
+    api_base = urljoin(base_url, "api/")
+    health_url = urljoin(api_base, "health/ready")
+    log(f"Alvo da carga: {api_base} ({args.server})", "INFO")
+    if not wait_for_url(health_url, timeout=15):
+        log(f"Aplicação não está pronta em {health_url}. Faça o deploy (opção 2 ou 4) antes da carga.", "ERROR")
+        return 2
+    baseline = count_pedidos(database)
+    dataset_size = args.dataset_size if args.dataset_size is not None else baseline
+    try:
+        if args.scenario == "lifecycle":
+            log(f"Cenário lifecycle: {args.pedidos} pedidos, {args.concurrency} simultâneos"
+                + (f" (tabela com {baseline} pedidos)" if baseline is not None else ""), "INFO")
+            with tracing.span("loadtest_lifecycle", cat="bench", pedidos=args.pedidos):
+                result, workload = loadgen.run_lifecycle(
+                    api_base, pedidos=args.pedidos, concurrency=args.concurrency,
+                    connections=max(args.connections, args.concurrency), timeout=args.timeout,
+                    table_baseline=baseline or 0,
+                    on_progress=lambda done, total: log(f"Ciclo de vida: {done}/{total} pedidos", "INFO"),
+                )
+            attempted = result.completed + result.failed
+            error_rate = result.failed / attempted if attempted else 1.0
+        else:
+            mix = loadgen.parse_mix(args.mix)
+            with tracing.span("loadtest", cat="bench", mode=args.mode):
+                result, workload = loadgen.run_load(
+                    api_base, mode=args.mode, duration=args.duration, warmup=args.warmup,
+                    users=args.users, rate=args.rate, connections=args.connections, timeout=args.timeout,
+                    mix=mix, think_time=args.think_time, seed=args.seed,
+                    on_phase=lambda phase: log(f"Carga: {phase}...", "INFO"),
+                )
+            total = result.total
+            error_rate = total.errors / (total.ok + total.errors) if total.ok + total.errors else 1.0
+    except ValueError as e:
+        log(f"Parâmetros de carga inválidos: {e}", "ERROR")
+        return 2
+    for line in result.summary_lines():
+        log(line, "INFO")
+    succeeded = error_rate <= args.max_error_rate
+    if not succeeded:
+        log(f"Taxa de erros {error_rate * 100:.2f}% acima do máximo de {args.max_error_rate * 100:g}%", "ERROR")
+    if not args.no_save:
+        try:
+            meta = bench_store.build_meta(
+                WORKSPACE_DIR, args.server, args.scenario,
+                args.jvm_flags if args.jvm_flags is not None else _default_jvm_flags(args.server, _local_server_pid(args)),
+                dataset_size, base_url=base_url, war=os.path.basename(find_built_war() or "") or None,
+                snapshot=args.from_snapshot,
+            )
+            saved = bench_store.save_run(args.results_dir, meta, result.to_dict())
+            log(f"Resultado gravado: {saved} (compare com: python main.py compare {saved})", "INFO")
+        except Exception as e:
+            log(f"Não foi possível gravar o resultado do benchmark: {e}", "WARNING")
+    created = len(workload.created_codes)
+    if database:
+        log(f"Pedidos criados pela carga descartados com o banco {database}", "INFO")
+    elif created and not args.keep_data:
+        with tracing.span("loadtest_cleanup", cat="bench"):
+            started = time.perf_counter()
+            removed = delete_pedidos_by_prefix(workload.code_prefix)
+        if removed is not None:
+            log(f"Limpeza: {removed} pedido(s) {workload.code_prefix}* removidos em um DELETE ({time.perf_counter() - started:.2f}s)", "INFO")
+    elif created:
+        log(f"Pedidos criados pela carga mantidos: prefixo {workload.code_prefix} ({created} no total)", "INFO")
+    return 0 if succeeded else 1
+
+
+def build_compare_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py compare",
+        description="Compara uma execução de benchmark com a referência e falha (código 1) se p95/p99, a vazão ou a taxa de erros regredirem além do limite")
+    parser.add_argument("candidate", nargs="?", default="latest", help="Execução candidata: arquivo JSON, 'latest' (padrão) ou prefixo de commit")
+    parser.add_argument("--baseline", help="Referência: arquivo JSON, 'latest' ou prefixo de commit. Padrão: execução anterior mais recente com mesmo servidor, cenário, flags da JVM e dataset de tamanho semelhante, de outro commit")
+    parser.add_argument("--server", choices=["tomcat", "wildfly"], help="Considerar apenas execuções deste servidor")
+    parser.add_argument("--scenario", choices=["mix", "lifecycle"], help="Considerar apenas execuções deste cenário")
+    parser.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD, help="Limite de regressão em %% para latência e vazão (padrão: 10 ou APP_BENCH_THRESHOLD)")
+    parser.add_argument("--latency-threshold", dest="latency_threshold", type=float, help="Limite específico para p95/p99 (%%)")
+    parser.add_argument("--throughput-threshold", dest="throughput_threshold", type=float, help="Limite específico para a vazão (%%)")
+    parser.add_argument("--error-threshold", dest="error_threshold", type=float, default=bench_store.DEFAULT_ERROR_RATE_THRESHOLD, help="Aumento absoluto máximo da taxa de erros, em fração (padrão: 0.01 = 1 p.p.)")
+    parser.add_argument("--any-dataset", dest="any_dataset", action="store_true", help="Na referência automática, aceitar qualquer tamanho de dataset (padrão: ±5%%)")
+    parser.add_argument("--results-dir", dest="results_dir", default=BENCH_RESULTS_DIR, help="Diretório dos resultados (padrão: bench-results/ ou APP_BENCH_RESULTS_DIR)")
+    return parser
+
+
+def run_compare_command(argv: list[str]) -> int:
+    """Subcomando `main.py compare`: 0 sem regressão, 1 com regressão, 2 se faltar execução."""
+    args = build_compare_parser().parse_args(argv)
+    filters = {"server": args.server, "scenario": args.scenario}
+    candidate = bench_store.select_run(args.results_dir, args.candidate, **filters)
+    if candidate is None:
+        log(f"Nenhuma execução encontrada para '{args.candidate}' em {args.results_dir}", "ERROR")
+        return 2
+    if args.baseline:
+        baseline = bench_store.select_run(args.results_dir, args.baseline, exclude=candidate["path"], **filters)
+    else:
+        baseline = bench_store.find_baseline(args.results_dir, candidate, match_dataset=not args.any_dataset)
+    if baseline is None:
+        log("Nenhuma execução de referência encontrada para a comparação.", "ERROR")
+        return 2
+    comparison = bench_store.compare_runs(
+        baseline, candidate,
+        latency_threshold_pct=args.latency_threshold if args.latency_threshold is not None else args.threshold,
+        throughput_threshold_pct=args.throughput_threshold if args.throughput_threshold is not None else args.threshold,
+        error_rate_threshold=args.error_threshold,
+    )
+    regressions = comparison.regressions
+    for line in bench_store.format_comparison(comparison):
+        log(line, "ERROR" if "REGRESSÃO" in line else "INFO")
+    if regressions:
+        log(f"Gate de desempenho: REPROVADO ({len(regressions)} regressão(ões))", "ERROR")
+        return 1
+    log("Gate de desempenho: aprovado", "SUCCESS")
+    return 0
+
+
+def build_compare_servers_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py compare-servers",
+        description="Implanta o mesmo WAR no Tomcat e no WildFly, aquece, aplica a mesma carga a cada um e gera um relatório comparativo")
+    parser.add_argument("--war", help="WAR a implantar (padrão: build novo de caracore-hub)")
+    parser.add_argument("--skip-build", dest="skip_build", action="store_true", help="Usar o WAR já existente em target/ sem novo build")
+    parser.add_argument("--servers", default="tomcat,wildfly", help="Ordem dos servidores (padrão: tomcat,wildfly)")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed", help="Modo de carga (ver main.py loadtest). Padrão: closed")
+    parser.add_argument("--users", type=int, default=16, help="Usuários virtuais no modo closed (padrão: 16)")
+    parser.add_argument("--rate", type=float, default=50.0, help="Requisições por segundo no modo open (padrão: 50)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Duração da medição por servidor em segundos (padrão: 60)")
+    parser.add_argument("--warmup", type=float, default=20.0, help="Aquecimento (JIT, pools) por servidor em segundos (padrão: 20)")
+    parser.add_argument("--connections", type=int, default=32, help="Conexões keep-alive do gerador (padrão: 32)")
+    parser.add_argument("--mix", help="Pesos das operações, ex.: create=4,list=3,ready=2,pickup=1")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do sorteio (a mesma sequência para os dois servidores; padrão: 42)")
+    parser.add_argument("--pin", help="Mantém os dois servidores ativos, cada um fixado nas próprias CPUs desde o início, ex.: tomcat=0-3,wildfly=4-7 (listas com ';': tomcat=0;2). O gerador de carga usa loadgen=... ou as CPUs restantes. Sem esta opção, o servidor fora de teste é parado")
+    parser.add_argument("--keep-running", dest="keep_running", action="store_true", help="Não parar os servidores ao final")
+    parser.add_argument("--from-snapshot", dest="from_snapshot", metavar="NOME", help="Cada servidor mede num clone novo do snapshot NOME (<banco>__bench): dados idênticos, banco da aplicação intacto")
+    parser.add_argument("--results-dir", dest="results_dir", default=BENCH_RESULTS_DIR, help="Diretório dos resultados (padrão: bench-results/ ou APP_BENCH_RESULTS_DIR)")
+    return parser
+
+
+def _stop_server(server: str) -> bool:
+    """Para o servidor e aguarda a porta HTTP liberar. False se ela continuar ocupada."""
+    if server == "tomcat":
+        if not is_server_up("localhost", TOMCAT_PORT):
+            return True
+        stop_tomcat_server()
+        port = TOMCAT_PORT
+    elif is_server_up("localhost", WILDFLY_PORT) or is_server_up("localhost", WILDFLY_MANAGEMENT_PORT):
+        if stop_wildfly_server():
+            return True
+        port = WILDFLY_PORT
+    else:
+        return True
+    if wait_for_port_closed(port, timeout=30):
+        return True
+    log(f"[{server}] porta {port} ainda ocupada após a parada; o próximo início pode falhar", "WARNING")
+    return False
+
+
+def _deploy_and_wait(server: str, war_path: str, timeout: int = 180) -> tuple[bool, float, str]:
+    """Implanta o WAR (iniciando o servidor) e mede o tempo até /api/health/ready responder."""
+    started = time.perf_counter()
+    with tracing.span(f"deploy_{server}", cat="bench"):
+        deployed = deploy_tomcat_war_quick(war_path) if server == "tomcat" else deploy_wildfly_war_quick(war_path)
+        base_url = resolve_app_base_url(server)
+        ready = deployed and wait_for_url(urljoin(base_url, "api/health/ready"), timeout=timeout)
+    return bool(ready), time.perf_counter() - started, base_url
+
+
+def _mb(value) -> str:
+    return f"{value / (1024 * 1024):.0f} MB" if value else "n/d"
+
+
+def format_server_comparison(entries: dict) -> list[str]:
+    """Tabela lado a lado (uma coluna por servidor) com vazão, percentis, deploy e memória."""
+    names = list(entries)
+
+    def row(label, values):
+        return f"{label:<28}" + "".join(f"{v:>16}" for v in values)
+
+    def lat(entry, key):
+        value = (entry.get("result") or {}).get("latency_ms", {}).get(key)
+        return f"{value:.2f} ms" if value is not None else "n/d"
+
+    lines = [row("", names)]
+    lines.append(row("início + deploy até pronto", [f"{entries[n]['startup_deploy_s']:.1f} s" if entries[n].get("startup_deploy_s") is not None else "n/d" for n in names]))
+    lines.append(row("vazão", [f"{entries[n]['result']['throughput_rps']:.1f} req/s" if entries[n].get("result") else "n/d" for n in names]))
+    lines.append(row("taxa de erros", [f"{entries[n]['result']['error_rate'] * 100:.2f}%" if entries[n].get("result") else "n/d" for n in names]))
+    for key, label in (("p50", "p50"), ("p90", "p90"), ("p95", "p95"), ("p99", "p99"), ("p99_9", "p99.9"), ("max", "máx")):
+        lines.append(row(f"latência {label}", [lat(entries[n], key) for n in names]))
+    lines.append(row("RSS após o deploy", [_mb(entries[n].get("rss_idle")) for n in names]))
+    lines.append(row("RSS pico sob carga", [_mb(entries[n].get("rss_peak")) for n in names]))
+    lines.append(row("RSS médio sob carga", [_mb(entries[n].get("rss_mean")) for n in names]))
+    measured = [n for n in names if entries[n].get("result")]
+    if len(measured) == 2:
+        a, b = measured
+        ta, tb = entries[a]["result"]["throughput_rps"], entries[b]["result"]["throughput_rps"]
+        if ta and tb:
+            faster = a if ta >= tb else b
+            lines.append(f"Maior vazão: {faster} ({max(ta, tb) / min(ta, tb):.2f}× a do outro servidor)")
+        pa = entries[a]["result"]["latency_ms"].get("p99")
+        pb = entries[b]["result"]["latency_ms"].get("p99")
+        if pa and pb:
+            lines.append(f"Menor p99: {a if pa <= pb else b} ({pa:.2f} ms × {pb:.2f} ms)")
+    return lines
+
+
+def run_compare_servers_command(argv: list[str]) -> int:
+    """Subcomando `main.py compare-servers`: mesmo WAR e mesma carga no Tomcat e no WildFly."""
+    args = build_compare_servers_parser().parse_args(argv)
+    servers = [s.strip().lower() for s in args.servers.split(",") if s.strip()]
+    if not servers or any(s not in ("tomcat", "wildfly") for s in servers):
+        log(f"Servidores inválidos: {args.servers} (use tomcat e/ou wildfly)", "ERROR")
+        return 2
+    pins = {}
+    if args.pin:
+        for part in args.pin.split(","):
+            name, _, cpus = part.partition("=")
+            if (name.strip() in servers or name.strip() == "loadgen") and cpus:
+                pins[name.strip()] = procstats.parse_cpu_list(cpus.replace(";", ","))
+    # O gerador de carga (este processo) fica fora das CPUs dos servidores: loadgen=... ou as restantes
+    loadgen_cpus = pins.pop("loadgen", None)
+    if pins and loadgen_cpus is None:
+        taken = {cpu for cpus in pins.values() for cpu in cpus}
+        loadgen_cpus = [cpu for cpu in (procstats.cpu_affinity() or []) if cpu not in taken] or None
+        if loadgen_cpus is None:
+            log("Nenhuma CPU livre para o gerador de carga; ele disputa CPU com os servidores.", "WARNING")
+    try:
+        mix = loadgen.parse_mix(args.mix)
+    except ValueError as e:
+        log(f"Parâmetros de carga inválidos: {e}", "ERROR")
+        return 2
+
+    # 1) Um único WAR para os dois servidores
+    war_path = args.war
+    if not war_path:
+        if not args.skip_build:
+            res = execute_maven_command("clean package", additional_params="-DskipTests")
+            if not res.get("success"):
+                log("Build falhou; comparação cancelada.", "ERROR")
+                return 1
+        war_path = find_built_war()
+    if not war_path or not os.path.isfile(war_path):
+        log("Nenhum WAR disponível para a comparação.", "ERROR")
+        return 1
+    log(f"WAR da comparação: {war_path}", "INFO")
+
+    # 2) Banco e datasources
+    if not ensure_docker_db_up():
+        log("Banco de dados indisponível; comparação cancelada.", "ERROR")
+        return 1
+    if "tomcat" in servers:
+        configure_tomcat_postgres_datasource()
+    if "wildfly" in servers:
+        configure_wildfly_postgres_datasource()
+
+    run_id = time.strftime("%Y%m%d%H%M%S")
+    entries: dict = {}
+    dataset_size = None
+    # Com snapshot, cada servidor mede num clone novo (<banco>__bench); o banco da aplicação não muda
+    bench_db = bench_database_name() if args.from_snapshot else None
+    for index, server in enumerate(servers):
+        entry = entries.setdefault(server, {})
+        # 3) Isolamento: sem --pin, apenas o servidor medido fica ativo. O servidor medido sempre
+        #    parte do zero, para que o tempo de início + deploy seja comparável entre os dois
+        stopped = [_stop_server(other) for other in (("tomcat", "wildfly") if not pins else (server,))]
+        if not all(stopped):
+            log(f"[{server}] servidor anterior não liberou a porta; servidor ignorado na comparação.", "ERROR")
+            continue
+        if bench_db and not (clone_db_snapshot(args.from_snapshot, bench_db) and point_datasource(server, bench_db)):
+            log("Snapshot não clonado; comparação cancelada.", "ERROR")
+            release_bench_database(servers, bench_db)
+            return 1
+        if dataset_size is None:
+            dataset_size = count_pedidos(bench_db)
+        log(f"[{server}] deploy e início...", "INFO")
+        # O servidor herda a afinidade deste processo ao ser lançado: fixado desde o início da JVM
+        with procstats.PinnedAffinity(pins.get(server)) as launch_pin:
+            ready, elapsed, base_url = _deploy_and_wait(server, war_path)
+        entry["startup_deploy_s"] = round(elapsed, 2)
+        entry["base_url"] = base_url
+        if not ready:
+            log(f"[{server}] aplicação não ficou pronta em {elapsed:.0f}s; servidor ignorado na comparação.", "ERROR")
+            continue
+        port = TOMCAT_PORT if server == "tomcat" else WILDFLY_PORT
+        pid = procstats.find_listening_pid(port)
+        entry["pid"] = pid
+        if pins.get(server) and pid:
+            # Reaplicada ao processo encontrado, caso o script de início não tenha repassado a afinidade
+            pinned = procstats.pin_process(pid, pins[server])
+            how = "desde o lançamento" if launch_pin.applied else "após o início"
+            log(f"[{server}] afinidade de CPU {pins[server]}: {how if pinned else 'não suportada neste sistema'}", "INFO")
+        entry["rss_idle"] = procstats.process_rss(pid) if pid else None
+        log(f"[{server}] pronto em {elapsed:.1f}s (PID {pid or 'n/d'}, RSS {_mb(entry['rss_idle'])}); aquecimento {args.warmup:.0f}s + medição {args.duration:.0f}s", "INFO")
+
+        # 4) Mesma carga (mesma semente) em cada servidor; o RSS é amostrado durante a medição
+        api_base = urljoin(base_url, "api/")
+        with tracing.span(f"loadtest_{server}", cat="bench"), procstats.PinnedAffinity(loadgen_cpus):
+            if args.warmup > 0:
+                loadgen.run_load(api_base, mode=args.mode, duration=args.warmup, warmup=0, users=args.users,
+                                 rate=args.rate, connections=args.connections, mix=mix,
+                                 run_id=f"{run_id}W{index}", seed=args.seed)
+            with procstats.RssSampler(pid) as sampler:
+                result, workload = loadgen.run_load(
+                    api_base, mode=args.mode, duration=args.duration, warmup=0, users=args.users,
+                    rate=args.rate, connections=args.connections, mix=mix, run_id=f"{run_id}S{index}", seed=args.seed,
+                )
+        entry["result"] = result.to_dict()
+        entry["rss_peak"] = sampler.peak
+        entry["rss_mean"] = sampler.mean
+        for line in result.summary_lines():
+            log(f"[{server}] {line}", "INFO")
+        if not bench_db:
+            delete_pedidos_by_prefix(f"LOAD-{run_id}W{index}-")
+            delete_pedidos_by_prefix(workload.code_prefix)
+        try:
+            meta = bench_store.build_meta(
+                WORKSPACE_DIR, server, "mix", _default_jvm_flags(server, pid), dataset_size,
+                base_url=base_url, war=os.path.basename(war_path), startup_deploy_s=entry["startup_deploy_s"],
+                rss_idle=entry["rss_idle"], rss_peak=entry["rss_peak"], compare_run=run_id,
+                snapshot=args.from_snapshot,
+            )
+            entry["saved"] = bench_store.save_run(args.results_dir, meta, entry["result"])
+        except Exception as e:
+            log(f"Não foi possível gravar o resultado de {server}: {e}", "WARNING")
+        if not pins and not args.keep_running:
+            _stop_server(server)
+
+    # 5) Relatório único
+    lines = format_server_comparison(entries)
+    log("Comparação Tomcat × WildFly (mesmo WAR, mesma carga):", "INFO")
+    for line in lines:
+        log(line, "INFO")
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"), "war": war_path, "dataset_size": dataset_size,
+        "snapshot": args.from_snapshot,
+        "load": {"mode": args.mode, "users": args.users, "rate": args.rate, "duration": args.duration,
+                 "warmup": args.warmup, "connections": args.connections, "seed": args.seed, "mix": args.mix},
+        "pinned": {**pins, **({"loadgen": loadgen_cpus} if loadgen_cpus else {})}, "servers": entries,
+    }
+    os.makedirs(args.results_dir, exist_ok=True)
+    report_path = os.path.join(args.results_dir, f"servers-compare-{run_id}.json")
+    with open(report_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=1, default=str)
+    text_path = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y_%m_%d_%H%M%S')}_{LOG_BASENAME}_servers_compare.txt")
+    os.makedirs(LOG_DIR, exist_ok=True)
+    with open(text_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+    log(f"Relatório: {report_path} (texto: {text_path})", "SUCCESS")
+    if pins and not args.keep_running:
+        for server in servers:
+            _stop_server(server)
+    if bench_db:
+        release_bench_database(servers, bench_db, stop=not args.keep_running)
+    return 0 if all(e.get("result") for e in entries.values()) else 1
+
+
+SUBCOMMANDS = {
+    "loadtest": run_loadtest_command,
+    "compare": run_compare_command,
+    "compare-servers": run_compare_servers_command,
+    "seed": run_seed_command,
+    "snapshot": run_snapshot_command,
+    "queryplan": run_queryplan_command,
+}
+
+
 def main():
     """Função principal que exibe o menu simplificado e processa as opções."""
-    global CURRENT_SERVER
+    global CURRENT_SERVER, BUILD_CACHE_ENABLED, INCREMENTAL_BUILD_ENABLED, PARALLEL_BUILD_THREADS
+    global TOMCAT_DEPLOY_MODE
+    # Reexecução na venv e leitura da opção só na execução do script, nunca ao importar o módulo
+    _reexec_in_venv()
+    # Inferir antes de validar ambiente (para evitar prompts)
+    _infer_preselected_option_from_argv()
+    # Validar ambiente Python antes de prosseguir
+    validate_python_environment()
+    startup_mark("ambiente Python validado")
+    # Subcomandos com argumentos próprios (ex.: `main.py loadtest --mode open --rate 100`)
+    if len(sys.argv) >= 2 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
     # Parser de argumentos para overrides
     parser = build_arg_parser()
     # Ignorar argv[0]
     args, unknown = parser.parse_known_args()
+    startup_mark("argumentos processados")
     if unknown:
         log(f"Argumentos desconhecidos ignorados: {' '.join(unknown)}", "WARNING")
 
@@ -4441,6 +6988,26 @@ def main():
 
     log(f"Modo configurado para iniciar WildFly: {wildfly_run_mode}", "INFO")
 
+    if getattr(args, "no_build_cache", False):
+        BUILD_CACHE_ENABLED = False
+    if getattr(args, "incremental", False):
+        INCREMENTAL_BUILD_ENABLED = True
+    if INCREMENTAL_BUILD_ENABLED:
+        log("Build incremental por módulo ativado (target/ preservado entre builds)", "INFO")
+    if getattr(args, "parallel_build", None):
+        PARALLEL_BUILD_THREADS = args.parallel_build
+    if PARALLEL_BUILD_THREADS:
+        threads = maven_reactor.parallel_thread_count(None if PARALLEL_BUILD_THREADS == "auto" else PARALLEL_BUILD_THREADS)
+        log(f"Build paralelo do reactor ativado: -T {threads}", "INFO")
+    if getattr(args, "tomcat_deploy_mode", None):
+        TOMCAT_DEPLOY_MODE = args.tomcat_deploy_mode
+    if TOMCAT_DEPLOY_MODE not in {"cold", "delta", "manager"}:
+        log(f"Valor inválido para APP_TOMCAT_DEPLOY_MODE: {TOMCAT_DEPLOY_MODE}. Usando padrão 'cold'.", "WARNING")
+        TOMCAT_DEPLOY_MODE = "cold"
+    log(f"Modo de deploy no Tomcat: {TOMCAT_DEPLOY_MODE}", "INFO")
+    # Estado do mvnd e do cache de build só é consultado pelas opções que fazem build
+    startup_mark("configuração da CLI aplicada")
+
     # Se for apenas checar ambiente e sair
     if getattr(args, 'only_check', False):
         log("--only-check detectado: verificando ambiente e saindo...", "INFO")
@@ -4452,10 +7019,10 @@ def main():
     if cli_option is not None:
         log(f"Executando em modo não interativo com opção: {cli_option}", "INFO")
     
-    # Variáveis para controlar os servidores em execução
-    tomcat_process = None
+    # Processo do WildFly iniciado pelo menu
     wildfly_process = None
     
+    startup_mark("pronto para executar a opção")
     # Banner de inicialização
     print(f"{Colors.HEADER}{'=' * 80}{Colors.END}")
     print(f"{Colors.HEADER}{'Gerenciador de Deploy Java':^80}{Colors.END}")
@@ -4498,191 +7065,47 @@ def main():
         
         elif option == "2":
             log("Iniciando processo de deploy no Tomcat...", "INFO")
-            
-            # Verificar ambiente básico antes de prosseguir
-            log("Verificando requisitos mínimos...", "INFO")
-            java_installed, _ = check_java_installed()
-            maven_installed, _, maven_cmd = check_maven_installed()
-            
-            if not java_installed or not maven_installed:
-                log("Requisitos mínimos não atendidos. Verifique o ambiente primeiro (opção 1).", "ERROR")
+
+            # Etapas independentes (build, PostgreSQL, porta/datasource/ambiente do Tomcat) rodam em paralelo
+            result = run_tomcat_deploy_pipeline(tomcat_run_mode)
+            if result.records["requisitos"].status != pipeline.OK or result.records["build"].status != pipeline.OK:
                 if not NON_INTERACTIVE:
                     input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
                 continue
-            
-            MAVEN_CMD = maven_cmd
-            
-            # Verificar se o Tomcat está em execução
-            tomcat_running = check_server_running(TOMCAT_PORT)
-            if tomcat_running:
-                log(f"Servidor Tomcat está em execução na porta {TOMCAT_PORT}", "WARNING")
-                log("O Tomcat não permite deploy a quente. O servidor será parado, feito undeploy e reiniciado.", "WARNING")
-                # Proceder automaticamente com o deploy sem solicitar confirmação
-                should_continue = "S"
-                log("Continuando automaticamente com o deploy...", "INFO")
+
+            if not os.path.exists(TOMCAT_DIR):
+                log(f"Tomcat não encontrado em: {TOMCAT_DIR}", "ERROR")
+                log("Instale o Tomcat ou corrija o caminho no script.", "ERROR")
             else:
-                log(f"Servidor Tomcat não está em execução na porta {TOMCAT_PORT}", "INFO")
-                log("O servidor será iniciado após o deploy.", "INFO")
-            
-            # Compilar e empacotar o projeto
-            log("Compilando e empacotando o projeto para Tomcat...", "INFO")
-            mvn_result = execute_maven_command("clean package", "tomcat", "-DskipTests")
-            
-            if not mvn_result["success"]:
-                log("Falha na compilação do projeto. Verifique os erros acima.", "ERROR")
-                input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
-                continue
-            
-            # Verificar se o WAR foi gerado
-            war_files = []
-            target_dir = os.path.join(PROJECT_DIR, "target")
-            if os.path.exists(target_dir):
-                war_files = [f for f in os.listdir(target_dir) if f.endswith(".war")]
-            
-            if not war_files:
-                log("Nenhum arquivo WAR encontrado em target/. Procurando em outros diretórios...", "WARNING")
-                
-                # Verificar em diretórios alternativos (por exemplo, diretório atual ou diretório raiz do projeto)
-                if os.path.exists(PROJECT_DIR):
-                    alt_war_files = [f for f in os.listdir(PROJECT_DIR) if f.endswith(".war")]
-                    if alt_war_files:
-                        war_files = alt_war_files
-                        target_dir = PROJECT_DIR
-                        log(f"Arquivo WAR encontrado no diretório do projeto: {os.path.join(target_dir, war_files[0])}", "INFO")
-                
-                if not war_files:
-                    log("Nenhum arquivo WAR encontrado. Falha no processo de deploy para Tomcat.", "ERROR")
+                hot = result.value("deploy_quente")
+                if hot:
+                    if hot["mode"] == "manager":
+                        print(f"\n{Colors.GREEN}DEPLOY A QUENTE NO TOMCAT CONCLUÍDO: http://localhost:{TOMCAT_PORT}/caracore-hub/{Colors.END}")
+                        log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/", "SUCCESS")
+                    elif hot["ok"]:
+                        print(f"\n{Colors.GREEN}DELTA DEPLOY NO TOMCAT CONCLUÍDO: http://localhost:{TOMCAT_PORT}/caracore-hub/{Colors.END}")
+                        log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/", "SUCCESS")
+                    else:
+                        log("Delta deploy falhou. Use --tomcat-deploy-mode cold para o deploy completo.", "ERROR")
                     if not NON_INTERACTIVE:
                         input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
                     continue
-                    
-            war_file = os.path.join(target_dir, war_files[0])
-            log(f"Arquivo WAR encontrado: {war_file}", "SUCCESS")
-            
-            # Deploy no Tomcat
-            if os.path.exists(TOMCAT_DIR):
-                # Configurar a porta do Tomcat antes de iniciar
-                log(f"Configurando Tomcat para usar a porta {TOMCAT_PORT}...", "INFO")
-                configure_tomcat_port(TOMCAT_DIR, TOMCAT_PORT)
-
-                # Garantir datasource PostgreSQL no Tomcat
-                log("Verificando/Configurando datasource PostgreSQL no Tomcat...", "INFO")
-                if configure_tomcat_postgres_datasource():
-                    log("Datasource PostgreSQL pronto no Tomcat.", "SUCCESS")
-                else:
-                    log("Não foi possível garantir o datasource PostgreSQL no Tomcat.", "WARNING")
-                tomcat_env = setup_tomcat_environment(TOMCAT_DIR)
-                
-                tomcat_webapps = os.path.join(TOMCAT_DIR, "webapps")
-                if not os.path.exists(tomcat_webapps):
-                    os.makedirs(tomcat_webapps)
-                
-                # Verificar se o Tomcat está em execução para fazer undeploy
-                tomcat_running = check_server_running(TOMCAT_PORT)
-                if tomcat_running:
-                    log("Tomcat está em execução. Realizando undeploy...", "INFO")
-                    
-                    # Parar o Tomcat para undeploy
-                    print(f"\n{Colors.YELLOW}Parando o servidor Tomcat para undeploy, aguarde...{Colors.END}")
-                    if platform.system() == "Windows":
-                        try:
-                            subprocess.run([os.path.join(TOMCAT_DIR, "bin", "shutdown.bat")], shell=True, env=tomcat_env)
-                            log("Comando de parada do Tomcat executado com sucesso", "SUCCESS")
-                            print(f"{Colors.YELLOW}Aguardando o servidor parar (10 segundos)...{Colors.END}")
-                            time.sleep(10)
-                        except Exception as e:
-                            log(f"Erro ao parar o Tomcat: {str(e)}", "ERROR")
-                    else:
-                        try:
-                            subprocess.run([os.path.join(TOMCAT_DIR, "bin", "shutdown.sh")], shell=True, env=tomcat_env)
-                            log("Comando de parada do Tomcat executado com sucesso", "SUCCESS")
-                            print(f"{Colors.YELLOW}Aguardando o servidor parar (10 segundos)...{Colors.END}")
-                            time.sleep(10)
-                        except Exception as e:
-                            log(f"Erro ao parar o Tomcat: {str(e)}", "ERROR")
-                else:
-                    log("Tomcat não está em execução. Prosseguindo com a limpeza do diretório webapps...", "INFO")
-                
-                # Limpar deployments anteriores (mesmo se o servidor não estiver rodando)
-                log("Limpando deployments anteriores...", "INFO")
-                for item in ["caracore-hub", "caracore-hub.war", "ROOT", "ROOT.war"]:
-                    item_path = os.path.join(tomcat_webapps, item)
-                    if os.path.exists(item_path):
-                        if os.path.isdir(item_path):
-                            shutil.rmtree(item_path, ignore_errors=True)
-                            log(f"Diretório {item} removido do Tomcat", "INFO")
-                        else:
-                            os.remove(item_path)
-                            log(f"Arquivo {item} removido do Tomcat", "INFO")
-
-                # Copiar o WAR para o Tomcat
-                war_dest = os.path.join(tomcat_webapps, "caracore-hub.war")
-                shutil.copy2(war_file, war_dest)
-                log(f"Arquivo WAR copiado para Tomcat: {war_dest}", "SUCCESS")
 
-                bin_dir = os.path.join(TOMCAT_DIR, "bin")
+                if result.records["copia_war"].status != pipeline.OK:
+                    log("Deploy no Tomcat não concluído: " + ", ".join(result.failed() + result.blocked()), "ERROR")
+                    if not NON_INTERACTIVE:
+                        input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
+                    continue
                 if tomcat_run_mode == "foreground":
-                    log("Iniciando o Tomcat em foreground (logs no terminal atual)...", "INFO")
-                    tomcat_process = None
-                    try:
-                        if platform.system() == "Windows":
-                            catalina = os.path.join(bin_dir, "catalina.bat")
-                            if not os.path.exists(catalina):
-                                log("catalina.bat não encontrado no Tomcat.", "ERROR")
-                            else:
-                                cmd = f'"{catalina}" run'
-                                tomcat_process = subprocess.Popen(cmd, shell=True, cwd=bin_dir, env=tomcat_env)
-                        else:
-                            catalina = os.path.join(bin_dir, "catalina.sh")
-                            if not os.path.exists(catalina):
-                                log("catalina.sh não encontrado no Tomcat.", "ERROR")
-                            else:
-                                tomcat_process = subprocess.Popen([catalina, "run"], cwd=bin_dir, env=tomcat_env)
-
-                        if tomcat_process:
-                            print(f"{Colors.CYAN}Tomcat em execução no foreground. Pressione Ctrl+C para parar.{Colors.END}")
-                            print(f"{Colors.GREEN}Aplicação: http://localhost:{TOMCAT_PORT}/caracore-hub/{Colors.END}")
-                            log("Tomcat iniciado em foreground; logs sendo exibidos neste terminal.", "SUCCESS")
-                            log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/ (foreground)", "SUCCESS")
-                            tomcat_process.wait()
-                            log("Tomcat finalizado (foreground).", "INFO")
-                    except KeyboardInterrupt:
-                        log("Interrompido pelo usuário. Enviando shutdown ao Tomcat...", "INFO")
-                        try:
-                            if platform.system() == "Windows":
-                                subprocess.run([os.path.join(bin_dir, "shutdown.bat")], shell=True, cwd=bin_dir, env=tomcat_env)
-                            else:
-                                subprocess.run([os.path.join(bin_dir, "shutdown.sh")], cwd=bin_dir, env=tomcat_env)
-                        except Exception:
-                            pass
-                    except Exception as e:
-                        log(f"Erro ao iniciar o Tomcat em foreground: {str(e)}", "ERROR")
+                    run_tomcat_foreground(result.value("ambiente"))
+                elif result.records["inicio"].status != pipeline.OK:
+                    log("WAR copiado, mas o Tomcat não iniciou: verifique logs/catalina.out e use a opção 3 para iniciá-lo.", "ERROR")
+                    if not NON_INTERACTIVE:
+                        input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
+                    continue
                 else:
-                    # Iniciar o Tomcat usando o script padrão (background)
-                    log("Iniciando o Tomcat (startup script)...", "INFO")
-                    try:
-                        if platform.system() == "Windows":
-                            startup_cmd = [os.path.join(bin_dir, "startup.bat")]
-                            subprocess.run(startup_cmd, shell=True, cwd=bin_dir, env=tomcat_env, check=True)
-                        else:
-                            startup_cmd = [os.path.join(bin_dir, "startup.sh")]
-                            subprocess.run(startup_cmd, cwd=bin_dir, env=tomcat_env, check=True)
-                        log("Comando de inicialização do Tomcat executado com sucesso", "SUCCESS")
-                    except subprocess.CalledProcessError as e:
-                        log(f"Erro ao iniciar o Tomcat (exit {e.returncode}): {e}", "ERROR")
-                    except Exception as e:
-                        log(f"Erro ao iniciar o Tomcat: {str(e)}", "ERROR")
-                    else:
-                        if wait_for_port(TOMCAT_PORT, timeout=40):
-                            log("Tomcat iniciou e está respondendo na porta configurada", "SUCCESS")
-                        else:
-                            log("Tomcat não respondeu na porta configurada dentro do tempo limite", "WARNING")
-
                     print(f"\n{Colors.GREEN}Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/{Colors.END}")
                     log(f"Aplicação disponível em: http://localhost:{TOMCAT_PORT}/caracore-hub/", "SUCCESS")
-            else:
-                log(f"Tomcat não encontrado em: {TOMCAT_DIR}", "ERROR")
-                log("Instale o Tomcat ou corrija o caminho no script.", "ERROR")
             
             # Exibir mensagem de sucesso e URL da aplicação
             print(f"\n{Colors.GREEN}{'=' * 60}{Colors.END}")
@@ -4881,28 +7304,11 @@ def main():
                     log("Compilação bem-sucedida com abordagem alternativa.", "SUCCESS")
             
             # Verificar se o WAR foi gerado
-            war_files = []
-            target_dir = os.path.join(PROJECT_DIR, "target")
-            if os.path.exists(target_dir):
-                war_files = [f for f in os.listdir(target_dir) if f.endswith(".war")]
-            
-            if not war_files:
-                log("Nenhum arquivo WAR encontrado em target/. Procurando em outros diretórios...", "WARNING")
-                
-                # Verificar em diretórios alternativos (por exemplo, diretório atual ou diretório raiz do projeto)
-                if os.path.exists(PROJECT_DIR):
-                    alt_war_files = [f for f in os.listdir(PROJECT_DIR) if f.endswith(".war")]
-                    if alt_war_files:
-                        war_files = alt_war_files
-                        target_dir = PROJECT_DIR
-                        log(f"Arquivo WAR encontrado no diretório do projeto: {os.path.join(target_dir, war_files[0])}", "INFO")
-                
-                if not war_files:
-                    log("Nenhum arquivo WAR encontrado. Falha no processo de deploy para WildFly.", "ERROR")
-                    input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
-                    continue
-                    
-            war_file = os.path.join(target_dir, war_files[0])
+            war_file = _locate_tomcat_build_war()
+            if not war_file:
+                log("Nenhum arquivo WAR encontrado. Falha no processo de deploy para WildFly.", "ERROR")
+                input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
+                continue
             log(f"Arquivo WAR encontrado: {war_file}", "SUCCESS")
             
             # Deploy no WildFly
@@ -4938,7 +7344,8 @@ def main():
                                 log(f"Arquivo {os.path.basename(item_path)} removido do WildFly", "INFO")
 
                     war_dest = os.path.join(deployments_dir, war_name)
-                    shutil.copy2(war_file, war_dest)
+                    with tracing.span("copia_war", cat="copy"):
+                        shutil.copy2(war_file, war_dest)
                     log(f"Arquivo WAR preparado para o WildFly: {war_dest}", "SUCCESS")
                     try:
                         with open(os.path.join(deployments_dir, f"{war_name}.dodeploy"), "w"):
@@ -5321,8 +7728,7 @@ def main():
                     log(f"Tomcat: {war_name} não encontrado após deploy.", "WARNING")
                 # Aguardar o contexto responder e também a página de login
                 base_tom = f"http://localhost:{TOMCAT_PORT}{'' if app_ctx == '/' else app_ctx}/"
-                wait_for_url(base_tom, timeout=60)
-                wait_for_url(urljoin(base_tom, "login"), timeout=60)
+                wait_for_environment(timeout=60, db=False, tomcat_ctx=app_ctx)
                 # Validação JNDI em runtime após subir Tomcat
                 ok_jndi_rt, msg_rt = validate_tomcat_jndi(runtime_check=True)
                 log(f"Validação JNDI Tomcat (runtime): {msg_rt}", "SUCCESS" if ok_jndi_rt else "WARNING")
@@ -5358,7 +7764,7 @@ def main():
                     log(f"WildFly: {war_name} não encontrado em deployments.", "WARNING")
                 # Evitar depender da raiz (pode mostrar Welcome to WildFly). Aguardar especificamente <context>/login
                 base_wf = f"http://localhost:{WILDFLY_PORT}{'' if app_ctx == '/' else app_ctx}/"
-                wait_for_url(urljoin(base_wf, "login"), timeout=30)
+                wait_for_environment(timeout=30, db=False, wildfly_ctx=app_ctx)
                 # Validação JNDI no WildFly
                 ok_jndi_wf, msg_wf = validate_wildfly_jndi(runtime_check=True)
                 log(f"Validação JNDI WildFly: {msg_wf}", "SUCCESS" if ok_jndi_wf else "WARNING")
@@ -5441,10 +7847,12 @@ def main():
                 base = f"http://localhost:{WILDFLY_PORT}{'' if app_ctx == '/' else app_ctx}/"
                 # Validar deploy/endpoint antes do teste de navegação
                 wf_deployments = os.path.join(WILDFLY_DIR, "standalone", "deployments")
-                marker_deployed = os.path.join(wf_deployments, war_name + ".deployed")
                 marker_failed = os.path.join(wf_deployments, war_name + ".failed")
-                has_failed = os.path.exists(marker_failed)
-                has_marker = os.path.exists(marker_deployed)
+                # WAR no scanner de deployments: aguardar o marker por evento; senão apenas o estado atual
+                marker_timeout = 10 if os.path.exists(os.path.join(wf_deployments, war_name)) else 0
+                marker = wait_for_files(wf_deployments, (war_name + ".failed", war_name + ".deployed"), timeout=marker_timeout)
+                has_failed = marker == war_name + ".failed"
+                has_marker = marker == war_name + ".deployed"
                 login_ready = wait_for_url(urljoin(base, "login"), timeout=20)
                 wildfly_ready = has_marker or login_ready
                 if has_failed:
@@ -5520,4 +7928,11 @@ def main():
             input(f"\n{Colors.WARNING}Pressione Enter para continuar...{Colors.END}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    exit_code = 0
+    try:
+        exit_code = main() or 0
+    finally:
+        startup_mark("execução concluída")
+        report_startup_profile(PRESELECTED_OPTION)
+        export_trace()
+    sys.exit(exit_code)
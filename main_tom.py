@@ -26,6 +26,10 @@ from urllib.parse import urljoin
 from urllib.request import Request, urlopen
 from html.parser import HTMLParser
 
+import log_follower
+import maven_reactor
+import readiness
+
 LOG_DIR_NAME = "logs"
 LOGGER_NAME = "main_tom"
 
@@ -113,11 +117,13 @@ def prompt_custom_args(logger: logging.Logger) -> Optional[List[str]]:
         return args
 
 def run_main_script(logger: logging.Logger, main_script: str, args: List[str]) -> int:
-    cmd = [sys.executable, main_script, *args]
+    # `-m` reutiliza o bytecode em __pycache__; `python main.py` recompila o script inteiro a cada chamada
+    script_path = Path(main_script)
+    cmd = [sys.executable, "-m", script_path.stem, *args]
     logger.info("Executando main.py com argumentos: %s", format_cmd(args))
 
     try:
-        result = subprocess.run(cmd, check=False)
+        result = subprocess.run(cmd, cwd=str(script_path.parent), check=False)
     except OSError as error:
         logger.exception("Falha ao executar main.py: %s", error)
         return 1
@@ -142,21 +148,68 @@ def find_maven_executable() -> Optional[str]:
             return located
     return None
 
-def build_project(logger: logging.Logger, project_dir: Path) -> Optional[Path]:
+def _run_maven_streaming(cmd: List[str], project_dir: Path) -> tuple[int, maven_reactor.MavenOutputProcessor]:
+    exec_cmd = ["cmd.exe", "/c", *cmd] if platform.system().lower().startswith("win") else cmd
+    processor = maven_reactor.MavenOutputProcessor(forward=lambda line: print(line, flush=True))
+    process = subprocess.Popen(
+        exec_cmd,
+        cwd=str(project_dir),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    assert process.stdout is not None
+    processor.consume(process.stdout)
+    return process.wait(), processor
+
+def build_project(logger: logging.Logger, project_dir: Path, log_dir: str) -> Optional[Path]:
     maven_executable = find_maven_executable()
     if not maven_executable:
         logger.error("Maven nao encontrado no PATH.")
         return None
 
-    cmd = [maven_executable, "-f", str(project_dir / "pom.xml"), "clean", "package", "-DskipTests"]
+    prefix, using_worker = maven_reactor.resolve_build_command(maven_executable)
+    if using_worker:
+        logger.info("Usando worker de build residente (mvnd): %s", prefix[0])
+    cmd = [*prefix, "-f", str(project_dir / "pom.xml"), "clean", "package", "-DskipTests"]
+    # Build paralelo como no main.py: APP_BUILD_PARALLEL liga, APP_MAVEN_THREADS define as threads
+    threads = None
+    if os.environ.get("APP_BUILD_PARALLEL", "").strip().lower() in {"1", "true", "yes", "on"}:
+        threads = maven_reactor.parallel_thread_count()
+        cmd.extend(["-T", str(threads)])
+    cmd.extend(maven_reactor.TIMESTAMP_PARAMS)
     logger.info("Executando build Maven: %s", format_cmd(cmd))
-    if platform.system().lower().startswith("win"):
-        exec_cmd = ["cmd.exe", "/c", *cmd]
-        result = subprocess.run(exec_cmd, cwd=str(project_dir), check=False)
-    else:
-        result = subprocess.run(cmd, cwd=str(project_dir), check=False)
-    if result.returncode != 0:
-        logger.error("Build Maven retornou codigo %s.", result.returncode)
+    returncode, processor = _run_maven_streaming(cmd, project_dir)
+    if using_worker and maven_reactor.is_worker_failure(returncode, processor):
+        logger.warning("Worker de build (mvnd) falhou sem executar o build (codigo %s); repetindo com mvn.", returncode)
+        cmd = [maven_executable, *cmd[len(prefix):]]
+        logger.info("Executando build Maven: %s", format_cmd(cmd))
+        returncode, processor = _run_maven_streaming(cmd, project_dir)
+
+    summary = processor.summary()
+    timings = summary["timings"]
+    if timings["modules"]:
+        for module in timings["modules"]:
+            if module["seconds"] is not None:
+                logger.info("Modulo %s: %s em %.2fs", module["module"], module["status"], module["seconds"])
+        top_plugins = maven_reactor.aggregate_plugin_seconds(timings)[:5]
+        if top_plugins:
+            logger.info("Plugins mais lentos: %s", ", ".join(f"{name} {secs:.1f}s" for name, secs in top_plugins))
+        timings_path = maven_reactor.save_build_timings(
+            log_dir,
+            os.environ.get("APP_LOG_BASENAME", "maven_deploy"),
+            timings,
+            command=format_cmd(cmd),
+            threads=threads,
+        )
+        logger.info("Detalhamento de tempos salvo em: %s", timings_path)
+
+    if returncode != 0:
+        logger.error("Build Maven retornou codigo %s.", returncode)
+        for event in processor.errors()[:10]:
+            logger.error("  %s", event["message"])
         return None
 
     target_dir = project_dir / "target"
@@ -253,14 +306,7 @@ def start_tomcat(logger: logging.Logger, tomcat_dir: Path) -> bool:
     return True
 
 def wait_for_port(port: int, timeout: int = 60) -> bool:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            with socket.create_connection(("localhost", port), timeout=2):
-                return True
-        except OSError:
-            time.sleep(1)
-    return False
+    return readiness.wait_for_port(port, timeout=timeout)
 
 def deploy_and_start_tomcat(logger: logging.Logger, main_script: str, workspace: str) -> int:
     workspace_path = Path(workspace)
@@ -274,7 +320,7 @@ def deploy_and_start_tomcat(logger: logging.Logger, main_script: str, workspace:
         logger.error("Diretorio do Tomcat nao encontrado: %s", tomcat_dir)
         return 1
 
-    war_path = build_project(logger, project_dir)
+    war_path = build_project(logger, project_dir, os.path.join(workspace, LOG_DIR_NAME))
     if war_path is None:
         return 1
 
@@ -299,17 +345,6 @@ def deploy_and_start_tomcat(logger: logging.Logger, main_script: str, workspace:
     return 1
 
 
-def _tail_file(path: Path, max_bytes: int = 64_000) -> str:
-    try:
-        with path.open('rb') as fh:
-            fh.seek(0, os.SEEK_END)
-            size = fh.tell()
-            fh.seek(max(size - max_bytes, 0))
-            data = fh.read()
-        return data.decode('utf-8', errors='ignore')
-    except OSError:
-        return ""
-
 def is_server_up(host: str, port: int, timeout: int = 2) -> bool:
     try:
         with socket.create_connection((host, port), timeout=timeout):
@@ -372,35 +407,14 @@ def validate_tomcat_jndi_local(tomcat_dir: Path, runtime_check: bool = True) ->
                 candidates = list(logs_dir.glob('catalina*.log'))
                 latest = max(candidates, key=lambda p: p.stat().st_mtime, default=None)
                 if latest:
-                    tail_low = _tail_file(latest).lower()
-                    err_tokens = [
-                        'cannot create jdbc driver',
-                        'cannot create poolableconnectionfactory',
-                        'resource is not available',
-                        'failed to register in jndi',
-                        'nontransientconnectionexception',
-                        'org.postgresql.util',
-                        'name [jdbc/postgresds] is not bound',
-                        'name [java:comp/env/jdbc/postgresds] is not bound',
-                        'no suitable driver',
-                        'org.postgresql.driver not found',
-                        'fetal: password authentication failed',
-                        'connection refused',
-                    ]
-                    ok_tokens = [
-                        'registering jndi resource',
-                        'registered jndi resource',
-                        'initialized datasource',
-                        'pgjdbc',
-                        'bound to naming context',
-                        'name [java:comp/env/jdbc/postgresds] is bound',
-                        'name [jdbc/postgresds] is bound',
-                        'org.apache.commons.dbcp2',
-                    ]
-                    if any(token in tail_low for token in err_tokens):
+                    # Leitura incremental: apenas os bytes novos desde a validação anterior
+                    follower = log_follower.follow(str(latest), log_follower.TOMCAT_JNDI_SIGNALS,
+                                                   log_follower.CATALINA_TIMESTAMP)
+                    follower.poll()
+                    if follower.has('error', window_bytes=64_000):
                         ok = False
                         messages.append('Erros detectados em catalina.log referentes ao datasource/JNDI')
-                    elif any(token in tail_low for token in ok_tokens):
+                    elif follower.has('ok', window_bytes=64_000):
                         messages.append('Logs indicam datasource inicializado/bound')
         else:
             messages.append('Tomcat nao esta em execucao; validacao de runtime nao realizada')
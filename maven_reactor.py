@@ -0,0 +1,396 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Utilitários compartilhados (main.py e main_tom.py) para builds Maven do reactor caracore-hub.
+
+- Dimensionamento do número de threads para builds paralelos (-T)
+- Parâmetros para prefixar cada linha do Maven com horário
+- Extração do Reactor Summary e do tempo por plugin a partir da saída do Maven
+- Processamento da saída em streaming (eventos estruturados e buffer circular)
+- Persistência do detalhamento de tempos ao lado do log diário
+- Worker de build residente (Maven Daemon, mvnd) com fallback para o mvn de execução única
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+# Prefixa as linhas do Maven com HH:mm:ss.SSS (logger padrão do Maven 3.x)
+TIMESTAMP_PARAMS = [
+    "-Dorg.slf4j.simpleLogger.showDateTime=true",
+    "-Dorg.slf4j.simpleLogger.dateTimeFormat=HH:mm:ss.SSS",
+]
+
+# Saída do mvnd sem a interface de progresso, no mesmo formato do mvn
+BUILD_WORKER_ARGS = ["--raw-streams"]
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_LINE_RE = re.compile(r"^(?:(?P<ts>\d{2}:\d{2}:\d{2}(?:\.\d{1,3})?)\s+)?\[(?P<level>[A-Z]+)\]\s?(?P<msg>.*)$")
+_PLUGIN_RE = re.compile(r"^--- (?P<plugin>[\w.\-]+):(?P<version>[\w.\-]+):(?P<goal>[\w.\-]+) \((?P<execution>[^)]*)\) @ (?P<module>[\w.\-]+) ---")
+_SUMMARY_RE = re.compile(r"^(?P<module>.+?) \.+ ?(?P<status>SUCCESS|FAILURE|SKIPPED)(?: \[\s*(?P<time>[\d:.]+) (?P<unit>s|min|h)\])?")
+_TOTAL_RE = re.compile(r"^Total time:\s+(?P<time>[\d:.]+) (?P<unit>s|min|h)(?P<wall> \(Wall Clock\))?")
+_BUILDING_RE = re.compile(r"^Building (?P<name>[\w.\-]+) (?P<version>[\w.\-]+)(?:\s+\[(?P<index>\d+)/(?P<total>\d+)\])?\s*$")
+_TESTS_RE = re.compile(r"Tests run: (?P<run>\d+), Failures: (?P<failures>\d+), Errors: (?P<errors>\d+), Skipped: (?P<skipped>\d+)")
+
+
+def parallel_thread_count(requested: Optional[str] = None) -> int:
+    """
+    Define o número de threads do build paralelo.
+
+    Aceita um valor explícito (ex.: "4" ou "1C", por núcleo). Sem valor, usa
+    APP_MAVEN_THREADS ou o número de núcleos disponíveis para o processo.
+    """
+    raw = (requested or os.environ.get("APP_MAVEN_THREADS") or "").strip().upper()
+    try:
+        cores = len(os.sched_getaffinity(0))  # type: ignore[attr-defined]
+    except (AttributeError, OSError):
+        cores = os.cpu_count() or 1
+    if raw.endswith("C"):
+        try:
+            return max(1, int(float(raw[:-1] or "1") * cores))
+        except ValueError:
+            return cores
+    if raw.isdigit() and int(raw) > 0:
+        return int(raw)
+    return max(1, cores)
+
+
+def _duration_seconds(value: str, unit: str) -> float:
+    """Converte '2.345 s', '01:02 min' ou '01:02 h' em segundos."""
+    if unit == "s":
+        return float(value)
+    parts = [float(p) for p in value.split(":")]
+    if unit == "min":
+        # mm:ss(.SSS)
+        return parts[0] * 60 + (parts[1] if len(parts) > 1 else 0.0)
+    # h: hh:mm(:ss)
+    seconds = parts[0] * 3600 + (parts[1] * 60 if len(parts) > 1 else 0.0)
+    return seconds + (parts[2] if len(parts) > 2 else 0.0)
+
+
+def _clock_seconds(ts: str) -> float:
+    hh, mm, rest = ts.split(":")
+    return int(hh) * 3600 + int(mm) * 60 + float(rest)
+
+
+def split_maven_line(line: str) -> tuple[Optional[str], Optional[str], str]:
+    """Separa (horário, nível, mensagem) de uma linha do Maven, removendo cores ANSI."""
+    clean = _ANSI_RE.sub("", line.rstrip("\r\n"))
+    match = _LINE_RE.match(clean)
+    if not match:
+        return None, None, clean
+    return match.group("ts"), match.group("level"), match.group("msg")
+
+
+class BuildTimingParser:
+    """
+    Extrai, linha a linha, o detalhamento de tempos de um build Maven.
+
+    Os tempos por módulo vêm do Reactor Summary. Os tempos por plugin são medidos entre
+    o início de uma execução e a próxima execução do mesmo módulo (requer TIMESTAMP_PARAMS);
+    a última execução de cada módulo termina no fim do módulo segundo o summary.
+    Só guarda os cabeçalhos de execução de plugin, nunca a saída completa.
+    """
+
+    def __init__(self) -> None:
+        self.modules: List[Dict] = []
+        self.total: Optional[float] = None
+        self.wall_clock = False
+        self._in_summary = False
+        self._executions: Dict[str, List[tuple]] = {}
+        self._day_offset = 0.0
+        self._last_clock: Optional[float] = None
+
+    def feed(self, raw: str) -> Optional[Dict]:
+        """Processa uma linha. Retorna a linha do summary reconhecida (módulo concluído), se houver."""
+        ts, _level, msg = split_maven_line(raw)
+        return self.feed_parsed(ts, msg)
+
+    def feed_parsed(self, ts: Optional[str], msg: str) -> Optional[Dict]:
+        clock = None
+        if ts:
+            clock = _clock_seconds(ts)
+            # Builds que atravessam a meia-noite
+            if self._last_clock is not None and clock + self._day_offset < self._last_clock - 1:
+                self._day_offset += 86400
+            clock += self._day_offset
+            self._last_clock = clock
+
+        plugin_match = _PLUGIN_RE.match(msg)
+        if plugin_match:
+            if clock is not None:
+                plugin = re.sub(r"^maven-|-maven-plugin$|-plugin$", "", plugin_match.group("plugin"))
+                key = f"{plugin}:{plugin_match.group('goal')}"
+                self._executions.setdefault(plugin_match.group("module"), []).append(
+                    (clock, key, plugin_match.group("execution")))
+            return None
+
+        if msg.startswith("Reactor Summary"):
+            self._in_summary = True
+            return None
+        if self._in_summary:
+            summary_match = _SUMMARY_RE.match(msg)
+            if summary_match:
+                module = {
+                    "module": summary_match.group("module").strip(),
+                    "status": summary_match.group("status"),
+                    "seconds": _duration_seconds(summary_match.group("time"), summary_match.group("unit"))
+                    if summary_match.group("time") else None,
+                }
+                self.modules.append(module)
+                return module
+        total_match = _TOTAL_RE.match(msg)
+        if total_match:
+            self.total = _duration_seconds(total_match.group("time"), total_match.group("unit"))
+            self.wall_clock = bool(total_match.group("wall"))
+            self._in_summary = False
+        return None
+
+    def result(self) -> Dict:
+        """
+        Returns:
+            dict: {"modules": [...], "plugins": [...], "total_seconds": float|None, "wall_clock": bool}
+        """
+        module_seconds = {m["module"]: m["seconds"] for m in self.modules}
+        plugin_rows: List[Dict] = []
+        for module, runs in self._executions.items():
+            runs = sorted(runs, key=lambda r: r[0])
+            module_end = None
+            if module_seconds.get(module) is not None:
+                module_end = runs[0][0] + module_seconds[module]
+            for index, (start, key, execution) in enumerate(runs):
+                end = runs[index + 1][0] if index + 1 < len(runs) else module_end
+                if end is None or end < start:
+                    continue
+                plugin_rows.append({
+                    "module": module,
+                    "plugin": key,
+                    "execution": execution,
+                    "seconds": round(end - start, 3),
+                })
+        return {
+            "modules": list(self.modules),
+            "plugins": plugin_rows,
+            "total_seconds": self.total,
+            "wall_clock": self.wall_clock,
+        }
+
+
+def parse_build_timings(lines: Iterable[str]) -> Dict:
+    """Extrai o detalhamento de tempos de uma saída Maven completa (ver BuildTimingParser)."""
+    parser = BuildTimingParser()
+    for line in lines:
+        parser.feed(line)
+    return parser.result()
+
+
+class MavenOutputProcessor:
+    """
+    Processa a saída do Maven em streaming, com memória limitada.
+
+    - Encaminha cada linha assim que chega (callback `forward`)
+    - Mantém apenas as últimas `tail_lines` linhas para relatórios de erro
+    - Extrai eventos estruturados (module_started, module_finished, tests, error, build_result)
+      e os entrega ao callback `on_event` conforme são reconhecidos
+    """
+
+    def __init__(self, forward: Optional[Callable[[str], None]] = None,
+                 on_event: Optional[Callable[[Dict], None]] = None,
+                 tail_lines: int = 200, max_events: int = 500) -> None:
+        self.forward = forward
+        self.on_event = on_event
+        self.tail: Deque[str] = deque(maxlen=max(1, tail_lines))
+        self.events: Deque[Dict] = deque(maxlen=max(1, max_events))
+        self.timings = BuildTimingParser()
+        self.line_count = 0
+        self.error_count = 0
+        self.tests = {"run": 0, "failures": 0, "errors": 0, "skipped": 0}
+        self.build_result: Optional[str] = None
+        self._current_module: Optional[str] = None
+
+    def _emit(self, event: Dict) -> None:
+        event.setdefault("line", self.line_count)
+        self.events.append(event)
+        if self.on_event:
+            self.on_event(event)
+
+    def feed(self, raw: str) -> None:
+        line = raw.rstrip("\r\n")
+        self.line_count += 1
+        if self.forward:
+            self.forward(line)
+        self.tail.append(line)
+
+        ts, level, msg = split_maven_line(line)
+        finished = self.timings.feed_parsed(ts, msg)
+        if finished:
+            self._emit({"type": "module_finished", **finished})
+            return
+
+        building = _BUILDING_RE.match(msg)
+        if building:
+            self._current_module = building.group("name")
+            self._emit({
+                "type": "module_started",
+                "module": self._current_module,
+                "index": int(building.group("index")) if building.group("index") else None,
+                "total": int(building.group("total")) if building.group("total") else None,
+            })
+            return
+
+        tests = _TESTS_RE.search(msg)
+        if tests:
+            counts = {k: int(tests.group(k)) for k in ("run", "failures", "errors", "skipped")}
+            # Linhas por classe trazem "Time elapsed"; o total do módulo vem sem ele
+            if "Time elapsed" not in msg:
+                for key, value in counts.items():
+                    self.tests[key] += value
+                self._emit({"type": "tests", "module": self._current_module, **counts})
+            return
+
+        if msg.startswith("BUILD SUCCESS") or msg.startswith("BUILD FAILURE"):
+            self.build_result = msg.split()[1]
+            self._emit({"type": "build_result", "result": self.build_result})
+            return
+
+        if level == "ERROR" and msg.strip():
+            self.error_count += 1
+            self._emit({"type": "error", "module": self._current_module, "message": msg.strip()})
+
+    def consume(self, stream: Iterable[str]) -> None:
+        for line in stream:
+            self.feed(line)
+
+    def tail_text(self, lines: Optional[int] = None) -> str:
+        data = list(self.tail)
+        if lines is not None:
+            data = data[-lines:]
+        return "\n".join(data)
+
+    def errors(self) -> List[Dict]:
+        return [e for e in self.events if e["type"] == "error"]
+
+    def summary(self) -> Dict:
+        return {
+            "lines": self.line_count,
+            "errors": self.error_count,
+            "tests": dict(self.tests),
+            "build_result": self.build_result,
+            "timings": self.timings.result(),
+        }
+
+
+def aggregate_plugin_seconds(timings: Dict) -> List[tuple]:
+    """Soma os tempos por plugin:goal em todos os módulos (maior primeiro)."""
+    totals: Dict[str, float] = {}
+    for row in timings.get("plugins", []):
+        totals[row["plugin"]] = totals.get(row["plugin"], 0.0) + row["seconds"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def save_build_timings(log_dir: str, basename: str, timings: Dict, **context) -> str:
+    """
+    Acrescenta o detalhamento de um build em log/YYYY_MM_DD_<basename>_build_times.jsonl.
+
+    Returns:
+        str: caminho do arquivo gravado
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, f"{datetime.now().strftime('%Y_%m_%d')}_{basename}_build_times.jsonl")
+    record = {"timestamp": datetime.now().isoformat(timespec="seconds"), **context, **timings}
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def build_worker_mode() -> str:
+    """
+    Modo do worker de build residente (APP_BUILD_WORKER):
+    "off" (padrão, sempre mvn), "auto" (usa o mvnd se instalado) ou "on" (exige mvnd).
+    """
+    raw = os.environ.get("APP_BUILD_WORKER", "off").strip().lower()
+    if raw in {"1", "true", "yes", "on", "mvnd"}:
+        return "on"
+    if raw == "auto":
+        return "auto"
+    return "off"
+
+
+def find_build_worker() -> Optional[str]:
+    """
+    Localiza o Maven Daemon (mvnd), processo de build residente que mantém a JVM do Maven
+    aquecida (JIT e classloading) entre comandos. Ordem: APP_MVND_CMD, PATH, MVND_HOME/bin.
+    """
+    windows = os.name == "nt"
+    explicit = os.environ.get("APP_MVND_CMD", "").strip()
+    if explicit:
+        located = shutil.which(explicit) or (explicit if os.path.isfile(explicit) else None)
+        if located:
+            return located
+    for candidate in (["mvnd.cmd", "mvnd.exe", "mvnd"] if windows else ["mvnd"]):
+        located = shutil.which(candidate)
+        if located:
+            return located
+    mvnd_home = os.environ.get("MVND_HOME", "").strip()
+    if mvnd_home:
+        for candidate in (["mvnd.cmd", "mvnd.exe"] if windows else ["mvnd", "mvnd.sh"]):
+            path = os.path.join(mvnd_home, "bin", candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def resolve_build_command(maven_cmd: str) -> tuple[List[str], bool]:
+    """
+    Define o executável do build: o worker residente (mvnd) quando habilitado e disponível,
+    senão o Maven de execução única.
+
+    Returns:
+        tuple: (prefixo do comando, usando_worker)
+    """
+    if build_worker_mode() != "off":
+        worker = find_build_worker()
+        if worker:
+            return [worker, *BUILD_WORKER_ARGS], True
+    return [maven_cmd], False
+
+
+def build_worker_status(worker: str) -> Optional[str]:
+    """Retorna a saída de `mvnd --status` (daemons ativos) ou None se não for possível consultar."""
+    try:
+        result = subprocess.run([worker, "--status"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, timeout=15)
+        return result.stdout.strip() if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def is_worker_failure(exit_code: int, processor: "MavenOutputProcessor") -> bool:
+    """
+    Distingue falha do próprio worker (daemon não sobe, cliente incompatível) de falha do build:
+    sem nenhuma saída reconhecível do Maven, o comando deve ser repetido com o mvn de execução única.
+    """
+    if exit_code == 0:
+        return False
+    if processor.build_result is not None or processor.timings.modules:
+        return False
+    return not any(event["type"] == "module_started" for event in processor.events)
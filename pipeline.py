@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Agendador de etapas em grafo (DAG) para os fluxos de deploy do main.py.
+
+Cada etapa declara suas dependências; etapas independentes rodam em paralelo (thread pool) assim
+que as dependências terminam. Ao final, o relatório do caminho crítico mostra a cadeia de etapas
+que determinou o tempo total — o tempo de parede tende ao caminho crítico, não à soma das etapas.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import tracing
+
+# Valor de retorno de uma etapa que decidiu não executar (ex.: deploy a quente já concluído).
+# Dependentes continuam normalmente.
+SKIP = object()
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+BLOCKED = "blocked"
+
+
+@dataclass
+class Stage:
+    """
+    Etapa do pipeline.
+
+    fn recebe o dicionário de resultados das etapas já concluídas ({nome: valor}).
+    Retornar False ou lançar exceção marca a etapa como falha; `required=False` permite que os
+    dependentes prossigam mesmo assim (ex.: configuração opcional que só gera aviso).
+    """
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str] = ()
+    required: bool = True
+    description: str = ""
+
+
+@dataclass
+class StageRecord:
+    name: str
+    status: str = BLOCKED
+    value: Any = None
+    error: Optional[BaseException] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    deps: Sequence[str] = ()
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+@dataclass
+class PipelineResult:
+    records: Dict[str, StageRecord] = field(default_factory=dict)
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def wall(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status in (OK, SKIPPED) for r in self.records.values())
+
+    def value(self, name: str, default: Any = None) -> Any:
+        record = self.records.get(name)
+        return record.value if record is not None and record.status == OK else default
+
+    def failed(self) -> List[str]:
+        return [name for name, r in self.records.items() if r.status == FAILED]
+
+    def blocked(self) -> List[str]:
+        return [name for name, r in self.records.items() if r.status == BLOCKED]
+
+    def critical_path(self) -> List[StageRecord]:
+        """Cadeia que terminou por último: a partir da etapa final, segue a dependência mais tardia."""
+        ran = [r for r in self.records.values() if r.finished is not None]
+        if not ran:
+            return []
+        current = max(ran, key=lambda r: r.finished)
+        path = [current]
+        while True:
+            deps = [self.records[d] for d in current.deps if self.records[d].finished is not None]
+            if not deps:
+                break
+            current = max(deps, key=lambda r: r.finished)
+            path.append(current)
+        return list(reversed(path))
+
+
+class Pipeline:
+    def __init__(self, stages: Sequence[Stage], max_workers: int = 4, on_event: Optional[Callable[[str, StageRecord], None]] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Etapa duplicada no pipeline: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {', '.join(missing)}")
+        self._check_acyclic()
+        self.max_workers = max(1, int(max_workers))
+        self.on_event = on_event
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(name: str, trail: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError("Ciclo no pipeline: " + " -> ".join(trail + [name]))
+            state[name] = 1
+            for dep in self.stages[name].deps:
+                visit(dep, trail + [name])
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name, [])
+
+    def _emit(self, event: str, record: StageRecord) -> None:
+        if self.on_event is not None:
+            try:
+                self.on_event(event, record)
+            except Exception:
+                pass
+
+    def run(self) -> PipelineResult:
+        result = PipelineResult(started=time.perf_counter())
+        records = {name: StageRecord(name=name, deps=tuple(stage.deps)) for name, stage in self.stages.items()}
+        result.records = records
+        values: Dict[str, Any] = {}
+        lock = threading.Lock()
+        pending = dict(self.stages)
+        running = {}
+
+        def execute(stage: Stage) -> None:
+            record = records[stage.name]
+            with lock:
+                snapshot = dict(values)
+            record.started = time.perf_counter()
+            self._emit("start", record)
+            try:
+                with tracing.span(stage.name, cat="pipeline", deps=",".join(stage.deps) or None):
+                    value = stage.fn(snapshot)
+                if value is SKIP:
+                    record.status = SKIPPED
+                elif value is False:
+                    record.status = FAILED
+                else:
+                    record.status = OK
+                    record.value = value
+                    with lock:
+                        values[stage.name] = value
+            except Exception as exc:
+                record.status = FAILED
+                record.error = exc
+            record.finished = time.perf_counter()
+            self._emit("finish", record)
+
+        def satisfied(dep: str) -> Optional[bool]:
+            """True: liberada; False: bloqueia dependentes; None: ainda não terminou."""
+            record = records[dep]
+            if record.finished is None and record.status == BLOCKED and dep not in pending and dep not in running.values():
+                return False  # dependência bloqueada por falha anterior
+            if record.finished is None:
+                return None
+            return record.status in (OK, SKIPPED) or not self.stages[dep].required
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        stage = pending[name]
+                        states = [satisfied(d) for d in stage.deps]
+                        if any(s is False for s in states):
+                            del pending[name]  # permanece BLOCKED
+                            self._emit("blocked", records[name])
+                            progressed = True
+                        elif all(s is True for s in states):
+                            del pending[name]
+                            running[pool.submit(execute, stage)] = name
+                            progressed = True
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+        result.finished = time.perf_counter()
+        return result
+
+
+def format_report(result: PipelineResult) -> List[str]:
+    """Linhas do relatório: duração de cada etapa, caminho crítico e ganho frente à execução serial."""
+    lines = []
+    origin = result.started
+    for record in sorted(result.records.values(), key=lambda r: (r.started is None, r.started or 0.0)):
+        if record.started is None:
+            lines.append(f"{record.name:<22} {record.status:<8} (não executada)")
+            continue
+        detail = f" — {record.error}" if record.error is not None else ""
+        lines.append(
+            f"{record.name:<22} {record.status:<8} {record.duration:7.2f}s "
+            f"[{record.started - origin:6.2f}s → {record.finished - origin:6.2f}s]{detail}"
+        )
+    path = result.critical_path()
+    serial = sum(r.duration for r in result.records.values())
+    if path:
+        chain = " → ".join(f"{r.name} ({r.duration:.2f}s)" for r in path)
+        lines.append(f"Caminho crítico: {chain}")
+    lines.append(f"Tempo total: {result.wall:.2f}s (soma das etapas: {serial:.2f}s)")
+    return lines
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Informações dos processos dos servidores (Tomcat/WildFly) para os benchmarks: PID pela porta em
+escuta, memória residente (RSS) e afinidade de CPU.
+
+Usa o psutil quando instalado; sem ele, recorre a /proc (Linux), netstat/tasklist (Windows) ou
+lsof/ps (macOS).
+"""
+
+import os
+import platform
+import re
+import subprocess
+import threading
+from typing import List, Optional, Sequence
+
+try:
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - dependência opcional
+    psutil = None
+
+IS_WINDOWS = platform.system() == "Windows"
+
+
+def _run(cmd: Sequence[str], timeout: float = 10) -> str:
+    try:
+        proc = subprocess.run(list(cmd), capture_output=True, text=True, timeout=timeout)
+        return proc.stdout or ""
+    except Exception:
+        return ""
+
+
+def find_listening_pid(port: int) -> Optional[int]:
+    """PID do processo que escuta na porta TCP local (None se não encontrado)."""
+    if psutil is not None:
+        try:
+            for conn in psutil.net_connections(kind="tcp"):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port and conn.pid:
+                    return int(conn.pid)
+        except Exception:
+            pass
+    if IS_WINDOWS:
+        for line in _run(["netstat", "-ano", "-p", "tcp"]).splitlines():
+            parts = line.split()
+            if len(parts) >= 5 and parts[3].upper() in ("LISTENING", "ESCUTANDO") and parts[1].endswith(f":{port}"):
+                return int(parts[4])
+        return None
+    if os.path.isdir("/proc/net"):
+        pid = _linux_listening_pid(port)
+        if pid is not None:
+            return pid
+    out = _run(["lsof", "-nP", f"-iTCP:{port}", "-sTCP:LISTEN", "-t"]).split()
+    return int(out[0]) if out and out[0].isdigit() else None
+
+
+def _linux_listening_pid(port: int) -> Optional[int]:
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, "r", encoding="ascii") as fh:
+                next(fh, None)
+                for line in fh:
+                    fields = line.split()
+                    # local_address = IP:PORTA (hex); st 0A = LISTEN
+                    if len(fields) > 9 and fields[3] == "0A" and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        inodes.add(fields[9])
+        except OSError:
+            continue
+    if not inodes:
+        return None
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fd_dir = f"/proc/{entry}/fd"
+        try:
+            for fd in os.listdir(fd_dir):
+                try:
+                    if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                        return int(entry)
+                except OSError:
+                    continue
+        except OSError:
+            continue
+    return None
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Memória residente do processo em bytes (None se indisponível)."""
+    if psutil is not None:
+        try:
+            return int(psutil.Process(pid).memory_info().rss)
+        except Exception:
+            pass
+    status = f"/proc/{pid}/status"
+    if os.path.exists(status):
+        try:
+            with open(status, "r", encoding="ascii", errors="ignore") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+        return None
+    if IS_WINDOWS:
+        out = _run(["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"])
+        # "java.exe","1234","Console","1","512.345 K"
+        match = re.search(r'"([\d.,\s\xa0]+)\s*K"\s*$', out.strip())
+        if match:
+            digits = re.sub(r"\D", "", match.group(1))
+            return int(digits) * 1024 if digits else None
+        return None
+    out = _run(["ps", "-o", "rss=", "-p", str(pid)]).strip()
+    return int(out) * 1024 if out.isdigit() else None
+
+
+class RssSampler:
+    """Amostra o RSS de um processo em segundo plano (pico e média) enquanto ativo."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            rss = process_rss(self.pid) if self.pid else None
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        if self.pid:
+            self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 4)
+
+    @property
+    def peak(self) -> Optional[int]:
+        return max(self.samples) if self.samples else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """'0-3,6' -> [0, 1, 2, 3, 6]."""
+    cpus: List[int] = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return sorted(set(cpus))
+
+
+def pin_process(pid: int, cpus: Sequence[int]) -> bool:
+    """
+    Restringe o processo e todas as suas threads às CPUs informadas. False se não suportado ou se
+    alguma thread não pôde ser fixada.
+    """
+    if not cpus:
+        return False
+    if hasattr(os, "sched_setaffinity"):
+        # Linux: a afinidade é por thread (sched_setaffinity(pid) e o psutil só alcançam a principal).
+        # A JVM já tem GC, JIT e threads de requisição rodando: aplicar a cada tarefa do processo
+        task_dir = f"/proc/{pid}/task"
+        try:
+            tasks = os.listdir(task_dir) if os.path.isdir(task_dir) else [str(pid)]
+        except OSError:
+            return False
+        pinned = True
+        for tid in tasks:
+            try:
+                os.sched_setaffinity(int(tid), set(cpus))
+            except ProcessLookupError:
+                continue  # thread encerrada entre a listagem e a chamada
+            except OSError:
+                pinned = False
+        return pinned
+    if psutil is not None:
+        # Windows: a afinidade definida pelo psutil vale para o processo inteiro
+        try:
+            psutil.Process(pid).cpu_affinity(list(cpus))
+            return True
+        except Exception:
+            return False
+    return False
+
+
+def cpu_affinity(pid: Optional[int] = None) -> Optional[List[int]]:
+    """CPUs permitidas ao processo (o atual se pid=None); None se não suportado."""
+    if psutil is not None:
+        try:
+            return sorted(psutil.Process(pid or os.getpid()).cpu_affinity())
+        except Exception:
+            pass
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return sorted(os.sched_getaffinity(pid or 0))
+        except OSError:
+            return None
+    return None
+
+
+class PinnedAffinity:
+    """
+    Fixa o processo atual nas CPUs informadas enquanto ativo e restaura a afinidade anterior ao sair.
+    Processos iniciados dentro do bloco herdam a afinidade, o que permite fixar um servidor já no
+    lançamento (início, deploy e JIT incluídos) e também o gerador de carga, que roda neste processo.
+    """
+
+    def __init__(self, cpus: Optional[Sequence[int]]):
+        self.cpus = list(cpus or [])
+        self.previous: Optional[List[int]] = None
+        self.applied = False
+
+    def __enter__(self) -> "PinnedAffinity":
+        if self.cpus:
+            self.previous = cpu_affinity()
+            self.applied = self.previous is not None and pin_process(os.getpid(), self.cpus)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.applied and self.previous:
+            pin_process(os.getpid(), self.previous)
+
+
+def process_cmdline(pid: int) -> Optional[List[str]]:
+    """Linha de comando do processo (None se indisponível)."""
+    if psutil is not None:
+        try:
+            return list(psutil.Process(pid).cmdline())
+        except Exception:
+            pass
+    path = f"/proc/{pid}/cmdline"
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as fh:
+                raw = fh.read()
+        except OSError:
+            return None
+        return [part.decode("utf-8", errors="replace") for part in raw.split(b"\0") if part] or None
+    if IS_WINDOWS:
+        return None
+    out = _run(["ps", "-o", "args=", "-p", str(pid)]).strip()
+    return out.split() or None
+
+
+# Opções do launcher java cujo valor vem no argumento seguinte
+_JVM_OPTIONS_WITH_VALUE = ("-cp", "-classpath", "--class-path", "-p", "--module-path", "--add-modules")
+
+
+def jvm_options(cmdline: Sequence[str]) -> List[str]:
+    """Flags de ajuste da JVM (-X..., -XX:..., -server) na linha de comando de um processo java."""
+    options: List[str] = []
+    args = iter(list(cmdline)[1:])
+    for arg in args:
+        if not arg.startswith("-") or arg in ("-jar", "-m", "--module"):
+            break  # classe principal/-jar: o que vem depois são argumentos da aplicação
+        if arg in _JVM_OPTIONS_WITH_VALUE:
+            next(args, None)
+        elif arg.startswith("-X") or arg in ("-server", "-client"):
+            options.append(arg)
+    return options
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Planos de execução da listagem de pedidos (PedidoDAO.buscarComFiltros) para cada combinação de filtros.
+
+O DAO monta o JPQL com até cinco filtros opcionais (status, canal, destinatário com LIKE '%x%',
+dataInicio e dataFim sobre created_at), sempre com LEFT JOIN FETCH dos volumes, DISTINCT e
+ORDER BY created_at DESC, sem paginação. `build_query` reproduz o SQL que o Hibernate 6 gera para
+cada uma das 32 combinações; `explain` executa EXPLAIN (ANALYZE, BUFFERS) e `analyze_plan` aponta
+seq scans grandes, sorts/hashes que transbordam para disco e resultados sem limite. Com medições em
+mais de um tamanho de base (snapshots), `project` estima o expoente de crescimento de cada
+combinação e o tempo no tamanho alvo (ex.: 10M pedidos).
+"""
+
+import json
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Ordem dos filtros no DAO (bit i da combinação = FILTERS[i] presente)
+FILTERS = ("status", "canal", "destinatario", "dataInicio", "dataFim")
+DEFAULT_VALUES = {"status": "RECEBIDO", "canal": "MANUAL", "destinatario": "silva", "days": 7}
+
+# Colunas na ordem em que o Hibernate 6 as seleciona (atributos em ordem alfabética; volumes: FK, id, demais)
+PEDIDO_COLUMNS = ("id", "canal", "codigo", "created_at", "destinatario_documento", "destinatario_nome",
+                  "destinatario_telefone", "external_id", "picked_up_at", "ready_at", "status", "tenant_id")
+VOLUME_COLUMNS = ("pedido_id", "id", "dimensoes", "etiqueta", "peso", "posicao_id", "status")
+
+# Seq scan só é alerta acima deste número de linhas lidas
+SEQ_SCAN_MIN_ROWS = 10_000
+# Listagem sem paginação: alerta acima deste número de linhas devolvidas
+RESULT_ROWS_WARN = 1_000
+DEFAULT_TARGET_PEDIDOS = 10_000_000
+DEFAULT_BUDGET_MS = 1_000.0
+
+_PREDICATES = {
+    "status": "p1_0.status=%s",
+    "canal": "p1_0.canal=%s",
+    "destinatario": "lower(p1_0.destinatario_nome) like %s",
+    "dataInicio": "p1_0.created_at>=%s",
+    "dataFim": "p1_0.created_at<%s",
+}
+
+
+def combinations() -> List[Tuple[str, ...]]:
+    """As 32 combinações de filtros, da consulta sem filtros à com todos."""
+    return [tuple(name for i, name in enumerate(FILTERS) if mask & (1 << i)) for mask in range(1 << len(FILTERS))]
+
+
+def combo_label(combo: Sequence[str]) -> str:
+    return "+".join(combo) if combo else "(sem filtros)"
+
+
+def filter_values(status: str = DEFAULT_VALUES["status"], canal: str = DEFAULT_VALUES["canal"],
+                  destinatario: str = DEFAULT_VALUES["destinatario"], days: int = DEFAULT_VALUES["days"],
+                  today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Parâmetros como o DAO os recebe: LIKE '%<destinatario minúsculo>%', dataInicio no início do dia e
+    dataFim exclusivo (dia seguinte ao fim). O intervalo padrão cobre os últimos `days` dias.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=days)
+    return {
+        "status": status,
+        "canal": canal,
+        "destinatario": f"%{destinatario.lower()}%",
+        "dataInicio": datetime.combine(start, datetime.min.time()),
+        "dataFim": datetime.combine(today + timedelta(days=1), datetime.min.time()),
+    }
+
+
+def build_query(combo: Sequence[str], values: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """SQL (parâmetros %s do psycopg2) equivalente ao JPQL do DAO para a combinação."""
+    columns = [f"p1_0.{c}" for c in PEDIDO_COLUMNS] + [f"v1_0.{c}" for c in VOLUME_COLUMNS]
+    where = ["1=1"] + [_PREDICATES[name] for name in FILTERS if name in combo]
+    sql = (f"select distinct {','.join(columns)} from pedido p1_0 "
+           f"left join volume v1_0 on p1_0.id=v1_0.pedido_id "
+           f"where {' and '.join(where)} "
+           # @OrderBy("id ASC") da coleção entra depois da ordenação do JPQL
+           f"order by p1_0.created_at desc,v1_0.id")
+    return sql, [values[name] for name in FILTERS if name in combo]
+
+
+def explain(db, sql: str, params: Sequence[Any], timeout_ms: int = 0) -> Dict[str, Any]:
+    """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) pelo pool do dbpool; devolve o nó raiz do plano."""
+    row = db.fetchone(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", list(params), statement_timeout_ms=timeout_ms)
+    document = row[0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return document[0]
+
+
+def _walk(node: Dict[str, Any], depth: int = 0):
+    yield node, depth
+    for child in node.get("Plans") or ():
+        yield from _walk(child, depth + 1)
+
+
+def analyze_plan(explained: Dict[str, Any], seq_scan_min_rows: int = SEQ_SCAN_MIN_ROWS,
+                 result_rows_warn: int = RESULT_ROWS_WARN) -> Dict[str, Any]:
+    """
+    Resumo do plano: tempo, linhas, buffers e alertas. Alertas: seq scan acima de `seq_scan_min_rows`
+    linhas lidas, sort em disco, hash/agregação em lotes (memória de work_mem estourada) e resultado
+    sem limite acima de `result_rows_warn` linhas.
+    """
+    root = explained["Plan"]
+    findings: List[Dict[str, Any]] = []
+    seq_scans: List[str] = []
+    for node, _depth in _walk(root):
+        kind = node.get("Node Type")
+        loops = node.get("Actual Loops") or 1
+        if kind == "Seq Scan":
+            kept = int(node.get("Actual Rows", 0) * loops)
+            scanned = kept + int(node.get("Rows Removed by Filter", 0) * loops)
+            relation = node.get("Relation Name", "?")
+            if scanned >= seq_scan_min_rows:
+                seq_scans.append(relation)
+                findings.append({"kind": "seq_scan", "relation": relation, "scanned": scanned, "kept": kept,
+                                 "detail": f"seq scan em {relation} ({scanned:,} linhas lidas, {kept:,} aproveitadas)"})
+        elif kind in ("Sort", "Incremental Sort") and node.get("Sort Space Type") == "Disk":
+            findings.append({"kind": "sort_disk", "kb": node.get("Sort Space Used"),
+                             "detail": f"sort em disco ({node.get('Sort Method')}, {node.get('Sort Space Used')} kB)"})
+        elif kind == "Hash" and (node.get("Hash Batches") or 1) > 1:
+            findings.append({"kind": "hash_batches", "batches": node["Hash Batches"],
+                             "detail": f"hash em {node['Hash Batches']} lotes (work_mem insuficiente)"})
+        elif kind == "Aggregate" and ((node.get("HashAgg Batches") or 1) > 1 or node.get("Disk Usage")):
+            findings.append({"kind": "hashagg_disk", "kb": node.get("Disk Usage"),
+                             "detail": f"agregação (DISTINCT) em disco ({node.get('Disk Usage', 0)} kB)"})
+    rows = int(root.get("Actual Rows", 0))
+    if rows >= result_rows_warn:
+        findings.append({"kind": "unbounded_result", "rows": rows,
+                         "detail": f"{rows:,} linhas devolvidas sem paginação"})
+    return {
+        "execution_ms": round(explained.get("Execution Time", 0.0), 3),
+        "planning_ms": round(explained.get("Planning Time", 0.0), 3),
+        "rows": rows,
+        "shared_hit": int(root.get("Shared Hit Blocks", 0)),
+        "shared_read": int(root.get("Shared Read Blocks", 0)),
+        "temp_written": int(root.get("Temp Written Blocks", 0)),
+        "seq_scans": sorted(set(seq_scans)),
+        "findings": findings,
+        "plan": plan_outline(explained),
+    }
+
+
+def plan_outline(explained: Dict[str, Any]) -> List[str]:
+    """Árvore do plano em uma linha por nó (tipo, relação/índice, linhas reais e tempo)."""
+    lines = []
+    for node, depth in _walk(explained["Plan"]):
+        target = node.get("Index Name") or node.get("Relation Name") or ""
+        label = f"{node.get('Node Type')}{' ' + target if target else ''}"
+        lines.append(f"{'  ' * depth}{label} (linhas={int(node.get('Actual Rows', 0) * (node.get('Actual Loops') or 1)):,}, "
+                     f"{node.get('Actual Total Time', 0):.1f} ms)")
+    return lines
+
+
+def schema_checks(db) -> Dict[str, bool]:
+    """Índices relevantes para a listagem: volume(pedido_id) do fetch join e trigramas do LIKE '%x%'."""
+    row = db.fetchone(
+        "SELECT EXISTS (SELECT 1 FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+        "               WHERE i.indrelid = 'public.volume'::regclass AND a.attname = 'pedido_id'), "
+        "       EXISTS (SELECT 1 FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'pedido' "
+        "               AND indexdef LIKE '%gin_trgm_ops%' AND indexdef LIKE '%destinatario_nome%')"
+    )
+    return {"volume_pedido_index": bool(row[0]), "destinatario_trgm_index": bool(row[1])}
+
+
+def run_dataset(db, values: Dict[str, Any], combos: Optional[Sequence[Sequence[str]]] = None, timeout_ms: int = 0,
+                repeat: int = 1, on_combo=None) -> Dict[str, Any]:
+    """
+    Todas as combinações num banco: {"pedidos", "schema", "combos": {rótulo: resumo}}. Com `repeat` > 1
+    fica a execução mais rápida (cache quente). Estouro de `timeout_ms` vira o alerta "timeout".
+    """
+    pedidos = int(db.scalar("SELECT count(*) FROM pedido") or 0)
+    results: Dict[str, Any] = {}
+    for combo in combos if combos is not None else combinations():
+        label = combo_label(combo)
+        sql, params = build_query(combo, values)
+        best = None
+        try:
+            for _ in range(max(1, repeat)):
+                summary = analyze_plan(explain(db, sql, params, timeout_ms))
+                if best is None or summary["execution_ms"] < best["execution_ms"]:
+                    best = summary
+        except Exception as e:
+            if "statement timeout" not in str(e) and "canceling statement" not in str(e):
+                raise
+            best = {"execution_ms": None, "rows": None, "seq_scans": [], "timeout_ms": timeout_ms,
+                    "findings": [{"kind": "timeout", "detail": f"excedeu {timeout_ms} ms"}]}
+        best["filters"] = list(combo)
+        results[label] = best
+        if on_combo is not None:
+            on_combo(label, best)
+    return {"pedidos": pedidos, "schema": schema_checks(db), "combos": results}
+
+
+def growth_exponent(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Inclinação do ajuste log-log (tempo ∝ pedidos^k) por mínimos quadrados; None com menos de 2 tamanhos."""
+    usable = [(math.log(n), math.log(max(t, 0.01))) for n, t in points if n and n > 0 and t is not None]
+    if len({x for x, _ in usable}) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    var = sum((x - mean_x) ** 2 for x, _ in usable)
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / var
+
+
+def project(datasets: Sequence[Dict[str, Any]], target_pedidos: int = DEFAULT_TARGET_PEDIDOS,
+            budget_ms: float = DEFAULT_BUDGET_MS) -> List[Dict[str, Any]]:
+    """
+    Tempo estimado de cada combinação no tamanho alvo a partir do maior conjunto medido. Com um único
+    tamanho assume crescimento linear (k=1). Risco: estimativa acima do orçamento, crescimento
+    superlinear (k > 1.2) ou timeout já na medição. Conjuntos sem pedidos não servem de base para
+    a extrapolação e são ignorados; ValueError se não sobrar nenhum.
+    """
+    ordered = sorted((d for d in datasets if d.get("pedidos")), key=lambda d: d["pedidos"])
+    if not ordered:
+        raise ValueError("nenhum conjunto de dados com pedidos para projetar")
+    largest = ordered[-1]
+    rows = []
+    for label, summary in largest["combos"].items():
+        points = [(d["pedidos"], d["combos"][label]["execution_ms"]) for d in ordered
+                  if label in d["combos"] and d["combos"][label].get("execution_ms") is not None]
+        k = growth_exponent(points)
+        measured = summary.get("execution_ms")
+        entry = {"combo": label, "exponent": None if k is None else round(k, 2), "measured_ms": measured,
+                 "measured_pedidos": largest["pedidos"], "projected_ms": None, "projected_rows": None}
+        if measured is not None:
+            scale = target_pedidos / largest["pedidos"]
+            # Sem ajuste (um tamanho só): linear; expoente negativo é ruído de medição
+            effective = 1.0 if k is None else max(k, 0.0)
+            entry["projected_ms"] = round(measured * scale ** effective, 1)
+            entry["projected_rows"] = int((summary.get("rows") or 0) * scale)
+        over_budget = entry["projected_ms"] is not None and entry["projected_ms"] > budget_ms
+        reasons = []
+        if measured is None:
+            reasons.append("timeout na medição")
+        elif over_budget:
+            reasons.append(f"~{entry['projected_ms'] / 1000:,.1f}s estimados")
+        if k is not None and k > 1.2:
+            reasons.append(f"crescimento superlinear (k={k:.2f})")
+        kinds = {f["kind"] for f in summary.get("findings", [])}
+        if "sort_disk" in kinds or "hashagg_disk" in kinds or "hash_batches" in kinds:
+            reasons.append("já transborda para disco")
+        entry["at_risk"] = measured is None or over_budget or (k is not None and k > 1.2)
+        entry["reasons"] = reasons
+        rows.append(entry)
+    rows.sort(key=lambda r: (not r["at_risk"], -(r["projected_ms"] or float("inf"))))
+    return rows
+
+
+def recommendations(datasets: Sequence[Dict[str, Any]]) -> List[str]:
+    """Sugestões a partir do schema e dos alertas observados no maior conjunto."""
+    largest = max(datasets, key=lambda d: d["pedidos"])
+    schema = largest["schema"]
+    combos = largest["combos"].values()
+    kinds = {f["kind"] for c in combos for f in c.get("findings", [])}
+    tips = []
+    if not schema["volume_pedido_index"]:
+        tips.append("volume(pedido_id) sem índice: o LEFT JOIN FETCH dos volumes (e o ON DELETE CASCADE) "
+                    "lê a tabela volume inteira. CREATE INDEX idx_volume_pedido ON volume(pedido_id);")
+    if not schema["destinatario_trgm_index"] and any("pedido" in c.get("seq_scans", []) and "destinatario" in c.get("filters", [])
+                                                     for c in combos):
+        tips.append("LIKE '%x%' em destinatario_nome não usa índice B-tree: CREATE EXTENSION pg_trgm; "
+                    "CREATE INDEX idx_pedido_destinatario_trgm ON pedido USING gin (lower(destinatario_nome) gin_trgm_ops);")
+    if kinds & {"sort_disk", "hashagg_disk", "hash_batches"}:
+        tips.append("DISTINCT + ORDER BY sobre todas as colunas de pedido e volume ordena o resultado inteiro "
+                    "(transbordando para disco): o Hibernate 6 já remove duplicatas do fetch join sem DISTINCT no SQL.")
+    if "unbounded_result" in kinds:
+        tips.append("Listagem sem paginação: o tempo cresce com o número de pedidos que casam com os filtros; "
+                    "limitar com setFirstResult/setMaxResults (paginação em duas etapas: ids, depois fetch dos volumes).")
+    return tips
+
+
+def format_dataset(name: str, dataset: Dict[str, Any]) -> List[str]:
+    lines = [f"Conjunto {name}: {dataset['pedidos']:,} pedidos",
+             f"{'filtros':<46} {'linhas':>9} {'ms':>10} {'buffers':>9}  alertas"]
+    for label, summary in dataset["combos"].items():
+        ms = summary.get("execution_ms")
+        buffers = (summary.get("shared_hit") or 0) + (summary.get("shared_read") or 0)
+        rows = summary.get("rows")
+        alerts = "; ".join(f["detail"] for f in summary.get("findings", []))
+        lines.append(f"{label:<46} {rows if rows is not None else '-':>9} {f'{ms:.1f}' if ms is not None else 'timeout':>10} "
+                     f"{buffers:>9}  {alerts}")
+    return lines
+
+
+def format_projection(rows: Sequence[Dict[str, Any]], target_pedidos: int, budget_ms: float) -> List[str]:
+    lines = [f"Projeção para {target_pedidos:,} pedidos (orçamento {budget_ms:g} ms por listagem):",
+             f"{'filtros':<46} {'k':>5} {'ms medido':>10} {'ms estimado':>12} {'linhas est.':>12}  risco"]
+    for row in rows:
+        k = f"{row['exponent']:.2f}" if row["exponent"] is not None else "1*"
+        measured = f"{row['measured_ms']:.1f}" if row["measured_ms"] is not None else "timeout"
+        projected = f"{row['projected_ms']:,.0f}" if row["projected_ms"] is not None else "-"
+        estimated_rows = f"{row['projected_rows']:,}" if row["projected_rows"] is not None else "-"
+        flag = "ALTO: " + ", ".join(row["reasons"]) if row["at_risk"] else ", ".join(row["reasons"])
+        lines.append(f"{row['combo']:<46} {k:>5} {measured:>10} {projected:>12} {estimated_rows:>12}  {flag}")
+    if any(row["exponent"] is None for row in rows):
+        lines.append("1* = um único tamanho medido: crescimento linear assumido (meça com --snapshots de tamanhos diferentes)")
+    return lines
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Motor asyncio de prontidão (readiness) compartilhado por main.py, main_tom.py e tests/conftest.py.
+
+Vários alvos (porta TCP do Tomcat/WildFly, PostgreSQL, URLs como /api/health/ready) são sondados
+ao mesmo tempo, com backoff exponencial com jitter e um prazo único: subir o ambiente completo
+leva o tempo do componente mais lento, e não a soma de esperas fixas. Sondas HTTP reutilizam a
+conexão (keep-alive) entre tentativas. O resultado traz, por alvo, o instante em que ficou pronto.
+"""
+
+import asyncio
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpclient
+
+DEFAULT_INITIAL_DELAY = 0.25
+DEFAULT_MAX_DELAY = 3.0
+DEFAULT_JITTER = 0.3
+DEFAULT_ATTEMPT_TIMEOUT = 3.0
+USER_AGENT = "app-jakarta-readiness/1.0"
+
+# SSLRequest do protocolo PostgreSQL: o postmaster responde 'S' ou 'N' assim que aceita conexões
+# (um accept TCP sozinho pode vir do docker-proxy com o contêiner ainda iniciando)
+_PG_SSL_REQUEST = struct.pack("!ii", 8, 80877103)
+
+
+def accept_2xx_3xx(status: int) -> bool:
+    """Pronto apenas com respostas 2xx ou 3xx (não 404/401)."""
+    return 200 <= status < 400
+
+
+def accept_below_500(status: int) -> bool:
+    """Pronto com qualquer resposta que não seja erro do servidor."""
+    return status < 500
+
+
+@dataclass
+class ProbeTarget:
+    """Alvo de prontidão: kind é 'tcp', 'postgres' ou 'http'."""
+    name: str
+    kind: str
+    host: str = "localhost"
+    port: int = 0
+    url: str = ""
+    accept: Callable[[int], bool] = accept_2xx_3xx
+    attempt_timeout: float = DEFAULT_ATTEMPT_TIMEOUT
+
+
+@dataclass
+class ProbeResult:
+    name: str
+    ready: bool = False
+    attempts: int = 0
+    ready_at: Optional[float] = None  # time.time() do momento em que ficou pronto
+    elapsed: Optional[float] = None   # segundos desde o início da espera
+    status: Optional[int] = None      # último status HTTP (sondas http)
+    detail: str = ""                  # último erro/observação
+
+
+@dataclass
+class ReadinessReport:
+    results: Dict[str, ProbeResult] = field(default_factory=dict)
+    started_at: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def all_ready(self) -> bool:
+        return all(r.ready for r in self.results.values())
+
+    def __getitem__(self, name: str) -> ProbeResult:
+        return self.results[name]
+
+    def pending(self) -> List[str]:
+        return [name for name, r in self.results.items() if not r.ready]
+
+
+def tcp_target(name: str, port: int, host: str = "localhost", attempt_timeout: float = 2.0) -> ProbeTarget:
+    return ProbeTarget(name=name, kind="tcp", host=host, port=int(port), attempt_timeout=attempt_timeout)
+
+
+def postgres_target(name: str, port: int, host: str = "localhost", attempt_timeout: float = 2.0) -> ProbeTarget:
+    return ProbeTarget(name=name, kind="postgres", host=host, port=int(port), attempt_timeout=attempt_timeout)
+
+
+def http_target(name: str, url: str, accept: Callable[[int], bool] = accept_2xx_3xx,
+                attempt_timeout: float = DEFAULT_ATTEMPT_TIMEOUT) -> ProbeTarget:
+    return ProbeTarget(name=name, kind="http", url=url, accept=accept, attempt_timeout=attempt_timeout)
+
+
+class _HttpKeepAlive:
+    """Sonda HTTP que mantém a conexão aberta entre tentativas (GET ou HEAD, sem redirect)."""
+
+    def __init__(self, url: str, method: str = "GET"):
+        self.method = method.upper()
+        secure, host, port, host_header, self.path = httpclient.split_url(url)
+        self.connection = httpclient.HttpConnection(host, port, secure, host_header,
+                                                    user_agent=USER_AGENT, accept="*/*")
+
+    async def close(self) -> None:
+        await self.connection.close()
+
+    async def get(self) -> int:
+        """Executa a requisição e retorna o status; o corpo é lido por completo para reaproveitar a conexão."""
+        return (await self.connection.request(self.method, self.path)).status
+
+
+async def _probe_once(target: ProbeTarget, http: Optional[_HttpKeepAlive]) -> Tuple[bool, Optional[int], str]:
+    if target.kind == "http":
+        status = await asyncio.wait_for(http.get(), timeout=target.attempt_timeout)
+        return target.accept(status), status, f"HTTP {status}"
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(target.host, target.port), timeout=target.attempt_timeout)
+    try:
+        if target.kind == "postgres":
+            writer.write(_PG_SSL_REQUEST)
+            await writer.drain()
+            answer = await asyncio.wait_for(reader.readexactly(1), timeout=target.attempt_timeout)
+            if answer not in (b"S", b"N"):
+                return False, None, f"resposta inesperada do PostgreSQL: {answer!r}"
+        return True, None, "ok"
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+async def _probe_until_ready(target: ProbeTarget, result: ProbeResult, started: float, deadline: float,
+                             initial_delay: float, max_delay: float, jitter: float) -> None:
+    http = _HttpKeepAlive(target.url) if target.kind == "http" else None
+    delay = initial_delay
+    try:
+        while True:
+            result.attempts += 1
+            try:
+                ok, status, detail = await _probe_once(target, http)
+                result.status = status
+                result.detail = detail
+            except asyncio.TimeoutError:
+                ok = False
+                result.detail = "timeout"
+                if http is not None:
+                    await http.close()
+            except Exception as exc:  # conexão recusada, reset, DNS etc.
+                ok = False
+                result.detail = str(exc) or exc.__class__.__name__
+                if http is not None:
+                    await http.close()
+            if ok:
+                result.ready = True
+                result.ready_at = time.time()
+                result.elapsed = time.monotonic() - started
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Backoff exponencial com jitter, sem ultrapassar o prazo compartilhado
+            sleep_for = delay * (1 + random.uniform(-jitter, jitter))
+            await asyncio.sleep(max(0.0, min(sleep_for, remaining)))
+            delay = min(delay * 2, max_delay)
+    finally:
+        if http is not None:
+            await http.close()
+
+
+async def probe_all(targets: Sequence[ProbeTarget], timeout: float,
+                    initial_delay: float = DEFAULT_INITIAL_DELAY,
+                    max_delay: float = DEFAULT_MAX_DELAY,
+                    jitter: float = DEFAULT_JITTER) -> ReadinessReport:
+    """Sonda todos os alvos em paralelo até ficarem prontos ou o prazo comum expirar."""
+    report = ReadinessReport(started_at=time.time())
+    started = time.monotonic()
+    deadline = started + max(0.0, float(timeout))
+    tasks = []
+    for target in targets:
+        result = ProbeResult(name=target.name)
+        report.results[target.name] = result
+        tasks.append(_probe_until_ready(target, result, started, deadline, initial_delay, max_delay, jitter))
+    if tasks:
+        # Margem para a última tentativa em andamento terminar após o prazo
+        grace = max((t.attempt_timeout for t in targets), default=0.0)
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout=max(0.0, float(timeout)) + grace)
+        except asyncio.TimeoutError:
+            pass
+    report.elapsed = time.monotonic() - started
+    return report
+
+
+def _run(coro):
+    """Executa a corrotina mesmo quando já existe um event loop ativo nesta thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    box: Dict[str, object] = {}
+
+    def runner() -> None:
+        try:
+            box["value"] = asyncio.run(coro)
+        except BaseException as exc:  # propagado para a thread chamadora
+            box["error"] = exc
+
+    thread = threading.Thread(target=runner, name="readiness-probe", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]  # type: ignore[misc]
+    return box["value"]
+
+
+def wait_ready(targets: Sequence[ProbeTarget], timeout: float, **kwargs) -> ReadinessReport:
+    """Versão síncrona de probe_all para os fluxos bloqueantes dos scripts."""
+    return _run(probe_all(list(targets), timeout, **kwargs))
+
+
+def wait_for_port(port: int, timeout: float = 30, host: str = "localhost") -> bool:
+    return wait_ready([tcp_target(f"{host}:{port}", port, host)], timeout).all_ready
+
+
+def wait_for_url(url: str, timeout: float = 30, accept: Callable[[int], bool] = accept_2xx_3xx) -> bool:
+    return wait_ready([http_target(url, url, accept)], timeout).all_ready
+
+
+def format_report(report: ReadinessReport) -> str:
+    """Resumo de uma linha por alvo: pronto em X s (N tentativas) ou pendente com o último erro."""
+    lines = []
+    for name, r in report.results.items():
+        if r.ready:
+            lines.append(f"{name}: pronto em {r.elapsed:.2f}s ({r.attempts} tentativa(s))")
+        else:
+            lines.append(f"{name}: indisponível após {r.attempts} tentativa(s) ({r.detail or 'sem resposta'})")
+    return "\n".join(lines)
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Carga em massa de dados sintéticos (posicao, pedido, volume, evento) via COPY FROM STDIN.
+
+As linhas são produzidas por geradores e enviadas ao COPY por um adaptador de leitura, então a
+memória é constante qualquer que seja o volume. Os atributos de cada pedido (status, datas,
+destinatário, quantidade de volumes) são funções determinísticas do índice do pedido e da
+semente: os fluxos de volume e evento recalculam o mesmo pedido sem guardar nada entre as
+tabelas. Os ids de pedido são reservados de uma vez na sequência, para que volume/evento
+referenciem pedido_id sem idas e voltas ao banco.
+
+Restrições do schema V1 respeitadas: codigo/etiqueta únicos (prefixo SEED-<tag>-), canal 'MANUAL',
+status/tipo dentro dos CHECKs, FKs para pedido e posicao.
+"""
+
+import functools
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PEDIDO_STATUSES = ("RECEBIDO", "PRONTO", "RETIRADO")
+DEFAULT_STATUS_MIX = {"RECEBIDO": 0.2, "PRONTO": 0.3, "RETIRADO": 0.5}
+
+FIRST_NAMES = (
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+    "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vanessa", "William",
+)
+LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+)
+_EPOCH = datetime(1970, 1, 1)
+# Tag dos códigos SEED-<tag>-<9 dígitos>: sem curingas do LIKE (o --purge apaga por prefixo) e curta o
+# bastante para codigo e etiqueta (codigo-V<n>) caberem em VARCHAR(64)
+TAG_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9-]*$")
+MAX_TAG_LENGTH = 40
+DIMENSIONS = ("30x20x15", "40x30x20", "20x15x10", "60x40x40", "25x25x25")
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(i: int, salt: int) -> int:
+    """splitmix64: inteiro pseudoaleatório de 64 bits, determinístico por (índice, sal)."""
+    z = (i * 0x9E3779B97F4A7C15 + salt) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+_INV24 = 1.0 / (1 << 24)
+
+
+def parse_distribution(text: Optional[str], default: Dict[str, float]) -> Dict[str, float]:
+    """'RECEBIDO=0.2,PRONTO=0.3,RETIRADO=0.5' -> pesos normalizados."""
+    if not text:
+        weights = dict(default)
+    else:
+        weights = {}
+        for part in text.split(","):
+            name, _, value = part.partition("=")
+            name = name.strip().upper()
+            if not name:
+                continue
+            if name not in PEDIDO_STATUSES:
+                raise ValueError(f"Status desconhecido na distribuição: {name}")
+            weights[name] = float(value) if value.strip() else 1.0
+    total = sum(w for w in weights.values() if w > 0)
+    if total <= 0:
+        raise ValueError("Distribuição de status sem pesos positivos")
+    return {k: v / total for k, v in weights.items() if v > 0}
+
+
+def validate_tag(tag: str) -> str:
+    if not TAG_PATTERN.match(tag or ""):
+        raise ValueError(f"Tag inválida: {tag!r} (use letras, dígitos e '-')")
+    if len(tag) > MAX_TAG_LENGTH:
+        raise ValueError(f"Tag longa demais: {len(tag)} caracteres (máximo {MAX_TAG_LENGTH})")
+    return tag
+
+
+class SeedConfig:
+    def __init__(self, pedidos: int = 100_000, posicoes: int = 2_000, max_volumes: int = 3,
+                 status_mix: Optional[Dict[str, float]] = None, days: float = 365.0, recency_skew: float = 1.0,
+                 names: int = 5_000, tag: Optional[str] = None, seed: int = 1, now: Optional[datetime] = None):
+        self.pedidos = max(0, int(pedidos))
+        self.posicoes = max(0, int(posicoes))
+        self.max_volumes = max(1, int(max_volumes))
+        self.status_mix = parse_distribution(None, status_mix or DEFAULT_STATUS_MIX)
+        self.days = max(0.0, float(days))
+        # >1 concentra os pedidos nos dias mais recentes; 1 = uniforme no intervalo
+        self.recency_skew = max(0.05, float(recency_skew))
+        self.names = max(1, int(names))
+        self.tag = validate_tag(tag) if tag else datetime.now().strftime("%Y%m%d%H%M%S")
+        self.seed = int(seed)
+        self.now = (now or datetime.now()).replace(microsecond=0)
+        self.now_seconds = int((self.now - _EPOCH).total_seconds())
+        cumulative, acc = [], 0.0
+        for status in PEDIDO_STATUSES:
+            acc += self.status_mix.get(status, 0.0)
+            cumulative.append((acc, status))
+        self._cumulative = cumulative
+
+    @property
+    def code_prefix(self) -> str:
+        return f"SEED-{self.tag}-"
+
+    def describe(self) -> str:
+        mix = ", ".join(f"{k} {v:.0%}" for k, v in self.status_mix.items())
+        return (f"{self.pedidos} pedidos (até {self.max_volumes} volumes), {self.posicoes} posições, status [{mix}], "
+                f"created_at em {self.days:g} dias (viés {self.recency_skew:g}), {self.names} destinatários, prefixo {self.code_prefix}")
+
+
+class PedidoShape:
+    """Atributos de um pedido derivados do índice (recalculáveis em qualquer fluxo)."""
+    __slots__ = ("index", "id", "codigo", "status", "created_at", "ready_at", "picked_up_at", "name_key", "volumes")
+
+    def __init__(self, config: SeedConfig, index: int, pedido_id: int):
+        s = config.seed
+        self.index = index
+        self.id = pedido_id
+        self.codigo = f"{config.code_prefix}{index:09d}"
+        # Três hashes por pedido, fatiados em campos independentes (status, idade, volumes / prazos / nome)
+        h1 = _mix(index, s)
+        h2 = _mix(index, s ^ 0x5DEECE66D)
+        u = (h1 & 0xFFFFFF) * _INV24
+        self.status = config._cumulative[-1][1]
+        for threshold, status in config._cumulative:
+            if u < threshold:
+                self.status = status
+                break
+        # Datas em segundos desde 1970-01-01 (ingênuas, como TIMESTAMP sem fuso): formatar datetime por linha
+        # custaria mais que o restante da geração
+        age = ((h1 >> 24) & 0xFFFFFF) * _INV24
+        self.created_at = config.now_seconds - int(config.days * 86400 * (age ** config.recency_skew))
+        self.ready_at = None
+        self.picked_up_at = None
+        if self.status != "RECEBIDO":
+            self.ready_at = self.created_at + 600 + (h2 & 0xFFFFFFF) % (2 * 86400)
+            if self.status == "RETIRADO":
+                self.picked_up_at = self.ready_at + 300 + ((h2 >> 28) & 0xFFFFFFF) % (5 * 86400)
+        self.name_key = _mix(index, s ^ 0x77) % config.names
+        self.volumes = 1 + (h1 >> 48) % config.max_volumes
+
+
+@functools.lru_cache(maxsize=4096)
+def _day(days: int) -> str:
+    return (_EPOCH + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _ts(seconds: Optional[int]) -> str:
+    if seconds is None:
+        return "\\N"
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{_day(days)} {hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+@functools.lru_cache(maxsize=65536)
+def _destinatario(seed: int, key: int) -> str:
+    """Colunas nome/documento/telefone (já separadas por TAB) do destinatário `key`."""
+    first = FIRST_NAMES[key % len(FIRST_NAMES)]
+    last = LAST_NAMES[(key // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    suffix = key // (len(FIRST_NAMES) * len(LAST_NAMES))
+    name = f"{first} {last}" + (f" {suffix}" if suffix else "")
+    return f"{name}\t{_mix(key, seed ^ 0xD0) % 10**11:011d}\t119{_mix(key, seed ^ 0xF0) % 10**8:08d}"
+
+
+def _shapes(config: SeedConfig, first_id: int) -> Iterator[PedidoShape]:
+    for index in range(config.pedidos):
+        yield PedidoShape(config, index, first_id + index)
+
+
+def pedido_rows(config: SeedConfig, first_id: int) -> Iterator[str]:
+    for p in _shapes(config, first_id):
+        yield (f"{p.id}\t{p.codigo}\tMANUAL\t{_destinatario(config.seed, p.name_key)}\t{p.status}\t"
+               f"{_ts(p.created_at)}\t{_ts(p.ready_at)}\t{_ts(p.picked_up_at)}\n")
+
+
+def volume_rows(config: SeedConfig, first_id: int, posicao_ids: Sequence[int]) -> Iterator[str]:
+    """Volumes: RECEBIDO sem posição; PRONTO alocado numa posição; RETIRADO com a posição liberada."""
+    n_pos = len(posicao_ids)
+    for p in _shapes(config, first_id):
+        for v in range(p.volumes):
+            peso = 0.2 + (_mix(p.index * 8 + v, config.seed ^ 0x5E) % 3000) / 100.0
+            dims = DIMENSIONS[(p.index + v) % len(DIMENSIONS)]
+            posicao = "\\N"
+            if p.status == "PRONTO" and n_pos:
+                posicao = str(posicao_ids[_mix(p.index * 8 + v, config.seed ^ 0x9A) % n_pos])
+            yield f"{p.id}\t{p.codigo}-V{v + 1}\t{peso:.2f}\t{dims}\t{p.status}\t{posicao}\n"
+
+
+def evento_rows(config: SeedConfig, first_id: int) -> Iterator[str]:
+    """CRIACAO para todos; PRONTO e RETIRADA conforme o status, com os horários do pedido."""
+    for p in _shapes(config, first_id):
+        yield f"{p.id}\tCRIACAO\t{{\"codigo\":\"{p.codigo}\"}}\t{_ts(p.created_at)}\tseed\n"
+        if p.ready_at is not None:
+            yield f"{p.id}\tPRONTO\t\\N\t{_ts(p.ready_at)}\tseed\n"
+        if p.picked_up_at is not None:
+            yield f"{p.id}\tRETIRADA\t\\N\t{_ts(p.picked_up_at)}\tseed\n"
+
+
+def posicao_rows(config: SeedConfig) -> Iterator[str]:
+    """Posições R<rua>/M<módulo>/N<nível>/C<caixa> (20 caixas por nível, 5 níveis, 10 módulos)."""
+    for i in range(config.posicoes):
+        caixa, rest = i % 20, i // 20
+        nivel, rest = rest % 5, rest // 5
+        modulo, rua = rest % 10, rest // 10
+        yield f"R{rua + 1:03d}\tM{modulo + 1:02d}\tN{nivel + 1}\tC{caixa + 1:02d}\tfalse\n"
+
+
+class IterStream:
+    """Adaptador arquivo-somente-leitura sobre um iterável de linhas (str), para copy_expert."""
+
+    def __init__(self, lines: Iterable[str], on_rows: Optional[Callable[[int], None]] = None, every: int = 100_000):
+        self._lines = iter(lines)
+        self._buffer = b""
+        self.rows = 0
+        self.bytes = 0
+        self._on_rows = on_rows
+        self._every = max(1, every)
+
+    def read(self, size: int = -1) -> bytes:
+        chunks: List[bytes] = [self._buffer] if self._buffer else []
+        have = len(self._buffer)
+        target = size if size and size > 0 else 1 << 16
+        while have < target:
+            try:
+                line = next(self._lines)
+            except StopIteration:
+                break
+            data = line.encode("utf-8")
+            chunks.append(data)
+            have += len(data)
+            self.rows += 1
+            if self._on_rows is not None and self.rows % self._every == 0:
+                self._on_rows(self.rows)
+        data = b"".join(chunks)
+        out, self._buffer = data[:target], data[target:]
+        self.bytes += len(out)
+        return out
+
+    readline = read
+
+
+def _copy(cur, table: str, columns: Sequence[str], rows: Iterable[str],
+          progress: Optional[Callable[[str, int], None]]) -> Tuple[int, float]:
+    started = time.perf_counter()
+    stream = IterStream(rows, (lambda n: progress(table, n)) if progress else None)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream, size=1 << 18)
+    return stream.rows, time.perf_counter() - started
+
+
+def _reserve_ids(cur, table: str, count: int) -> int:
+    """Reserva `count` ids consecutivos na sequência serial da tabela e retorna o primeiro."""
+    cur.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+        (table, table, count),
+    )
+    last = int(cur.fetchone()[0])
+    return last - count + 1
+
+
+def seed(conn, config: SeedConfig, progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Executa a carga numa única transação (tudo ou nada) e retorna {tabela: {rows, seconds}}.
+    O commit síncrono é desligado apenas nesta transação; ANALYZE ao final atualiza as estatísticas.
+    """
+    stats: Dict[str, Dict[str, float]] = {}
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL synchronous_commit = off")
+            # Impede inserções concorrentes em pedido enquanto os ids reservados são usados
+            cur.execute("LOCK TABLE pedido IN SHARE ROW EXCLUSIVE MODE")
+
+            if config.posicoes:
+                started = time.perf_counter()
+                cur.execute("CREATE TEMP TABLE seed_posicao (LIKE posicao INCLUDING DEFAULTS) ON COMMIT DROP")
+                rows, _ = _copy(cur, "seed_posicao", ("rua", "modulo", "nivel", "caixa", "ocupada"),
+                                posicao_rows(config), progress)
+                cur.execute(
+                    "INSERT INTO posicao (rua, modulo, nivel, caixa, ocupada) "
+                    "SELECT rua, modulo, nivel, caixa, ocupada FROM seed_posicao "
+                    "ON CONFLICT ON CONSTRAINT ux_posicao_codigo DO NOTHING"
+                )
+                stats["posicao"] = {"rows": cur.rowcount, "seconds": time.perf_counter() - started}
+            cur.execute("SELECT id FROM posicao ORDER BY id")
+            posicao_ids = [row[0] for row in cur.fetchall()]
+
+            if config.pedidos:
+                first_id = _reserve_ids(cur, "pedido", config.pedidos)
+                for table, columns, rows in (
+                    ("pedido", ("id", "codigo", "canal", "destinatario_nome", "destinatario_documento",
+                                "destinatario_telefone", "status", "created_at", "ready_at", "picked_up_at"),
+                     pedido_rows(config, first_id)),
+                    ("volume", ("pedido_id", "etiqueta", "peso", "dimensoes", "status", "posicao_id"),
+                     volume_rows(config, first_id, posicao_ids)),
+                    ("evento", ("pedido_id", "tipo", "payload", "created_at", "actor"),
+                     evento_rows(config, first_id)),
+                ):
+                    count, seconds = _copy(cur, table, columns, rows, progress)
+                    stats[table] = {"rows": count, "seconds": seconds}
+                # Posições usadas por volumes PRONTO passam a ocupadas (uma instrução)
+                cur.execute(
+                    "UPDATE posicao SET ocupada = true WHERE NOT ocupada AND id IN "
+                    "(SELECT DISTINCT posicao_id FROM volume WHERE pedido_id BETWEEN %s AND %s AND posicao_id IS NOT NULL)",
+                    (first_id, first_id + config.pedidos - 1),
+                )
+    # ANALYZE fora da transação da carga
+    old_autocommit = conn.autocommit
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            started = time.perf_counter()
+            cur.execute("ANALYZE posicao, pedido, volume, evento")
+            stats["analyze"] = {"rows": 0, "seconds": time.perf_counter() - started}
+    finally:
+        conn.autocommit = old_autocommit
+    return stats
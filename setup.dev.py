@@ -65,6 +65,10 @@ REQUIREMENTS = PROJECT_ROOT / "requirements.txt"
 POSTGRES_CONTAINER = "meu-app-postgres"
 POSTGRES_DB = "meu_app_db"
 POSTGRES_USER = "meu_app_user"
+# Acesso direto (driver) pela porta publicada pelo docker-compose; mesmas variáveis APP_DB_* do main.py
+POSTGRES_HOST = os.environ.get("APP_DB_HOST", "localhost")
+POSTGRES_PORT = int(os.environ.get("APP_DB_PORT", "5432"))
+POSTGRES_PASSWORD = os.environ.get("APP_DB_PASSWORD", "meu_app_password")
 ADMIN_EMAIL = "admin@meuapp.com"
 ADMIN_PLAIN = "Admin@123"
 BCRYPT_HASH_PATTERN = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
@@ -96,6 +100,7 @@ class Status:
             "Postgres": "NOK",
             "PostgresConn": "NOK",
             "PostgresSchema": "NOK",
+            "PostgresVia": "",
             "Perfis": "Pending",
             "Venv": "NOK",
             "WslDefault": "",
@@ -967,51 +972,131 @@ def check_postgres_container(args):
     status.set("Postgres", "OK" if health == "healthy" else health)
 
 
+# Todas as verificações do banco (tabelas, coluna perfil, contagens e hash do ADMIN) numa única ida ao
+# servidor: uma função temporária (pg_temp, descartada com a sessão) só consulta as tabelas que existem,
+# então um schema incompleto não derruba o lote.
+_DB_PROBE_SQL = """
+CREATE OR REPLACE FUNCTION pg_temp.setup_probe(admin_email text)
+RETURNS TABLE (has_usuarios boolean, has_produtos boolean, has_perfil boolean,
+               usuarios bigint, produtos bigint, admins bigint, admin_hash text)
+LANGUAGE plpgsql AS $$
+BEGIN
+    has_usuarios := to_regclass('public.usuarios') IS NOT NULL;
+    has_produtos := to_regclass('public.produtos') IS NOT NULL;
+    has_perfil := EXISTS (SELECT 1 FROM information_schema.columns c
+                          WHERE c.table_schema = 'public' AND c.table_name = 'usuarios' AND c.column_name = 'perfil');
+    IF has_usuarios THEN
+        EXECUTE 'SELECT count(*) FROM public.usuarios' INTO usuarios;
+        EXECUTE 'SELECT senha FROM public.usuarios WHERE email = $1 LIMIT 1' INTO admin_hash USING admin_email;
+    END IF;
+    IF has_produtos THEN
+        EXECUTE 'SELECT count(*) FROM public.produtos' INTO produtos;
+    END IF;
+    IF has_perfil THEN
+        EXECUTE 'SELECT count(*) FROM public.usuarios WHERE perfil = ''ADMIN''' INTO admins;
+    END IF;
+    RETURN NEXT;
+END
+$$;
+SELECT * FROM pg_temp.setup_probe(%s);
+"""
+_DB_PROBE_FIELDS = ("has_usuarios", "has_produtos", "has_perfil", "usuarios", "produtos", "admins", "admin_hash")
+_db_probe_cache: Dict[str, Any] = {}
+
+
+def _port_open(host: str, port: int, timeout: float = 1.0) -> bool:
+    if host.startswith("/"):
+        # Socket Unix (APP_DB_HOST=/var/run/postgresql): o driver conecta sem porta TCP
+        return os.path.exists(os.path.join(host, f".s.PGSQL.{port}"))
+    import socket
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _probe_via_driver(args):
+    """Lote pelo driver (pool do dbpool.py) na porta publicada; None se indisponível."""
+    try:
+        import dbpool
+    except Exception:
+        return None
+    if not dbpool.available() or not _port_open(POSTGRES_HOST, POSTGRES_PORT):
+        return None
+    config = {"host": POSTGRES_HOST, "port": POSTGRES_PORT, "name": POSTGRES_DB,
+              "user": POSTGRES_USER, "password": POSTGRES_PASSWORD}
+    try:
+        row = dbpool.get_database(config, retries=0).fetchone(_DB_PROBE_SQL, (ADMIN_EMAIL,))
+    except Exception as e:
+        if args.verbose:
+            warn(f"Driver Postgres indisponível ({str(e).strip()}); usando docker exec psql.", args)
+        return None
+    return dict(zip(_DB_PROBE_FIELDS, row), via="driver")
+
+
+def _probe_via_docker(args):
+    """Mesmo lote num único `docker exec psql` (porta não publicada ou psycopg2 ausente)."""
+    sql = _DB_PROBE_SQL.replace("%s", "'" + ADMIN_EMAIL.replace("'", "''") + "'")
+    cp = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB,
+                  "-X", "-q", "-t", "-A", "-F", "|", "-v", "ON_ERROR_STOP=1", "-c", sql])
+    lines = [line for line in (cp.stdout or "").splitlines() if line.strip()]
+    if cp.returncode != 0 or not lines:
+        return None
+    values = lines[-1].split("|", len(_DB_PROBE_FIELDS) - 1)
+    if len(values) != len(_DB_PROBE_FIELDS):
+        return None
+    probe: Dict[str, Any] = {"via": "docker exec psql"}
+    for field, value in zip(_DB_PROBE_FIELDS, values):
+        if field.startswith("has_"):
+            probe[field] = value == "t"
+        elif field == "admin_hash":
+            probe[field] = value or None
+        else:
+            probe[field] = int(value) if value else None
+    return probe
+
+
+def probe_postgres(args, refresh: bool = False):
+    """Resultado do lote (dict com os campos de _DB_PROBE_FIELDS + "via"), reaproveitado entre as etapas."""
+    if refresh or "result" not in _db_probe_cache:
+        _db_probe_cache["result"] = _probe_via_driver(args) or _probe_via_docker(args)
+    return _db_probe_cache["result"]
+
+
 def check_postgres_db(args):
     if status.data["Postgres"] != "OK":
         warn("Pulando teste de DB: container não saudável.", args)
         return
     info("Testando conexão Postgres...", args)
-    cp = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-c", "SELECT 1;"])
-    if cp.returncode != 0:
+    probe = probe_postgres(args, refresh=True)
+    if probe is None:
         err("Falha ao conectar no Postgres.", args)
         return
-    ok("Conexão psql ok.", args)
+    ok(f"Conexão ok ({probe['via']}).", args)
     status.set("PostgresConn", "OK")
+    status.set("PostgresVia", probe["via"])
     info("Validando schema (tabelas usuarios/produtos)...", args)
-    cmd_tables = "SELECT to_regclass('public.usuarios') IS NOT NULL, to_regclass('public.produtos') IS NOT NULL;"
-    cp_tables = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-A", "-F", ",", "-t", "-c", cmd_tables])
-    if cp_tables.returncode != 0:
-        err("Falha verificação tabelas.", args)
-        return
-    flags = cp_tables.stdout.strip().split(",")
-    u_ok = (len(flags) > 0 and flags[0] == 't')
-    p_ok = (len(flags) > 1 and flags[1] == 't')
-    
+    u_ok = probe["has_usuarios"]
+    p_ok = probe["has_produtos"]
+
     # Se tabelas estão ausentes e auto-fix está habilitado, criar tabelas
     if args.auto_fix and (not u_ok or not p_ok):
         info("Tentando criar tabelas ausentes automaticamente...", args)
         create_missing_tables(args, not u_ok, not p_ok)
         # Verificar novamente após a criação
-        cp_tables = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-A", "-F", ",", "-t", "-c", cmd_tables])
-        if cp_tables.returncode == 0:
-            flags = cp_tables.stdout.strip().split(",")
-            u_ok = (len(flags) > 0 and flags[0] == 't')
-            p_ok = (len(flags) > 1 and flags[1] == 't')
-    
-    cp_counts = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-A", "-F", ",", "-t", "-c", "SELECT (SELECT COUNT(*) FROM usuarios WHERE 1=1 OR to_regclass('public.usuarios') IS NULL),(SELECT COUNT(*) FROM produtos WHERE 1=1 OR to_regclass('public.produtos') IS NULL);"])
-    if cp_counts.returncode == 0:
-        counts = cp_counts.stdout.strip().split(",")
-        uc = counts[0] if counts else "?"
-        pc = counts[1] if len(counts) > 1 else "?"
-        if u_ok and p_ok:
-            status.set("PostgresSchema", "OK")
-            ok(f"Schema ok (usuarios={uc}, produtos={pc})", args)
-        else:
-            status.set("PostgresSchema", "Parcial")
-            warn(f"Schema parcial (usuariosOk={u_ok}, produtosOk={p_ok})", args)
+        probe = probe_postgres(args, refresh=True) or probe
+        u_ok = probe["has_usuarios"]
+        p_ok = probe["has_produtos"]
+
+    uc = probe["usuarios"] if probe["usuarios"] is not None else "?"
+    pc = probe["produtos"] if probe["produtos"] is not None else "?"
+    if u_ok and p_ok:
+        status.set("PostgresSchema", "OK")
+        ok(f"Schema ok (usuarios={uc}, produtos={pc})", args)
     else:
-        err("Falha obtendo contagens.", args)
+        status.set("PostgresSchema", "Parcial")
+        warn(f"Schema parcial (usuariosOk={u_ok}, produtosOk={p_ok})", args)
 
 
 def create_missing_tables(args, create_usuarios=False, create_produtos=False):
@@ -1071,16 +1156,14 @@ def count_admins(args):
     if status.data["PostgresSchema"] != "OK":
         return
     info("Contando usuários ADMIN...", args)
-    cp_col = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-A", "-c", "SELECT 1 FROM information_schema.columns WHERE table_name='usuarios' AND column_name='perfil' LIMIT 1;"])
-    has_perfil = (cp_col.returncode == 0 and cp_col.stdout.strip() == '1')
-    if not has_perfil:
-        warn("Coluna 'perfil' ausente em usuarios (schema antigo).", args)
-        return
-    cp_count = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-A", "-c", "SELECT COUNT(*) FROM usuarios WHERE perfil='ADMIN';"])
-    if cp_count.returncode != 0:
+    probe = probe_postgres(args)
+    if probe is None:
         warn("Não foi possível contar usuários ADMIN.", args)
         return
-    val = int(cp_count.stdout.strip() or 0)
+    if not probe["has_perfil"]:
+        warn("Coluna 'perfil' ausente em usuarios (schema antigo).", args)
+        return
+    val = int(probe["admins"] or 0)
     status.set("AdminCount", val)
     if val > 0:
         ok(f"Admins existentes: {val}", args)
@@ -1092,14 +1175,13 @@ def validate_admin_hash(args):
     if status.data["AdminCount"] <= 0 or status.data["PostgresSchema"] != "OK":
         return
     info("Validando hash bcrypt do admin padrão...", args)
-    cp_hash = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-A", "-c", f"SELECT senha FROM usuarios WHERE email='{ADMIN_EMAIL}' LIMIT 1;"])
-    if cp_hash.returncode != 0 or not cp_hash.stdout.strip():
+    hash_val = (probe_postgres(args) or {}).get("admin_hash")
+    if not hash_val:
         warn("Hash admin não obtido.", args)
         return
-    hash_val = cp_hash.stdout.strip()
     if not BCRYPT_HASH_PATTERN.match(hash_val):
         warn("Formato de hash inesperado (não parece BCrypt).", args)
-    
+
     # Tentar instalar bcrypt automaticamente se não estiver disponível
     try:
         import bcrypt
@@ -1156,22 +1238,19 @@ def ensure_admin(args):
         warn("--ensure-admin ignorado: schema não OK.", args)
         return
     
-    # Verificar quantos administradores existem
+    # Verificar quantos administradores existem (lote de check_postgres_db)
     info("Verificando usuários ADMIN existentes...", args)
-    cp_count = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-A", "-c", "SELECT COUNT(*) FROM usuarios WHERE perfil='ADMIN';"])
-    if cp_count.returncode != 0:
+    probe = probe_postgres(args)
+    if probe is None:
         warn("Não foi possível contar usuários ADMIN.", args)
         return
     
-    admin_count = int(cp_count.stdout.strip() or 0)
+    admin_count = int(probe["admins"] or 0)
     
     # Se não há nenhum admin, criar um
     if admin_count == 0:
         info("Nenhum usuário ADMIN encontrado. Criando usuário ADMIN default...", args)
-        cp_col = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-t", "-A", "-c", "SELECT 1 FROM information_schema.columns WHERE table_name='usuarios' AND column_name='perfil' LIMIT 1;"])
-        has_perfil = (cp_col.returncode == 0 and cp_col.stdout.strip() == '1')
-        
-        if not has_perfil:
+        if not probe["has_perfil"]:
             warn("Coluna 'perfil' ausente. Aplicando migração leve (ALTER TABLE).", args)
             cp_alter = run_cmd(["docker", "exec", POSTGRES_CONTAINER, "psql", "-U", POSTGRES_USER, "-d", POSTGRES_DB, "-c", "ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS perfil VARCHAR(20) DEFAULT 'OPERADOR' CHECK (perfil IN ('ADMIN','SUPERVISOR','OPERADOR'));" ])
             if cp_alter.returncode != 0:
@@ -1215,7 +1294,8 @@ def ensure_admin(args):
         else:
             err("Falha ao atualizar perfil de outros administradores.", args)
     
-    # Atualizar contagens e validar hash
+    # Atualizar contagens e validar hash (novo lote: as alterações acima invalidam o anterior)
+    probe_postgres(args, refresh=True)
     count_admins(args)
     validate_admin_hash(args)
 
@@ -1298,11 +1378,11 @@ def show_summary(args, start_time):
     print(f"{Colors.MAGENTA}{title}{Colors.RESET}" if Colors.MAGENTA else title)
     d = status.data
     ordered_keys = [
-        "Java","JavaVersion","Maven","MavenVersion","MavenSource","DockerCli","DockerVersion","DockerDaemon","WSL","WslDefault","Postgres","PostgresConn","PostgresSchema","AdminCount","AdminHash","Perfis","Venv","DuraçãoSeg"
+        "Java","JavaVersion","Maven","MavenVersion","MavenSource","DockerCli","DockerVersion","DockerDaemon","WSL","WslDefault","Postgres","PostgresConn","PostgresVia","PostgresSchema","AdminCount","AdminHash","Perfis","Venv","DuraçãoSeg"
     ]
     d["DuraçãoSeg"] = round(time.time() - start_time, 2)
     for k in ordered_keys:
-        if k == "WslDefault" and not d.get(k):
+        if k in ("WslDefault", "PostgresVia") and not d.get(k):
             continue
         print(f"{k:15}: {d.get(k)}")
     sugg = status.suggestions(args.only_check, args.ensure_admin)
@@ -1,22 +1,24 @@
 from __future__ import annotations
 
 import os
-import time
+import sys
+from pathlib import Path
 from typing import Dict, Iterable, List
 from urllib.parse import urljoin
 
 import pytest
 import requests
 
-try:
-    import psycopg2
-    from psycopg2 import OperationalError
-except Exception:  # pragma: no cover
-    psycopg2 = None  # type: ignore
-    OperationalError = Exception  # type: ignore[misc]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dbpool  # noqa: E402
+import dbsnapshot  # noqa: E402
+import readiness  # noqa: E402
 
 DEFAULT_BASE_URL = "http://localhost:9090/caracore-hub/"
 DEFAULT_WAIT_SECONDS = 30
+# application_name padrão das conexões do pgjdbc (pool da aplicação)
+JDBC_APPLICATION_NAME = "PostgreSQL JDBC Driver"
 
 
 def _ensure_trailing_slash(value: str) -> str:
@@ -45,18 +47,14 @@ def admin_credentials() -> Dict[str, str]:
 def ensure_app_running(base_url: str):
     login_url = urljoin(base_url, "login")
     wait_seconds = int(os.getenv("APP_TEST_WAIT_SECONDS", str(DEFAULT_WAIT_SECONDS)))
-    deadlines = time.time() + max(wait_seconds, 1)
-    last_error: str | None = None
-    while time.time() < deadlines:
-        try:
-            response = requests.get(login_url, timeout=5, allow_redirects=True)
-            if response.status_code < 500:
-                return {"login_url": login_url, "status_code": response.status_code}
-            last_error = f"HTTP {response.status_code}"
-        except requests.RequestException as exc:  # pragma: no cover - network errors
-            last_error = str(exc)
-        time.sleep(2)
-    pytest.skip(f"Aplicação indisponível em {login_url}: {last_error}")
+    report = readiness.wait_ready(
+        [readiness.http_target("login", login_url, accept=readiness.accept_below_500, attempt_timeout=5)],
+        timeout=max(wait_seconds, 1),
+    )
+    result = report["login"]
+    if result.ready:
+        return {"login_url": login_url, "status_code": result.status}
+    pytest.skip(f"Aplicação indisponível em {login_url}: {result.detail}")
 
 
 @pytest.fixture()
@@ -73,8 +71,7 @@ def api_session(ensure_app_running) -> requests.Session:
     session.close()
 
 
-@pytest.fixture(scope="session")
-def db_config() -> Dict[str, str]:
+def _db_settings() -> Dict[str, str]:
     return {
         "host": os.getenv("APP_TEST_DB_HOST", "localhost"),
         "port": int(os.getenv("APP_TEST_DB_PORT", "5432")),
@@ -84,23 +81,84 @@ def db_config() -> Dict[str, str]:
     }
 
 
+@pytest.fixture(scope="session", autouse=True)
+def db_snapshot():
+    """
+    APP_TEST_DB_SNAPSHOT=<nome>: clona o snapshot (main.py snapshot save) num banco da sessão,
+    APP_TEST_DB_CLONE (padrão: <banco>__pytest), removido ao final. O banco da aplicação não é
+    alterado; o servidor testado deve usar o clone, o que `db_config` confere antes de qualquer limpeza.
+    """
+    name = os.getenv("APP_TEST_DB_SNAPSHOT")
+    if not name:
+        yield None
+        return
+    settings = _db_settings()
+    db = {key: settings[key] for key in ("host", "port", "user", "password")}
+    db["name"] = settings["dbname"]
+    target = os.getenv("APP_TEST_DB_CLONE") or f"{settings['dbname']}__pytest"
+    try:
+        info = dbsnapshot.clone_from_config(db, name, target)
+    except dbsnapshot.SnapshotError as exc:
+        pytest.fail(f"Snapshot '{name}' não clonado em {target}: {exc}")
+    yield info
+    try:
+        dbsnapshot.drop_from_config(db, target)
+    except dbsnapshot.SnapshotError:  # pragma: no cover - banco ocupado ao final da sessão
+        pass
+
+
+def _db_from_config(db_config: Dict[str, str]) -> Dict[str, str]:
+    db = {key: db_config[key] for key in ("host", "port", "user", "password")}
+    db["name"] = db_config["dbname"]
+    return db
+
+
+def _require_app_on_clone(api_base_url: str, db_config: Dict[str, str]) -> None:
+    """Falha a sessão se a aplicação não tiver conexões no clone: a limpeza iria para o banco errado."""
+    clone = db_config["dbname"]
+    try:
+        # /health/ready passa pelo pool da aplicação, que assim tem conexões abertas na consulta abaixo
+        requests.get(urljoin(api_base_url, "health/ready"), timeout=10)
+    except requests.RequestException:
+        pass
+    if not dbpool.available():
+        pytest.fail(f"psycopg2 ausente: não é possível conferir se a aplicação usa o clone {clone}")
+    try:
+        connected = dbpool.get_database(_db_from_config(db_config), retries=0).scalar(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND application_name = %s",
+            (JDBC_APPLICATION_NAME,),
+        )
+    except dbpool.DatabaseUnavailable as exc:
+        pytest.fail(f"Clone {clone} inacessível: {exc}")
+    if not connected:
+        pytest.fail(
+            f"A aplicação não está conectada ao clone {clone}: os pedidos dos testes iriam para outro banco "
+            f"e a limpeza não os alcançaria. Inicie o servidor com DB_NAME={clone} ou rode sem APP_TEST_DB_SNAPSHOT."
+        )
+
+
+@pytest.fixture(scope="session")
+def db_config(db_snapshot, request) -> Dict[str, str]:
+    config = _db_settings()
+    if db_snapshot:
+        config["dbname"] = db_snapshot["database"]
+        request.getfixturevalue("ensure_app_running")
+        _require_app_on_clone(request.getfixturevalue("api_base_url"), config)
+    return config
+
+
 def _cleanup_pedidos(codigos: Iterable[str], db_config: Dict[str, str]) -> None:
     items = list(codigos)
     if not items:
         return
-    if psycopg2 is None:  # pragma: no cover - fallback para ambientes sem psycopg2
+    if not dbpool.available():  # pragma: no cover - fallback para ambientes sem psycopg2
         return
+    db = _db_from_config(db_config)
     try:
-        conn = psycopg2.connect(connect_timeout=5, **db_config)
-    except OperationalError:  # pragma: no cover - banco indisponível
+        # Pool compartilhado pela sessão; um único DELETE para todos os códigos do teste
+        dbpool.get_database(db, retries=0).execute("DELETE FROM pedido WHERE codigo = ANY(%s)", (items,))
+    except dbpool.DatabaseUnavailable:  # pragma: no cover - banco indisponível
         return
-    try:
-        with conn:
-            with conn.cursor() as cur:
-                for codigo in items:
-                    cur.execute("DELETE FROM pedido WHERE codigo = %s", (codigo,))
-    finally:
-        conn.close()
 
 
 @pytest.fixture()
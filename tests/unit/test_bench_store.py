@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import pytest
+
+import bench_store
+
+
+def _op(ok, errors=0, p95=10.0, p99=20.0):
+    return {"ok": ok, "errors": errors, "latency_ms": {"p50": 5.0, "p95": p95, "p99": p99}}
+
+
+def _mix(ok=1000, errors=0, p95=10.0, p99=20.0, duration=10.0):
+    return {
+        "mode": "closed", "duration_s": duration, "throughput_rps": (ok + errors) / duration,
+        "latency_ms": {"p50": 5.0, "p95": p95, "p99": p99},
+        "operations": {"list": _op(ok, errors, p95, p99)},
+    }
+
+
+def _run(result, **meta):
+    return {"meta": meta, "result": result, "path": meta.get("path")}
+
+
+def _compare(base, cand, **kw):
+    return bench_store.compare_runs(_run(base), _run(cand), **kw)
+
+
+def _row(comparison, metric, scope="total"):
+    return next(r for r in comparison.rows if r["scope"] == scope and r["metric"] == metric)
+
+
+@pytest.mark.parametrize("percentile", ["p95", "p99"])
+@pytest.mark.parametrize("candidate, regressed", [(110.0, False), (109.9, False), (110.1, True)])
+def test_latencia_no_limite(percentile, candidate, regressed):
+    comparison = _compare(_mix(**{percentile: 100.0}), _mix(**{percentile: candidate}), latency_threshold_pct=10)
+    assert _row(comparison, percentile)["regressed"] is regressed
+    assert _row(comparison, percentile, scope="list")["regressed"] is regressed
+
+
+@pytest.mark.parametrize("ok, regressed", [(900, False), (901, False), (899, True)])
+def test_vazao_no_limite(ok, regressed):
+    comparison = _compare(_mix(ok=1000), _mix(ok=ok), throughput_threshold_pct=10)
+    assert _row(comparison, "throughput")["regressed"] is regressed
+    # Vazão por operação depende da mistura sorteada: só o total é avaliado
+    assert not [r for r in comparison.rows if r["metric"] == "throughput" and r["scope"] != "total"]
+
+
+def test_vazao_conta_apenas_requisicoes_ok():
+    metrics = bench_store.extract_metrics(_mix(ok=600, errors=400, duration=10.0))
+    assert metrics["total"]["throughput"] == 60.0
+    assert metrics["total"]["error_rate"] == 0.4
+    assert metrics["list"]["throughput"] == 60.0
+    # Erros rápidos mantêm as requisições/s, mas não escondem a queda de vazão útil
+    comparison = _compare(_mix(ok=1000), _mix(ok=600, errors=400))
+    assert _row(comparison, "throughput")["regressed"]
+
+
+@pytest.mark.parametrize("errors, regressed", [(10, False), (11, True)])
+def test_taxa_de_erros(errors, regressed):
+    comparison = _compare(_mix(ok=1000), _mix(ok=1000 - errors, errors=errors), error_rate_threshold=0.01)
+    row = _row(comparison, "error_rate")
+    assert row["delta_abs"] == pytest.approx(errors / 1000)
+    assert row["regressed"] is regressed
+
+
+def test_taxa_de_erros_reprova_mesmo_com_latencia_boa():
+    comparison = _compare(_mix(ok=1000), _mix(ok=1, errors=999, p95=1.0, p99=2.0))
+    assert {(r["scope"], r["metric"]) for r in comparison.regressions} >= {("total", "error_rate"), ("total", "throughput")}
+    assert not any(r["metric"] in ("p95", "p99") for r in comparison.regressions)
+
+
+def test_metricas_do_ciclo_de_vida():
+    result = {
+        "scenario": "lifecycle", "completed": 90, "failed": 10, "duration_s": 30.0, "throughput_rps": 3.0,
+        "steps": {"create": _op(100, 0, 12.0, 30.0), "ready": _op(85, 5, 8.0, 16.0)},
+    }
+    metrics = bench_store.extract_metrics(result)
+    assert metrics["total"] == {"throughput": 3.0, "error_rate": 0.1}
+    assert set(metrics) == {"total", "create", "ready"}
+    assert metrics["ready"] == {"throughput": round(85 / 30.0, 2), "error_rate": round(5 / 90, 5), "p95": 8.0, "p99": 16.0}
+
+
+def _save(tmp_path, stamp, commit="aaa", server="tomcat", scenario="mix", flags="-Xmx1g", dataset=1000):
+    meta = {
+        "timestamp": f"2025-03-10T10:{stamp:02d}:00", "commit": commit, "dirty": False, "server": server,
+        "scenario": scenario, "jvm_flags": flags, "jvm_flags_hash": bench_store.jvm_flags_hash(flags),
+        "dataset_size": dataset,
+    }
+    return bench_store.save_run(str(tmp_path), meta, _mix())
+
+
+def test_referencia_mesmas_condicoes_outro_commit_mais_recente(tmp_path):
+    _save(tmp_path, 1, commit="aaa")
+    expected = _save(tmp_path, 2, commit="bbb", dataset=1040)
+    _save(tmp_path, 3, commit="ccc", server="wildfly")
+    _save(tmp_path, 4, commit="ccc", scenario="lifecycle")
+    _save(tmp_path, 5, commit="ccc", flags="-Xmx2g")
+    _save(tmp_path, 6, commit="ccc", dataset=1100)
+    _save(tmp_path, 7, commit="ddd")  # mesmo commit da candidata
+    candidate = bench_store.load_run(_save(tmp_path, 8, commit="ddd"))
+    _save(tmp_path, 9, commit="eee")  # posterior à candidata
+
+    baseline = bench_store.find_baseline(str(tmp_path), candidate)
+    assert baseline["path"] == expected
+
+
+def test_referencia_do_mesmo_commit_na_falta_de_outro(tmp_path):
+    earlier = _save(tmp_path, 1, commit="ddd")
+    candidate = bench_store.load_run(_save(tmp_path, 2, commit="ddd"))
+    assert bench_store.find_baseline(str(tmp_path), candidate)["path"] == earlier
+
+
+def test_referencia_tolerancia_do_conjunto_de_dados(tmp_path):
+    other = _save(tmp_path, 1, commit="aaa", dataset=2000)
+    candidate = bench_store.load_run(_save(tmp_path, 2, commit="bbb", dataset=1000))
+    assert bench_store.find_baseline(str(tmp_path), candidate) is None
+    assert bench_store.find_baseline(str(tmp_path), candidate, match_dataset=False)["path"] == other
+    assert bench_store.similar_dataset(1000, 1050) and not bench_store.similar_dataset(1000, 1060)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+import queryplan
+
+
+def _values():
+    return queryplan.filter_values("PRONTO", "MANUAL", "Silva", days=7, today=date(2025, 3, 10))
+
+
+def test_filter_values_como_o_dao():
+    values = _values()
+    assert values["destinatario"] == "%silva%"
+    assert values["dataInicio"].isoformat() == "2025-03-03T00:00:00"
+    assert values["dataFim"].isoformat() == "2025-03-11T00:00:00"
+
+
+def test_build_query_sem_filtros():
+    sql, params = queryplan.build_query((), _values())
+    assert params == []
+    assert "where 1=1 order by p1_0.created_at desc,v1_0.id" in sql
+    assert sql.startswith("select distinct p1_0.id,p1_0.canal,")
+    assert "left join volume v1_0 on p1_0.id=v1_0.pedido_id" in sql
+
+
+def test_build_query_parametros_na_ordem_dos_filtros():
+    values = _values()
+    sql, params = queryplan.build_query(("dataFim", "status", "destinatario"), values)
+    assert "p1_0.status=%s and lower(p1_0.destinatario_nome) like %s and p1_0.created_at<%s" in sql
+    assert params == [values["status"], values["destinatario"], values["dataFim"]]
+    assert sql.count("%s") == len(params)
+
+
+def test_combinations_cobre_todas():
+    combos = queryplan.combinations()
+    assert len(combos) == 32
+    assert combos[0] == () and combos[-1] == queryplan.FILTERS
+    assert queryplan.combo_label(()) == "(sem filtros)"
+
+
+EXPLAIN = {
+    "Planning Time": 0.42,
+    "Execution Time": 812.5,
+    "Plan": {
+        "Node Type": "Unique", "Actual Rows": 5000, "Actual Loops": 1,
+        "Shared Hit Blocks": 120, "Shared Read Blocks": 30, "Temp Written Blocks": 7,
+        "Plans": [{
+            "Node Type": "Sort", "Sort Method": "external merge", "Sort Space Type": "Disk",
+            "Sort Space Used": 2048, "Actual Rows": 5000, "Actual Loops": 1,
+            "Plans": [{
+                "Node Type": "Hash Join", "Actual Rows": 5000, "Actual Loops": 1,
+                "Plans": [
+                    {"Node Type": "Seq Scan", "Relation Name": "volume", "Actual Rows": 60000, "Actual Loops": 1},
+                    {"Node Type": "Hash", "Hash Batches": 4, "Actual Rows": 5000, "Actual Loops": 1,
+                     "Plans": [{"Node Type": "Seq Scan", "Relation Name": "pedido", "Actual Rows": 5000,
+                                "Rows Removed by Filter": 45000, "Actual Loops": 1}]},
+                ],
+            }],
+        }],
+    },
+}
+
+
+def test_analyze_plan_alertas():
+    summary = queryplan.analyze_plan(EXPLAIN)
+    assert summary["execution_ms"] == 812.5
+    assert summary["rows"] == 5000
+    assert summary["shared_hit"] == 120 and summary["shared_read"] == 30 and summary["temp_written"] == 7
+    assert summary["seq_scans"] == ["pedido", "volume"]
+    kinds = [f["kind"] for f in summary["findings"]]
+    assert kinds.count("seq_scan") == 2
+    assert {"sort_disk", "hash_batches", "unbounded_result"} <= set(kinds)
+    pedido = next(f for f in summary["findings"] if f.get("relation") == "pedido")
+    assert pedido["scanned"] == 50000 and pedido["kept"] == 5000
+    assert summary["plan"]
+
+
+def test_analyze_plan_respeita_limites():
+    summary = queryplan.analyze_plan(EXPLAIN, seq_scan_min_rows=100_000, result_rows_warn=10_000)
+    assert summary["seq_scans"] == []
+    assert {f["kind"] for f in summary["findings"]} == {"sort_disk", "hash_batches"}
+
+
+def test_growth_exponent():
+    assert queryplan.growth_exponent([(1000, 10.0), (10000, 100.0)]) == pytest.approx(1.0)
+    assert queryplan.growth_exponent([(1000, 10.0), (10000, 1000.0)]) == pytest.approx(2.0)
+    assert queryplan.growth_exponent([(1000, 10.0)]) is None
+    assert queryplan.growth_exponent([(1000, 10.0), (1000, 12.0)]) is None
+
+
+def _dataset(pedidos, ms, rows=100, findings=()):
+    return {"pedidos": pedidos, "combos": {"status": {"execution_ms": ms, "rows": rows, "findings": list(findings)}}}
+
+
+def test_project_extrapola_pelo_expoente():
+    rows = queryplan.project([_dataset(1000, 1.0), _dataset(10000, 100.0)], target_pedidos=100000, budget_ms=1000)
+    (row,) = rows
+    assert row["exponent"] == 2.0
+    assert row["projected_ms"] == pytest.approx(10000.0)
+    assert row["projected_rows"] == 1000
+    assert row["at_risk"]
+
+
+def test_project_um_tamanho_assume_linear():
+    (row,) = queryplan.project([_dataset(10000, 5.0)], target_pedidos=100000, budget_ms=1000)
+    assert row["exponent"] is None
+    assert row["projected_ms"] == pytest.approx(50.0)
+    assert not row["at_risk"] and row["reasons"] == []
+
+
+def test_project_timeout_na_medicao():
+    (row,) = queryplan.project([_dataset(10000, None)], target_pedidos=100000)
+    assert row["projected_ms"] is None
+    assert row["at_risk"] and row["reasons"] == ["timeout na medição"]
+
+
+def test_project_ignora_conjunto_vazio():
+    (row,) = queryplan.project([_dataset(0, 0.5), _dataset(10000, 5.0)], target_pedidos=100000)
+    assert row["measured_pedidos"] == 10000
+    with pytest.raises(ValueError):
+        queryplan.project([_dataset(0, 0.5)])
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# © 2025 23.969.028 CHRISTIAN VLADIMIR UHDRE MULATO (CNPJ 23.969.028/0001-37)
+
+"""
+Spans de rastreamento (tracing) das etapas de build/deploy/testes.
+
+    with tracing.span("maven_build", cat="build", command="clean package"):
+        ...
+
+Spans podem ser aninhados (pilha por thread) e são exportados por execução em log/ como
+JSON no formato Chrome trace-event (abrir em chrome://tracing ou https://ui.perfetto.dev)
+e como tabela-resumo em texto.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+# APP_TRACE=0 desativa o registro de spans
+ENABLED = str(os.environ.get("APP_TRACE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+# Spans mantidos em memória (os mais antigos são descartados): o menu pode ficar aberto por horas
+MAX_SPANS = int(os.environ.get("APP_TRACE_MAX_SPANS", "50000"))
+
+
+class SpanRecord:
+    # Classe simples (sem dataclasses): tracing é importado na inicialização do main.py
+    __slots__ = ("name", "cat", "start", "end", "tid", "thread_name", "depth", "parent", "args", "error")
+
+    def __init__(self, name: str, cat: str, start: float, tid: int = 0, thread_name: str = "",
+                 depth: int = 0, parent: Optional[str] = None, args: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.cat = cat
+        self.start = start  # time.perf_counter()
+        self.end: Optional[float] = None
+        self.tid = tid
+        self.thread_name = thread_name
+        self.depth = depth
+        self.parent = parent
+        self.args = args or {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer:
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now()
+        self.spans: Deque[SpanRecord] = deque(maxlen=max(1, max_spans))
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[SpanRecord]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args) -> Iterator[SpanRecord]:
+        stack = self._stack()
+        thread = threading.current_thread()
+        record = SpanRecord(
+            name=name, cat=cat, start=time.perf_counter(), tid=thread.ident or 0,
+            thread_name=thread.name, depth=len(stack), parent=stack[-1].name if stack else None,
+            args={k: v for k, v in args.items() if v is not None},
+        )
+        with self._lock:
+            if len(self.spans) == self.spans.maxlen:
+                self.dropped += 1
+            self.spans.append(record)
+        stack.append(record)
+        try:
+            yield record
+        except BaseException as exc:
+            record.error = f"{exc.__class__.__name__}: {exc}"
+            raise
+        finally:
+            record.end = time.perf_counter()
+            stack.pop()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Eventos completos ('X') em microssegundos desde o início da execução."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        threads = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            threads.setdefault(s.tid, s.thread_name)
+            args = {k: (v if isinstance(v, (int, float, bool, str)) else str(v)) for k, v in s.args.items()}
+            if s.error:
+                args["error"] = s.error
+            events.append({
+                "name": s.name, "cat": s.cat, "ph": "X", "pid": pid, "tid": s.tid,
+                "ts": round((s.start - self.origin) * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "args": args,
+            })
+        for tid, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "app_jakarta"}})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at.isoformat(timespec="seconds"), "dropped_spans": self.dropped},
+        }
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """Agregado por (categoria, nome): chamadas, total, média, máximo e tempo próprio (sem filhos)."""
+        with self._lock:
+            spans = list(self.spans)
+        child_time: Dict[int, float] = {}
+        # Tempo próprio: desconta filhos diretos na mesma thread
+        by_thread: Dict[int, List[SpanRecord]] = {}
+        for s in spans:
+            by_thread.setdefault(s.tid, []).append(s)
+        for thread_spans in by_thread.values():
+            stack: List[SpanRecord] = []
+            for s in sorted(thread_spans, key=lambda r: (r.start, -r.duration)):
+                while stack and (stack[-1].end or 0) <= s.start:
+                    stack.pop()
+                if stack:
+                    child_time[id(stack[-1])] = child_time.get(id(stack[-1]), 0.0) + s.duration
+                stack.append(s)
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for s in spans:
+            row = rows.setdefault((s.cat, s.name), {"cat": s.cat, "name": s.name, "calls": 0, "total": 0.0,
+                                                     "max": 0.0, "self": 0.0, "errors": 0})
+            row["calls"] += 1
+            row["total"] += s.duration
+            row["max"] = max(row["max"], s.duration)
+            row["self"] += max(0.0, s.duration - child_time.get(id(s), 0.0))
+            row["errors"] += 1 if s.error else 0
+        return sorted(rows.values(), key=lambda r: r["total"], reverse=True)
+
+    def summary_text(self) -> str:
+        rows = self.summary_rows()
+        with self._lock:
+            wall = max(((s.end or s.start) for s in self.spans), default=self.origin) - self.origin
+        dropped = f" ({self.dropped} span(s) mais antigos descartados)" if self.dropped else ""
+        lines = [
+            f"Execução iniciada em {self.started_at.isoformat(timespec='seconds')} — duração rastreada {wall:.2f}s{dropped}",
+            f"{'categoria':<10} {'etapa':<28} {'chamadas':>8} {'total(s)':>9} {'média(s)':>9} {'máx(s)':>8} {'próprio(s)':>10} {'%':>6}",
+        ]
+        for r in rows:
+            share = (r["total"] / wall * 100) if wall > 0 else 0.0
+            flag = f"  ({r['errors']} erro(s))" if r["errors"] else ""
+            lines.append(
+                f"{r['cat']:<10} {r['name']:<28} {r['calls']:>8} {r['total']:>9.2f} {r['total'] / r['calls']:>9.2f} "
+                f"{r['max']:>8.2f} {r['self']:>10.2f} {share:>5.1f}%{flag}"
+            )
+        return "\n".join(lines)
+
+    def export(self, log_dir: str, basename: str = "run") -> Optional[Dict[str, str]]:
+        """Grava <data_hora>_<basename>_trace.json e _trace_summary.txt em log_dir (se houver spans)."""
+        if not self.spans:
+            return None
+        os.makedirs(log_dir, exist_ok=True)
+        stamp = self.started_at.strftime("%Y_%m_%d_%H%M%S")
+        trace_path = os.path.join(log_dir, f"{stamp}_{basename}_trace.json")
+        summary_path = os.path.join(log_dir, f"{stamp}_{basename}_trace_summary.txt")
+        with open(trace_path, "w", encoding="utf-8") as fh:
+            json.dump(self.chrome_trace(), fh, ensure_ascii=False)
+        with open(summary_path, "w", encoding="utf-8") as fh:
+            fh.write(self.summary_text() + "\n")
+        return {"trace": trace_path, "summary": summary_path}
+
+
+_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _TRACER
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args) -> Iterator[Optional[SpanRecord]]:
+    """Span no rastreador global (no-op quando APP_TRACE=0)."""
+    if not ENABLED:
+        yield None
+        return
+    with _TRACER.span(name, cat, **args) as record:
+        yield record
+
+
+def traced(name: Optional[str] = None, cat: str = "stage"):
+    """Decorador: executa a função dentro de um span (nome padrão = nome da função)."""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            with span(span_name, cat):
+                return fn(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def export(log_dir: str, basename: str = "run") -> Optional[Dict[str, str]]:
+    return _TRACER.export(log_dir, basename) if ENABLED else None